@@ -0,0 +1,5 @@
+"""
+Benchmarks for Scientist Twin
+Run individual benchmarks as modules, e.g. python -m benchmarks.resonance
+The full per-stage suite (JSON results in benchmarks/results/) is python -m benchmarks.suite
+"""
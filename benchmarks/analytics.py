@@ -0,0 +1,176 @@
+"""
+Analytics aggregation benchmark - whole-table downloads vs server-side aggregates
+For each /analytics and /dashboard metric, compares the rows the old path
+pulled to count in Python (rank-1 results, every completed profile, domain,
+ip_hash and timestamp columns) with the small result the analytics views
+return. Runs offline on the SQLite backend at each size; payload
+is the JSON a PostgREST response would carry
+
+Usage: python -m benchmarks.analytics [--sizes 10000 1000000]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from questions_v3_simplified import TRAIT_DIMENSIONS
+from sqlite_backend import SQLiteBackend
+from benchmarks.storage import DOMAINS
+
+
+def bulk_load(backend, sessions: int, seed: int = 0, chunk: int = 20000, first: int = 0):
+    """Insert finished quizzes straight into the tables (a million start_quiz calls would take minutes)
+
+    first numbers the sessions, so a database can be grown in steps.
+    """
+    with open('scientist_db_rich.json', 'r', encoding='utf-8') as f:
+        scientists = json.load(f)
+    rng = random.Random(seed)
+    dims = list(TRAIT_DIMENSIONS.items())
+    start = datetime.now(timezone.utc) - timedelta(days=30)
+    conn = backend._connect()
+    for offset in range(first, first + sessions, chunk):
+        session_rows, result_rows = [], []
+        for i in range(offset, min(offset + chunk, first + sessions)):
+            started = start + timedelta(seconds=rng.randrange(30 * 86400))
+            stamp = started.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+            profile = json.dumps({dim: rng.choice(values) for dim, values in dims})
+            session_rows.append((f"s{i}", f"bulk-{i}", rng.choice(DOMAINS), profile, stamp, stamp,
+                                 f"ip{rng.randrange(int(sessions * 0.8))}"))
+            for rank, s in enumerate(rng.sample(scientists, 3), 1):
+                result_rows.append((f"r{i}-{rank}", f"s{i}", s["name"], s["field"], s.get("era", ""),
+                                    s.get("image_url", ""), round(rng.uniform(0.5, 0.95), 3), "Strong", rank, stamp))
+        with backend._transaction():
+            conn.executemany("INSERT INTO quiz_sessions (id, session_id, domain, user_profile, started_at, "
+                             "completed_at, ip_hash) VALUES (?, ?, ?, ?, ?, ?, ?)", session_rows)
+            conn.executemany("INSERT INTO quiz_results (id, session_id, scientist_name, scientist_field, "
+                             "scientist_era, scientist_image, match_score, match_quality, rank, created_at) "
+                             "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", result_rows)
+
+
+def download(backend, sql: str) -> tuple:
+    """Rows as a PostgREST response would carry them: (decoded rows, payload bytes)"""
+    payload = json.dumps(backend._query(sql))
+    return json.loads(payload), len(payload)
+
+
+def old_path(backend) -> dict:
+    """The Python-side counting the analytics used before: {metric: (payload bytes, seconds)}"""
+    def hall_of_fame():
+        rows, size = download(backend, "SELECT scientist_name, scientist_field, scientist_era, scientist_image, "
+                                       "match_score FROM quiz_results WHERE rank = 1")
+        counts = Counter(r["scientist_name"] for r in rows)
+        return size, counts.most_common(5)
+
+    def fields():
+        rows, size = download(backend, "SELECT scientist_field FROM quiz_results WHERE rank = 1")
+        return size, Counter(r["scientist_field"] for r in rows if r["scientist_field"]).most_common(5)
+
+    def traits():
+        rows, size = download(backend, "SELECT user_profile FROM quiz_sessions WHERE completed_at IS NOT NULL")
+        counts = Counter()
+        for r in rows:
+            counts.update(f"{k}:{v}" for k, v in json.loads(r["user_profile"]).items())
+        return size, counts.most_common(20)
+
+    def domains():
+        rows, size = download(backend, "SELECT domain FROM quiz_sessions WHERE completed_at IS NOT NULL")
+        return size, Counter(r["domain"] for r in rows).most_common()
+
+    def retakes():
+        rows, size = download(backend, "SELECT ip_hash FROM quiz_sessions "
+                                       "WHERE completed_at IS NOT NULL AND ip_hash IS NOT NULL")
+        return size, (len(rows), len({r["ip_hash"] for r in rows}))
+
+    def activity():
+        rows, size = download(backend, "SELECT started_at FROM quiz_sessions WHERE completed_at IS NOT NULL")
+        hours, days = Counter(), Counter()
+        for r in rows:
+            dt = datetime.fromisoformat(r["started_at"].replace("Z", "+00:00"))
+            hours[dt.hour] += 1
+            days[dt.strftime("%A")] += 1
+        return size, (hours.most_common(1), days.most_common(1))
+
+    return time_metrics({"hall_of_fame": hall_of_fame, "popular_fields": fields, "trait_distribution": traits,
+                         "domain_distribution": domains, "retake_rate": retakes, "peak_times": activity})
+
+
+def new_path(backend) -> dict:
+    """The same metrics from the analytics tables: {metric: (payload bytes, seconds)}"""
+    def small(result):
+        return len(json.dumps(result)), result
+
+    return time_metrics({
+        "hall_of_fame": lambda: small(backend.top_scientists(5)),
+        "popular_fields": lambda: small(backend.field_counts(5)),
+        "trait_distribution": lambda: small(backend.trait_pair_counts(20)),
+        "domain_distribution": lambda: small(backend.domain_counts()),
+        "retake_rate": lambda: small(backend.retake_counts()),
+        "peak_times": lambda: small(backend.activity_by_time()),
+    })
+
+
+def time_metrics(metrics: dict) -> dict:
+    timings = {}
+    for name, run in metrics.items():
+        t = time.perf_counter()
+        size, _ = run()
+        timings[name] = (size, time.perf_counter() - t)
+    return timings
+
+
+def human(size: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark server-side analytics aggregation")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 1000000])
+    args = parser.parse_args()
+
+    ok = True
+    for sessions in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            backend = SQLiteBackend(os.path.join(tmp, "analytics.db"))
+            t = time.perf_counter()
+            bulk_load(backend, sessions)
+            print(f"\n{sessions:,} sessions ({sessions * 3:,} results) loaded in {time.perf_counter() - t:.1f}s")
+
+            old, new = old_path(backend), new_path(backend)
+            print(f"  {'metric':<20} {'download payload':>17} {'time':>9}   {'aggregate payload':>17} {'time':>9}")
+            for name in old:
+                print(f"  {name:<20} {human(old[name][0]):>17} {old[name][1] * 1e3:>7.1f}ms"
+                      f"   {human(new[name][0]):>17} {new[name][1] * 1e3:>7.2f}ms")
+            old_bytes, old_s = sum(v[0] for v in old.values()), sum(v[1] for v in old.values())
+            new_bytes, new_s = sum(v[0] for v in new.values()), sum(v[1] for v in new.values())
+            print(f"  {'total':<20} {human(old_bytes):>17} {old_s * 1e3:>7.1f}ms"
+                  f"   {human(new_bytes):>17} {new_s * 1e3:>7.2f}ms")
+
+            # Same answers both ways
+            expected = Counter()
+            for row in backend._query("SELECT scientist_name FROM quiz_results WHERE rank = 1"):
+                expected[row["scientist_name"]] += 1
+            top = backend.top_scientists(5)
+            if [s["match_count"] for s in top] != [c for _, c in expected.most_common(5)]:
+                print("  FAIL: hall of fame differs from a direct count")
+                ok = False
+            if backend.retake_counts()[0] != sessions or sum(d["count"] for d in backend.domain_counts()) != sessions:
+                print("  FAIL: aggregate totals differ from the session count")
+                ok = False
+
+    print("PASS" if ok else "FAIL")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+Circuit breaker fault injection against a local PostgREST stand-in
+Serves PostgREST-shaped JSON from a local HTTP server whose behaviour can be
+switched between healthy, erroring (503) and hanging, then drives calls
+through a CircuitBreaker: reports per-phase latency and state transitions,
+and checks that an open breaker fails fast against a real socket. The
+transition rules themselves are tested in tests/test_circuit_breaker.py
+
+Usage: python -m benchmarks.circuit_breaker [--calls 40] [--timeout 0.5]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED, OPEN
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """GET /rest/v1/<table> - answers like PostgREST, or fails as server.mode says
+
+    Also used by tests/test_supabase_breakers.py.
+    """
+
+    def do_GET(self):
+        mode = self.server.mode
+        self.server.requests += 1
+        if mode == "hang":
+            time.sleep(self.server.hang_seconds)
+        if mode == "error":
+            self.send_response(503)
+            body = json.dumps({"code": "PGRST000", "message": "Could not connect to the database"}).encode()
+        else:
+            self.send_response(200)
+            rows = [{"id": 1, "scientist_name": "Marie Curie"}]
+            # .single() asks for one object instead of an array
+            single = "vnd.pgrst.object" in self.headers.get("Accept", "")
+            body = json.dumps(rows[0] if single else rows).encode()
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+    mode = "ok"
+    hang_seconds = 2.0
+    requests = 0
+
+    def handle_error(self, request, client_address):
+        pass  # clients that timed out on a hanging request close the socket early
+
+
+def fetch(url: str, timeout: float):
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def run_phase(breaker, url: str, calls: int, timeout: float) -> dict:
+    timings, outcomes = [], {"ok": 0, "error": 0, "rejected": 0}
+    for _ in range(calls):
+        t = time.perf_counter()
+        try:
+            breaker.call(fetch, url, timeout)
+            outcomes["ok"] += 1
+        except CircuitOpenError:
+            outcomes["rejected"] += 1
+        except (urllib.error.URLError, OSError):
+            outcomes["error"] += 1
+        timings.append(time.perf_counter() - t)
+    p50, p99 = np.percentile(np.array(timings) * 1e3, [50, 99])
+    return dict(outcomes, p50_ms=p50, p99_ms=p99, total_s=sum(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fault-inject a CircuitBreaker against a local PostgREST stand-in")
+    parser.add_argument("--calls", type=int, default=40, help="calls per phase")
+    parser.add_argument("--timeout", type=float, default=0.5, help="client read timeout in seconds")
+    parser.add_argument("--open-seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    server = StandInServer(("127.0.0.1", 0), StandIn)
+    server.mode, server.hang_seconds = "ok", args.timeout * 4
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/rest/v1/quiz_results"
+
+    breaker = CircuitBreaker("reads", window=10.0, min_calls=5, error_threshold=0.5, open_seconds=args.open_seconds)
+    failures = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        phases = []
+        for label, mode in [("healthy", "ok"), ("503 errors", "error"), ("hanging", "hang")]:
+            server.mode = mode
+            breaker.reset()
+            phases.append((label, run_phase(breaker, url, args.calls, args.timeout), breaker.state))
+        tripped_state = breaker.state
+
+        server.mode = "ok"
+        time.sleep(args.open_seconds)
+        phases.append(("recovered", run_phase(breaker, url, args.calls, args.timeout), breaker.state))
+    server.shutdown()
+
+    for label, stats, state in phases:
+        print(f"{label:<11} ok {stats['ok']:>3}  errors {stats['error']:>3}  rejected {stats['rejected']:>3}  "
+              f"p50 {stats['p50_ms']:8.3f} ms  p99 {stats['p99_ms']:8.3f} ms  total {stats['total_s']:.2f}s  "
+              f"-> {state}")
+    print("Transitions: " + ", ".join(f"{t['from']}->{t['to']}" for t in breaker.stats()["transitions"]))
+    unbroken_s = args.calls * args.timeout
+    print(f"Hanging phase: {phases[2][1]['total_s']:.2f}s with the breaker vs ~{unbroken_s:.0f}s "
+          f"waiting out every timeout")
+
+    if tripped_state != OPEN:
+        failures.append(f"breaker did not trip (state {tripped_state})")
+    if phases[2][1]["error"] > 5:
+        failures.append("more than min_calls timeouts before tripping")
+    if phases[3][2] != CLOSED or phases[3][1]["ok"] != args.calls:
+        failures.append("breaker did not close after a successful half-open probe")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
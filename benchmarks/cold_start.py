@@ -0,0 +1,100 @@
+"""
+Cold start benchmark - how long a fresh process takes to serve its first match
+Runs each start in a new interpreter (as a new serverless instance or worker
+would): import web_app_v3, load the matching engine, answer the first
+/api/submit-quiz. Compared setups: the engine indexed from the JSON
+(ENGINE_SNAPSHOT empty) and mapped from scientist_engine.snapshot, whose
+results must be identical
+
+Usage: python -m benchmarks.cold_start [--runs 9]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from build_engine_snapshot import DEFAULT_OUT, build
+
+# Runs in the fresh interpreter, prints one JSON line of timings (ms) and a digest of the results
+CHILD = r'''
+import hashlib, json, random, time
+start = time.perf_counter()
+import web_app_v3
+imported = time.perf_counter()
+engine = web_app_v3.get_matching_engine()
+loaded = time.perf_counter()
+client = web_app_v3.app.test_client()
+response = client.post("/api/submit-quiz", json={"domain": "cosmos", "answers": [1, 2, 0, 3, 1, 2, 0, 1, 3, 2, 1, 0]})
+answered = time.perf_counter()
+assert response.status_code == 200, response.status_code
+
+from questions_v3_simplified import DOMAINS, build_user_profile
+rng = random.Random(7)
+digest = hashlib.sha256()
+for i in range(200):
+    profile = build_user_profile([rng.randrange(4) for _ in range(12)])
+    matches = engine.get_full_matches(profile, rng.choice(list(DOMAINS) + [None]), rng=random.Random(i))
+    digest.update(json.dumps(matches, sort_keys=True).encode())
+print(json.dumps({"import": (imported - start) * 1000, "engine": (loaded - imported) * 1000,
+                  "first": (answered - loaded) * 1000, "total": (answered - start) * 1000,
+                  "mapped": engine.snapshot_path is not None, "digest": digest.hexdigest()}))
+'''
+
+
+def cold_start(env: dict) -> dict:
+    output = subprocess.run([sys.executable, "-c", CHILD], env={**os.environ, **env},
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start with the engine indexed from JSON vs mapped from a snapshot")
+    parser.add_argument("--runs", type=int, default=9, help="fresh processes per setup (medians reported)")
+    args = parser.parse_args()
+
+    if not os.path.exists(DEFAULT_OUT):
+        build()
+
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {"STORAGE_BACKEND": f"sqlite:///{os.path.join(tmp, 'app.db')}",
+               "WRITE_JOURNAL_PATH": os.path.join(tmp, "journal.db"),
+               "RESULT_STORE_URL": f"sqlite:///{os.path.join(tmp, 'results.db')}",
+               "SHARED_STATE_URL": "memory", "SECRET_KEY": "benchmark-only-key",
+               "LIVE_FEED": "0", "PYTHONPATH": os.getcwd()}
+        setups = (("indexed from JSON", {**env, "ENGINE_SNAPSHOT": ""}),
+                  ("mapped snapshot", {**env, "ENGINE_SNAPSHOT": DEFAULT_OUT}))
+        cold_start(env)  # warm the OS page cache and .pyc files
+
+        print(f"Median of {args.runs} fresh processes, ms")
+        print(f"  {'setup':<20} {'import':>8} {'engine':>8} {'1st req':>8} {'total':>8}")
+        results = {}
+        for label, setup_env in setups:
+            runs = [cold_start(setup_env) for _ in range(args.runs)]
+            med = {key: statistics.median(r[key] for r in runs) for key in ("import", "engine", "first", "total")}
+            results[label] = (med, runs)
+            print(f"  {label:<20} {med['import']:>8.1f} {med['engine']:>8.1f} {med['first']:>8.1f} {med['total']:>8.1f}")
+
+    (indexed, indexed_runs), (mapped, mapped_runs) = results["indexed from JSON"], results["mapped snapshot"]
+    print(f"\nEngine load {indexed['engine']:.1f} -> {mapped['engine']:.1f} ms, "
+          f"first match served {indexed['total']:.0f} -> {mapped['total']:.0f} ms after start")
+    if any(r["mapped"] for r in indexed_runs) or not all(r["mapped"] for r in mapped_runs):
+        print("  FAIL: the snapshot was used (or ignored) when it should not have been")
+        ok = False
+    if len({r["digest"] for r in indexed_runs + mapped_runs}) != 1:
+        print("  FAIL: results differ between the indexed and the mapped engine")
+        ok = False
+    if mapped["engine"] >= indexed["engine"]:
+        print("  FAIL: mapping the snapshot should be faster than indexing the JSON")
+        ok = False
+
+    print("PASS" if ok else "FAIL")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
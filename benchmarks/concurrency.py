@@ -0,0 +1,88 @@
+"""
+Concurrency stress test for MatchingEngineV3.get_full_matches
+Runs thousands of concurrent requests against one shared engine and checks
+that every request produces the same output as its single-threaded reference
+(per-request rng, no shared sentence state) and that RSS stays flat
+
+Usage: python -m benchmarks.concurrency [--calls 5000] [--threads 32] [--specs 200]
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import resource
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from matching_engine_v3 import MatchingEngineV3
+from questions_v3_simplified import QUESTIONS, DOMAINS, build_user_profile
+
+
+def rss_mb() -> float:
+    """Current resident set size in MB (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def make_specs(engine, count: int, seed: int = 0) -> list:
+    """Random (profile, domain, recently_shown, rng seed) request specs"""
+    rng = random.Random(seed)
+    names = [s['name'] for s in engine.scientists]
+    return [(build_user_profile([rng.randrange(len(q['options'])) for q in QUESTIONS]),
+             rng.choice(list(DOMAINS)),
+             rng.sample(names, min(len(names), rng.randrange(10))),
+             rng.randrange(2 ** 32))
+            for _ in range(count)]
+
+
+def run_spec(engine, spec) -> list:
+    profile, domain, recently_shown, seed = spec
+    return engine.get_full_matches(profile, domain, recently_shown=list(recently_shown), rng=random.Random(seed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress get_full_matches from many threads")
+    parser.add_argument("--db", default="scientist_db_rich.json")
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--specs", type=int, default=200)
+    args = parser.parse_args()
+
+    # Engine logs every narrative it builds - keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = MatchingEngineV3(args.db)
+        specs = make_specs(engine, args.specs)
+        expected = [run_spec(engine, spec) for spec in specs]
+
+        def check(i):
+            spec_id = i % len(specs)
+            return run_spec(engine, specs[spec_id]) == expected[spec_id]
+
+        samples = [rss_mb()]
+        mismatches = 0
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            for done, ok in enumerate(pool.map(check, range(args.calls)), 1):
+                if not ok:
+                    mismatches += 1
+                if done % max(1, args.calls // 10) == 0:
+                    samples.append(rss_mb())
+        elapsed = time.perf_counter() - start
+
+    print(f"{args.calls} calls on {args.threads} threads in {elapsed:.2f}s ({args.calls / elapsed:.0f} req/s)")
+    print("RSS MB: " + " ".join(f"{s:.1f}" for s in samples))
+    print(f"RSS growth after warm-up: {samples[-1] - samples[1]:+.1f} MB")
+    print(f"Output mismatches vs single-threaded reference: {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
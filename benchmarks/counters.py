@@ -0,0 +1,93 @@
+"""
+Analytics counters benchmark - what counting on write costs and buys
+Times finished quizzes through the app's write path with and without the
+counter triggers, then loads databases of increasing size and checks the
+analytics reads stay flat (they touch counter rows, not sessions) and that
+the running counters equal a full recount
+
+Usage: python -m benchmarks.counters [--sizes 10000 100000] [--sessions 3000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from sqlite_backend import SQLiteBackend
+from benchmarks.analytics import bulk_load
+from benchmarks.storage import populate
+
+COUNTER_TRIGGERS = ("count_started", "count_completed_insert", "count_completed", "count_unique_ip",
+                    "count_quiz_result", "count_likes", "count_shares")
+
+
+def analytics_reads(backend) -> float:
+    """Every counter-backed read behind /analytics, /dashboard and /api/stats, in seconds"""
+    t = time.perf_counter()
+    backend.totals()
+    backend.top_scientists(20)
+    backend.trait_pair_counts(20)
+    backend.domain_counts()
+    backend.field_counts(5)
+    backend.retake_counts()
+    backend.activity_by_time()
+    return time.perf_counter() - t
+
+
+def write_cost(path: str, sessions: int, triggers: bool) -> float:
+    """Seconds per finished quiz (start_quiz plus its share of a batched finish_quiz write)"""
+    backend = SQLiteBackend(path)
+    if not triggers:
+        for name in COUNTER_TRIGGERS:
+            backend._connect().execute(f"DROP TRIGGER {name}")
+    t = time.perf_counter()
+    populate(backend, sessions)
+    return (time.perf_counter() - t) / sessions
+
+
+def counters(backend) -> list:
+    return sorted(map(tuple, backend._connect().execute("SELECT kind, key, count, meta FROM analytics_counters")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incrementally maintained analytics counters")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--sessions", type=int, default=3000, help="quizzes timed for the write cost")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        plain = write_cost(os.path.join(tmp, "plain.db"), args.sessions, triggers=False)
+        counted = write_cost(os.path.join(tmp, "counted.db"), args.sessions, triggers=True)
+    print(f"Write path: {plain * 1e3:.3f} ms per quiz without counters, {counted * 1e3:.3f} ms with "
+          f"(+{(counted - plain) * 1e3:.3f} ms)")
+
+    ok = True
+    print(f"\n  {'sessions':>10} {'counter rows':>13} {'reads p50':>10} {'reads p99':>10} {'recount':>9}")
+    for sessions in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            backend = SQLiteBackend(os.path.join(tmp, "counters.db"))
+            bulk_load(backend, sessions)
+            timings = np.array([analytics_reads(backend) for _ in range(50)]) * 1e3
+            rows = counters(backend)
+
+            t = time.perf_counter()
+            backend.rebuild_analytics_counters()
+            recount = time.perf_counter() - t
+            if counters(backend) != rows:
+                print(f"  FAIL: running counters differ from a full recount at {sessions} sessions")
+                ok = False
+            if backend.totals()["plays"] != sessions:
+                print(f"  FAIL: plays counter {backend.totals()['plays']} != {sessions}")
+                ok = False
+            p50, p99 = np.percentile(timings, [50, 99])
+            print(f"  {sessions:>10,} {len(rows):>13} {p50:>8.2f}ms {p99:>8.2f}ms {recount:>8.1f}s")
+
+    print("PASS" if ok else "FAIL")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
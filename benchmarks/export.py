@@ -0,0 +1,100 @@
+"""
+Streaming export benchmark - memory of the dashboard exports as tables grow
+Streams /dashboard/export/<table>.<fmt> through the Flask test client at
+each size and records peak Python memory (tracemalloc) while doing it,
+next to what materializing the same table in one list costs (the old
+"fetch ALL sessions" dashboard). Checks every row arrives exactly once:
+NDJSON rows must come in strictly increasing (created_at, id) order
+
+Usage: python -m benchmarks.export [--sizes 100000 200000] [--materialize-max 200000]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from sqlite_backend import SQLiteBackend
+from benchmarks.analytics import bulk_load
+
+
+def stream(client, url: str) -> tuple:
+    """(bytes, lines, rows out of keyset order, seconds, peak traced bytes) for one streamed download"""
+    tracemalloc.start()
+    t = time.perf_counter()
+    response = client.get(url, buffered=False)
+    size, lines, disorder, last = 0, 0, 0, ("", "")
+    for chunk in response.response:
+        chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+        size += len(chunk)
+        for line in chunk.splitlines():
+            lines += 1
+            if url.endswith(".ndjson"):
+                # Strictly increasing keys mean no row repeated, without holding a set of ids
+                row = json.loads(line)
+                key = (row["created_at"], row["id"])
+                disorder += key <= last
+                last = key
+    elapsed = time.perf_counter() - t
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return size, lines, disorder, elapsed, peak
+
+
+def materialize(backend) -> int:
+    """Peak traced bytes of loading every completed session into one list"""
+    tracemalloc.start()
+    rows = backend._query("SELECT * FROM quiz_sessions WHERE completed_at IS NOT NULL")
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del rows
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the streaming dashboard exports")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 200000])
+    parser.add_argument("--materialize-max", type=int, default=200000,
+                        help="largest size the whole-table list is measured at")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "export.db")
+        backend = SQLiteBackend(path)
+        os.environ["STORAGE_BACKEND"] = f"sqlite:///{path}"
+        os.environ["WRITE_JOURNAL_PATH"] = os.path.join(tmp, "journal.db")
+        with contextlib.redirect_stdout(io.StringIO()):
+            import web_app_v3
+        web_app_v3.app.config['SESSION_COOKIE_SECURE'] = False
+        client = web_app_v3.app.test_client()
+        with contextlib.redirect_stdout(io.StringIO()):
+            client.get('/dashboard?password=SciRio2025')
+
+        ok, loaded = True, 0
+        print(f"  {'sessions':>10} {'export':<26} {'size':>9} {'time':>8} {'rows/s':>9} {'peak memory':>12}")
+        for sessions in sorted(args.sizes):
+            bulk_load(backend, sessions - loaded, first=loaded)
+            loaded = sessions
+            for url, expected in ((f"/dashboard/export/quiz_sessions.csv", sessions + 1),
+                                  (f"/dashboard/export/quiz_results.ndjson", sessions * 3)):
+                size, lines, disorder, elapsed, peak = stream(client, url)
+                print(f"  {sessions:>10,} {url.rsplit('/', 1)[1]:<26} {size / 2**20:>7.0f}MB {elapsed:>7.1f}s "
+                      f"{expected / elapsed:>9,.0f} {peak / 2**20:>10.1f}MB")
+                if lines != expected or disorder:
+                    print(f"  FAIL: {url} gave {lines} lines ({disorder} out of order), expected {expected}")
+                    ok = False
+            if sessions <= args.materialize_max:
+                print(f"  {sessions:>10,} {'whole table in one list':<26} {'':>9} {'':>8} {'':>9} "
+                      f"{materialize(backend) / 2**20:>10.1f}MB")
+
+    print("PASS" if ok else "FAIL")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Keyword matching benchmark: Aho-Corasick automaton vs per-keyword substring tests
+Times the offline trait inference (infer_traits_from_text, extract_working_style)
+on full Wikipedia texts and the engine's load-time sentence indexing
+
+Usage:
+    python -m benchmarks.keywords --texts DIR        # cached Wikipedia texts (*.txt)
+    python -m benchmarks.keywords --fetch 50 --texts DIR   # fetch via database_builder first
+    python -m benchmarks.keywords                    # no texts: rebuild ~content_length texts from the DB
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import os
+import random
+import time
+
+import keyword_matcher
+from keyword_matcher import KeywordMatcher
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import build_1000_scientists as builder
+import matching_engine_v3
+from biography_index import SentenceIndex
+
+
+def fetch_texts(count: int, directory: str) -> None:
+    """Fetch full Wikipedia texts the way database_builder does and cache them"""
+    from database_builder import fetch_wikipedia_full
+    os.makedirs(directory, exist_ok=True)
+    for info in builder.UNIQUE_SCIENTISTS[:count]:
+        path = os.path.join(directory, info['wiki'].replace('/', '_') + '.txt')
+        if os.path.exists(path):
+            continue
+        content = fetch_wikipedia_full(info['wiki'])
+        if content:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(content)
+        time.sleep(0.5)  # Be nice to Wikipedia
+
+
+def load_texts(directory: str) -> list:
+    texts = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.txt'))):
+        with open(path, encoding='utf-8') as f:
+            texts.append(f.read())
+    return texts
+
+
+def rebuild_texts(db_path: str, seed: int = 0) -> list:
+    """Stand-in corpus: each scientist's text padded with other biographies to its content_length"""
+    with open(db_path, encoding='utf-8') as f:
+        scientists = json.load(f)
+    rng = random.Random(seed)
+    texts = []
+    for s in scientists:
+        parts = [s.get('summary', ''), s.get('achievements', '')] + s.get('moments', [])
+        while sum(len(p) for p in parts) < s.get('content_length', 0):
+            other = rng.choice(scientists)
+            parts.extend([other.get('summary', ''), other.get('achievements', '')])
+        texts.append(" ".join(parts)[:max(s.get('content_length', 0), 1)])
+    return texts
+
+
+def use_automaton(enabled: bool) -> None:
+    """Rebuild the module-level matchers with or without the automaton"""
+    builder.TRAIT_MATCHER = KeywordMatcher(builder.TRAIT_MATCHER.keywords, use_automaton=enabled)
+    builder.WORKING_STYLE_MATCHER = KeywordMatcher(builder.WORKING_STYLE_MATCHER.keywords, use_automaton=enabled)
+    matching_engine_v3.EVIDENCE_MATCHER = KeywordMatcher(matching_engine_v3.EVIDENCE_KEYWORDS, use_automaton=enabled)
+
+
+def run(texts: list, scientists: list) -> tuple:
+    start = time.perf_counter()
+    inferred = [(builder.infer_traits_from_text(t), builder.extract_working_style(t, "X")) for t in texts]
+    infer_s = time.perf_counter() - start
+
+    index_s = float('inf')
+    for _ in range(3):  # best of 3 - the build is short and noisy
+        start = time.perf_counter()
+        indexes = [SentenceIndex(s.get('summary', ''), s.get('achievements', ''), s.get('moments', []),
+                                 matching_engine_v3.EVIDENCE_MATCHER) for s in scientists]
+        index_s = min(index_s, time.perf_counter() - start)
+    return inferred, [i.keyword_index for i in indexes], infer_s, index_s
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark single-pass keyword matching")
+    parser.add_argument("--db", default="scientist_db_rich.json")
+    parser.add_argument("--texts", help="directory of cached Wikipedia texts (*.txt)")
+    parser.add_argument("--fetch", type=int, default=0, help="fetch this many texts into --texts first")
+    args = parser.parse_args()
+
+    if args.fetch and args.texts:
+        fetch_texts(args.fetch, args.texts)
+    texts = load_texts(args.texts) if args.texts else []
+    source = f"{len(texts)} Wikipedia texts from {args.texts}"
+    if not texts:
+        texts = rebuild_texts(args.db)
+        source = f"{len(texts)} texts rebuilt from {args.db} (no Wikipedia cache)"
+    with open(args.db, encoding='utf-8') as f:
+        scientists = json.load(f)
+
+    print(source + f", avg {sum(map(len, texts)) // len(texts)} chars")
+    if not keyword_matcher.AHOCORASICK_AVAILABLE:
+        print("pyahocorasick not installed - both runs use substring tests")
+
+    use_automaton(False)
+    base = run(texts, scientists)
+    use_automaton(True)
+    fast = run(texts, scientists)
+
+    print(f"infer_traits + working_style: {base[2] * 1e3 / len(texts):.2f} -> {fast[2] * 1e3 / len(texts):.2f} ms/text")
+    print(f"sentence index build:         {base[3] * 1e3:.1f} -> {fast[3] * 1e3:.1f} ms for {len(scientists)} scientists")
+    print(f"identical results: {base[0] == fast[0] and base[1] == fast[1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""
+Live feed load test - many idle /api/live subscribers on one process
+Serves the app from a threaded werkzeug server, opens N EventSource-style
+connections from one selector loop, idles to measure what the open streams
+cost (database reads, CPU, threads, memory), then finishes quizzes through
+the real write path and times how long each play takes to reach every
+subscriber. With --gunicorn it runs gunicorn.conf.py instead, opens more
+dashboards than the workers have threads and times quiz submissions while
+they are connected, with the shipped stream cap and with no cap
+
+Usage: python -m benchmarks.live_feed [--subscribers 1000] [--idle 10] [--plays 20]
+       python -m benchmarks.live_feed --gunicorn [--dashboards 40] [--quizzes 40]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import multiprocessing
+import os
+import selectors
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from sqlite_backend import SQLiteBackend
+from benchmarks.analytics import bulk_load
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+class Listener:
+    """Reads every subscriber socket from one thread and records when each play arrives"""
+
+    def __init__(self, port: int, count: int):
+        self.selector = selectors.DefaultSelector()
+        self.buffers = {}
+        self.snapshots = 0
+        self.arrivals = {}  # play id -> list of arrival times
+        self.statuses = {}
+        self.sockets = []
+        for _ in range(count):
+            sock = socket.create_connection(("127.0.0.1", port))
+            sock.sendall(b"GET /api/live HTTP/1.1\r\nHost: localhost\r\nAccept: text/event-stream\r\n\r\n")
+            sock.setblocking(False)
+            self.selector.register(sock, selectors.EVENT_READ)
+            self.buffers[sock] = b""
+            self.sockets.append(sock)
+        self._stop = False
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while not self._stop:
+            for key, _ in self.selector.select(timeout=0.2):
+                sock = key.fileobj
+                try:
+                    data = sock.recv(65536)
+                except BlockingIOError:
+                    continue
+                now = time.perf_counter()
+                if not data:
+                    self.selector.unregister(sock)
+                    continue
+                buffer = self.buffers[sock] + data
+                if sock not in self.statuses and b"\r\n\r\n" in buffer:
+                    head, buffer = buffer.split(b"\r\n\r\n", 1)
+                    self.statuses[sock] = int(head.split()[1])
+                # Chunked transfer framing lines are skipped - only SSE fields are read
+                *messages, buffer = buffer.split(b"\n\n")
+                self.buffers[sock] = buffer
+                for message in messages:
+                    fields = dict(line.split(": ", 1) for line in message.decode().splitlines()
+                                  if ": " in line and not line.startswith(":"))
+                    event = fields.get("event", "")
+                    if event == "snapshot":
+                        self.snapshots += 1
+                    elif event == "play":
+                        play = json.loads(fields["data"])
+                        self.arrivals.setdefault(play["id"], []).append(now)
+
+    def close(self):
+        self._stop = True
+        self.thread.join()
+        for sock in self.sockets:
+            sock.close()
+
+
+ANSWERS = [1, 2, 0, 3, 1, 2, 0, 1, 3, 2, 1, 0]
+
+
+def submit_quiz(port: int, timeout: float) -> tuple:
+    """(status or None on timeout, seconds) for one /api/submit-quiz"""
+    body = json.dumps({"domain": "cosmos", "answers": ANSWERS, "client_uuid": str(uuid.uuid4())}).encode()
+    request = urllib.request.Request(f"http://127.0.0.1:{port}/api/submit-quiz", data=body,
+                                     headers={"Content-Type": "application/json"})
+    t = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            return response.status, time.perf_counter() - t
+    except OSError:
+        return None, time.perf_counter() - t
+
+
+def gunicorn_run(env: dict, dashboards: int, quizzes: int, timeout: float) -> dict:
+    """Start gunicorn -c gunicorn.conf.py, connect the dashboards, then submit quizzes alongside them"""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "web_app_v3:app"],
+                              env={**os.environ, **env, "BIND": f"127.0.0.1:{port}"},
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.perf_counter() + 60
+        while time.perf_counter() < deadline:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/live-stats", timeout=1):
+                    break
+            except OSError:
+                time.sleep(0.2)
+        submit_quiz(port, timeout)  # every worker's engine is already mapped - this warms the route
+
+        listener = Listener(port, dashboards)
+        deadline = time.perf_counter() + 10
+        while len(listener.statuses) < dashboards and time.perf_counter() < deadline:
+            time.sleep(0.05)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: submit_quiz(port, timeout), range(quizzes)))
+        statuses = list(listener.statuses.values())
+        listener.close()
+    finally:
+        server.terminate()
+        server.wait()
+
+    served = np.array([seconds for status, seconds in results if status == 200]) * 1e3
+    return {"streaming": statuses.count(200), "polling": statuses.count(204),
+            "queued": dashboards - len(statuses), "served": len(served),
+            "p50": np.percentile(served, 50) if len(served) else None,
+            "p99": np.percentile(served, 99) if len(served) else None}
+
+
+def gunicorn_main(args) -> int:
+    # The same defaults as gunicorn.conf.py
+    workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+    threads = int(os.getenv("GUNICORN_THREADS", "8"))
+    dashboards = args.dashboards or workers * threads * 2
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "live.db")
+        bulk_load(SQLiteBackend(path), 2000)
+        env = {"STORAGE_BACKEND": f"sqlite:///{path}", "WRITE_JOURNAL_PATH": os.path.join(tmp, "journal.db"),
+               "RESULT_STORE_URL": f"sqlite:///{os.path.join(tmp, 'results.db')}",
+               "SHARED_STATE_URL": f"sqlite:///{os.path.join(tmp, 'state.db')}",
+               "SECRET_KEY": "benchmark-only-key", "WEB_CONCURRENCY": str(workers),
+               "GUNICORN_THREADS": str(threads), "LIVE_FEED": "1"}
+        os.environ.pop("LIVE_MAX_SUBSCRIBERS", None)
+
+        print(f"gunicorn.conf.py: {workers} gthread workers x {threads} threads, {dashboards} dashboards "
+              f"on /api/live, then {args.quizzes} quiz submissions (8 at a time, {args.timeout:g}s timeout)")
+        print(f"  {'stream cap per worker':<28} {'streaming':>9} {'polling':>8} {'queued':>7} "
+              f"{'quizzes served':>15} {'p50 ms':>8} {'p99 ms':>8}")
+        runs = {}
+        for label, cap in ((f"default ({max(threads // 4, 1)})", None), ("2000 (previous default)", "2000")):
+            run = gunicorn_run({**env, **({"LIVE_MAX_SUBSCRIBERS": cap} if cap else {})},
+                               dashboards, args.quizzes, args.timeout)
+            runs[label] = run
+            p50 = f"{run['p50']:.0f}" if run["p50"] is not None else "-"
+            p99 = f"{run['p99']:.0f}" if run["p99"] is not None else "-"
+            print(f"  {label:<28} {run['streaming']:>9} {run['polling']:>8} {run['queued']:>7} "
+                  f"{run['served']:>7}/{args.quizzes:<7} {p50:>8} {p99:>8}")
+
+    shipped = next(iter(runs.values()))
+    if shipped["served"] != args.quizzes:
+        print("  FAIL: quiz requests went unanswered while dashboards were connected")
+        ok = False
+    if shipped["streaming"] > workers * max(threads // 4, 1):
+        print("  FAIL: more streams open than the cap allows")
+        ok = False
+    print("PASS" if ok else "FAIL")
+    return 0 if ok else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test /api/live with many idle subscribers")
+    parser.add_argument("--subscribers", type=int, default=1000)
+    parser.add_argument("--idle", type=float, default=10.0, help="seconds of idling with every stream open")
+    parser.add_argument("--plays", type=int, default=20, help="quizzes finished while everyone listens")
+    parser.add_argument("--interval", type=float, default=2.0, help="producer poll interval (LIVE_POLL_SECONDS)")
+    parser.add_argument("--gunicorn", action="store_true", help="run gunicorn.conf.py and time quizzes next to dashboards")
+    parser.add_argument("--dashboards", type=int, default=0, help="--gunicorn: open streams (default 2 x all threads)")
+    parser.add_argument("--quizzes", type=int, default=40, help="--gunicorn: quiz submissions to time")
+    parser.add_argument("--timeout", type=float, default=5.0, help="--gunicorn: seconds a quiz may take")
+    args = parser.parse_args()
+    if args.gunicorn:
+        return gunicorn_main(args)
+
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "live.db")
+        bulk_load(SQLiteBackend(path), 5000)
+        os.environ["STORAGE_BACKEND"] = f"sqlite:///{path}"
+        os.environ["WRITE_JOURNAL_PATH"] = os.path.join(tmp, "journal.db")
+        os.environ["LIVE_POLL_SECONDS"] = str(args.interval)
+        # Fan-out cost only: werkzeug gives every connection its own thread, so no cap here
+        os.environ["LIVE_MAX_SUBSCRIBERS"] = str(args.subscribers)
+        with contextlib.redirect_stdout(io.StringIO()):
+            import web_app_v3
+            from werkzeug.serving import make_server
+        import supabase_client as db
+        with open("scientist_db_rich.json", encoding="utf-8") as f:
+            scientists = json.load(f)[:3]
+        matches = [{"name": s["name"], "field": s["field"], "score": 0.8, "match_quality": "Strong"}
+                   for s in scientists]
+
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)  # no access log line per stream
+        server = make_server("127.0.0.1", 0, web_app_v3.app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        feed = web_app_v3.live_feed
+        base_threads, base_rss = threading.active_count(), rss_mb()
+
+        t = time.perf_counter()
+        listener = Listener(server.server_port, args.subscribers)
+        while listener.snapshots < args.subscribers and time.perf_counter() - t < 60:
+            time.sleep(0.05)
+        connect_time = time.perf_counter() - t
+        print(f"{args.subscribers:,} subscribers connected and got their snapshot in {connect_time:.1f}s "
+              f"({listener.snapshots:,} snapshots, statuses {sorted(set(listener.statuses.values()))})")
+        if listener.snapshots != args.subscribers or feed.stats()["subscribers"] != args.subscribers:
+            print(f"  FAIL: {feed.stats()['subscribers']} open streams, {listener.snapshots} snapshots")
+            ok = False
+
+        reads, cpu = feed.stats()["reads"], time.process_time()
+        time.sleep(args.idle)
+        idle_reads = feed.stats()["reads"] - reads
+        idle_cpu = time.process_time() - cpu
+        print(f"Idle {args.idle:g}s: {idle_reads} database reads ({idle_reads / args.idle:.2f}/s, poll every "
+              f"{args.interval:g}s), {idle_cpu / args.idle * 100:.1f}% of one core, "
+              f"+{threading.active_count() - base_threads} threads, +{rss_mb() - base_rss:.0f} MB RSS "
+              f"(server and client sockets in one process)")
+        print(f"  Polling /api/analytics-live every 90s would be {args.subscribers / 90:.1f} requests/s "
+              f"for the same viewers")
+        if idle_reads > args.idle / args.interval + 2:
+            print(f"  FAIL: {idle_reads} reads while idle - the producer should read once per interval")
+            ok = False
+
+        # Finish quizzes through the app's write path (write-behind queue -> storage -> producer wake-up)
+        first_play = feed.stats()["events"]
+        submitted = {}
+        plays_before = db.get_totals()["plays"]
+        for i in range(args.plays):
+            session_uuid = db.create_quiz_session(str(uuid.uuid4()), "cosmos", f"10.0.0.{i}")
+            submitted[plays_before + i + 1] = time.perf_counter()
+            db.finish_quiz(session_uuid, {"work_style": "solo"}, matches)
+            time.sleep(0.25)
+        deadline = time.perf_counter() + 10
+        while (sum(len(v) for v in listener.arrivals.values()) < args.plays * args.subscribers
+               and time.perf_counter() < deadline):
+            time.sleep(0.05)
+
+        latencies = np.array([arrival - submitted[play] for play, arrivals in listener.arrivals.items()
+                              if play in submitted for arrival in arrivals]) * 1e3
+        delivered = len(latencies)
+        print(f"{args.plays} plays -> {delivered:,} deliveries of {args.plays * args.subscribers:,} "
+              f"({feed.stats()['events'] - first_play} events published once each)")
+        if delivered:
+            p50, p99 = np.percentile(latencies, [50, 99])
+            print(f"  finish_quiz -> every subscriber: p50 {p50:.0f} ms, p99 {p99:.0f} ms, max {latencies.max():.0f} ms "
+                  f"(includes the write-behind flush)")
+        if delivered != args.plays * args.subscribers:
+            print("  FAIL: not every subscriber received every play")
+            ok = False
+        stats = feed.stats()
+        print(f"  /api/live-stats: {stats['subscribers']} open, peak {stats['peak_subscribers']}, "
+              f"dropped {stats['dropped_slow']}, rejected {stats['rejected']}, {stats['reads']} reads in total")
+
+        listener.close()
+        server.shutdown()
+
+    print("PASS" if ok else "FAIL")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
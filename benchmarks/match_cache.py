@@ -0,0 +1,68 @@
+"""
+Match cache benchmark - find_matches with and without the ranking LRU
+Replays an event-like stream where a few popular answer sheets repeat
+(Zipf-distributed), checks cached and uncached engines return the same
+matches for the same rng seed, and reports the cache counters
+
+Usage: python -m benchmarks.match_cache [--sizes 0 50000] [--requests 5000] [--profiles 500]
+(size 0 means the real scientist_db_rich.json)
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+
+from matching_engine_v3 import MatchingEngineV3
+from questions_v3_simplified import QUESTIONS, DOMAINS, build_user_profile
+from benchmarks.synthetic import write_synthetic_db
+
+
+def make_stream(requests: int, profiles: int, seed: int = 0) -> list:
+    """(profile, domain, recently_shown seed) requests drawn Zipf-like from a profile pool"""
+    rng = random.Random(seed)
+    pool = [(build_user_profile([rng.randrange(len(q['options'])) for q in QUESTIONS]), rng.choice(list(DOMAINS)))
+            for _ in range(profiles)]
+    weights = [1 / (rank + 1) for rank in range(profiles)]
+    return [(*rng.choices(pool, weights)[0], rng.randrange(2 ** 32)) for _ in range(requests)]
+
+
+def replay(engine, stream: list) -> tuple:
+    """Run the stream through find_matches; returns (ms per request, picked names)"""
+    picked = []
+    start = time.perf_counter()
+    for profile, domain, seed in stream:
+        matches = engine.find_matches(profile, domain, rng=random.Random(seed))
+        picked.append([m['scientist']['name'] for m in matches])
+    return (time.perf_counter() - start) * 1e3 / len(stream), picked
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the find_matches ranking cache")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 50000])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--profiles", type=int, default=500, help="distinct answer sheets in the stream")
+    parser.add_argument("--cache-size", type=int, default=4096)
+    args = parser.parse_args()
+
+    stream = make_stream(args.requests, args.profiles)
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = 'scientist_db_rich.json' if size == 0 else write_synthetic_db(os.path.join(tmp, 'db.json'), size)
+            with contextlib.redirect_stdout(io.StringIO()):
+                uncached = MatchingEngineV3(path, cache_size=0)
+                cached = MatchingEngineV3(path, cache_size=args.cache_size)
+        uncached_ms, expected = replay(uncached, stream)
+        cached_ms, picked = replay(cached, stream)
+        mismatches = sum(1 for a, b in zip(expected, picked) if a != b)
+        stats = cached.cache_stats()
+        print(f"{len(cached.scientists):>7} scientists: uncached {uncached_ms:.3f} ms, cached {cached_ms:.3f} ms "
+              f"per find_matches, hit rate {stats['hit_rate']:.1%} ({stats['hits']} hits, {stats['misses']} misses, "
+              f"{stats['evictions']} evictions), mismatches {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Micro-benchmark for MatchingEngineV3.build_rich_resonance
+Reports CPU time per resonance and per /api/get-matches style request
+(3 matches x 3 resonances + 1 contrast each)
+
+Usage: python -m benchmarks.resonance [--requests 200] [--db scientist_db_rich.json]
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import time
+
+from matching_engine_v3 import MatchingEngineV3, TRAIT_DESCRIPTIONS
+from questions_v3_simplified import QUESTIONS, TRAIT_DIMENSIONS, build_user_profile
+
+DOMAINS = ["cosmos", "quantum", "chemistry", "life", "earth", "engineering"]
+
+
+def bench_resonance(engine, rounds: int = 3) -> float:
+    """CPU seconds per build_rich_resonance call over every scientist x trait"""
+    calls = 0
+    start = time.process_time()
+    for _ in range(rounds):
+        for scientist in engine.scientists:
+            for dim, values in TRAIT_DIMENSIONS.items():
+                value = values[calls % len(values)]
+                trait = {"dimension": dim, "value": value, "match_type": "exact",
+                         "description": TRAIT_DESCRIPTIONS[dim][value]}
+                engine.build_rich_resonance(scientist['name'], trait, scientist.get('summary', ''),
+                                            scientist.get('achievements', ''), scientist.get('moments', []),
+                                            {dim: value})
+                calls += 1
+    return (time.process_time() - start) / calls
+
+
+def bench_requests(engine, requests: int, seed: int = 0) -> float:
+    """CPU seconds per get_full_matches call for random quiz profiles"""
+    rng = random.Random(seed)
+    profiles = [(build_user_profile([rng.randrange(len(q['options'])) for q in QUESTIONS]), rng.choice(DOMAINS))
+                for _ in range(requests)]
+    start = time.process_time()
+    for profile, domain in profiles:
+        engine.get_full_matches(profile, domain)
+    return (time.process_time() - start) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark rich resonance generation")
+    parser.add_argument("--db", default="scientist_db_rich.json")
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    # Engine logs every narrative it builds - keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = MatchingEngineV3(args.db)
+        per_resonance = bench_resonance(engine)
+        per_request = bench_requests(engine, args.requests)
+
+    print(f"Scientists:            {len(engine.scientists)}")
+    print(f"build_rich_resonance:  {per_resonance * 1e6:.1f} us CPU/call")
+    print(f"get_full_matches:      {per_request * 1e3:.2f} ms CPU/request ({args.requests} requests)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Response cache benchmark - upstream queries and latency as viewers grow
+Many viewers poll /api/analytics-live, /analytics and /api/stats through
+the Flask test client, each keeping its last ETag like a browser does. The
+storage reads behind those pages get a simulated Supabase round trip. Runs
+once with the response cache off and once with it on, and checks that with
+it on the upstream queries depend on the TTL and not on the viewer count
+
+Usage: python -m benchmarks.response_cache [--viewers 10 100] [--seconds 5] [--ttl 1]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+from sqlite_backend import SQLiteBackend
+from benchmarks.analytics import bulk_load
+
+ENDPOINTS = ("/api/analytics-live", "/analytics", "/api/stats")
+# Storage reads behind the cached pages (get_real_analytics also feeds /analytics)
+UPSTREAM = ("get_real_analytics", "get_live_activity", "get_dashboard_stats")
+
+
+def with_latency(db, latency: float) -> Counter:
+    """Give every upstream read a Supabase-like round trip and count the calls"""
+    calls = Counter()
+    for name in UPSTREAM:
+        def slow(*args, _read=getattr(db, name), _name=name, **kwargs):
+            calls[_name] += 1
+            time.sleep(latency)
+            return _read(*args, **kwargs)
+        setattr(db, name, slow)
+    return calls
+
+
+def viewer(app, seconds: float, poll: float, seed: int, latencies: list, statuses: Counter, sent: list):
+    """Poll the endpoints until time runs out, sending If-None-Match like a browser"""
+    rng = random.Random(seed)
+    client = app.test_client()
+    etags = {}
+    deadline = time.perf_counter() + seconds
+    time.sleep(rng.uniform(0, poll))
+    while time.perf_counter() < deadline:
+        for path in ENDPOINTS:
+            headers = {"Accept-Encoding": "gzip"}
+            if path in etags:
+                headers["If-None-Match"] = etags[path]
+            t = time.perf_counter()
+            response = client.get(path, headers=headers)
+            latencies.append(time.perf_counter() - t)
+            statuses[response.status_code] += 1
+            sent[0] += len(response.data)
+            if "ETag" in response.headers:
+                etags[path] = response.headers["ETag"]
+        time.sleep(rng.uniform(0.5, 1.5) * poll)
+
+
+def run(app, viewers: int, seconds: float, poll: float) -> tuple:
+    latencies, statuses, sent = [], Counter(), [0]
+    threads = [threading.Thread(target=viewer, args=(app, seconds, poll, i, latencies, statuses, sent))
+               for i in range(viewers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return np.array(latencies) * 1e3, statuses, sent[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the analytics response cache under many viewers")
+    parser.add_argument("--viewers", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--seconds", type=float, default=5.0, help="how long each run polls")
+    parser.add_argument("--poll", type=float, default=0.5, help="seconds between one viewer's polls")
+    parser.add_argument("--ttl", type=float, default=1.0, help="fresh seconds per endpoint for the run")
+    parser.add_argument("--latency", type=float, default=0.08, help="simulated Supabase round trip (s)")
+    parser.add_argument("--sessions", type=int, default=20000)
+    args = parser.parse_args()
+
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.db")
+        bulk_load(SQLiteBackend(path), args.sessions)
+        os.environ["STORAGE_BACKEND"] = f"sqlite:///{path}"
+        os.environ["WRITE_JOURNAL_PATH"] = os.path.join(tmp, "journal.db")
+        with contextlib.redirect_stdout(io.StringIO()):
+            import web_app_v3
+            web_app_v3.get_matching_engine()
+        import supabase_client as db
+        calls = with_latency(db, args.latency)
+        cache = web_app_v3.response_cache
+        for key in web_app_v3.CACHE_TTLS:
+            web_app_v3.CACHE_TTLS[key] = (args.ttl, 10 * args.ttl)
+
+        print(f"{args.sessions:,} sessions, {args.latency * 1e3:.0f} ms upstream round trip, "
+              f"TTL {args.ttl:g}s, {args.seconds:g}s per run, each viewer polls every ~{args.poll:g}s")
+        print(f"  {'viewers':>7} {'cache':>5} {'requests':>9} {'upstream':>9} {'304s':>6} "
+              f"{'p50':>8} {'p99':>8} {'sent':>9}")
+        # Renders per endpoint: one per TTL, plus the first miss and a refresh straddling the end
+        ceiling = len(ENDPOINTS) * (args.seconds / args.ttl + 2)
+        for viewers in args.viewers:
+            for enabled in (False, True):
+                cache.enabled = enabled
+                cache.invalidate()
+                calls.clear()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    latencies, statuses, sent = run(web_app_v3.app, viewers, args.seconds, args.poll)
+                upstream = sum(calls.values())
+                p50, p99 = np.percentile(latencies, [50, 99])
+                print(f"  {viewers:>7} {'on' if enabled else 'off':>5} {len(latencies):>9,} {upstream:>9,} "
+                      f"{statuses[304]:>6,} {p50:>6.1f}ms {p99:>6.1f}ms {sent / 2**20:>7.1f}MB")
+                if set(statuses) - {200, 304}:
+                    print(f"  FAIL: unexpected statuses {dict(statuses)}")
+                    ok = False
+                if enabled and upstream > ceiling:
+                    print(f"  FAIL: {upstream} upstream reads with the cache on (expected at most {ceiling:.0f})")
+                    ok = False
+
+    print("PASS" if ok else "FAIL")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""
+Vectorized trait scoring vs the per-scientist Python scorer
+Checks that MatchingEngineV3.score_profile reproduces calculate_match_score
+exactly, and times both plus find_matches
+
+Usage: python -m benchmarks.scoring [--sizes 0 50000] [--profiles 50]
+(size 0 means the real scientist_db_rich.json)
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import tempfile
+import time
+
+from matching_engine_v3 import MatchingEngineV3
+from questions_v3_simplified import QUESTIONS, build_user_profile
+from benchmarks.synthetic import write_synthetic_db
+
+DOMAINS = [None, "cosmos", "quantum", "chemistry", "life", "earth", "engineering"]
+
+
+def run(engine, profiles: int, seed: int = 0) -> dict:
+    """Compare both scorers on random profiles; returns timings in ms per profile"""
+    rng = random.Random(seed)
+    python_s = vector_s = matches_s = 0.0
+    mismatches = 0
+
+    for _ in range(profiles):
+        profile = build_user_profile([rng.randrange(len(q['options'])) for q in QUESTIONS])
+
+        start = time.perf_counter()
+        expected = [engine.calculate_match_score(profile, s)[0] for s in engine.scientists]
+        python_s += time.perf_counter() - start
+
+        start = time.perf_counter()
+        scores = engine.score_profile(profile)
+        vector_s += time.perf_counter() - start
+
+        mismatches += sum(1 for a, b in zip(expected, scores.tolist()) if a != b)
+
+        start = time.perf_counter()
+        engine.find_matches(profile, rng.choice(DOMAINS))
+        matches_s += time.perf_counter() - start
+
+    return {
+        "python_ms": python_s * 1e3 / profiles,
+        "vector_ms": vector_s * 1e3 / profiles,
+        "find_matches_ms": matches_s * 1e3 / profiles,
+        "mismatches": mismatches
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vectorized trait scoring")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 50000])
+    parser.add_argument("--profiles", type=int, default=50)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = 'scientist_db_rich.json' if size == 0 else write_synthetic_db(os.path.join(tmp, 'db.json'), size)
+            with contextlib.redirect_stdout(io.StringIO()):
+                engine = MatchingEngineV3(path)
+        result = run(engine, args.profiles)
+        print(f"{len(engine.scientists):>7} scientists: "
+              f"python {result['python_ms']:.2f} ms, vectorized {result['vector_ms']:.3f} ms, "
+              f"find_matches {result['find_matches_ms']:.3f} ms, score mismatches {result['mismatches']}")
+
+
+if __name__ == "__main__":
+    main()
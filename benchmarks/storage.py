@@ -0,0 +1,170 @@
+"""
+Storage backend benchmark - the SQLite backend under quiz-day load, offline
+Fills a fresh database with synthetic finished quizzes through the same
+calls the app makes (start_quiz, batched finish_quiz writes), times the
+analytics reads behind /analytics and /dashboard, then runs writers and a
+dashboard reader concurrently to check WAL keeps them out of each other's way
+
+Usage: python -m benchmarks.storage [--sessions 5000] [--writers 4]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from questions_v3_simplified import TRAIT_DIMENSIONS
+from sqlite_backend import SQLiteBackend
+
+DOMAINS = ["physics", "biology", "chemistry", "mathematics", "computer_science", "earth_science"]
+
+
+def make_finished_quiz(rng: random.Random, scientists: list, session_uuid: str) -> dict:
+    """finish_quiz write for one session: a random profile and three distinct matches"""
+    matches = rng.sample(scientists, 3)
+    return {
+        "session_uuid": session_uuid,
+        "profile": {dim: rng.choice(values) for dim, values in TRAIT_DIMENSIONS.items()},
+        "results": [{"scientist_name": s["name"], "scientist_field": s["field"], "scientist_era": s.get("era", ""),
+                     "scientist_image": s.get("image_url", ""), "match_score": round(rng.uniform(0.5, 0.95), 3),
+                     "match_quality": "Strong", "rank": rank} for rank, s in enumerate(matches, 1)],
+        "completed_at": datetime.now(timezone.utc).isoformat()
+    }
+
+
+def populate(backend, sessions: int, seed: int = 0, batch_size: int = 200, prefix: str = "bench") -> list:
+    """Start and finish `sessions` quizzes; returns the start_quiz timings in seconds"""
+    with open('scientist_db_rich.json', 'r', encoding='utf-8') as f:
+        scientists = json.load(f)
+    rng = random.Random(seed)
+    timings, pending = [], []
+    for i in range(sessions):
+        t = time.perf_counter()
+        session_uuid = backend.start_quiz(f"{prefix}-{i}", rng.choice(DOMAINS), f"ip{rng.randrange(sessions)}")
+        timings.append(time.perf_counter() - t)
+        pending.append(make_finished_quiz(rng, scientists, session_uuid))
+        if len(pending) == batch_size:
+            backend.write("finish_quiz", "quiz_sessions", pending)
+            pending = []
+    if pending:
+        backend.write("finish_quiz", "quiz_sessions", pending)
+    return timings
+
+
+def dashboard_reads(backend) -> dict:
+    """Every primitive the analytics and dashboard pages call, timed in milliseconds"""
+    calls = {
+        "count_completed": lambda: backend.count_completed(),
+        "top_scientists": lambda: backend.top_scientists(20),
+        "recent_top_matches": lambda: backend.recent_top_matches(6),
+        "trait_value_counts": lambda: backend.trait_value_counts(1000),
+        "trait_pair_counts": lambda: backend.trait_pair_counts(20),
+        "domain_counts": lambda: backend.domain_counts(),
+        "field_counts": lambda: backend.field_counts(5),
+        "retake_counts": lambda: backend.retake_counts(),
+        "activity_by_time": lambda: backend.activity_by_time(),
+        "recent_sessions": lambda: backend.recent_sessions(100),
+        "recent_results": lambda: backend.recent_results(500),
+    }
+    timings = {}
+    for name, call in calls.items():
+        t = time.perf_counter()
+        call()
+        timings[name] = (time.perf_counter() - t) * 1e3
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the SQLite storage backend")
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--writers", type=int, default=4, help="concurrent writer threads in the mixed phase")
+    parser.add_argument("--mixed-sessions", type=int, default=500, help="sessions per writer in the mixed phase")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = SQLiteBackend(os.path.join(tmp, "bench.db"))
+
+        t = time.perf_counter()
+        starts = populate(backend, args.sessions)
+        elapsed = time.perf_counter() - t
+        p50, p99 = np.percentile(np.array(starts) * 1e3, [50, 99])
+        print(f"Loaded {args.sessions} finished quizzes in {elapsed:.2f}s "
+              f"({args.sessions / elapsed:.0f}/s); start_quiz p50 {p50:.3f} ms, p99 {p99:.3f} ms")
+
+        for name, ms in dashboard_reads(backend).items():
+            print(f"  {name:<20} {ms:8.2f} ms")
+
+        # The same pages through supabase_client, as the routes call them
+        os.environ["STORAGE_BACKEND"] = f"sqlite:///{backend.path}"
+        os.environ["WRITE_JOURNAL_PATH"] = os.path.join(tmp, "journal.db")
+        with contextlib.redirect_stdout(io.StringIO()):
+            import supabase_client as db
+        for name, call in (("get_real_analytics", db.get_real_analytics),
+                           ("get_dashboard_stats", db.get_dashboard_stats)):
+            t = time.perf_counter()
+            page = call()
+            print(f"{name}: {(time.perf_counter() - t) * 1e3:.1f} ms, "
+                  f"{len(json.dumps(page, default=str)) / 1024:.0f} KiB")
+            if page is None:
+                print(f"FAIL: {name} returned None")
+                return 1
+
+        # Writers and a dashboard reader at once: WAL should mean no "database is locked" and no torn reads
+        errors, reads = [], []
+        done = threading.Event()
+
+        def writer(w: int):
+            try:
+                populate(backend, args.mixed_sessions, seed=w + 1, batch_size=50, prefix=f"mixed{w}")
+            except Exception as e:
+                errors.append(e)
+
+        def reader():
+            while not done.is_set():
+                try:
+                    t = time.perf_counter()
+                    backend.count_completed()
+                    backend.recent_results(500)
+                    backend.top_scientists(20)
+                    reads.append(time.perf_counter() - t)
+                except Exception as e:
+                    errors.append(e)
+
+        threads = [threading.Thread(target=writer, args=(w,)) for w in range(args.writers)]
+        watcher = threading.Thread(target=reader)
+        t = time.perf_counter()
+        watcher.start()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        done.set()
+        watcher.join()
+        elapsed = time.perf_counter() - t
+
+        expected = args.sessions + args.writers * args.mixed_sessions
+        completed = backend.count_completed()
+        results = backend._scalar("SELECT COUNT(*) FROM quiz_results")
+        p50, p99 = np.percentile(np.array(reads) * 1e3, [50, 99]) if reads else (0, 0)
+        print(f"Mixed: {args.writers} writers x {args.mixed_sessions} quizzes in {elapsed:.2f}s, "
+              f"{len(reads)} dashboard reads (p50 {p50:.1f} ms, p99 {p99:.1f} ms), {len(errors)} errors")
+        print(f"Completed sessions {completed} / {expected}, result rows {results} / {expected * 3}")
+        for e in errors[:3]:
+            print(f"  {type(e).__name__}: {e}")
+
+    ok = not errors and completed == expected and results == expected * 3
+    print("PASS" if ok else "FAIL")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+"""
+Matching and narrative benchmark suite
+Times each request stage separately - build_user_profile, find_matches,
+generate_rich_narrative and get_full_matches - on random valid quiz answers
+spread evenly over every domain, against scientist_db_rich.json and synthetic
+databases of the same schema. Reports p50/p95/p99 latency, throughput and peak
+allocation per stage, and writes everything as JSON so runs can be compared
+
+Usage: python -m benchmarks.suite [--sizes 0 1000 10000 100000] [--requests 2000]
+                                  [--out results.json] [--compare previous.json]
+(size 0 means the real scientist_db_rich.json, served like the web app does)
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+from matching_engine_v3 import MatchingEngineV3
+from questions_v3_simplified import QUESTIONS, DOMAINS, build_user_profile
+from benchmarks.synthetic import write_synthetic_db
+
+STAGES = ["build_user_profile", "find_matches", "generate_rich_narrative", "get_full_matches"]
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def make_requests(count: int, names: list, seed: int = 0) -> list:
+    """(answers, domain, recently_shown, rng seed) specs, domains in round-robin"""
+    rng = random.Random(seed)
+    domains = list(DOMAINS)
+    return [([rng.randrange(len(q['options'])) for q in QUESTIONS],
+             domains[i % len(domains)],
+             rng.sample(names, min(len(names), rng.randrange(10))),
+             rng.randrange(2 ** 32))
+            for i in range(count)]
+
+
+def stage_calls(engine, requests: list) -> dict:
+    """One zero-argument callable per request for every stage"""
+    profiles = [build_user_profile(answers) for answers, _, _, _ in requests]
+    matches = [engine.find_matches(profile, domain, recently_shown=list(shown), rng=random.Random(seed))
+               for profile, (_, domain, shown, seed) in zip(profiles, requests)]
+    return {
+        "build_user_profile": [lambda a=answers: build_user_profile(a) for answers, _, _, _ in requests],
+        "find_matches": [lambda p=profile, d=domain, r=shown, s=seed:
+                         engine.find_matches(p, d, recently_shown=list(r), rng=random.Random(s))
+                         for profile, (_, domain, shown, seed) in zip(profiles, requests)],
+        # One narrative per request: the top pick, as rendered first on the results page
+        "generate_rich_narrative": [lambda p=profile, m=found[0]: engine.generate_rich_narrative(p, m)
+                                    for profile, found in zip(profiles, matches) if found],
+        "get_full_matches": [lambda p=profile, d=domain, r=shown, s=seed:
+                             engine.get_full_matches(p, d, recently_shown=list(r), rng=random.Random(s))
+                             for profile, (_, domain, shown, seed) in zip(profiles, requests)],
+    }
+
+
+def measure(calls: list, memory_calls: int) -> dict:
+    """Latency percentiles and throughput over all calls, peak allocation over the first few"""
+    timings = np.empty(len(calls))
+    started = time.perf_counter()
+    for i, call in enumerate(calls):
+        t = time.perf_counter_ns()
+        call()
+        timings[i] = time.perf_counter_ns() - t
+    elapsed = time.perf_counter() - started
+
+    # Separate pass - tracemalloc slows every allocation down, so it must not skew the timings
+    tracemalloc.start()
+    for call in calls[:memory_calls]:
+        call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    p50, p95, p99 = np.percentile(timings, [50, 95, 99]) / 1e3
+    return {
+        "calls": len(calls),
+        "mean_us": round(float(timings.mean()) / 1e3, 2),
+        "p50_us": round(float(p50), 2),
+        "p95_us": round(float(p95), 2),
+        "p99_us": round(float(p99), 2),
+        "throughput_per_s": round(len(calls) / elapsed, 1) if elapsed else None,
+        "peak_alloc_kb": round(peak / 1024, 1)
+    }
+
+
+def peak_rss_mb() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024
+
+
+def run_database(label: str, path: str, args, narratives_path: str = None) -> dict:
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        engine = MatchingEngineV3(path, narratives_path=narratives_path, cache_size=args.cache_size)
+        load_s = time.perf_counter() - started
+        specs = make_requests(args.requests, [s['name'] for s in engine.scientists])
+        stages = {name: measure(calls, args.memory_calls) for name, calls in stage_calls(engine, specs).items()}
+    return {
+        "database": label,
+        "scientists": len(engine.scientists),
+        "narratives": "precomputed" if engine._narratives else "live",
+        "load_s": round(load_s, 3),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "stages": stages
+    }
+
+
+def metadata(args) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "requests": args.requests,
+        "sizes": args.sizes,
+        "cache_size": args.cache_size
+    }
+
+
+def print_report(results: dict, previous: dict = None):
+    before = {}
+    if previous:
+        for db in previous.get("databases", []):
+            for stage, stats in db["stages"].items():
+                before[(db["database"], stage)] = stats
+    for db in results["databases"]:
+        print(f"\n{db['database']}: {db['scientists']} scientists, {db['narratives']} narratives, "
+              f"load {db['load_s']:.2f}s, peak RSS {db['peak_rss_mb']:.0f} MB")
+        for stage in STAGES:
+            stats = db["stages"][stage]
+            line = (f"  {stage:<24} p50 {stats['p50_us']:>9.1f} us  p95 {stats['p95_us']:>9.1f} us  "
+                    f"p99 {stats['p99_us']:>9.1f} us  {stats['throughput_per_s']:>10.1f}/s  "
+                    f"peak {stats['peak_alloc_kb']:>8.1f} KB")
+            old = before.get((db["database"], stage))
+            if old and old["p50_us"]:
+                line += f"  (p50 x{stats['p50_us'] / old['p50_us']:.2f} vs previous)"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark matching and narrative stages")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 1000, 10000, 100000])
+    parser.add_argument("--requests", type=int, default=2000, help="requests timed per stage and database")
+    parser.add_argument("--memory-calls", type=int, default=100, help="calls traced for peak allocation")
+    parser.add_argument("--cache-size", type=int, default=0,
+                        help="match cache entries (default 0: every call does the full ranking work)")
+    parser.add_argument("--narratives", default="scientist_narratives.msgpack",
+                        help="artifact used for the real database ('' for live narratives)")
+    parser.add_argument("--out", help="JSON output (default: benchmarks/results/suite-<timestamp>.json)")
+    parser.add_argument("--compare", help="previous JSON result to compare p50 against")
+    args = parser.parse_args()
+
+    results = {"meta": metadata(args), "databases": []}
+    for size in args.sizes:
+        if size == 0:
+            results["databases"].append(run_database("scientist_db_rich.json", "scientist_db_rich.json", args,
+                                                     args.narratives or None))
+            continue
+        with tempfile.TemporaryDirectory() as tmp:
+            path = write_synthetic_db(os.path.join(tmp, "db.json"), size)
+            results["databases"].append(run_database(f"synthetic-{size}", path, args))
+
+    out = args.out
+    if not out:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = results["meta"]["timestamp"].replace(":", "").replace("-", "").replace("+0000", "Z")
+        out = os.path.join(RESULTS_DIR, f"suite-{stamp}.json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = json.load(f)
+    print_report(results, previous)
+    print(f"\nWrote {out}")
+
+
+if __name__ == "__main__":
+    main()
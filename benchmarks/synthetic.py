@@ -0,0 +1,34 @@
+"""
+Synthetic scientist databases for scale benchmarks
+Rows follow the scientist_db_rich.json schema: traits are drawn from
+TRAIT_DIMENSIONS, fields and biography text are borrowed from real entries
+"""
+
+import json
+import random
+
+from questions_v3_simplified import TRAIT_DIMENSIONS
+
+
+def make_synthetic_db(size: int, source: str = 'scientist_db_rich.json', seed: int = 0) -> list:
+    """Build `size` synthetic scientists shaped like the real database"""
+    with open(source, 'r', encoding='utf-8') as f:
+        real = json.load(f)
+
+    rng = random.Random(seed)
+    scientists = []
+    for i in range(size):
+        template = rng.choice(real)
+        scientist = dict(template)
+        scientist['name'] = f"{template['name']} #{i}"
+        scientist['field'] = rng.choice(real)['field']
+        scientist['traits'] = {dim: rng.choice(values) for dim, values in TRAIT_DIMENSIONS.items()}
+        scientists.append(scientist)
+    return scientists
+
+
+def write_synthetic_db(path: str, size: int, source: str = 'scientist_db_rich.json', seed: int = 0) -> str:
+    """Write a synthetic database to `path` and return the path"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(make_synthetic_db(size, source, seed), f, ensure_ascii=False)
+    return path
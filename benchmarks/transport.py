@@ -0,0 +1,134 @@
+"""
+Supabase transport benchmark - keep-alive pooling, in-flight cap and histograms
+Serves PostgREST-shaped responses from a local HTTP/1.1 keep-alive server
+with a fixed think time, then compares a new connection per request (no
+pooling) with InstrumentedTransport, fires a thread spike through a small
+in-flight cap and prints the per-table latency histograms it recorded
+
+Usage: python -m benchmarks.transport [--requests 300] [--threads 64] [--max-in-flight 8]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from supabase_transport import InstrumentedTransport, create_http_client
+
+
+class StandIn(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like PostgREST behind its gateway
+    # One write per response - separate header/body writes hit Nagle + delayed ACK (~40 ms)
+    disable_nagle_algorithm = True
+    wbufsize = 65536
+
+    def _answer(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        time.sleep(self.server.think_seconds)
+        body = json.dumps([{"id": 1}]).encode()
+        self.send_response(201 if self.command == "POST" else 200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PATCH = _answer
+
+    def log_message(self, *args):
+        pass
+
+
+class CountingServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.connections = 0
+        self.think_seconds = 0.0
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        super().process_request(request, client_address)
+
+
+def timed(calls: list) -> float:
+    start = time.perf_counter()
+    for call in calls:
+        call()
+    return (time.perf_counter() - start) * 1e3 / len(calls)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pooled Supabase HTTP transport")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--max-in-flight", type=int, default=8)
+    parser.add_argument("--think-ms", type=float, default=20.0, help="server time per request in the spike")
+    args = parser.parse_args()
+
+    server = CountingServer(("127.0.0.1", 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}/rest/v1"
+    failures = []
+
+    # Sequential latency: fresh connection per request vs pooled keep-alive
+    no_keepalive = httpx.Client(limits=httpx.Limits(max_keepalive_connections=0))
+    fresh_ms = timed([lambda: no_keepalive.get(f"{base}/quiz_sessions") for _ in range(args.requests)])
+    no_keepalive.close()
+    fresh_conns, server.connections = server.connections, 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        transport = InstrumentedTransport(pool_size=args.max_in_flight, max_in_flight=args.max_in_flight, http2=False)
+    client = create_http_client(transport)
+    pooled_ms = timed([lambda: client.get(f"{base}/quiz_sessions") for _ in range(args.requests)])
+    print(f"Sequential GET: new connection {fresh_ms:.3f} ms ({fresh_conns} connections), "
+          f"pooled keep-alive {pooled_ms:.3f} ms ({server.connections} connections)")
+    if server.connections > 1:
+        failures.append("pooled client opened more than one connection for sequential requests")
+
+    # Spike: many threads, few slots
+    server.connections, server.think_seconds = 0, args.think_ms / 1e3
+    paths = [("POST", "quiz_results"), ("PATCH", "quiz_sessions"), ("POST", "rpc/finish_quiz"),
+             ("GET", "quiz_results"), ("POST", "rpc/get_hall_of_fame")]
+
+    def call(i):
+        method, path = paths[i % len(paths)]
+        return client.request(method, f"{base}/{path}", json={} if method != "GET" else None).status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        statuses = list(pool.map(call, range(args.requests)))
+    elapsed = time.perf_counter() - start
+    stats = transport.stats()
+    print(f"Spike: {args.requests} requests from {args.threads} threads in {elapsed:.2f}s, "
+          f"peak in flight {stats['peak_in_flight']} (cap {args.max_in_flight}), "
+          f"{server.connections} new connections, {stats['slot_timeouts']} slot timeouts")
+    if stats["peak_in_flight"] > args.max_in_flight:
+        failures.append("in-flight cap exceeded")
+    if server.connections > args.max_in_flight:
+        failures.append("more sockets opened than the pool allows")
+    if any(status >= 400 for status in statuses):
+        failures.append("error responses during the spike")
+
+    print("Per-table latency:")
+    for table, h in stats["tables"].items():
+        print(f"  {table:<22} n {h['count']:>4}  mean {h['mean_ms']:7.2f} ms  p50 <= {h['p50_ms']:g} ms  "
+              f"p99 <= {h['p99_ms']:g} ms  max {h['max_ms']:.1f} ms")
+
+    client.close()
+    server.shutdown()
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
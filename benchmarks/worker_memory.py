@@ -0,0 +1,267 @@
+"""
+Worker memory benchmark - what each forked gunicorn worker really costs
+Starts web_app_v3 under gunicorn.conf.py with 1, 4 and 16 workers, runs
+quizzes through every worker, forces a full garbage collection in each
+(as a worker that has been up a while will have done), then reads PSS and
+USS from /proc/<pid>/smaps_rollup, and how many of the pages holding the
+matching engine each worker still shares with the master (pagemap frame
+numbers, needs root). Compared setups: every worker importing the app
+itself, --preload as before (engine loaded in the master, no gc.freeze)
+and the current config
+
+Usage: python -m benchmarks.worker_memory [--workers 1 4 16] [--quizzes 50]
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from sqlite_backend import SQLiteBackend
+from benchmarks.analytics import bulk_load
+from benchmarks.workers import free_port, quiz, request, stop
+
+PAGE = os.sysconf("SC_PAGE_SIZE")
+
+
+def engine_pages(engine) -> tuple:
+    """(sorted page numbers, bytes) of every object reachable from the engine, numpy buffers included"""
+    skip = (type, type(os), type(engine_pages), type(len), type(engine_pages.__code__))
+    pages, total, seen, stack = set(), 0, set(), [engine.__dict__]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, skip):
+            continue
+        seen.add(id(obj))
+        spans = [(id(obj), sys.getsizeof(obj))]
+        if isinstance(obj, np.ndarray) and obj.nbytes:
+            spans.append((obj.ctypes.data, obj.nbytes))
+        for start, size in spans:
+            total += size
+            pages.update(range(start // PAGE, (start + size - 1) // PAGE + 1))
+        stack.extend(gc.get_referents(obj))
+    return sorted(pages), total
+
+
+def dump_engine_pages():
+    """In the master, before forking: where the engine lives (walking it in a worker would dirty it)"""
+    import web_app_v3
+    pages, total = engine_pages(web_app_v3.get_matching_engine())
+    with open(os.environ["ENGINE_PAGES_FILE"], "w") as f:
+        json.dump({"pages": pages, "bytes": total}, f)
+
+
+def frame(pagemap, page: int):
+    pagemap.seek(page * 8)
+    entry = struct.unpack("Q", pagemap.read(8))[0]
+    return entry & ((1 << 55) - 1) if entry >> 63 else None
+
+
+def create_app():
+    """WSGI app for the gunicorn workers: web_app_v3 plus a route that runs a full collection"""
+    import web_app_v3
+
+    @web_app_v3.app.route("/bench/gc")
+    def bench_gc():
+        gc.collect()
+        copied = pages = None
+        if os.path.exists(os.environ.get("ENGINE_PAGES_FILE", "")):
+            with open(os.environ["ENGINE_PAGES_FILE"]) as f:
+                engine = json.load(f)["pages"]
+            with open("/proc/self/pagemap", "rb") as mine, open(f"/proc/{os.getppid()}/pagemap", "rb") as master:
+                frames = [(frame(mine, page), frame(master, page)) for page in engine]
+            # Frame numbers read as 0 without CAP_SYS_ADMIN - nothing to compare then
+            if any(own for own, _ in frames):
+                pages, copied = len(frames), sum(own != theirs for own, theirs in frames)
+        # Hold the worker so the next concurrent request lands on another one
+        time.sleep(0.3)
+        return {"pid": os.getpid(), "engine_pages": pages, "engine_copied": copied}
+
+    return web_app_v3.app
+
+# --preload as shipped before gc.freeze: the master loads the engine and forks
+PRELOAD_ONLY = """
+import gc
+
+exec(open("gunicorn.conf.py").read())
+gc.enable()
+
+
+def when_ready(server):
+    import web_app_v3
+    from benchmarks.worker_memory import dump_engine_pages
+    web_app_v3.get_matching_engine()
+    dump_engine_pages()
+"""
+
+# The shipped config, plus the engine page map
+CURRENT = """
+exec(open("gunicorn.conf.py").read())
+_when_ready = when_ready
+
+
+def when_ready(server):
+    from benchmarks.worker_memory import dump_engine_pages
+    _when_ready(server)
+    dump_engine_pages()
+"""
+
+
+def smaps(pid: int) -> dict:
+    """kB totals from smaps_rollup: Rss, Pss, Private_Clean, Private_Dirty ..."""
+    totals = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                totals[parts[0].rstrip(":")] = int(parts[1])
+    return totals
+
+
+def children(pid: int) -> list:
+    found = []
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    if int(f.read().rsplit(")", 1)[1].split()[1]) == pid:
+                        found.append(int(entry))
+            except (OSError, IndexError, ValueError):
+                pass
+    return found
+
+
+def start(workers: int, env: dict, config: str) -> tuple:
+    port = free_port()
+    # One connection per worker at a time, so concurrent requests reach every worker
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", config, "--workers", str(workers), "--threads", "1",
+         "--worker-connections", "1", "--bind", f"127.0.0.1:{port}", "benchmarks.worker_memory:create_app()"],
+        env={**os.environ, **env}, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 120
+    while time.time() < deadline:
+        if len(children(process.pid)) == workers:
+            try:
+                if request(port, "GET", "/api/health")[0] == 200:
+                    return process, port
+            except OSError:
+                pass
+        time.sleep(0.2)
+    stop(process)
+    raise RuntimeError("gunicorn did not start")
+
+
+def exercise(port: int, workers: int, quizzes: int):
+    """Quizzes and result pages through every worker, then one full collection in each"""
+    def client(seed):
+        rng = random.Random(seed)
+        for _ in range(quizzes):
+            _, headers, _ = request(port, "POST", "/api/submit-quiz", quiz(rng))
+            request(port, "GET", "/results", headers={"Cookie": headers["Set-Cookie"].split(";")[0]})
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    collected, deadline = {}, time.time() + 60
+    while len(collected) < workers and time.time() < deadline:
+        results = [None] * workers
+
+        def collect(i):
+            results[i] = json.loads(request(port, "GET", "/bench/gc")[2])
+        threads = [threading.Thread(target=collect, args=(i,)) for i in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        collected.update((result["pid"], result) for result in results)
+    return list(collected.values())
+
+
+def measure(workers: int, env: dict, config: str, quizzes: int) -> dict:
+    process, port = start(workers, env, config)
+    try:
+        collected = exercise(port, workers, quizzes)
+        worker_mem = [smaps(pid) for pid in children(process.pid)]
+        master = smaps(process.pid)
+    finally:
+        stop(process)
+    count = len(worker_mem)
+    engine = [c for c in collected if c["engine_pages"]]
+    return {
+        "reached": len(collected),
+        "engine_pages": engine[0]["engine_pages"] if engine else None,
+        "engine_shared": sum(c["engine_pages"] - c["engine_copied"] for c in engine) / len(engine) if engine else None,
+        "rss": sum(m["Rss"] for m in worker_mem) / count / 1024,
+        "pss": sum(m["Pss"] for m in worker_mem) / count / 1024,
+        "uss": sum(m["Private_Clean"] + m["Private_Dirty"] for m in worker_mem) / count / 1024,
+        "total_pss": (sum(m["Pss"] for m in worker_mem) + master["Pss"]) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PSS/USS per gunicorn worker with and without preload + gc.freeze")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--quizzes", type=int, default=50, help="quizzes per client (one client per worker)")
+    args = parser.parse_args()
+
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "app.db")
+        bulk_load(SQLiteBackend(path), 2000)
+        configs = {}
+        for name, text in (("preload_only", PRELOAD_ONLY), ("current", CURRENT)):
+            configs[name] = os.path.join(tmp, f"{name}.conf.py")
+            with open(configs[name], "w") as f:
+                f.write(text)
+        env = {"STORAGE_BACKEND": f"sqlite:///{path}",
+               "WRITE_JOURNAL_PATH": os.path.join(tmp, "journal.db"),
+               "RESULT_STORE_URL": f"sqlite:///{os.path.join(tmp, 'results.db')}",
+               "SHARED_STATE_URL": f"sqlite:///{os.path.join(tmp, 'state.db')}",
+               "SECRET_KEY": "benchmark-only-key", "LIVE_FEED": "0", "PYTHONPATH": os.getcwd(),
+               "ENGINE_PAGES_FILE": os.path.join(tmp, "engine_pages.json")}
+        setups = (("no preload (each worker imports)", {**env, "GUNICORN_PRELOAD": "0", "ENGINE_PAGES_FILE": ""}, "gunicorn.conf.py"),
+                  ("preload, no gc.freeze", env, configs["preload_only"]),
+                  ("preload + gc.freeze (current)", env, configs["current"]))
+
+        print(f"Per worker after {args.quizzes} quizzes each and a full gc.collect(); MB, engine pages still shared")
+        print(f"  {'setup':<34} {'workers':>7} {'RSS':>7} {'PSS':>7} {'USS':>7} {'all PSS':>8} {'engine':>10}")
+        results = {}
+        for label, setup_env, config in setups:
+            for workers in args.workers:
+                m = measure(workers, setup_env, config, args.quizzes)
+                results[label, workers] = m
+                engine = f"{m['engine_shared']:.0f}/{m['engine_pages']}" if m["engine_pages"] else "-"
+                print(f"  {label:<34} {workers:>7} {m['rss']:>7.1f} {m['pss']:>7.1f} {m['uss']:>7.1f} "
+                      f"{m['total_pss']:>8.1f} {engine:>10}")
+                if m["reached"] != workers:
+                    print(f"  FAIL: the full collection only reached {m['reached']}/{workers} workers")
+                    ok = False
+
+        workers = max(args.workers)
+        before, after = results["preload, no gc.freeze", workers], results["preload + gc.freeze (current)", workers]
+        separate = results["no preload (each worker imports)", workers]
+        print(f"\n{workers} workers: {separate['total_pss']:.0f} MB without preload, {before['total_pss']:.0f} MB "
+              f"preloaded, {after['total_pss']:.0f} MB preloaded and frozen "
+              f"(private per worker {separate['uss']:.1f} -> {before['uss']:.1f} -> {after['uss']:.1f} MB)")
+        if after["uss"] >= before["uss"]:
+            print("  FAIL: gc.freeze should leave each worker with fewer private pages")
+            ok = False
+
+    print("PASS" if ok else "FAIL")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,308 @@
+"""
+Multi-worker benchmark - gunicorn --preload throughput from 1 to N workers
+Runs web_app_v3 under gunicorn.conf.py with one request thread per worker
+and a simulated Supabase round trip on session creation, drives
+/api/submit-quiz (one upstream call plus matching) and reports throughput
+per worker count. Then checks what must hold across workers: a session
+signed by one worker loads on another, results and login counters are seen
+by all, and a cached response is rendered once - against SQLite shared
+state and a local stand-in for the REST KV
+
+Usage: python -m benchmarks.workers [--workers 1 2 4 8] [--seconds 8] [--latency 0.1]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from questions_v3_simplified import QUESTIONS
+from sqlite_backend import SQLiteBackend
+from benchmarks.analytics import bulk_load
+
+
+def create_app():
+    """WSGI app for the gunicorn workers: web_app_v3 with a slow start_quiz and the serving pid in a header"""
+    import web_app_v3
+    import supabase_client as db
+    latency = float(os.environ["BENCH_UPSTREAM_LATENCY"])
+    create_quiz_session = db.create_quiz_session
+
+    def slow_create_quiz_session(*args, **kwargs):
+        time.sleep(latency)
+        return create_quiz_session(*args, **kwargs)
+
+    db.create_quiz_session = slow_create_quiz_session
+
+    @web_app_v3.app.after_request
+    def worker_pid(response):
+        response.headers["X-Worker-Pid"] = str(os.getpid())
+        return response
+
+    return web_app_v3.app
+
+
+class KVStandIn(BaseHTTPRequestHandler):
+    """POST / with a Redis command as a JSON array - answers like the Upstash REST API"""
+
+    TOKEN = "benchmark-kv-token"
+
+    def do_POST(self):
+        command = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.headers.get("Authorization") != f"Bearer {self.TOKEN}":
+            self.send_error(401)
+            return
+        store, now = self.server.store, time.time()
+        with self.server.lock:
+            name, key = command[0].upper(), command[1]
+            if key in store and store[key][1] is not None and store[key][1] < now:
+                del store[key]
+            if name == "GET":
+                result = store[key][0] if key in store else None
+            elif name == "SET":
+                options = [c.upper() for c in command[3:]]
+                expires = now + int(command[options.index("PX") + 4]) / 1000 if "PX" in options else None
+                if "NX" in options and key in store:
+                    result = None
+                else:
+                    store[key] = (command[2], expires)
+                    result = "OK"
+            elif name == "INCR":
+                value = int(store[key][0]) + 1 if key in store else 1
+                store[key] = (str(value), store[key][1] if key in store else None)
+                result = value
+            elif name == "PEXPIRE":
+                result = 0
+                if key in store:
+                    store[key] = (store[key][0], now + int(command[2]) / 1000)
+                    result = 1
+            elif name == "DEL":
+                result = 1 if store.pop(key, None) is not None else 0
+            else:
+                result = None
+        body = json.dumps({"result": result}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_kv() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KVStandIn)
+    server.daemon_threads = True
+    server.store, server.lock = {}, threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def request(port: int, method: str, path: str, body: dict = None, headers: dict = None) -> tuple:
+    """(status, headers, body) over a fresh connection, so the kernel hands it to whichever worker is free"""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    payload = json.dumps(body) if body is not None else None
+    conn.request(method, path, payload, {"Content-Type": "application/json", "Connection": "close", **(headers or {})})
+    response = conn.getresponse()
+    data = response.read()
+    conn.close()
+    return response.status, response.headers, data
+
+
+def quiz(rng: random.Random) -> dict:
+    return {"domain": rng.choice(["cosmos", "life", "quantum", "earth", "engineering"]),
+            "answers": [rng.randrange(len(q["options"])) for q in QUESTIONS], "client_uuid": str(uuid.uuid4())}
+
+
+def start_gunicorn(workers: int, env: dict, preload: bool = True) -> tuple:
+    port = free_port()
+    process = subprocess.Popen(
+        # One connection at a time per worker, so only an idle worker accepts and the load spreads evenly
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--workers", str(workers), "--threads", "1",
+         "--worker-connections", "1", "--bind", f"127.0.0.1:{port}", "benchmarks.workers:create_app()"],
+        env={**os.environ, **env, "GUNICORN_PRELOAD": "1" if preload else "0"},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if request(port, "GET", "/api/health")[0] == 200:
+                # Every worker answers once it is forked - give them a moment past the first
+                time.sleep(1 + workers * 0.2)
+                return process, port
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("gunicorn did not start")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def stop(process):
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=20)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def load(port: int, clients: int, seconds: float) -> tuple:
+    """Closed-loop clients posting whole quizzes: (requests/s, latencies ms, errors, distinct worker pids)"""
+    latencies, errors, pids = [], [0], set()
+    deadline = time.perf_counter() + seconds
+
+    def client(seed):
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            t = time.perf_counter()
+            try:
+                status, headers, _ = request(port, "POST", "/api/submit-quiz", quiz(rng))
+            except OSError:
+                status, headers = 0, {}
+            if status == 200:
+                latencies.append(time.perf_counter() - t)
+                pids.add(headers.get("X-Worker-Pid"))
+            else:
+                errors[0] += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(latencies) / (time.perf_counter() - start), np.array(latencies) * 1e3, errors[0], len(pids)
+
+
+def concurrently(count: int, call) -> list:
+    results = [None] * count
+
+    def run(i):
+        results[i] = call(i)
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def cross_worker_checks(port: int, tag: str) -> dict:
+    """What must hold whichever worker answers: {check: (passed, detail)}"""
+    checks = {}
+    cookie = lambda headers: headers["Set-Cookie"].split(";")[0]
+
+    # Dashboard login signed by one worker, used on all of them
+    _, headers, _ = request(port, "GET", "/dashboard?password=SciRio2025",
+                            headers={"X-Forwarded-For": f"198.51.100.{tag}"})
+    session = cookie(headers)
+    pages = concurrently(24, lambda i: request(port, "GET", "/dashboard", headers={"Cookie": session}))
+    logged_in = sum(b"Backend Dashboard" in data and b'type="password"' not in data for _, _, data in pages)
+    pids = len({h.get("X-Worker-Pid") for _, h, _ in pages})
+    checks["session cookie"] = (logged_in == 24 and pids > 1, f"{logged_in}/24 logged in across {pids} workers")
+
+    # Finished quiz stored server-side, reopened through any worker
+    _, headers, _ = request(port, "POST", "/api/submit-quiz", quiz(random.Random(1)))
+    session = cookie(headers)
+    results = concurrently(12, lambda i: request(port, "GET", "/results", headers={"Cookie": session}))
+    found = sum(status == 200 for status, _, _ in results)
+    checks["result store"] = (found == 12, f"{found}/12 /results pages found")
+
+    # Wrong passwords counted across workers (limit 10 per IP and window)
+    ip = {"X-Forwarded-For": f"203.0.113.{tag}"}
+    statuses = concurrently(10, lambda i: request(port, "GET", "/dashboard?password=wrong", headers=ip)[0])
+    last = request(port, "GET", "/dashboard?password=wrong", headers=ip)[0]
+    checks["login counter"] = (429 not in statuses and last == 429,
+                               f"attempt 11 answered {last} after 10 x {sorted(set(statuses))}")
+
+    # One render shared by every worker (a separate render would carry a later Last-Modified)
+    first = request(port, "GET", "/api/stats")[1]["Last-Modified"]
+    time.sleep(1.1)
+    stamps = concurrently(24, lambda i: request(port, "GET", "/api/stats")[1]["Last-Modified"])
+    checks["shared response cache"] = (set(stamps) == {first}, f"{len(set(stamps))} distinct Last-Modified")
+    return checks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark web_app_v3 across gunicorn worker counts")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seconds", type=float, default=8.0, help="load per worker count")
+    parser.add_argument("--latency", type=float, default=0.1, help="simulated Supabase round trip (s)")
+    args = parser.parse_args()
+
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "app.db")
+        bulk_load(SQLiteBackend(path), 2000)
+        env = {"STORAGE_BACKEND": f"sqlite:///{path}",
+               "WRITE_JOURNAL_PATH": os.path.join(tmp, "journal.db"),
+               "RESULT_STORE_URL": f"sqlite:///{os.path.join(tmp, 'results.db')}",
+               "SHARED_STATE_URL": f"sqlite:///{os.path.join(tmp, 'state.db')}",
+               "SECRET_KEY": "benchmark-only-key", "LIVE_FEED": "0",
+               "BENCH_UPSTREAM_LATENCY": str(args.latency), "PYTHONPATH": os.getcwd()}
+
+        print(f"{os.cpu_count()} CPU core(s), {args.latency * 1e3:.0f} ms upstream round trip per quiz, "
+              f"1 request thread per worker, {args.seconds:g}s per run")
+        print(f"  {'workers':>7} {'req/s':>8} {'speedup':>8} {'p50':>8} {'p99':>8} {'errors':>7} {'served by':>10}")
+        base = None
+        for workers in args.workers:
+            process, port = start_gunicorn(workers, env)
+            try:
+                rate, latencies, errors, pids = load(port, clients=2 * workers, seconds=args.seconds)
+            finally:
+                stop(process)
+            base = base or rate
+            p50, p99 = np.percentile(latencies, [50, 99])
+            print(f"  {workers:>7} {rate:>8.1f} {rate / base:>7.2f}x {p50:>6.0f}ms {p99:>6.0f}ms {errors:>7} "
+                  f"{pids:>8} pids")
+            if errors or rate / base < 0.75 * workers:
+                print(f"  FAIL: {workers} workers should give close to {workers}x one worker without errors")
+                ok = False
+
+        workers = max(args.workers)
+        kv = start_kv()
+        for label, overrides in (("SQLite shared state", {}),
+                                 ("REST KV stand-in", {"SHARED_STATE_URL": f"http://127.0.0.1:{kv.server_port}",
+                                                      "SHARED_STATE_TOKEN": KVStandIn.TOKEN}),
+                                 ("per-process keys (no SECRET_KEY, no --preload)",
+                                  {"SECRET_KEY": "", "SHARED_STATE_URL": "memory"})):
+            process, port = start_gunicorn(workers, {**env, **overrides}, preload="SECRET_KEY" not in overrides)
+            try:
+                checks = cross_worker_checks(port, str(len(label)))
+            finally:
+                stop(process)
+            contrast = "SECRET_KEY" in overrides
+            print(f"\n{workers} workers, {label}:")
+            for name, (passed, detail) in checks.items():
+                print(f"  {'ok  ' if passed else 'lost' if contrast else 'FAIL'} {name:<22} {detail}")
+            if contrast:
+                # The old setup, for contrast - sessions are expected to break here
+                if checks["session cookie"][0]:
+                    print("  FAIL: per-process keys should not verify on other workers")
+                    ok = False
+            elif not all(passed for passed, _ in checks.values()):
+                ok = False
+        kv.shutdown()
+
+    print("PASS" if ok else "FAIL")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
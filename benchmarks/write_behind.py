@@ -0,0 +1,110 @@
+"""
+Write-behind queue benchmark - request-path cost of persisting quiz results
+Simulates a database round trip with fixed latency and compares calling it
+inline (the old synchronous path) with WriteBehindQueue.submit, then takes
+the sink down mid-stream and checks every row is delivered exactly once
+after it recovers (via the SQLite journal)
+
+Usage: python -m benchmarks.write_behind [--sessions 2000] [--latency-ms 40] [--outage 0.3]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from write_behind import WriteBehindQueue
+
+
+class SimulatedSink:
+    """Sink with a fixed per-call latency that can be switched off to mimic an outage"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.up = True
+        self.calls = 0
+        self.rows = []
+        self._lock = threading.Lock()
+
+    def __call__(self, op, table, rows):
+        time.sleep(self.latency)
+        if not self.up:
+            raise ConnectionError("simulated outage")
+        with self._lock:
+            self.calls += 1
+            self.rows.extend((table, row.get("session_id") or row.get("id"), row.get("rank")) for row in rows)
+
+
+def session_writes(i: int) -> list:
+    """The writes one finished quiz makes: complete the session, insert its top 3"""
+    return [("update", "quiz_sessions", [{"id": f"s{i}", "values": {"completed_at": "now"}}]),
+            ("insert", "quiz_results", [{"session_id": f"s{i}", "rank": r} for r in (1, 2, 3)])]
+
+
+def percentiles(timings: list) -> str:
+    p50, p99 = np.percentile(np.array(timings) * 1e3, [50, 99])
+    return f"p50 {p50:.3f} ms, p99 {p99:.3f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the write-behind queue")
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="simulated round trip per write")
+    parser.add_argument("--inline-sessions", type=int, default=50, help="sessions timed on the synchronous path")
+    parser.add_argument("--outage", type=float, default=0.3, help="fraction of the stream sent while the sink is down")
+    args = parser.parse_args()
+    latency = args.latency_ms / 1e3
+
+    sink = SimulatedSink(latency)
+    inline = []
+    for i in range(args.inline_sessions):
+        t = time.perf_counter()
+        for op, table, rows in session_writes(i):
+            sink(op, table, rows)
+        inline.append(time.perf_counter() - t)
+    print(f"Inline writes:  {percentiles(inline)} per finished quiz")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sink = SimulatedSink(latency)
+        queue = WriteBehindQueue(sink, journal_path=os.path.join(tmp, "journal.db"),
+                                 flush_interval=0.05, max_retries=2, backoff=0.01, max_backoff=0.2)
+        outage = range(int(args.sessions * 0.4), int(args.sessions * (0.4 + args.outage)))
+        queued, max_lag = [], 0.0
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i in range(args.sessions):
+                sink.up = i not in outage
+                t = time.perf_counter()
+                for op, table, rows in session_writes(i):
+                    queue.submit(op, table, rows)
+                queued.append(time.perf_counter() - t)
+                if i % 100 == 0:
+                    max_lag = max(max_lag, queue.stats()["lag_seconds"])
+                time.sleep(0.0005)  # arrivals spread out like real traffic
+            sink.up = True
+            deadline = time.time() + 60
+            while time.time() < deadline:
+                stats = queue.stats()
+                if queue.flush(0.1) and stats["journal_depth"] == 0 and stats["state"] == "ok":
+                    break
+                time.sleep(0.1)
+            queue.stop()
+        stats = queue.stats()
+
+    print(f"Write-behind:   {percentiles(queued)} per finished quiz")
+    expected = args.sessions * 4
+    unique = len(set(sink.rows))
+    print(f"Sink calls: {sink.calls} for {expected} rows ({expected / max(sink.calls, 1):.1f} rows per call)")
+    print(f"Outage: {stats['spilled']} rows journaled, {stats['replayed']} replayed, {stats['retries']} retries, "
+          f"max lag {max_lag:.2f}s")
+    print(f"Delivered {len(sink.rows)} rows, {unique} unique of {expected} expected, dropped {stats['dropped']}")
+    return 0 if len(sink.rows) == unique == expected else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
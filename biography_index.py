@@ -0,0 +1,247 @@
+"""
+Biography Sentence Index - load-time segmentation for evidence lookup
+Each scientist's summary and achievements are split, classified and indexed
+once, so picking evidence at request time is set arithmetic, not text scans
+"""
+
+from keyword_matcher import KeywordMatcher
+
+# Sentence classes
+INTRO = "intro"          # Wikipedia-style opening ("X (born ...) was an Indian ...")
+FRAGMENT = "fragment"    # too short or not a complete sentence on its own
+BIO = "bio"              # purely biographical (birth, marriage, children ...)
+WORK = "work"            # usable evidence mentioning research/career work
+OTHER = "other"          # usable evidence without a work indicator
+
+# Sentences matching these are pure biography and never used as evidence
+PURE_BIO_PATTERNS = ['was born', 'died on', 'married', 'children', 'spouse', 'moved to']
+
+# Fallback keywords for any work-related sentence
+WORK_INDICATORS = ['research', 'discovered', 'developed', 'invented', 'pioneered', 'founded',
+                   'contributed', 'published', 'award', 'prize', 'known for', 'breakthrough',
+                   'theory', 'equation', 'method', 'technique', 'professor', 'director',
+                   'institute', 'led', 'established', 'study', 'work']
+
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August',
+          'September', 'October', 'November', 'December']
+
+NATIONALITY_PATTERNS = ['indian physicist', 'indian scientist', 'indian mathematician', 'indian engineer',
+                        'indian chemist', 'indian biologist', 'indian astronomer', 'indian astrophysicist']
+
+FRAGMENT_STARTERS = {'first', 'also', 'and', 'but', 'or', 'which', 'where', 'when', 'that', 'who',
+                     'awarded', 'served', 'known', 'in', 'career', 'early', 'later', 'after',
+                     'before', 'during', 'following', 'padma', 'born', 'died', 'received', 'joined',
+                     'performed', 'made', 'was', 'is', 'has', 'had', 'worked', 'studied',
+                     'nobel', 'upon', 'the', 'his', 'her', 'their', 'a', 'an', 'for', 'with', 'on', 'at',
+                     'he', 'she', 'they', 'it', 'this', 'these', 'from', 'since', 'as', 'being'}
+
+_BIO_MATCHER = KeywordMatcher(PURE_BIO_PATTERNS)
+_WORK_MATCHER = KeywordMatcher(WORK_INDICATORS)
+
+# Words that make a moment or fact worth highlighting
+FACT_WORDS = ['award', 'prize', 'discovered', 'invented', 'founded', 'breakthrough', 'published', 'developed']
+MOMENT_WORDS = ['award', 'prize', 'discovered', 'invented', 'founded', 'breakthrough', 'published', 'first',
+                'developed', 'pioneered', 'became', 'led', 'launched']
+SUMMARY_MOMENT_WORDS = ['first', 'founded', 'led', 'became', 'award', 'pioneered', 'discovered', 'developed']
+
+# Patterns that indicate a Wikipedia intro rather than a defining moment
+MOMENT_INTRO_PATTERNS = ['is an indian', 'was an indian', 'is a indian', 'was a indian',
+                         'born on', 'born in', '(born', 'is an american', 'was an american',
+                         'is a scientist', 'was a scientist', 'who headed', 'who served']
+
+# Moments ending in an abbreviation were cut off mid-sentence ("... by G. H. Hardy")
+TRUNCATED_ENDINGS = [' M.', ' B.', ' Ph.', ' Dr.', ' Prof.', ' Mr.', ' Mrs.', ' Ms.', ' Jr.', ' Sr.', ' St.',
+                     ' vs.', ' etc.', ' i.e.', ' e.g.']
+
+
+def is_wikipedia_intro(s: str) -> bool:
+    """Detect Wikipedia-style intro sentences"""
+    s_lower = s.lower()
+    # Pattern: dates in parentheses like "(19 July 1938 – 20 May 2025)"
+    if '(' in s and ')' in s and any(month in s for month in MONTHS):
+        return True
+    # Pattern: "Name was a/an Indian/American/British..."
+    if ') was a' in s_lower or ') is a' in s_lower:
+        return True
+    if 'was an indian' in s_lower or 'is an indian' in s_lower:
+        return True
+    if 'was a indian' in s_lower or 'was an american' in s_lower or 'was a british' in s_lower:
+        return True
+    # Pattern: starts with name and immediately has nationality
+    if any(p in s_lower[:100] for p in NATIONALITY_PATTERNS):
+        return True
+    return False
+
+
+def is_complete_sentence(s: str) -> bool:
+    """Check if sentence is complete and not a fragment"""
+    if not s or len(s) < 30:
+        return False
+    # Must start with capital letter (proper sentence start)
+    if not s[0].isupper():
+        return False
+    # Skip sentences that start with words that indicate fragments or incomplete thoughts
+    words = s.split()
+    first_word = words[0].lower() if words else ""
+    return first_word not in FRAGMENT_STARTERS
+
+
+def evidence_text(sentence: str, sentence_lower: str):
+    """Text shown when a sentence is used as evidence, or None if it can't be"""
+    # Extract work part from intro sentences
+    if 'who ' in sentence_lower and len(sentence) > 50:
+        who_index = sentence_lower.find('who ')
+        work_part = sentence[who_index + 4:].strip()
+        if len(work_part) > 20 and is_complete_sentence(work_part[0].upper() + work_part[1:]):
+            return work_part[0].upper() + work_part[1:] + "."
+    if len(sentence) < 300 and is_complete_sentence(sentence):
+        return sentence + "."
+    # DON'T return fragments
+    return None
+
+
+def relevant_fact(summary: str, achievements: str, moments: list) -> str:
+    """Pick a notable fact: a significant moment, else an early achievement or summary sentence"""
+    # Look for significant moments (prefer achievements over migration/personal events)
+    if moments:
+        for m in moments:
+            m_lower = m.lower()
+            # Skip mundane facts, prefer scientific/career achievements
+            if any(word in m_lower for word in FACT_WORDS):
+                return m
+        # Return first moment if no significant one found
+        return moments[0]
+
+    if achievements:
+        for s in achievements.split('.'):
+            if len(s.strip()) > 20:
+                return s.strip() + "."
+
+    if summary:
+        for s in summary.split('.')[1:3]:  # Skip first sentence (usually intro)
+            if len(s.strip()) > 30:
+                return s.strip() + "."
+
+    return ""
+
+
+def character_moment(moments: list, summary: str):
+    """Pick the best defining moment, or None to fall back to an archetype moment"""
+    def is_untruncated(s):
+        if not s or len(s) < 30:
+            return False
+        return not any(s.rstrip().endswith(ending) for ending in TRUNCATED_ENDINGS)
+
+    if moments:
+        # First try to find a significant complete moment (skipping intro-style sentences)
+        for m in moments:
+            if not is_untruncated(m):
+                continue
+            m_lower = m.lower()
+            if any(p in m_lower for p in MOMENT_INTRO_PATTERNS):
+                continue
+            if any(word in m_lower for word in MOMENT_WORDS):
+                return m
+        # Fall back to first complete non-intro moment
+        for m in moments:
+            if is_untruncated(m) and not any(p in m.lower() for p in MOMENT_INTRO_PATTERNS):
+                return m
+
+    # Try the summary (skip first sentence which is usually intro, check next 3)
+    if summary:
+        for s in summary.split('.')[1:4]:
+            s = s.strip()
+            if 40 < len(s) < 200:
+                s_lower = s.lower()
+                if not any(p in s_lower for p in MOMENT_INTRO_PATTERNS):
+                    if any(word in s_lower for word in SUMMARY_MOMENT_WORDS):
+                        return s + "."
+
+    return None
+
+
+class SentenceIndex:
+    """
+    Pre-segmented biography of one scientist
+
+    sentences: every (sentence, class) from summary + achievements
+    evidence: display text of each usable sentence, in biography order
+    keyword_index: keyword -> ids of evidence sentences containing it
+    (pre-built for the matcher's keywords, other keywords are scanned on first use)
+    """
+
+    def __init__(self, summary: str, achievements: str, moments: list = None, matcher: KeywordMatcher = None):
+        self.summary = summary
+        self.achievements = achievements
+        self.moments = moments or []
+
+        self.sentences = []
+        self.evidence = []
+        self._lower = []
+        seen = set()
+        for s in f"{summary} {achievements}".split('.'):
+            sentence = s.strip()
+            kind = self._classify(sentence)
+            self.sentences.append((sentence, kind))
+            # A repeated sentence can never be picked before its first copy
+            if kind in (WORK, OTHER) and sentence not in seen:
+                seen.add(sentence)
+                self.evidence.append(evidence_text(sentence, sentence.lower()))
+                self._lower.append(sentence.lower())
+
+        self.keyword_index = {}
+        self._hits = {}
+        if matcher is not None:
+            index = {kw: set() for kw in matcher.keywords}
+            for i, sentence_lower in enumerate(self._lower):
+                for kw in matcher.found(sentence_lower):
+                    index[kw].add(i)
+            self.keyword_index = {kw: frozenset(ids) for kw, ids in index.items()}
+        self._work_hits = self.hits(WORK_INDICATORS)
+
+        self.fact = relevant_fact(summary, achievements, self.moments)
+        self.moment = character_moment(self.moments, summary)
+
+    @staticmethod
+    def _classify(sentence: str) -> str:
+        if len(sentence) <= 20:
+            return FRAGMENT
+        sentence_lower = sentence.lower()
+        if _BIO_MATCHER.any(sentence_lower):
+            return BIO
+        if is_wikipedia_intro(sentence):
+            return INTRO
+        if evidence_text(sentence, sentence_lower) is None:
+            return FRAGMENT
+        if _WORK_MATCHER.any(sentence_lower):
+            return WORK
+        return OTHER
+
+    def _keyword_ids(self, keyword: str) -> frozenset:
+        ids = self.keyword_index.get(keyword)
+        if ids is None:
+            ids = frozenset(i for i, s in enumerate(self._lower) if keyword in s)
+            self.keyword_index[keyword] = ids
+        return ids
+
+    def hits(self, keywords) -> frozenset:
+        """Ids of evidence sentences containing any of the keywords"""
+        key = tuple(keywords)
+        ids = self._hits.get(key)
+        if ids is None:
+            ids = frozenset().union(*(self._keyword_ids(kw) for kw in key))
+            self._hits[key] = ids
+        return ids
+
+    def select(self, keywords, used: set) -> str:
+        """Claim the first unused sentence matching keywords, else any work-related one
+
+        `used` is the caller's cursor of claimed evidence ids.
+        """
+        for hits in (self.hits(keywords), self._work_hits):
+            available = hits - used
+            if available:
+                i = min(available)
+                used.add(i)
+                return self.evidence[i]
+        return ""
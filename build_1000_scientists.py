@@ -7,6 +7,8 @@ import json
 import time
 import re
 
+from keyword_matcher import KeywordMatcher
+
 # Comprehensive list of Indian scientists with Wikipedia article titles
 # Organized by field for better coverage
 
@@ -440,9 +442,12 @@ TRAIT_PATTERNS = {
     }
 }
 
+# All trait keywords, found in one pass over the biography
+TRAIT_MATCHER = KeywordMatcher(kw for values in TRAIT_PATTERNS.values() for keywords in values.values() for kw in keywords)
+
 def infer_traits_from_text(text: str) -> dict:
     """Infer personality traits from biographical text"""
-    text_lower = text.lower()
+    found = TRAIT_MATCHER.found(text.lower())
     traits = {}
 
     for dimension, values in TRAIT_PATTERNS.items():
@@ -450,7 +455,7 @@ def infer_traits_from_text(text: str) -> dict:
         best_score = 0
 
         for trait_value, keywords in values.items():
-            score = sum(1 for kw in keywords if kw in text_lower)
+            score = sum(1 for kw in keywords if kw in found)
             if score > best_score:
                 best_score = score
                 best_match = trait_value
@@ -601,28 +606,35 @@ def determine_era(text: str) -> str:
 
     return "Contemporary"
 
+WORKING_STYLE_MATCHER = KeywordMatcher([
+    "alone", "solitary", "isolation", "team", "collaborat",
+    "meticulous", "careful", "intuiti", "instinct",
+    "experiment", "laboratory", "theoret", "mathematical",
+    "taught", "mentor", "students"
+])
+
 def extract_working_style(text: str, name: str) -> str:
     """Extract working style description"""
-    text_lower = text.lower()
+    found = WORKING_STYLE_MATCHER.found(text.lower())
 
     styles = []
 
-    if "alone" in text_lower or "solitary" in text_lower or "isolation" in text_lower:
+    if found & {"alone", "solitary", "isolation"}:
         styles.append(f"{name} preferred working in focused solitude")
-    elif "team" in text_lower or "collaborat" in text_lower:
+    elif found & {"team", "collaborat"}:
         styles.append(f"{name} thrived in collaborative environments")
 
-    if "meticulous" in text_lower or "careful" in text_lower:
+    if found & {"meticulous", "careful"}:
         styles.append("with meticulous attention to detail")
-    elif "intuiti" in text_lower or "instinct" in text_lower:
+    elif found & {"intuiti", "instinct"}:
         styles.append("guided by powerful intuition")
 
-    if "experiment" in text_lower or "laboratory" in text_lower:
+    if found & {"experiment", "laboratory"}:
         styles.append("spending long hours in the laboratory")
-    elif "theoret" in text_lower or "mathematical" in text_lower:
+    elif found & {"theoret", "mathematical"}:
         styles.append("pursuing elegant mathematical formulations")
 
-    if "taught" in text_lower or "mentor" in text_lower or "students" in text_lower:
+    if found & {"taught", "mentor", "students"}:
         styles.append("while nurturing the next generation of scientists")
 
     if styles:
@@ -0,0 +1,81 @@
+"""
+Build Engine Snapshot - the fully indexed matching engine in one file
+Parses the scientist database and the narrative artifact, builds every index
+(trait matrix, similarity tables, domain partitions, packed rows) and writes
+them to a snapshot the web app memory-maps at startup
+(MatchingEngineV3(..., snapshot_path=...)) instead of redoing that work.
+
+The snapshot records content hashes of the database and the artifact (and
+digests of the tables it was indexed with); when any of them changes it is
+ignored and the engine indexes the JSON as before. Run this after
+build_narratives.py or after editing the database.
+
+    python build_engine_snapshot.py                # build scientist_engine.snapshot
+    python build_engine_snapshot.py --verify 2000  # also check snapshot == JSON-indexed output
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+
+from matching_engine_v3 import MatchingEngineV3
+from questions_v3_simplified import DOMAINS, build_user_profile
+
+DEFAULT_DB = 'scientist_db_rich.json'
+DEFAULT_NARRATIVES = 'scientist_narratives.msgpack'
+DEFAULT_OUT = 'scientist_engine.snapshot'
+
+
+def build(db_path: str = DEFAULT_DB, narratives_path: str = DEFAULT_NARRATIVES, out_path: str = DEFAULT_OUT):
+    """Index the database and write the snapshot to out_path"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = MatchingEngineV3(db_path, narratives_path=narratives_path)
+    engine.save_snapshot(out_path)
+    print(f"Wrote {out_path}: {len(engine.scientists)} scientists, "
+          f"{len(engine._narratives)} with precomputed narratives, {os.path.getsize(out_path) / 1024:.0f} KB")
+
+
+def verify(db_path: str = DEFAULT_DB, narratives_path: str = DEFAULT_NARRATIVES, out_path: str = DEFAULT_OUT,
+           profiles: int = 1000, seed: int = 1) -> int:
+    """Compare results from the snapshot against the JSON-indexed engine, returns the number of differences"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        indexed = MatchingEngineV3(db_path, narratives_path=narratives_path)
+        mapped = MatchingEngineV3(db_path, narratives_path=narratives_path, snapshot_path=out_path)
+    if mapped.snapshot_path is None:
+        print(f"{out_path} was not used - is it stale?")
+        return 1
+
+    rng = random.Random(seed)
+    domains = list(DOMAINS) + [None]
+    names = [s['name'] for s in indexed.scientists]
+    mismatches = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(profiles):
+            profile = build_user_profile([rng.randrange(4) for _ in range(12)])
+            domain = rng.choice(domains)
+            shown = rng.sample(names, 3)
+            a = indexed.get_full_matches(profile, domain, recently_shown=shown, rng=random.Random(i))
+            b = mapped.get_full_matches(profile, domain, recently_shown=shown, rng=random.Random(i))
+            mismatches += a != b
+    print(f"Verified {profiles} results: {mismatches} mismatches")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot the indexed matching engine for fast cold starts")
+    parser.add_argument("--db", default=DEFAULT_DB)
+    parser.add_argument("--narratives", default=DEFAULT_NARRATIVES, help="artifact from build_narratives.py")
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    parser.add_argument("--verify", type=int, default=0, metavar="N",
+                        help="compare snapshot and JSON-indexed results over N random profiles")
+    args = parser.parse_args()
+
+    build(args.db, args.narratives, args.out)
+    if args.verify and verify(args.db, args.narratives, args.out, args.verify):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Build Narrative Artifact - precompute every narrative fragment per scientist
+Resonances, working style and character moment depend only on the scientist's
+data and the wording tables, contrasts only on the tables and the name, so they
+are built here once and the web app just assembles them
+(MatchingEngineV3(..., narratives_path=...)).
+
+Incremental: scientists whose data and wording tables are unchanged keep their
+fragments from the existing artifact.
+
+    python build_narratives.py                 # build / update scientist_narratives.msgpack
+    python build_narratives.py --full          # rebuild every scientist
+    python build_narratives.py --verify 2000   # also check precomputed == live output
+"""
+
+import argparse
+import contextlib
+import io
+import random
+
+from matching_engine_v3 import MatchingEngineV3, NARRATIVE_DIGEST
+from narrative_artifact import ARTIFACT_VERSION, load_artifact, save_artifact, scientist_digest
+from narrative_phrases import check_phrase_table
+from questions_v3_simplified import DOMAINS, TRAIT_DIMENSIONS, build_user_profile
+
+DEFAULT_DB = 'scientist_db_rich.json'
+DEFAULT_OUT = 'scientist_narratives.msgpack'
+
+
+def build(db_path: str = DEFAULT_DB, out_path: str = DEFAULT_OUT, full: bool = False) -> dict:
+    """Build (or update) the artifact at out_path, returns it"""
+    problems = check_phrase_table(TRAIT_DIMENSIONS)
+    if problems:
+        raise SystemExit("Phrase table problems:\n" + "\n".join(problems))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = MatchingEngineV3(db_path)
+        previous = None if full else load_artifact(out_path)
+    if previous is not None and previous.get('tables') != NARRATIVE_DIGEST:
+        print("Wording tables changed - rebuilding every scientist")
+        previous = None
+    old_entries = previous['scientists'] if previous else {}
+
+    entries = {}
+    rebuilt = 0
+    for scientist in engine.scientists:
+        digest = scientist_digest(scientist)
+        entry = old_entries.get(scientist['name'])
+        if entry is None or entry['digest'] != digest:
+            entry = {"digest": digest, **engine.narrative_fragments(scientist)}
+            rebuilt += 1
+        entries[scientist['name']] = entry
+
+    artifact = {"version": ARTIFACT_VERSION, "tables": NARRATIVE_DIGEST,
+                "contrasts": engine.contrast_fragments(), "scientists": entries}
+    save_artifact(out_path, artifact)
+    removed = len(set(old_entries) - set(entries))
+    print(f"Wrote {out_path}: {len(entries)} scientists ({rebuilt} rebuilt, "
+          f"{len(entries) - rebuilt} unchanged, {removed} removed)")
+    return artifact
+
+
+def verify(db_path: str = DEFAULT_DB, out_path: str = DEFAULT_OUT, profiles: int = 1000, seed: int = 1) -> int:
+    """Compare precomputed against live narratives, returns the number of differences"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        live = MatchingEngineV3(db_path)
+        precomputed = MatchingEngineV3(db_path, narratives_path=out_path)
+    if len(precomputed._narratives) != len(precomputed.scientists):
+        print(f"Only {len(precomputed._narratives)}/{len(precomputed.scientists)} scientists are precomputed")
+
+    rng = random.Random(seed)
+    domains = list(DOMAINS) + [None]
+    mismatches = 0
+    checked = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        # Every scientist against random profiles (all resonance/contrast paths)
+        for row in range(len(live.scientists)):
+            for _ in range(max(1, profiles // len(live.scientists))):
+                profile = build_user_profile([rng.randrange(4) for _ in range(12)])
+                a = live.generate_rich_narrative(profile, live._build_matches(profile, [(row, 0.6, False)])[0])
+                b = precomputed.generate_rich_narrative(profile, precomputed._build_matches(profile, [(row, 0.6, False)])[0])
+                mismatches += a != b
+                checked += 1
+        # Full results, same seeded shuffle on both engines
+        for i in range(profiles):
+            profile = build_user_profile([rng.randrange(4) for _ in range(12)])
+            domain = rng.choice(domains)
+            a = live.get_full_matches(profile, domain, rng=random.Random(i))
+            b = precomputed.get_full_matches(profile, domain, rng=random.Random(i))
+            mismatches += a != b
+            checked += 1
+    print(f"Verified {checked} narratives/results: {mismatches} mismatches")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute narrative fragments for every scientist")
+    parser.add_argument("--db", default=DEFAULT_DB)
+    parser.add_argument("--out", default=DEFAULT_OUT, help=".msgpack (needs msgpack) or .json")
+    parser.add_argument("--full", action="store_true", help="ignore the existing artifact and rebuild everything")
+    parser.add_argument("--verify", type=int, default=0, metavar="N",
+                        help="compare precomputed and live output over N random profiles")
+    args = parser.parse_args()
+
+    build(args.db, args.out, args.full)
+    if args.verify and verify(args.db, args.out, args.verify):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Circuit Breaker - fail fast while a backend is down instead of waiting on timeouts
+Closed: calls pass and outcomes are kept in a rolling time window. Open:
+calls are refused until a cool-down passes. Half-open: exactly one probe
+call is let through - success closes the breaker, failure reopens it, and a
+probe that never reports back is replaced after another cool-down
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised by CircuitBreaker.call when the breaker refuses the call"""
+
+
+class CircuitBreaker:
+    """
+    Error-rate breaker over a rolling window
+
+    Trips when at least min_calls outcomes in the last window seconds
+    include an error rate of error_threshold or more. Stays open for
+    open_seconds, then admits a single half-open probe. A probe that has
+    not reported back open_seconds after it was claimed (a caller that was
+    killed or abandoned) no longer holds the breaker: the next call probes.
+    """
+
+    # Transitions kept for the health endpoint
+    HISTORY = 20
+
+    def __init__(self, name: str, window: float = 30.0, min_calls: int = 5, error_threshold: float = 0.5,
+                 open_seconds: float = 15.0, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.error_threshold = error_threshold
+        self.open_seconds = open_seconds
+        self.clock = clock
+
+        self.state = CLOSED
+        self._since = clock()
+        self._outcomes = deque()  # (time, ok)
+        self._probing = False
+        self._probe_since = 0.0
+        self._lock = threading.Lock()
+        self.transitions = deque(maxlen=self.HISTORY)  # (wall time, from, to)
+        self.rejected = 0
+
+    def _move(self, state: str):
+        self.transitions.append((time.time(), self.state, state))
+        print(f"[Breaker] {self.name}: {self.state} -> {state}")
+        self.state = state
+        self._since = self.clock()
+        self._outcomes.clear()
+        self._probing = False
+
+    def _trim(self, now: float):
+        while self._outcomes and self._outcomes[0][0] < now - self.window:
+            self._outcomes.popleft()
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now (a True in half-open claims the single probe)"""
+        with self._lock:
+            if self.state == OPEN and self.clock() - self._since >= self.open_seconds:
+                self._move(HALF_OPEN)
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and (not self._probing or self.clock() - self._probe_since >= self.open_seconds):
+                self._probing = True
+                self._probe_since = self.clock()
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._move(CLOSED)
+                return
+            now = self.clock()
+            self._outcomes.append((now, True))
+            self._trim(now)
+
+    def record_failure(self):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._move(OPEN)
+                return
+            if self.state == OPEN:
+                return
+            now = self.clock()
+            self._outcomes.append((now, False))
+            self._trim(now)
+            errors = sum(1 for _, ok in self._outcomes if not ok)
+            if len(self._outcomes) >= self.min_calls and errors / len(self._outcomes) >= self.error_threshold:
+                self._move(OPEN)
+
+    def release(self):
+        """Give back a half-open probe without an outcome (the caller gave up before finding out)"""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probing = False
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """fn(*args, **kwargs) guarded by the breaker; raises CircuitOpenError when refused"""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit is {self.state}")
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def reset(self):
+        with self._lock:
+            if self.state != CLOSED:
+                self._move(CLOSED)
+            self._outcomes.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = self.clock()
+            self._trim(now)
+            errors = sum(1 for _, ok in self._outcomes if not ok)
+            return {
+                "state": self.state,
+                "seconds_in_state": round(now - self._since, 3),
+                "window_calls": len(self._outcomes),
+                "window_error_rate": round(errors / len(self._outcomes), 4) if self._outcomes else 0.0,
+                "rejected": self.rejected,
+                "transitions": [{"at": round(at, 3), "from": old, "to": new} for at, old, new in self.transitions]
+            }
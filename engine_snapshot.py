@@ -0,0 +1,106 @@
+"""
+Engine Snapshot - the indexed matching engine in one memory-mapped file
+Written by build_engine_snapshot.py: NumPy arrays (trait matrix, similarity
+tables, domain partitions) and the packed scientist / narrative rows sit at
+aligned offsets behind a JSON header. Loading maps the file and wraps each
+section in place, so a cold start neither parses JSON nor rebuilds indexes
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+from typing import Optional
+
+import numpy as np
+
+# Bump when the layout or the engine state stored in it changes
+SNAPSHOT_VERSION = 1
+
+MAGIC = b"SCITWIN\x00"
+# Sections start on cache-line boundaries (and so satisfy every dtype's alignment)
+ALIGN = 64
+
+
+def file_digest(path: str) -> Optional[str]:
+    """sha256 of a file's bytes, None if it does not exist"""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGN) * ALIGN
+
+
+def write_snapshot(path: str, header: dict, arrays: dict, blobs: dict):
+    """Write header (JSON-compatible), arrays (name -> ndarray) and blobs (name -> bytes) to path
+
+    The file is written next to path and renamed into place, so a reader never maps half a snapshot.
+    """
+    sections = []
+    layout = {"arrays": {}, "blobs": {}}
+    offset = 0
+    for name, array in arrays.items():
+        data = np.ascontiguousarray(array).tobytes()
+        layout["arrays"][name] = {"offset": offset, "dtype": array.dtype.str, "shape": list(array.shape)}
+        sections.append((offset, data))
+        offset = _aligned(offset + len(data))
+    for name, blob in blobs.items():
+        layout["blobs"][name] = {"offset": offset, "size": len(blob)}
+        sections.append((offset, bytes(blob)))
+        offset = _aligned(offset + len(blob))
+
+    layout["data_size"] = offset
+    encoded = json.dumps({**header, "version": SNAPSHOT_VERSION, **layout}, ensure_ascii=False).encode('utf-8')
+    start = _aligned(len(MAGIC) + 8 + len(encoded))
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC + struct.pack('<Q', len(encoded)) + encoded)
+        for section_offset, data in sections:
+            f.seek(start + section_offset)
+            f.write(data)
+        f.truncate(start + offset)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: str):
+    """(header, arrays, blobs) with every section a read-only view of the mapped file
+
+    None if the file is missing, unreadable or from another snapshot version.
+    """
+    try:
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        print(f"[Engine] Could not read snapshot {path}: {e}")
+        return None
+    try:
+        if mapped[:len(MAGIC)] != MAGIC:
+            raise ValueError("not an engine snapshot")
+        (length,) = struct.unpack_from('<Q', mapped, len(MAGIC))
+        header = json.loads(mapped[len(MAGIC) + 8:len(MAGIC) + 8 + length])
+        if header.get('version') != SNAPSHOT_VERSION:
+            raise ValueError(f"snapshot version {header.get('version')}, expected {SNAPSHOT_VERSION}")
+        start = _aligned(len(MAGIC) + 8 + length)
+        if len(mapped) < start + header['data_size']:
+            raise ValueError(f"truncated at {len(mapped)} of {start + header['data_size']} bytes")
+        arrays = {}
+        for name, spec in header['arrays'].items():
+            dtype = np.dtype(spec['dtype'])
+            count = int(np.prod(spec['shape']))
+            if count == 0:
+                arrays[name] = np.empty(spec['shape'], dtype=dtype)
+                continue
+            arrays[name] = np.frombuffer(mapped, dtype=dtype, count=count,
+                                         offset=start + spec['offset']).reshape(spec['shape'])
+        view = memoryview(mapped)
+        blobs = {name: view[start + spec['offset']:start + spec['offset'] + spec['size']]
+                 for name, spec in header['blobs'].items()}
+    except (ValueError, KeyError, TypeError, struct.error) as e:
+        print(f"[Engine] {path} is not a usable version {SNAPSHOT_VERSION} snapshot: {e}")
+        return None
+    return header, arrays, blobs
@@ -0,0 +1,43 @@
+"""
+Gunicorn config - web_app_v3 on several workers with the app preloaded
+The master imports the app and loads the matching engine once, then freezes
+the garbage collector's view of it and forks; workers share those pages
+copy-on-write instead of each loading (or dirtying) their own.
+Needs SECRET_KEY (and SHARED_STATE_URL for rate counters and cached
+responses) set the same for every worker and instance
+
+Usage: gunicorn -c gunicorn.conf.py web_app_v3:app
+"""
+
+import gc
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+# Threaded workers - each open /api/live stream holds one thread, so LIVE_MAX_SUBSCRIBERS
+# (default threads // 4) caps the streams per worker and leaves the rest for quiz requests
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+timeout = 30
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") != "0"
+
+if preload_app:
+    # No collections while the master imports the app: freed objects would leave holes
+    # that the master's later allocations fill, dirtying pages the workers share
+    gc.disable()
+
+
+def when_ready(server):
+    """Runs in the master after the app is imported and before any worker is forked"""
+    if preload_app:
+        import web_app_v3
+        web_app_v3.get_matching_engine()
+        # Everything loaded so far moves to the permanent generation: collections in the
+        # workers skip it, so they stop writing to (and copying) every page of it
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        gc.enable()
@@ -0,0 +1,44 @@
+"""
+Keyword Matcher - single-pass multi-keyword search
+Compiles a keyword set once and reports every keyword present in a text.
+Uses an Aho-Corasick automaton when pyahocorasick is installed
+(pip install pyahocorasick), otherwise falls back to one substring test
+per keyword
+"""
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    ahocorasick = None
+    AHOCORASICK_AVAILABLE = False
+
+
+class KeywordMatcher:
+    """
+    Substring matcher for a fixed keyword set
+
+    Matching is case-sensitive, like the `kw in text_lower` checks it
+    replaces: lowercase the text (and keywords) before matching.
+    """
+
+    def __init__(self, keywords, use_automaton: bool = True):
+        self.keywords = tuple(dict.fromkeys(keywords))
+        self._automaton = None
+        if use_automaton and AHOCORASICK_AVAILABLE and self.keywords:
+            self._automaton = ahocorasick.Automaton()
+            for kw in self.keywords:
+                self._automaton.add_word(kw, kw)
+            self._automaton.make_automaton()
+
+    def found(self, text: str) -> set:
+        """Every keyword that occurs in text, from one pass over it"""
+        if self._automaton is not None:
+            return {kw for _, kw in self._automaton.iter(text)}
+        return {kw for kw in self.keywords if kw in text}
+
+    def any(self, text: str) -> bool:
+        """True if at least one keyword occurs in text (stops at the first hit)"""
+        if self._automaton is not None:
+            return next(self._automaton.iter(text), None) is not None
+        return any(kw in text for kw in self.keywords)
@@ -0,0 +1,211 @@
+"""
+Live Feed - one producer, many Server-Sent Events subscribers
+A single thread per process watches the analytics counters (one small read
+per interval, only while someone is listening) and turns changes into
+play/totals events. Each event is formatted once and queued to every
+subscriber, so database cost does not grow with the number of viewers
+"""
+
+import json
+import queue
+import threading
+from collections import deque
+from typing import Callable, Optional
+
+
+class Subscriber:
+    """One open /api/live stream: a bounded queue of pre-formatted SSE messages"""
+
+    def __init__(self, maxsize: int):
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.closed = False
+
+
+class LiveFeed:
+    """
+    Polls read_totals() every interval seconds while there are subscribers
+    and publishes what changed:
+
+      snapshot  total_plays, likes, shares and the newest plays (sent on connect)
+      play      one new completion: player number, scientist, quality, created_at
+      totals    started, plays, likes and shares after a change
+
+    Every message carries an id, so a reconnecting EventSource resumes from
+    Last-Event-ID out of a short backlog (or gets a fresh snapshot). A
+    subscriber whose queue fills up is dropped - its browser reconnects.
+    Every stream holds a server thread, so max_subscribers stays well below
+    the worker's thread count; pages turned away poll instead.
+    """
+
+    def __init__(self, read_totals: Callable, read_recent: Callable, interval: float = 2.0,
+                 keepalive: float = 15.0, feed_size: int = 6, max_subscribers: int = 2,
+                 queue_size: int = 100, backlog: int = 100):
+        self.read_totals = read_totals
+        self.read_recent = read_recent
+        self.interval = interval
+        self.keepalive = keepalive
+        self.feed_size = feed_size
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+
+        self._subscribers = set()
+        self._lock = threading.Lock()  # subscribers, state and backlog
+        self._read_lock = threading.Lock()  # one database read at a time, outside _lock
+        self._wake = threading.Event()
+        self._producer = None
+        self._totals = None  # last counters seen - None until the first read
+        self._recent = deque(maxlen=feed_size)  # newest first: {"id", "scientist", "match_quality", "created_at"}
+        self._backlog = deque(maxlen=backlog)  # (event id, message)
+        self._next_id = 1
+
+        self.connects = 0
+        self.rejected = 0
+        self.dropped = 0
+        self.peak_subscribers = 0
+        self.events = 0
+        self.reads = 0
+
+    # ---- subscribers ----
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Optional[Subscriber]:
+        """Open a stream, or None at the connection cap (the page falls back to polling)"""
+        if self._totals is None:
+            # First listener since the producer went idle - read the current state once
+            self._tick(initial=True)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                self.rejected += 1
+                return None
+            subscriber = Subscriber(self.queue_size)
+            for message in self._catch_up(last_event_id):
+                subscriber.queue.put_nowait(message)
+            self._subscribers.add(subscriber)
+            self.connects += 1
+            self.peak_subscribers = max(self.peak_subscribers, len(self._subscribers))
+            if self._producer is None:
+                self._producer = threading.Thread(target=self._run, name="live-feed", daemon=True)
+                self._producer.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+        subscriber.closed = True
+
+    def _catch_up(self, last_event_id: Optional[str]) -> list:
+        """Messages a new stream starts with: the missed backlog on resume, otherwise a snapshot"""
+        if last_event_id and last_event_id.isdigit() and self._backlog:
+            last = int(last_event_id)
+            if self._backlog[0][0] <= last + 1 and last < self._next_id:
+                return [message for event_id, message in self._backlog if event_id > last]
+        # Counts are null while the database has not answered yet - pages keep what they rendered
+        totals = self._totals or {}
+        snapshot = {"total_plays": totals.get("plays"), "likes": totals.get("likes"),
+                    "shares": totals.get("shares"), "recent_activity": list(self._recent)}
+        # The snapshot reuses the newest id, so a resume after it only replays later events
+        return ["retry: 5000\n" + self._format("snapshot", snapshot, self._next_id - 1)]
+
+    def stream(self, subscriber: Subscriber):
+        """SSE text for one subscriber until it disconnects or is dropped"""
+        try:
+            while not subscriber.closed:
+                try:
+                    message = subscriber.queue.get(timeout=self.keepalive)
+                except queue.Empty:
+                    # Comment line - keeps proxies from timing out an idle stream and detects closed sockets
+                    yield ": keepalive\n\n"
+                    continue
+                if message is None:
+                    break
+                yield message
+        finally:
+            self.unsubscribe(subscriber)
+
+    # ---- producer ----
+
+    def notify(self):
+        """Check for changes now instead of at the next interval (after a local write)"""
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            with self._lock:
+                if not self._subscribers:
+                    # Nobody listening - stop reading; the next subscriber starts from a fresh read
+                    # (and the backlog no longer covers what happens meanwhile)
+                    self._producer = None
+                    self._totals = None
+                    self._backlog.clear()
+                    return
+            try:
+                self._tick()
+            except Exception as e:
+                print(f"[Live] Producer tick failed: {e}")
+
+    def _tick(self, initial: bool = False):
+        """Read the counters once and publish what changed since the last read"""
+        with self._read_lock:
+            previous = self._totals
+            if initial and previous is not None:
+                return  # a concurrent first subscriber already read it
+            totals = self.read_totals()
+            self.reads += 1
+            if totals is None or totals == previous:
+                return  # unchanged, or database unavailable - keep the last state and retry next interval
+
+            plays = []
+            new_plays = totals["plays"] - (previous["plays"] if previous is not None else 0)
+            if previous is None or new_plays > 0:
+                recent = self.read_recent(self.feed_size if previous is None else min(new_plays, self.feed_size))
+                self.reads += 1
+                if recent is None:
+                    return  # try the whole change again next interval
+                plays = [{"id": totals["plays"] - i, "scientist": row["scientist_name"],
+                          "match_quality": row.get("match_quality"), "created_at": row["created_at"]}
+                         for i, row in enumerate(recent)]
+
+            with self._lock:
+                for play in reversed(plays):
+                    self._recent.appendleft(play)
+                    if previous is not None:
+                        self._publish("play", play)
+                self._totals = totals
+                if previous is not None:
+                    self._publish("totals", totals)
+
+    def _publish(self, event: str, data: dict):
+        """Format once, queue to every subscriber (lock held)"""
+        event_id = self._next_id
+        self._next_id += 1
+        message = self._format(event, data, event_id)
+        self._backlog.append((event_id, message))
+        self.events += 1
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.queue.put_nowait(message)
+            except queue.Full:
+                # Too far behind to catch up in order - close it and let the browser reconnect
+                self._subscribers.discard(subscriber)
+                subscriber.closed = True
+                self.dropped += 1
+
+    @staticmethod
+    def _format(event: str, data: dict, event_id: int) -> str:
+        return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "peak_subscribers": self.peak_subscribers,
+                "max_subscribers": self.max_subscribers,
+                "producer_running": self._producer is not None,
+                "connects": self.connects,
+                "rejected": self.rejected,
+                "dropped_slow": self.dropped,
+                "events": self.events,
+                "reads": self.reads,
+                "interval": self.interval
+            }
@@ -4,100 +4,174 @@ Generates detailed explanations based on actual scientist biographies
 """
 
 import json
+import random
+
+import numpy as np
+
+from questions_v3_simplified import TRAIT_DIMENSIONS, DOMAINS, FIELD_ALIASES, normalize_field, pack_profile
+from biography_index import SentenceIndex, WORK_INDICATORS, relevant_fact
+from keyword_matcher import KeywordMatcher
+from result_cache import LRUCache
+from packed_records import PackedRecords, ENCODING as RECORD_ENCODING
+from narrative_artifact import load_artifact, scientist_digest, tables_digest
+from engine_snapshot import read_snapshot, write_snapshot, file_digest
+# TRAIT_DESCRIPTIONS is still importable from here for older scripts
+from narrative_phrases import (TRAIT_DESCRIPTIONS, TRAIT_PHRASES, ARCHETYPE_STYLES, ARCHETYPE_MOMENTS,
+                               trait_phrase, dimension_label, second_person, archetype_style, archetype_moment)
 # Gemini API temporarily disabled for next week
 # import google.generativeai as genai
 # from config import GEMINI_API_KEY
 # genai.configure(api_key=GEMINI_API_KEY)
 
-# Trait descriptions for generating meaningful explanations
-TRAIT_DESCRIPTIONS = {
+# Trait values that count as a half match when they differ
+RELATED_TRAITS = {
+    "approach": [("theoretical", "observational"), ("experimental", "applied")],
+    "collaboration": [("solo", "small_team"), ("large_team", "mentor")],
+    "risk": [("calculated", "hedged"), ("bold", "calculated")],
+    "motivation": [("curiosity", "recognition"), ("impact", "duty")],
+    "adversity": [("persist", "fight"), ("pivot", "accept")],
+    "breadth": [("generalist", "interdisciplinary"), ("specialist", "expanding")],
+    "authority": [("independent", "reformer"), ("institutional", "reformer")],
+    "communication": [("written", "reserved"), ("charismatic", "demonstrative")],
+    "time_horizon": [("medium", "long_term"), ("long_term", "eternal")],
+    "resources": [("frugal", "adequate"), ("adequate", "abundant")],
+    "legacy": [("knowledge", "people"), ("institutions", "movement")],
+    "failure": [("analytical", "pragmatic"), ("persistent", "serendipitous")]
+}
+
+# Resonance templates: dimension -> value -> (lead sentence, evidence keywords).
+# Order matters: within one resonance, earlier entries claim biography
+# sentences first, so evidence is selected in this order.
+RESONANCE_TEMPLATES = {
     "approach": {
-        "theoretical": "approaches problems through mathematical reasoning and abstract thinking",
-        "experimental": "prefers hands-on experimentation and empirical validation",
-        "applied": "focuses on practical applications and real-world impact",
-        "observational": "excels at pattern recognition and careful observation"
+        "theoretical": ("Like you, {name} approached problems through abstract reasoning.", ['theory', 'mathematical', 'equation', 'formula']),
+        "experimental": ("You both believe in testing ideas hands-on.", ['experiment', 'laboratory', 'discovered', 'tested']),
+        "applied": ("Like you, {name} focused on making science useful.", ['practical', 'application', 'developed', 'implemented']),
+        "observational": ("You share {name}'s gift for observation and pattern recognition.", ['observed', 'pattern', 'data', 'survey'])
     },
     "collaboration": {
-        "solo": "thrives working independently with deep focus",
-        "small_team": "works best with a few trusted collaborators",
-        "large_team": "excels at orchestrating large collaborative efforts",
-        "mentor": "finds fulfillment in teaching while researching"
+        "solo": ("Like you, {name} thrived working independently.", ['alone', 'solitary', 'independent', 'independently']),
+        "small_team": ("You both work best with trusted collaborators.", ['collaborat', 'worked with', 'partner', 'together']),
+        "large_team": ("Like you, {name} excelled at leading large teams.", ['led', 'directed', 'team', 'organization', 'founded']),
+        "mentor": ("You share {name}'s dedication to mentoring.", ['taught', 'mentor', 'students', 'trained', 'professor'])
     },
     "risk": {
-        "conservative": "prefers proven paths with strong evidence",
-        "calculated": "carefully weighs risks before committing",
-        "bold": "embraces unconventional ideas and breakthrough thinking",
-        "hedged": "explores risky ideas while maintaining safer alternatives"
+        "conservative": ("Like you, {name} preferred methodical, proven approaches.", ['meticulous', 'careful', 'systematic', 'rigorous']),
+        "calculated": ("You both carefully weigh risks before committing.", ['strategic', 'planned', 'considered', 'calculated']),
+        "bold": ("You share {name}'s appetite for breakthrough thinking.", ['revolutionary', 'pioneer', 'breakthrough', 'first', 'unconventional']),
+        "hedged": ("Like you, {name} balanced bold ideas with pragmatic backup plans.", ['diverse', 'multiple', 'varied', 'balanced'])
     },
     "motivation": {
-        "curiosity": "driven purely by the joy of understanding",
-        "impact": "motivated by making a tangible difference in lives",
-        "recognition": "seeks acknowledgment and validation of excellence",
-        "duty": "driven by responsibility to country and community"
+        "curiosity": ("Pure curiosity drives you both.", ['curious', 'passion', 'fascinated', 'love of']),
+        "impact": ("You share {name}'s drive to make a tangible difference.", ['help', 'improve', 'benefit', 'society', 'humanity']),
+        "recognition": ("Like you, {name} pursued excellence and acknowledgment.", ['award', 'prize', 'honor', 'recognition', 'medal']),
+        "duty": ("You share {name}'s sense of duty to nation.", ['nation', 'India', 'country', 'service'])
     },
     "adversity": {
-        "persist": "responds to obstacles with redoubled determination",
-        "pivot": "adapts fluidly when facing barriers",
-        "fight": "directly challenges unfair systems and rejection",
-        "accept": "philosophically accepts setbacks while staying focused"
+        "persist": ("Like you, {name} redoubled efforts when facing obstacles.", ['persever', 'persist', 'despite', 'overcame']),
+        "pivot": ("You both adapt fluidly when facing barriers.", ['changed', 'shifted', 'adapted', 'new direction']),
+        "fight": ("Like you, {name} directly challenged unfair systems.", ['fought', 'challenged', 'opposed', 'battle']),
+        "accept": ("You share {name}'s philosophical acceptance while staying focused.", ['philosophical', 'accepted', 'graceful'])
+    },
+    "legacy": {
+        "knowledge": ("Like you, {name} wanted discoveries that outlast them.", ['discovery', 'theorem', 'theory', 'understanding']),
+        "people": ("You share {name}'s focus on influencing the next generation.", ['students', 'trained', 'mentored', 'influenced']),
+        "institutions": ("Like you, {name} built lasting institutions.", ['founded', 'established', 'built', 'institution']),
+        "movement": ("You share {name}'s desire to transform how society thinks.", ['movement', 'revolution', 'transformed', 'changed'])
     },
     "breadth": {
-        "specialist": "goes extremely deep in one focused area",
-        "generalist": "learns broadly across many fields",
-        "interdisciplinary": "works at the intersection of multiple fields",
-        "expanding": "starts deep then gradually expands scope"
+        "specialist": ("Like you, {name} went deep in one focused area.", ['specialist', 'expert', 'focused', 'dedicated']),
+        "generalist": ("You share {name}'s broad intellectual curiosity.", ['broad', 'diverse', 'various', 'multiple fields']),
+        "interdisciplinary": ("Like you, {name} worked across multiple fields.", ['interdisciplinary', 'combined', 'bridged', 'intersection']),
+        "expanding": ("You both started deep then expanded scope.", ['expanded', 'grew', 'evolved', 'broadened'])
     },
     "authority": {
-        "independent": "works best outside traditional structures",
-        "institutional": "builds and strengthens institutions",
-        "reformer": "challenges norms while working within systems",
-        "revolutionary": "creates entirely new frameworks"
+        "independent": ("Like you, {name} worked best outside traditional structures.", ['independent', 'own path', 'unconventional']),
+        "institutional": ("You share {name}'s dedication to building institutions.", ['institution', 'organization', 'established', 'founded']),
+        "reformer": ("Like you, {name} challenged norms while working within systems.", ['reform', 'changed', 'improved', 'modernized']),
+        "revolutionary": ("You share {name}'s revolutionary approach.", ['revolutionary', 'breakthrough', 'pioneered', 'first'])
     },
     "communication": {
-        "reserved": "lets work speak for itself",
-        "charismatic": "enjoys explaining ideas to broad audiences",
-        "written": "communicates through detailed documentation",
-        "demonstrative": "shows rather than tells through building"
+        "reserved": ("Like you, {name} let work speak for itself.", ['quietly', 'modest', 'humble', 'reserved']),
+        "charismatic": ("You share {name}'s gift for explaining ideas.", ['spoke', 'lectured', 'communicated', 'explained']),
+        "written": ("Like you, {name} communicated through detailed writing.", ['wrote', 'published', 'authored', 'books', 'papers']),
+        "demonstrative": ("You both believe in showing rather than telling.", ['built', 'created', 'demonstrated', 'showed'])
     },
     "time_horizon": {
-        "immediate": "focuses on urgent problems needing solutions now",
-        "medium": "thinks in terms of achievable multi-year goals",
-        "long_term": "maintains decades-spanning vision",
-        "eternal": "pursues timeless questions transcending eras"
+        "immediate": ("Like you, {name} focused on urgent problems.", ['urgent', 'immediate', 'pressing', 'crisis']),
+        "medium": ("You share {name}'s strategic multi-year thinking.", ['planned', 'strategic', 'project', 'developed']),
+        "long_term": ("Like you, {name} maintained decades-spanning vision.", ['vision', 'long-term', 'decades', 'future']),
+        "eternal": ("You both pursue timeless questions.", ['fundamental', 'eternal', 'timeless', 'universal'])
     },
     "resources": {
-        "frugal": "achieves great things with minimal resources",
-        "adequate": "needs reasonable resources, avoids excess",
-        "abundant": "secures big resources for big problems",
-        "ideas_first": "focuses on ideas, lets resources follow"
-    },
-    "legacy": {
-        "knowledge": "wants discoveries that outlast them",
-        "people": "values the students and people influenced",
-        "institutions": "builds systems that continue their work",
-        "movement": "seeks to change how society thinks"
+        "frugal": ("Like you, {name} achieved great things with minimal resources.", ['limited', 'modest', 'frugal', 'simple']),
+        "adequate": ("You share {name}'s balanced approach to resources.", ['efficient', 'practical', 'reasonable']),
+        "abundant": ("Like you, {name} mobilized major resources for big problems.", ['major', 'large-scale', 'significant', 'funded']),
+        "ideas_first": ("You both focus on ideas first.", ['idea', 'concept', 'theory', 'vision'])
     },
     "failure": {
-        "analytical": "treats failures as data points for analysis",
-        "persistent": "tries again with modifications until success",
-        "serendipitous": "looks for unexpected discoveries in failures",
-        "pragmatic": "moves on quickly to more promising directions"
+        "analytical": ("Like you, {name} treated failures as data points.", ['analyzed', 'studied', 'systematic', 'methodical']),
+        "persistent": ("You share {name}'s relentless persistence.", ['persistent', 'persevered', 'continued', 'despite']),
+        "serendipitous": ("Like you, {name} found discoveries in failures.", ['discovered', 'unexpected', 'accident', 'serendipity']),
+        "pragmatic": ("You share {name}'s practical approach to moving on.", ['practical', 'pragmatic', 'focused', 'moved'])
     }
 }
 
+# Dimension-specific keywords for finding relevant contrast evidence
+CONTRAST_KEYWORDS = {
+    "risk": ["bold", "daring", "cautious", "careful", "risk", "unconventional", "pioneering", "revolutionary"],
+    "approach": ["theoretical", "experimental", "practical", "applied", "mathematical", "observation"],
+    "collaboration": ["team", "solo", "alone", "collaborated", "partner", "independent", "mentored"],
+    "motivation": ["curiosity", "impact", "society", "recognition", "award", "duty", "service"],
+    "adversity": ["struggle", "obstacle", "challenge", "overcame", "persisted", "adapted"],
+    "breadth": ["specialized", "broad", "interdisciplinary", "focused", "diverse"],
+    "authority": ["institution", "independent", "established", "founded", "challenged"],
+    "communication": ["published", "lecture", "wrote", "presented", "taught"],
+    "time_horizon": ["long-term", "immediate", "vision", "future", "decades"],
+    "resources": ["minimal", "frugal", "funded", "resources", "budget"],
+    "legacy": ["students", "institution", "discovery", "movement", "influence"],
+    "failure": ["failed", "setback", "learned", "adapted", "retry"]
+}
+
+# Every keyword evidence is looked up by - indexed per scientist at load time
+EVIDENCE_KEYWORDS = sorted({kw for values in RESONANCE_TEMPLATES.values() for _, keywords in values.values() for kw in keywords}
+                           | {kw for keywords in CONTRAST_KEYWORDS.values() for kw in keywords}
+                           | set(WORK_INDICATORS))
+EVIDENCE_MATCHER = KeywordMatcher(EVIDENCE_KEYWORDS)
+
+# Ranked candidates kept for identical (profile, domain) quizzes - a few hundred bytes each
+MATCH_CACHE_SIZE = 4096
+
+# Precomputed narrative fragments are only valid for the tables they were worded from
+NARRATIVE_DIGEST = tables_digest(TRAIT_PHRASES, RELATED_TRAITS, RESONANCE_TEMPLATES,
+                                 ARCHETYPE_STYLES, ARCHETYPE_MOMENTS)
+
+# Trait ids and domain partitions in a snapshot are only valid for the tables they were indexed with
+INDEX_DIGEST = tables_digest(TRAIT_DIMENSIONS, RELATED_TRAITS, DOMAINS, FIELD_ALIASES)
+
 
 class MatchingEngineV3:
     """
     Rich biographical matching engine
     """
 
-    def __init__(self, database_path='scientist_db_rich.json'):
+    def __init__(self, database_path='scientist_db_rich.json', narratives_path=None, cache_size=MATCH_CACHE_SIZE,
+                 snapshot_path=None):
         # Gemini API disabled - using rich fallback instead
         self.model = None
-        self.load_database(database_path)
+        # Optional artifact from build_narratives.py - narratives are then assembled, not generated
+        self.narratives_path = narratives_path
+        # Deterministic ranking stage per packed profile, invalidated by load_database
+        self.match_cache = LRUCache(cache_size)
+        self.db_version = 0
+        # Optional snapshot from build_engine_snapshot.py - used only if built from these exact files
+        if not (snapshot_path and self.load_snapshot(snapshot_path, database_path)):
+            self.load_database(database_path)
 
     def load_database(self, path):
         """Load the scientist database"""
+        self.database_path = path
+        self.snapshot_path = None
         try:
             with open(path, 'r', encoding='utf-8') as f:
                 self.scientists = json.load(f)
@@ -105,6 +179,199 @@ class MatchingEngineV3:
         except FileNotFoundError:
             print(f"Database not found at {path}")
             self.scientists = []
+        self._index_traits()
+        self._index_domains()
+        self._index_narratives()
+        self._index_sentences()
+        # Requests read rows back out of one blob, so a forked worker shares the database
+        # instead of copying every dict whose refcount a request touches
+        self._names = tuple(s['name'] for s in self.scientists)
+        self.scientists = PackedRecords(self.scientists)
+        # Cached rankings refer to the old rows - the version bump keeps in-flight ones out too
+        self.match_cache.clear()
+        self.db_version += 1
+
+    def _index_traits(self):
+        """Encode all scientists' traits as an integer matrix for vectorized scoring
+
+        trait_matrix[row, col] is the id of the scientist's value for dimension
+        col; trait_similarity[col] is that dimension's value-by-value score table
+        (1.0 exact, 0.5 related). The last id stands for a missing/unknown value.
+        """
+        values = {dim: list(options) for dim, options in TRAIT_DIMENSIONS.items()}
+        for scientist in self.scientists:
+            for dim, value in scientist.get('traits', {}).items():
+                options = values.setdefault(dim, [])
+                if value is not None and value not in options:
+                    options.append(value)
+
+        self._trait_dims = list(values)
+        self._trait_ids = {dim: {v: i for i, v in enumerate(options)} for dim, options in values.items()}
+        self._missing_trait = max(len(options) for options in values.values())
+        self._trait_cols = np.arange(len(self._trait_dims))
+
+        self.trait_matrix = np.full((len(self.scientists), len(self._trait_dims)), self._missing_trait, dtype=np.int8)
+        for row, scientist in enumerate(self.scientists):
+            traits = scientist.get('traits', {})
+            for col, dim in enumerate(self._trait_dims):
+                self.trait_matrix[row, col] = self._trait_ids[dim].get(traits.get(dim), self._missing_trait)
+
+        size = self._missing_trait + 1
+        self.trait_similarity = np.zeros((len(self._trait_dims), size, size))
+        for col, dim in enumerate(self._trait_dims):
+            ids = self._trait_ids[dim]
+            for i in ids.values():
+                self.trait_similarity[col, i, i] = 1.0
+            for a, b in RELATED_TRAITS.get(dim, []):
+                if a in ids and b in ids:
+                    self.trait_similarity[col, ids[a], ids[b]] = 0.5
+                    self.trait_similarity[col, ids[b], ids[a]] = 0.5
+
+    def _index_domains(self):
+        """Pre-slice candidate rows (and their trait matrix rows) for every quiz domain"""
+        fields = [normalize_field(s.get('field')) for s in self.scientists]
+        self._domain_rows = {}
+        self._domain_matrix = {}
+        for domain, info in DOMAINS.items():
+            allowed = {normalize_field(f) for f in info['fields']}
+            rows = np.array([i for i, f in enumerate(fields) if f in allowed], dtype=np.intp)
+            self._domain_rows[domain] = rows
+            self._domain_matrix[domain] = self.trait_matrix[rows]
+
+    def _index_narratives(self):
+        """Attach precomputed narrative fragments to the scientists they were built from
+
+        _narratives holds the rows that have them, _fragments[row] the fragments.
+        """
+        self._narratives = frozenset()
+        self._fragments = PackedRecords()
+        self._contrasts = {}
+        if not self.narratives_path:
+            return
+        artifact = load_artifact(self.narratives_path)
+        if artifact is None or artifact.get('tables') != NARRATIVE_DIGEST:
+            print(f"[Narratives] {self.narratives_path} missing or stale - generating narratives live")
+            return
+        self._contrasts = artifact.get('contrasts', {})
+        entries = artifact.get('scientists', {})
+        fragments = []
+        for s in self.scientists:
+            entry = entries.get(s['name'])
+            fragments.append(entry if entry and entry['digest'] == scientist_digest(s) else None)
+        self._narratives = frozenset(row for row, entry in enumerate(fragments) if entry is not None)
+        self._fragments = PackedRecords(fragments)
+        print(f"[Narratives] Precomputed narratives for {len(self._narratives)}/{len(self.scientists)} scientists")
+
+    def _index_sentences(self):
+        """Segment, classify and keyword-index every scientist's biography once
+
+        Scientists with precomputed narratives are skipped - their text is not scanned at runtime.
+        """
+        self._sentence_index = {}
+        shared = {}  # rows with identical text share one index
+        for row in range(len(self.scientists)):
+            if row in self._narratives:
+                continue
+            s = self.scientists[row]
+            key = (s.get('summary', ''), s.get('achievements', ''), tuple(s.get('moments', [])))
+            if key not in shared:
+                shared[key] = SentenceIndex(key[0], key[1], list(key[2]), EVIDENCE_MATCHER)
+            self._sentence_index[s['name']] = shared[key]
+
+    def _sources(self, database_path: str) -> dict:
+        """Fingerprints of everything the indexed state is derived from"""
+        return {
+            "database": file_digest(database_path),
+            "narratives": file_digest(self.narratives_path) if self.narratives_path else None,
+            "narrative_tables": NARRATIVE_DIGEST,
+            "index_tables": INDEX_DIGEST,
+            "encoding": RECORD_ENCODING
+        }
+
+    def save_snapshot(self, path: str):
+        """Write the indexed state to a snapshot file that load_snapshot maps back in"""
+        records, record_offsets = self.scientists.buffers()
+        fragments, fragment_offsets = self._fragments.buffers()
+        arrays = {
+            "trait_matrix": self.trait_matrix,
+            "trait_similarity": self.trait_similarity,
+            "record_offsets": np.frombuffer(record_offsets, dtype=np.uint64),
+            "fragment_offsets": np.frombuffer(fragment_offsets, dtype=np.uint64)
+        }
+        for domain, rows in self._domain_rows.items():
+            arrays[f"domain_rows/{domain}"] = rows.astype(np.int64)
+            arrays[f"domain_matrix/{domain}"] = self._domain_matrix[domain]
+        header = {
+            "sources": self._sources(self.database_path),
+            "trait_options": {dim: list(ids) for dim, ids in self._trait_ids.items()},
+            "missing_trait": self._missing_trait,
+            "names": list(self._names),
+            "narrated": sorted(self._narratives),
+            "contrasts": self._contrasts,
+            "domains": list(self._domain_rows)
+        }
+        write_snapshot(path, header, arrays, {"records": records, "fragments": fragments})
+
+    def load_snapshot(self, path: str, database_path: str) -> bool:
+        """Map in the indexed state save_snapshot wrote - False (nothing changed) if the
+        snapshot is missing or was built from different data, tables or code
+        """
+        snapshot = read_snapshot(path)
+        if snapshot is None:
+            return False
+        header, arrays, blobs = snapshot
+        if header.get('sources') != self._sources(database_path):
+            print(f"[Engine] Snapshot {path} is stale (built from other data) - indexing {database_path}")
+            return False
+
+        self.database_path = database_path
+        self.snapshot_path = path
+        self.scientists = PackedRecords.from_buffers(blobs['records'], arrays['record_offsets'])
+        self._names = tuple(header['names'])
+        self._trait_dims = list(header['trait_options'])
+        self._trait_ids = {dim: {v: i for i, v in enumerate(options)} for dim, options in header['trait_options'].items()}
+        self._missing_trait = header['missing_trait']
+        self._trait_cols = np.arange(len(self._trait_dims))
+        self.trait_matrix = arrays['trait_matrix']
+        self.trait_similarity = arrays['trait_similarity']
+        self._domain_rows = {domain: arrays[f"domain_rows/{domain}"].astype(np.intp, copy=False)
+                             for domain in header['domains']}
+        self._domain_matrix = {domain: arrays[f"domain_matrix/{domain}"] for domain in header['domains']}
+        self._narratives = frozenset(header['narrated'])
+        self._fragments = PackedRecords.from_buffers(blobs['fragments'], arrays['fragment_offsets'])
+        self._contrasts = header['contrasts']
+        self._index_sentences()
+        self.match_cache.clear()
+        self.db_version += 1
+        print(f"[Engine] Mapped {len(self.scientists)} indexed scientists from {path} "
+              f"({len(self._narratives)} with precomputed narratives)")
+        return True
+
+    def _biography(self, name: str, summary: str, achievements: str, moments: list = None) -> SentenceIndex:
+        """Load-time sentence index for a scientist (built on the fly for unknown text)"""
+        index = self._sentence_index.get(name)
+        if (index is None or index.summary != summary or index.achievements != achievements
+                or (moments is not None and index.moments != moments)):
+            index = SentenceIndex(summary, achievements, moments, EVIDENCE_MATCHER)
+        return index
+
+    def score_profile(self, user_profile: dict, domain: str = None) -> np.ndarray:
+        """Match scores for every scientist (or a domain's candidates) in one pass
+
+        Same values as calculate_match_score, without the trait breakdown.
+        """
+        matrix = self._domain_matrix.get(domain, self.trait_matrix) if domain else self.trait_matrix
+        if not user_profile:
+            return np.zeros(len(matrix))
+
+        # One similarity row per dimension for the user's answer
+        lookup = np.zeros((len(self._trait_dims), self._missing_trait + 1))
+        for col, dim in enumerate(self._trait_dims):
+            if dim in user_profile:
+                user_id = self._trait_ids[dim].get(user_profile[dim], self._missing_trait)
+                lookup[col] = self.trait_similarity[col, user_id]
+
+        return lookup[self._trait_cols, matrix].sum(axis=1) / len(user_profile)
 
     def calculate_match_score(self, user_profile: dict, scientist: dict) -> tuple:
         """Calculate match score with detailed trait analysis"""
@@ -121,7 +388,7 @@ class MatchingEngineV3:
                     "dimension": dimension,
                     "value": user_value,
                     "match_type": "exact",
-                    "description": TRAIT_DESCRIPTIONS.get(dimension, {}).get(user_value, "")
+                    "description": trait_phrase(dimension, user_value)
                 })
             elif self._are_related(dimension, user_value, scientist_value):
                 matching_traits.append({
@@ -129,8 +396,8 @@ class MatchingEngineV3:
                     "user_value": user_value,
                     "scientist_value": scientist_value,
                     "match_type": "related",
-                    "user_desc": TRAIT_DESCRIPTIONS.get(dimension, {}).get(user_value, ""),
-                    "scientist_desc": TRAIT_DESCRIPTIONS.get(dimension, {}).get(scientist_value, "")
+                    "user_desc": trait_phrase(dimension, user_value),
+                    "scientist_desc": trait_phrase(dimension, scientist_value)
                 })
             else:
                 if scientist_value:
@@ -138,8 +405,8 @@ class MatchingEngineV3:
                         "dimension": dimension,
                         "user_value": user_value,
                         "scientist_value": scientist_value,
-                        "user_desc": TRAIT_DESCRIPTIONS.get(dimension, {}).get(user_value, ""),
-                        "scientist_desc": TRAIT_DESCRIPTIONS.get(dimension, {}).get(scientist_value, "")
+                        "user_desc": trait_phrase(dimension, user_value),
+                        "scientist_desc": trait_phrase(dimension, scientist_value)
                     })
 
         exact = sum(1 for t in matching_traits if t.get('match_type') == 'exact')
@@ -153,25 +420,11 @@ class MatchingEngineV3:
         if not val1 or not val2:
             return False
 
-        related_pairs = {
-            "approach": [("theoretical", "observational"), ("experimental", "applied")],
-            "collaboration": [("solo", "small_team"), ("large_team", "mentor")],
-            "risk": [("calculated", "hedged"), ("bold", "calculated")],
-            "motivation": [("curiosity", "recognition"), ("impact", "duty")],
-            "adversity": [("persist", "fight"), ("pivot", "accept")],
-            "breadth": [("generalist", "interdisciplinary"), ("specialist", "expanding")],
-            "authority": [("independent", "reformer"), ("institutional", "reformer")],
-            "communication": [("written", "reserved"), ("charismatic", "demonstrative")],
-            "time_horizon": [("medium", "long_term"), ("long_term", "eternal")],
-            "resources": [("frugal", "adequate"), ("adequate", "abundant")],
-            "legacy": [("knowledge", "people"), ("institutions", "movement")],
-            "failure": [("analytical", "pragmatic"), ("persistent", "serendipitous")]
-        }
-
-        pairs = related_pairs.get(dimension, [])
+        pairs = RELATED_TRAITS.get(dimension, [])
         return (val1, val2) in pairs or (val2, val1) in pairs
 
-    def find_matches(self, user_profile: dict, domain_filter: str = None, top_n: int = 3, recently_shown: list = None) -> list:
+    def find_matches(self, user_profile: dict, domain_filter: str = None, top_n: int = 3, recently_shown: list = None,
+                     rng: random.Random = None) -> list:
         """Find top matching scientists with anti-repetition system
 
         Args:
@@ -179,295 +432,166 @@ class MatchingEngineV3:
             domain_filter: Scientific domain to filter by
             top_n: Number of matches to return (default 3)
             recently_shown: List of scientist names shown in recent attempts
+            rng: Random source for the variety shuffle (default: module random)
 
         Returns:
             List of top matches with variety ensured across attempts
         """
-        import random
-
-        candidates = self.scientists
         recently_shown = recently_shown or []
+        rng = rng or random
 
-        if domain_filter:
-            domain_map = {
-                "cosmos": ["Physics", "Space Science", "Astrophysics", "Astronomy", "Aerospace"],
-                "quantum": ["Physics", "Mathematics", "Computer Science"],
-                "chemistry": ["Chemistry", "Material Science", "Biochemistry"],  # New chemistry domain
-                "life": ["Biology", "Medicine", "Neuroscience", "Genetics"],  # Removed Chemistry
-                "earth": ["Environmental Science", "Agriculture", "Ecology", "Earth Science"],
-                "engineering": ["Engineering", "Technology", "Computer Science", "Aerospace"]
-            }
-            allowed = domain_map.get(domain_filter, [])
-            if allowed:
-                candidates = [s for s in candidates if s.get('field') in allowed]
-
-        # Calculate scores for all candidates
-        scored = []
-        for scientist in candidates:
-            score, matching, differing = self.calculate_match_score(user_profile, scientist)
-            scored.append({
-                "scientist": scientist,
-                "score": score,
-                "matching_traits": matching,
-                "differing_traits": differing,
-                "was_recently_shown": scientist['name'] in recently_shown
-            })
+        top_tier, fallback = self.rank_candidates(user_profile, domain_filter, top_n)
 
-        # Sort by score
-        scored.sort(key=lambda x: x['score'], reverse=True)
+        def candidates(ranked):
+            return [(row, score, self._names[row] in recently_shown) for row, score in ranked]
 
         # Anti-repetition logic: Among top matches, prioritize unshown scientists
-        if len(scored) > 0:
-            top_score = scored[0]['score']
-
-            # Define "top tier" as scientists within 15% of the best score
-            # This creates a pool of good matches to choose from
-            threshold = top_score * 0.85
-            top_tier = [s for s in scored if s['score'] >= threshold]
+        if top_tier:
+            top_tier = candidates(top_tier)
 
             # Separate recently shown from fresh scientists in top tier
-            fresh = [s for s in top_tier if not s['was_recently_shown']]
-            shown = [s for s in top_tier if s['was_recently_shown']]
+            fresh = [c for c in top_tier if not c[2]]
+            shown = [c for c in top_tier if c[2]]
 
             # If we have fresh scientists in top tier, prioritize them
             if len(fresh) >= top_n:
                 # Randomize among fresh top-tier matches for variety
-                random.shuffle(fresh)
-                return fresh[:top_n]
+                rng.shuffle(fresh)
+                return self._build_matches(user_profile, fresh[:top_n])
             elif len(fresh) > 0:
                 # Mix fresh scientists with some shown ones if needed
-                random.shuffle(fresh)
-                random.shuffle(shown)
+                rng.shuffle(fresh)
+                rng.shuffle(shown)
                 selected = fresh + shown
-                return selected[:top_n]
+                return self._build_matches(user_profile, selected[:top_n])
             else:
                 # All top tier were recently shown - apply decay to recently shown
                 # This prevents the exact same scientist from being #1 every time
                 if len(shown) >= top_n:
-                    random.shuffle(shown)
-                    return shown[:top_n]
+                    rng.shuffle(shown)
+                    return self._build_matches(user_profile, shown[:top_n])
 
         # Fallback: just return top scored (shouldn't normally reach here)
-        return scored[:top_n]
+        return self._build_matches(user_profile, candidates(fallback))
+
+    def rank_candidates(self, user_profile: dict, domain_filter: str = None, top_n: int = 3) -> tuple:
+        """Deterministic stage of find_matches: score, sort and cut the top tier
+
+        Returns (top_tier, fallback) as tuples of (row, score), best first, ties in
+        database order. top_tier holds everyone within 15% of the best score;
+        fallback is the plain top_n, only filled in when the tier is smaller.
+        Complete quiz profiles are cached by (packed profile, domain, top_n, database version).
+        """
+        # Domain candidates are pre-sliced at load; unknown domains use everyone
+        domain = domain_filter if domain_filter in self._domain_rows else None
+        packed = pack_profile(user_profile, domain)
+        key = None if packed is None else (packed, top_n, self.db_version)
+        if key is not None:
+            ranked = self.match_cache.get(key)
+            if ranked is not None:
+                return ranked
+
+        scores = self.score_profile(user_profile, domain)
+        row_ids = self._domain_rows[domain] if domain else np.arange(len(scores))
+        top_tier = ()
+        if len(scores) > 0:
+            # Define "top tier" as scientists within 15% of the best score
+            # This creates a pool of good matches to choose from
+            threshold = float(scores.max()) * 0.85
+            tier = np.flatnonzero(scores >= threshold)
+            tier = tier[np.argsort(-scores[tier], kind='stable')]
+            top_tier = tuple((int(row_ids[i]), float(scores[i])) for i in tier)
+        fallback = ()
+        if len(top_tier) < top_n:
+            fallback = tuple((int(row_ids[i]), float(scores[i])) for i in self._top_k(scores, top_n))
+
+        ranked = (top_tier, fallback)
+        if key is not None:
+            self.match_cache.put(key, ranked)
+        return ranked
+
+    def cache_stats(self) -> dict:
+        """Match cache counters (hits, misses, evictions, size) and the database version"""
+        return {**self.match_cache.stats(), "db_version": self.db_version}
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        """Indices of the k best scores, highest first, ties in database order"""
+        if k <= 0 or len(scores) == 0:
+            return np.array([], dtype=np.intp)
+        if k >= len(scores):
+            return np.argsort(-scores, kind='stable')
+        kth = scores[np.argpartition(-scores, k - 1)[:k]].min()
+        above = np.flatnonzero(scores > kth)
+        ties = np.flatnonzero(scores == kth)[:k - len(above)]
+        best = np.concatenate([above, ties])
+        return best[np.argsort(-scores[best], kind='stable')]
+
+    def _build_matches(self, user_profile: dict, selected: list) -> list:
+        """Attach the scientist and the detailed trait breakdown to the (row, score, shown) picks"""
+        matches = []
+        for row, score, was_recently_shown in selected:
+            scientist = self.scientists[row]
+            _, matching, differing = self.calculate_match_score(user_profile, scientist)
+            matches.append({
+                "scientist": scientist,
+                "row": row,
+                "score": score,
+                "matching_traits": matching,
+                "differing_traits": differing,
+                "was_recently_shown": was_recently_shown
+            })
+        return matches
 
     def build_rich_resonance(self, name: str, trait: dict, summary: str, achievements: str, moments: list, user_profile: dict = None) -> dict:
         """Build a rich resonance explanation using actual biographical data and user's specific answers"""
         dim = trait['dimension']
-        dim_title = dim.replace('_', ' ').title()
-
-        # Get user's actual answer for this dimension
-        user_answer = user_profile.get(dim, '') if user_profile else ''
-        user_desc = TRAIT_DESCRIPTIONS.get(dim, {}).get(user_answer, '')
-
-        # Extract specific details from biography
-        summary_lower = summary.lower() if summary else ""
-        achievements_lower = achievements.lower() if achievements else ""
-
-        # Clear used sentences cache for this scientist at start
-        self._used_sentences[name] = set()
-
-        # Build CONCISE explanations - 1-2 sentences max
-        explanations = {
-            "approach": {
-                "theoretical": f"Like you, {name} approached problems through abstract reasoning. {self._find_evidence(summary, achievements, ['theory', 'mathematical', 'equation', 'formula'], name)}",
-                "experimental": f"You both believe in testing ideas hands-on. {self._find_evidence(summary, achievements, ['experiment', 'laboratory', 'discovered', 'tested'], name)}",
-                "applied": f"Like you, {name} focused on making science useful. {self._find_evidence(summary, achievements, ['practical', 'application', 'developed', 'implemented'], name)}",
-                "observational": f"You share {name}'s gift for observation and pattern recognition. {self._find_evidence(summary, achievements, ['observed', 'pattern', 'data', 'survey'], name)}"
-            },
-            "collaboration": {
-                "solo": f"Like you, {name} thrived working independently. {self._find_evidence(summary, achievements, ['alone', 'solitary', 'independent', 'independently'], name)}",
-                "small_team": f"You both work best with trusted collaborators. {self._find_evidence(summary, achievements, ['collaborat', 'worked with', 'partner', 'together'], name)}",
-                "large_team": f"Like you, {name} excelled at leading large teams. {self._find_evidence(summary, achievements, ['led', 'directed', 'team', 'organization', 'founded'], name)}",
-                "mentor": f"You share {name}'s dedication to mentoring. {self._find_evidence(summary, achievements, ['taught', 'mentor', 'students', 'trained', 'professor'], name)}"
-            },
-            "risk": {
-                "conservative": f"Like you, {name} preferred methodical, proven approaches. {self._find_evidence(summary, achievements, ['meticulous', 'careful', 'systematic', 'rigorous'], name)}",
-                "calculated": f"You both carefully weigh risks before committing. {self._find_evidence(summary, achievements, ['strategic', 'planned', 'considered', 'calculated'], name)}",
-                "bold": f"You share {name}'s appetite for breakthrough thinking. {self._find_evidence(summary, achievements, ['revolutionary', 'pioneer', 'breakthrough', 'first', 'unconventional'], name)}",
-                "hedged": f"Like you, {name} balanced bold ideas with pragmatic backup plans. {self._find_evidence(summary, achievements, ['diverse', 'multiple', 'varied', 'balanced'], name)}"
-            },
-            "motivation": {
-                "curiosity": f"Pure curiosity drives you both. {self._find_evidence(summary, achievements, ['curious', 'passion', 'fascinated', 'love of'], name)}",
-                "impact": f"You share {name}'s drive to make a tangible difference. {self._find_evidence(summary, achievements, ['help', 'improve', 'benefit', 'society', 'humanity'], name)}",
-                "recognition": f"Like you, {name} pursued excellence and acknowledgment. {self._find_evidence(summary, achievements, ['award', 'prize', 'honor', 'recognition', 'medal'], name)}",
-                "duty": f"You share {name}'s sense of duty to nation. {self._find_evidence(summary, achievements, ['nation', 'India', 'country', 'service'], name)}"
-            },
-            "adversity": {
-                "persist": f"Like you, {name} redoubled efforts when facing obstacles. {self._find_evidence(summary, achievements, ['persever', 'persist', 'despite', 'overcame'], name)}",
-                "pivot": f"You both adapt fluidly when facing barriers. {self._find_evidence(summary, achievements, ['changed', 'shifted', 'adapted', 'new direction'], name)}",
-                "fight": f"Like you, {name} directly challenged unfair systems. {self._find_evidence(summary, achievements, ['fought', 'challenged', 'opposed', 'battle'], name)}",
-                "accept": f"You share {name}'s philosophical acceptance while staying focused. {self._find_evidence(summary, achievements, ['philosophical', 'accepted', 'graceful'], name)}"
-            },
-            "legacy": {
-                "knowledge": f"Like you, {name} wanted discoveries that outlast them. {self._find_evidence(summary, achievements, ['discovery', 'theorem', 'theory', 'understanding'], name)}",
-                "people": f"You share {name}'s focus on influencing the next generation. {self._find_evidence(summary, achievements, ['students', 'trained', 'mentored', 'influenced'], name)}",
-                "institutions": f"Like you, {name} built lasting institutions. {self._find_evidence(summary, achievements, ['founded', 'established', 'built', 'institution'], name)}",
-                "movement": f"You share {name}'s desire to transform how society thinks. {self._find_evidence(summary, achievements, ['movement', 'revolution', 'transformed', 'changed'], name)}"
-            },
-            "breadth": {
-                "specialist": f"Like you, {name} went deep in one focused area. {self._find_evidence(summary, achievements, ['specialist', 'expert', 'focused', 'dedicated'], name)}",
-                "generalist": f"You share {name}'s broad intellectual curiosity. {self._find_evidence(summary, achievements, ['broad', 'diverse', 'various', 'multiple fields'], name)}",
-                "interdisciplinary": f"Like you, {name} worked across multiple fields. {self._find_evidence(summary, achievements, ['interdisciplinary', 'combined', 'bridged', 'intersection'], name)}",
-                "expanding": f"You both started deep then expanded scope. {self._find_evidence(summary, achievements, ['expanded', 'grew', 'evolved', 'broadened'], name)}"
-            },
-            "authority": {
-                "independent": f"Like you, {name} worked best outside traditional structures. {self._find_evidence(summary, achievements, ['independent', 'own path', 'unconventional'], name)}",
-                "institutional": f"You share {name}'s dedication to building institutions. {self._find_evidence(summary, achievements, ['institution', 'organization', 'established', 'founded'], name)}",
-                "reformer": f"Like you, {name} challenged norms while working within systems. {self._find_evidence(summary, achievements, ['reform', 'changed', 'improved', 'modernized'], name)}",
-                "revolutionary": f"You share {name}'s revolutionary approach. {self._find_evidence(summary, achievements, ['revolutionary', 'breakthrough', 'pioneered', 'first'], name)}"
-            },
-            "communication": {
-                "reserved": f"Like you, {name} let work speak for itself. {self._find_evidence(summary, achievements, ['quietly', 'modest', 'humble', 'reserved'], name)}",
-                "charismatic": f"You share {name}'s gift for explaining ideas. {self._find_evidence(summary, achievements, ['spoke', 'lectured', 'communicated', 'explained'], name)}",
-                "written": f"Like you, {name} communicated through detailed writing. {self._find_evidence(summary, achievements, ['wrote', 'published', 'authored', 'books', 'papers'], name)}",
-                "demonstrative": f"You both believe in showing rather than telling. {self._find_evidence(summary, achievements, ['built', 'created', 'demonstrated', 'showed'], name)}"
-            },
-            "time_horizon": {
-                "immediate": f"Like you, {name} focused on urgent problems. {self._find_evidence(summary, achievements, ['urgent', 'immediate', 'pressing', 'crisis'], name)}",
-                "medium": f"You share {name}'s strategic multi-year thinking. {self._find_evidence(summary, achievements, ['planned', 'strategic', 'project', 'developed'], name)}",
-                "long_term": f"Like you, {name} maintained decades-spanning vision. {self._find_evidence(summary, achievements, ['vision', 'long-term', 'decades', 'future'], name)}",
-                "eternal": f"You both pursue timeless questions. {self._find_evidence(summary, achievements, ['fundamental', 'eternal', 'timeless', 'universal'], name)}"
-            },
-            "resources": {
-                "frugal": f"Like you, {name} achieved great things with minimal resources. {self._find_evidence(summary, achievements, ['limited', 'modest', 'frugal', 'simple'], name)}",
-                "adequate": f"You share {name}'s balanced approach to resources. {self._find_evidence(summary, achievements, ['efficient', 'practical', 'reasonable'], name)}",
-                "abundant": f"Like you, {name} mobilized major resources for big problems. {self._find_evidence(summary, achievements, ['major', 'large-scale', 'significant', 'funded'], name)}",
-                "ideas_first": f"You both focus on ideas first. {self._find_evidence(summary, achievements, ['idea', 'concept', 'theory', 'vision'], name)}"
-            },
-            "failure": {
-                "analytical": f"Like you, {name} treated failures as data points. {self._find_evidence(summary, achievements, ['analyzed', 'studied', 'systematic', 'methodical'], name)}",
-                "persistent": f"You share {name}'s relentless persistence. {self._find_evidence(summary, achievements, ['persistent', 'persevered', 'continued', 'despite'], name)}",
-                "serendipitous": f"Like you, {name} found discoveries in failures. {self._find_evidence(summary, achievements, ['discovered', 'unexpected', 'accident', 'serendipity'], name)}",
-                "pragmatic": f"You share {name}'s practical approach to moving on. {self._find_evidence(summary, achievements, ['practical', 'pragmatic', 'focused', 'moved'], name)}"
-            }
-        }
+        dim_title = dimension_label(dim)
 
         # Get the trait value
         trait_value = trait.get('value') if trait.get('match_type') == 'exact' else trait.get('scientist_value', trait.get('user_value'))
 
         # Get explanation or build default
-        if dim in explanations and trait_value in explanations[dim]:
-            explanation = explanations[dim][trait_value]
-        else:
-            desc = trait.get('description', trait.get('scientist_desc', ''))
-            explanation = f"You share {name}'s approach: {desc}. {self._extract_relevant_fact(summary, achievements, moments)}"
+        biography = self._biography(name, summary, achievements, moments)
+        desc = trait.get('description', trait.get('scientist_desc', ''))
 
         return {
             "trait": dim_title,
-            "explanation": explanation
+            "explanation": self._resonance_text(name, biography, dim, trait_value, desc)
         }
 
-    # Class-level cache to track used sentences per scientist
-    _used_sentences = {}
-
-    def _find_evidence(self, summary: str, achievements: str, keywords: list, scientist_name: str = "") -> str:
-        """Find evidence from biography matching keywords - returns DIFFERENT sentences each time"""
-        text = f"{summary} {achievements}"
-        sentences = [s.strip() for s in text.split('.') if len(s.strip()) > 20]
-
-        # Track which sentences have been used for this scientist
-        if scientist_name not in self._used_sentences:
-            self._used_sentences[scientist_name] = set()
-        used = self._used_sentences[scientist_name]
-
-        # Pure skip patterns - expanded to catch Wikipedia intros
-        pure_bio_patterns = ['was born', 'died on', 'married', 'children', 'spouse', 'moved to']
-
-        def is_wikipedia_intro(s):
-            """Detect Wikipedia-style intro sentences"""
-            s_lower = s.lower()
-            # Pattern: dates in parentheses like "(19 July 1938 – 20 May 2025)"
-            if '(' in s and ')' in s and any(month in s for month in ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October', 'November', 'December']):
-                return True
-            # Pattern: "Name was a/an Indian/American/British..."
-            if ') was a' in s_lower or ') is a' in s_lower:
-                return True
-            if 'was an indian' in s_lower or 'is an indian' in s_lower:
-                return True
-            if 'was a indian' in s_lower or 'was an american' in s_lower or 'was a british' in s_lower:
-                return True
-            # Pattern: starts with name and immediately has nationality
-            nationality_patterns = ['indian physicist', 'indian scientist', 'indian mathematician', 'indian engineer',
-                                   'indian chemist', 'indian biologist', 'indian astronomer', 'indian astrophysicist']
-            if any(p in s_lower[:100] for p in nationality_patterns):
-                return True
-            return False
+    def _resonance_text(self, name: str, biography: SentenceIndex, dimension: str, value: str, desc: str) -> str:
+        """Template lead plus biographical evidence, or a description-based default"""
+        template = RESONANCE_TEMPLATES.get(dimension, {}).get(value)
+        if template:
+            lead = template[0].format(name=name)
+            return f"{lead} {self._resonance_evidence(biography, dimension, value)}"
+        return f"You share {name}'s approach: {desc}. {biography.fact}"
 
-        def is_complete_sentence(s):
-            """Check if sentence is complete and not a fragment"""
-            if not s or len(s) < 30:
-                return False
-            # Must start with capital letter (proper sentence start)
-            if not s[0].isupper():
-                return False
-            # Skip sentences that start with words that indicate fragments or incomplete thoughts
-            first_word = s.split()[0].lower() if s.split() else ""
-            fragment_starters = ['first', 'also', 'and', 'but', 'or', 'which', 'where', 'when', 'that', 'who',
-                                'awarded', 'served', 'known', 'in', 'career', 'early', 'later', 'after',
-                                'before', 'during', 'following', 'padma', 'born', 'died', 'received', 'joined',
-                                'performed', 'made', 'was', 'is', 'has', 'had', 'worked', 'studied',
-                                'nobel', 'upon', 'the', 'his', 'her', 'their', 'a', 'an', 'for', 'with', 'on', 'at',
-                                'he', 'she', 'they', 'it', 'this', 'these', 'from', 'since', 'as', 'being']
-            if first_word in fragment_starters:
-                return False
-            return True
-
-        # First pass: find sentences with specific keywords that haven't been used
-        for sentence in sentences:
-            if sentence in used:
-                continue
-            sentence_lower = sentence.lower()
+    def _resonance_evidence(self, biography: SentenceIndex, dimension: str, value: str) -> str:
+        """Select evidence for a single resonance template
 
-            if any(p in sentence_lower for p in pure_bio_patterns):
-                continue
-
-            # Skip Wikipedia intro sentences
-            if is_wikipedia_intro(sentence):
-                continue
-
-            if any(kw in sentence_lower for kw in keywords):
-                # Extract work part from intro sentences
-                if 'who ' in sentence_lower and len(sentence) > 50:
-                    who_index = sentence_lower.find('who ')
-                    work_part = sentence[who_index + 4:].strip()
-                    if len(work_part) > 20 and is_complete_sentence(work_part[0].upper() + work_part[1:]):
-                        used.add(sentence)
-                        return work_part[0].upper() + work_part[1:] + "."
-                if len(sentence) < 300 and is_complete_sentence(sentence):
-                    used.add(sentence)
-                    return sentence + "."
-
-        # Second pass: find ANY unused work-related sentence
-        work_indicators = ['research', 'discovered', 'developed', 'invented', 'pioneered', 'founded',
-                          'contributed', 'published', 'award', 'prize', 'known for', 'breakthrough',
-                          'theory', 'equation', 'method', 'technique', 'professor', 'director',
-                          'institute', 'led', 'established', 'study', 'work']
-
-        for sentence in sentences:
-            if sentence in used:
-                continue
-            sentence_lower = sentence.lower()
+        Templates earlier in RESONANCE_TEMPLATES claim their sentences first, so
+        their picks are replayed (index lookups only, no text built) up to the
+        requested template.
+        """
+        used = set()
+        for dim, values in RESONANCE_TEMPLATES.items():
+            for val, (_, keywords) in values.items():
+                evidence = biography.select(keywords, used)
+                if dim == dimension and val == value:
+                    return evidence
+        return ""
 
-            if any(p in sentence_lower for p in pure_bio_patterns):
-                continue
+    def _find_evidence(self, summary: str, achievements: str, keywords: list, used: set = None) -> str:
+        """Find evidence from biography matching keywords
 
-            # Skip Wikipedia intro sentences
-            if is_wikipedia_intro(sentence):
-                continue
-
-            if any(kw in sentence_lower for kw in work_indicators):
-                if 'who ' in sentence_lower and len(sentence) > 50:
-                    who_index = sentence_lower.find('who ')
-                    work_part = sentence[who_index + 4:].strip()
-                    if len(work_part) > 20 and is_complete_sentence(work_part[0].upper() + work_part[1:]):
-                        used.add(sentence)
-                        return work_part[0].upper() + work_part[1:] + "."
-                if len(sentence) < 300 and is_complete_sentence(sentence):
-                    used.add(sentence)
-                    return sentence + "."
-
-        # Return empty if nothing good found - DON'T return fragments
-        return ""
+        `used` is the caller's sentence cursor: sentences returned are added to
+        it and skipped on later calls, so repeated lookups return DIFFERENT
+        sentences. Without one, every call starts fresh.
+        """
+        used = set() if used is None else used
+        return SentenceIndex(summary, achievements).select(keywords, used)
 
     def _extract_relevant_fact(self, summary: str, achievements: str, moments: list, keywords: list = None) -> str:
         """Extract a relevant fact from the biography, optionally matching keywords"""
@@ -483,33 +607,16 @@ class MatchingEngineV3:
                     if len(clean) > 20 and len(clean) < 300:
                         return clean + "."
 
-        # Look for significant moments (prefer achievements over migration/personal events)
-        if moments and len(moments) > 0:
-            for m in moments:
-                m_lower = m.lower()
-                # Skip mundane facts, prefer scientific/career achievements
-                if any(word in m_lower for word in ['award', 'prize', 'discovered', 'invented', 'founded', 'breakthrough', 'published', 'developed']):
-                    return m
-            # Return first moment if no significant one found
-            return moments[0]
-
-        if achievements:
-            sentences = achievements.split('.')
-            for s in sentences:
-                if len(s.strip()) > 20:
-                    return s.strip() + "."
-
-        if summary:
-            sentences = summary.split('.')
-            for s in sentences[1:3]:  # Skip first sentence (usually intro)
-                if len(s.strip()) > 30:
-                    return s.strip() + "."
-
-        return ""
+        return relevant_fact(summary, achievements, moments)
 
     def generate_rich_narrative(self, user_profile: dict, match: dict) -> dict:
         """Generate detailed narrative based on actual biography"""
         scientist = match['scientist']
+        # Fragments belong to the engine's own rows - a match built by hand is narrated live
+        row = match.get('row')
+        if row in self._narratives:
+            return self._assemble_narrative(user_profile, match, self._fragments[row])
+
         matching = match['matching_traits']
         differing = match['differing_traits']
 
@@ -570,136 +677,150 @@ Return ONLY valid JSON. Keep it concise."""
         if True:  # Skip Gemini entirely
             print(f"[FALLBACK] Using rich biographical template for {name}")
             # RICH FALLBACK using actual biographical data and user's specific answers
+            biography = self._biography(name, summary, achievements, moments)
             resonances = []
             for t in matching[:3]:
                 resonances.append(self.build_rich_resonance(name, t, summary, achievements, moments, user_profile))
 
-            # Dimension-specific keywords for finding relevant contrast evidence
-            dimension_keywords = {
-                "risk": ["bold", "daring", "cautious", "careful", "risk", "unconventional", "pioneering", "revolutionary"],
-                "approach": ["theoretical", "experimental", "practical", "applied", "mathematical", "observation"],
-                "collaboration": ["team", "solo", "alone", "collaborated", "partner", "independent", "mentored"],
-                "motivation": ["curiosity", "impact", "society", "recognition", "award", "duty", "service"],
-                "adversity": ["struggle", "obstacle", "challenge", "overcame", "persisted", "adapted"],
-                "breadth": ["specialized", "broad", "interdisciplinary", "focused", "diverse"],
-                "authority": ["institution", "independent", "established", "founded", "challenged"],
-                "communication": ["published", "lecture", "wrote", "presented", "taught"],
-                "time_horizon": ["long-term", "immediate", "vision", "future", "decades"],
-                "resources": ["minimal", "frugal", "funded", "resources", "budget"],
-                "legacy": ["students", "institution", "discovery", "movement", "influence"],
-                "failure": ["failed", "setback", "learned", "adapted", "retry"]
-            }
-
-            # Build contrast explanation with relevant evidence
+            # Build contrast explanation
+            # (contrast evidence was never part of the explanation text, so it is not looked up)
             contrasts = []
             for d in differing[:1]:
                 dim = d['dimension']
-                dim_title = dim.replace('_', ' ').title()
-                user_desc = d.get('user_desc', 'take one approach')
-                sci_desc = d.get('scientist_desc', 'took another path')
-                keywords = dimension_keywords.get(dim, [])
-                contrast_evidence = self._find_evidence(summary, achievements, keywords) if keywords else ""
-                if not contrast_evidence:
-                    contrast_evidence = ""
                 contrasts.append({
-                    "trait": dim_title,
-                    "explanation": f"You {user_desc.replace('thrives', 'thrive').replace('excels', 'excel').replace('finds', 'find').replace('goes', 'go').replace('learns', 'learn').replace('works', 'work').replace('builds', 'build').replace('challenges', 'challenge').replace('creates', 'create').replace('lets', 'let').replace('enjoys', 'enjoy').replace('focuses', 'focus').replace('thinks', 'think').replace('needs', 'need').replace('secures', 'secure').replace('achieves', 'achieve').replace('treats', 'treat').replace('tries', 'try').replace('looks', 'look').replace('moves', 'move').replace('prefers', 'prefer').replace('embraces', 'embrace').replace('adapts', 'adapt').replace('responds', 'respond').replace('maintains', 'maintain').replace('pursues', 'pursue').replace('communicates', 'communicate').replace('demonstrates', 'demonstrate').replace('takes', 'take').replace('uses', 'use')}, while {name} {sci_desc}. This difference can expand your perspective."
+                    "trait": dimension_label(dim),
+                    "explanation": self._contrast_text(name, d)
                 })
 
-            # Build working style from actual data - NEVER show generic placeholder
-            if working_style and len(working_style) > 50 and "Made significant contributions" not in working_style and "significant contributions" not in working_style.lower():
-                style_text = working_style
-            else:
-                # Build from archetype and field - make it specific
-                archetype_styles = {
-                    "Experimental Pioneer": f"Known for rigorous hands-on experimentation and meticulous lab work in {field}.",
-                    "Theoretical Visionary": f"Approached {field} through deep mathematical reasoning and theoretical frameworks.",
-                    "Institution Builder": f"Combined research excellence with building lasting institutions in {field}.",
-                    "Distinguished Researcher": f"Maintained high standards of research excellence throughout their career in {field}.",
-                    "Intuitive Visionary": f"Known for bold, intuitive leaps in {field} that others later proved correct.",
-                    "Contemporary Leader": f"Leads by example in {field}, balancing research with mentorship."
-                }
-                style_text = archetype_styles.get(archetype, f"A dedicated researcher who advanced the field of {field}.")
-
-            # Find best defining moment (prefer significant achievements over mundane facts)
-            # Skip truncated sentences (ending with abbreviations like "M.", "Ph.", "Dr.", etc.)
-            def is_complete_sentence(s):
-                if not s or len(s) < 30:
-                    return False
-                # Check if sentence is truncated (ends with common abbreviations)
-                truncated_endings = [' M.', ' B.', ' Ph.', ' Dr.', ' Prof.', ' Mr.', ' Mrs.', ' Ms.', ' Jr.', ' Sr.', ' St.', ' vs.', ' etc.', ' i.e.', ' e.g.']
-                for ending in truncated_endings:
-                    if s.rstrip().endswith(ending):
-                        return False
-                return True
-
-            moment_text = None
-            # Skip patterns that indicate Wikipedia intro, not a defining moment
-            intro_patterns = ['is an indian', 'was an indian', 'is a indian', 'was a indian',
-                             'born on', 'born in', '(born', 'is an american', 'was an american',
-                             'is a scientist', 'was a scientist', 'who headed', 'who served']
-
-            if moments:
-                # First try to find a significant complete moment
-                for m in moments:
-                    if not is_complete_sentence(m):
-                        continue
-                    m_lower = m.lower()
-                    # Skip intro-style sentences
-                    if any(p in m_lower for p in intro_patterns):
-                        continue
-                    if any(word in m_lower for word in ['award', 'prize', 'discovered', 'invented', 'founded', 'breakthrough', 'published', 'first', 'developed', 'pioneered', 'became', 'led', 'launched']):
-                        moment_text = m
-                        break
-                # Fall back to first complete non-intro moment
-                if not moment_text:
-                    for m in moments:
-                        if is_complete_sentence(m):
-                            m_lower = m.lower()
-                            if not any(p in m_lower for p in intro_patterns):
-                                moment_text = m
-                                break
-
-            # If still no moment, try to find from summary (skip first sentence which is usually intro)
-            if not moment_text and summary:
-                sentences = summary.split('.')
-                for s in sentences[1:4]:  # Skip first sentence, check next 3
-                    s = s.strip()
-                    if len(s) > 40 and len(s) < 200:
-                        s_lower = s.lower()
-                        if not any(p in s_lower for p in intro_patterns):
-                            if any(word in s_lower for word in ['first', 'founded', 'led', 'became', 'award', 'pioneered', 'discovered', 'developed']):
-                                moment_text = s + "."
-                                break
-
-            if not moment_text:
-                # Use archetype-based moment as last resort
-                archetype_moments = {
-                    "Experimental Pioneer": f"Pioneered groundbreaking experimental techniques in {field}.",
-                    "Theoretical Visionary": f"Developed influential theoretical frameworks in {field}.",
-                    "Institution Builder": f"Founded key research institutions advancing {field} in India.",
-                    "Distinguished Researcher": f"Received major recognition for contributions to {field}.",
-                    "Contemporary Leader": f"Currently leading transformative initiatives in {field}."
-                }
-                moment_text = archetype_moments.get(archetype, f"Made lasting contributions to {field}.")
-
             return {
-                "match_quality": "Deep Resonance" if match['score'] > 0.7 else ("Kindred Spirit" if match['score'] > 0.5 else "Parallel Paths"),
+                "match_quality": self._match_quality(match['score']),
                 "resonances": resonances,
-                "contrasts": contrasts if contrasts else [],
-                "working_style": style_text,
-                "character_moment": moment_text
+                "contrasts": contrasts,
+                "working_style": self._working_style_text(working_style, archetype, field),
+                "character_moment": self._moment_text(biography, archetype, field)
             }
 
-    def get_full_matches(self, user_profile: dict, domain: str = None, recently_shown: list = None) -> list:
+    def narrative_fragments(self, scientist: dict) -> dict:
+        """Every narrative fragment that depends only on the scientist (for build_narratives.py)
+
+        resonances: dimension -> explanation for the scientist's own value
+        (exact and related matches both explain the scientist's value)
+        """
+        name = scientist['name']
+        field = scientist['field']
+        archetype = scientist.get('archetype', 'Distinguished Researcher')
+        biography = self._biography(name, scientist.get('summary', ''), scientist.get('achievements', ''),
+                                    scientist.get('moments', []))
+
+        resonances = {}
+        for dim, sci_value in scientist.get('traits', {}).items():
+            if sci_value:
+                resonances[dim] = self._resonance_text(name, biography, dim, sci_value, trait_phrase(dim, sci_value))
+
+        return {
+            "resonances": resonances,
+            "working_style": self._working_style_text(scientist.get('working_style', ''), archetype, field),
+            "character_moment": self._moment_text(biography, archetype, field)
+        }
+
+    def contrast_fragments(self) -> dict:
+        """Contrast text around the name for every dimension -> scientist value -> differing user value"""
+        table = {}
+        for dim, phrases in TRAIT_PHRASES.items():
+            table[dim] = {
+                sci_value: {
+                    value: list(self._contrast_parts(phrase['second'], sci_phrase['third']))
+                    for value, phrase in phrases.items()
+                    if value != sci_value and not self._are_related(dim, value, sci_value)
+                }
+                for sci_value, sci_phrase in phrases.items()
+            }
+        return table
+
+    def _assemble_narrative(self, user_profile: dict, match: dict, fragments: dict) -> dict:
+        """generate_rich_narrative from precomputed fragments (any missing one is built live)"""
+        scientist = match['scientist']
+        name = scientist['name']
+        traits = scientist.get('traits', {})
+
+        resonances = []
+        for t in match['matching_traits'][:3]:
+            dim = t['dimension']
+            value = t.get('value') if t.get('match_type') == 'exact' else t.get('scientist_value', t.get('user_value'))
+            explanation = fragments['resonances'].get(dim) if value == traits.get(dim) else None
+            if explanation is None:
+                resonances.append(self.build_rich_resonance(name, t, scientist.get('summary', ''),
+                                                            scientist.get('achievements', ''),
+                                                            scientist.get('moments', []), user_profile))
+            else:
+                resonances.append({"trait": dimension_label(dim), "explanation": explanation})
+
+        contrasts = []
+        for d in match['differing_traits'][:1]:
+            dim = d['dimension']
+            parts = self._contrasts.get(dim, {}).get(d.get('scientist_value'), {}).get(d.get('user_value'))
+            if parts is None:
+                explanation = self._contrast_text(name, d)
+            else:
+                explanation = f"{parts[0]}{name}{parts[1]}"
+            contrasts.append({"trait": dimension_label(dim), "explanation": explanation})
+
+        return {
+            "match_quality": self._match_quality(match['score']),
+            "resonances": resonances,
+            "contrasts": contrasts,
+            "working_style": fragments['working_style'],
+            "character_moment": fragments['character_moment']
+        }
+
+    @staticmethod
+    def _match_quality(score: float) -> str:
+        return "Deep Resonance" if score > 0.7 else ("Kindred Spirit" if score > 0.5 else "Parallel Paths")
+
+    @classmethod
+    def _contrast_text(cls, name: str, differing: dict) -> str:
+        """Contrast explanation for one differing trait, addressed to the user"""
+        dim = differing['dimension']
+        user_second = trait_phrase(dim, differing.get('user_value'), 'second') or \
+            second_person(differing.get('user_desc', 'take one approach'))
+        before, after = cls._contrast_parts(user_second, differing.get('scientist_desc', 'took another path'))
+        return f"{before}{name}{after}"
+
+    @staticmethod
+    def _contrast_parts(user_second: str, sci_desc: str) -> tuple:
+        """Contrast explanation around the scientist's name (it is the only per-scientist part)"""
+        return f"You {user_second}, while ", f" {sci_desc}. This difference can expand your perspective."
+
+    @staticmethod
+    def _working_style_text(working_style: str, archetype: str, field: str) -> str:
+        """Working style from actual data - NEVER show generic placeholder"""
+        if working_style and len(working_style) > 50 and "Made significant contributions" not in working_style and "significant contributions" not in working_style.lower():
+            return working_style
+        # Build from archetype and field - make it specific
+        return archetype_style(archetype, field)
+
+    @staticmethod
+    def _moment_text(biography: SentenceIndex, archetype: str, field: str) -> str:
+        """Best defining moment, pre-selected when the biography was indexed
+
+        Prefers significant, untruncated, non-intro moments, then the summary,
+        then an archetype-based moment as last resort.
+        """
+        if biography.moment:
+            return biography.moment
+        return archetype_moment(archetype, field)
+
+    def get_full_matches(self, user_profile: dict, domain: str = None, recently_shown: list = None,
+                         rng: random.Random = None) -> list:
         """Get full match results with rich narratives
 
         Args:
             user_profile: User's trait profile
             domain: Scientific domain to filter by
             recently_shown: List of scientist names shown in recent attempts (for anti-repetition)
+            rng: Random source for the variety shuffle (default: module random)
         """
-        matches = self.find_matches(user_profile, domain, recently_shown=recently_shown)
+        matches = self.find_matches(user_profile, domain, recently_shown=recently_shown, rng=rng)
 
         results = []
         for match in matches:
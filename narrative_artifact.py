@@ -0,0 +1,66 @@
+"""
+Narrative Artifact - precomputed narrative fragments shipped with the app
+Reads and writes the versioned fragment file produced by build_narratives.py.
+MessagePack when the path ends in .msgpack (pip install msgpack), JSON otherwise
+"""
+
+import hashlib
+import json
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+# Bump when the artifact layout or the code that words a fragment changes
+ARTIFACT_VERSION = 1
+
+# Scientist fields the narrative fragments are built from
+NARRATIVE_FIELDS = ('name', 'field', 'archetype', 'summary', 'achievements', 'moments', 'working_style', 'traits')
+
+
+def scientist_digest(scientist: dict) -> str:
+    """Fingerprint of the scientist data a fragment set was built from"""
+    data = {field: scientist.get(field) for field in NARRATIVE_FIELDS}
+    return hashlib.sha1(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def tables_digest(*tables) -> str:
+    """Fingerprint of the wording tables (templates, descriptions ...) fragments depend on"""
+    return hashlib.sha1(json.dumps(tables, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def load_artifact(path: str):
+    """Load an artifact, or None if it is missing, unreadable or from another version"""
+    try:
+        if path.endswith('.msgpack'):
+            if not MSGPACK_AVAILABLE:
+                print("[Narratives] msgpack not available - install with: pip install msgpack")
+                return None
+            with open(path, 'rb') as f:
+                artifact = msgpack.unpackb(f.read())
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                artifact = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[Narratives] Could not read {path}: {e}")
+        return None
+
+    if not isinstance(artifact, dict) or artifact.get('version') != ARTIFACT_VERSION:
+        print(f"[Narratives] {path} is not a version {ARTIFACT_VERSION} artifact")
+        return None
+    return artifact
+
+
+def save_artifact(path: str, artifact: dict):
+    """Write an artifact in the format implied by the path"""
+    if path.endswith('.msgpack'):
+        if not MSGPACK_AVAILABLE:
+            raise RuntimeError("msgpack is required to write .msgpack artifacts: pip install msgpack")
+        with open(path, 'wb') as f:
+            f.write(msgpack.packb(artifact))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(artifact, f, ensure_ascii=False, separators=(',', ':'))
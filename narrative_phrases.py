@@ -0,0 +1,216 @@
+"""
+Narrative Phrases - trait and archetype wording for match explanations
+Third-person, second-person and short-label forms of every trait value are
+built once at import, so narratives never rewrite descriptions per request
+"""
+
+# Trait descriptions for generating meaningful explanations
+TRAIT_DESCRIPTIONS = {
+    "approach": {
+        "theoretical": "approaches problems through mathematical reasoning and abstract thinking",
+        "experimental": "prefers hands-on experimentation and empirical validation",
+        "applied": "focuses on practical applications and real-world impact",
+        "observational": "excels at pattern recognition and careful observation"
+    },
+    "collaboration": {
+        "solo": "thrives working independently with deep focus",
+        "small_team": "works best with a few trusted collaborators",
+        "large_team": "excels at orchestrating large collaborative efforts",
+        "mentor": "finds fulfillment in teaching while researching"
+    },
+    "risk": {
+        "conservative": "prefers proven paths with strong evidence",
+        "calculated": "carefully weighs risks before committing",
+        "bold": "embraces unconventional ideas and breakthrough thinking",
+        "hedged": "explores risky ideas while maintaining safer alternatives"
+    },
+    "motivation": {
+        "curiosity": "driven purely by the joy of understanding",
+        "impact": "motivated by making a tangible difference in lives",
+        "recognition": "seeks acknowledgment and validation of excellence",
+        "duty": "driven by responsibility to country and community"
+    },
+    "adversity": {
+        "persist": "responds to obstacles with redoubled determination",
+        "pivot": "adapts fluidly when facing barriers",
+        "fight": "directly challenges unfair systems and rejection",
+        "accept": "philosophically accepts setbacks while staying focused"
+    },
+    "breadth": {
+        "specialist": "goes extremely deep in one focused area",
+        "generalist": "learns broadly across many fields",
+        "interdisciplinary": "works at the intersection of multiple fields",
+        "expanding": "starts deep then gradually expands scope"
+    },
+    "authority": {
+        "independent": "works best outside traditional structures",
+        "institutional": "builds and strengthens institutions",
+        "reformer": "challenges norms while working within systems",
+        "revolutionary": "creates entirely new frameworks"
+    },
+    "communication": {
+        "reserved": "lets work speak for itself",
+        "charismatic": "enjoys explaining ideas to broad audiences",
+        "written": "communicates through detailed documentation",
+        "demonstrative": "shows rather than tells through building"
+    },
+    "time_horizon": {
+        "immediate": "focuses on urgent problems needing solutions now",
+        "medium": "thinks in terms of achievable multi-year goals",
+        "long_term": "maintains decades-spanning vision",
+        "eternal": "pursues timeless questions transcending eras"
+    },
+    "resources": {
+        "frugal": "achieves great things with minimal resources",
+        "adequate": "needs reasonable resources, avoids excess",
+        "abundant": "secures big resources for big problems",
+        "ideas_first": "focuses on ideas, lets resources follow"
+    },
+    "legacy": {
+        "knowledge": "wants discoveries that outlast them",
+        "people": "values the students and people influenced",
+        "institutions": "builds systems that continue their work",
+        "movement": "seeks to change how society thinks"
+    },
+    "failure": {
+        "analytical": "treats failures as data points for analysis",
+        "persistent": "tries again with modifications until success",
+        "serendipitous": "looks for unexpected discoveries in failures",
+        "pragmatic": "moves on quickly to more promising directions"
+    }
+}
+
+# Working style fallback when the biography has no usable one - {field} is filled in
+ARCHETYPE_STYLES = {
+    "Experimental Pioneer": "Known for rigorous hands-on experimentation and meticulous lab work in {field}.",
+    "Theoretical Visionary": "Approached {field} through deep mathematical reasoning and theoretical frameworks.",
+    "Institution Builder": "Combined research excellence with building lasting institutions in {field}.",
+    "Distinguished Researcher": "Maintained high standards of research excellence throughout their career in {field}.",
+    "Intuitive Visionary": "Known for bold, intuitive leaps in {field} that others later proved correct.",
+    "Contemporary Leader": "Leads by example in {field}, balancing research with mentorship."
+}
+
+# Character moment fallback when no biographical moment qualifies
+ARCHETYPE_MOMENTS = {
+    "Experimental Pioneer": "Pioneered groundbreaking experimental techniques in {field}.",
+    "Theoretical Visionary": "Developed influential theoretical frameworks in {field}.",
+    "Institution Builder": "Founded key research institutions advancing {field} in India.",
+    "Distinguished Researcher": "Received major recognition for contributions to {field}.",
+    "Contemporary Leader": "Currently leading transformative initiatives in {field}."
+}
+
+DEFAULT_STYLE = "A dedicated researcher who advanced the field of {field}."
+DEFAULT_MOMENT = "Made lasting contributions to {field}."
+
+# Third-person verbs in TRAIT_DESCRIPTIONS -> second-person form
+SECOND_PERSON_VERBS = {
+    'accepts': 'accept', 'achieves': 'achieve', 'adapts': 'adapt', 'approaches': 'approach',
+    'avoids': 'avoid', 'builds': 'build', 'challenges': 'challenge', 'communicates': 'communicate',
+    'creates': 'create', 'embraces': 'embrace', 'enjoys': 'enjoy', 'excels': 'excel',
+    'expands': 'expand', 'explores': 'explore', 'finds': 'find', 'focuses': 'focus', 'goes': 'go',
+    'learns': 'learn', 'lets': 'let', 'looks': 'look', 'maintains': 'maintain', 'moves': 'move',
+    'needs': 'need', 'prefers': 'prefer', 'pursues': 'pursue', 'responds': 'respond',
+    'secures': 'secure', 'seeks': 'seek', 'shows': 'show', 'starts': 'start',
+    'strengthens': 'strengthen', 'tells': 'tell', 'thinks': 'think', 'thrives': 'thrive',
+    'treats': 'treat', 'tries': 'try', 'values': 'value', 'wants': 'want', 'weighs': 'weigh',
+    'works': 'work'
+}
+BASE_VERBS = set(SECOND_PERSON_VERBS.values())
+# Descriptions only use them/their for the person described
+SECOND_PERSON_PRONOUNS = {'them': 'you', 'their': 'your', 'themselves': 'yourself'}
+# Descriptions opening with a participle need a verb ("driven by" -> "are driven by")
+PARTICIPLE_OPENERS = {'driven', 'motivated'}
+
+
+def _is_verb_slot(words: list, i: int) -> bool:
+    """The description's own verbs: the opening word, or one after and/then/than or a comma
+
+    Adverbs in between are skipped ("carefully weighs", "then gradually expands"), other
+    words are left alone, so "frameworks" or "how society thinks" are never rewritten.
+    """
+    j = i - 1
+    while j >= 0 and words[j].endswith('ly'):
+        j -= 1
+    return j < 0 or words[j] in ('and', 'then', 'than') or words[j].endswith(',')
+
+
+def second_person(description: str) -> str:
+    """Rewrite a third-person trait description so it reads after 'You'"""
+    words = description.split(' ')
+    converted = []
+    for i, word in enumerate(words):
+        core = word.rstrip(',.;')
+        if _is_verb_slot(words, i) and core in SECOND_PERSON_VERBS:
+            word = SECOND_PERSON_VERBS[core] + word[len(core):]
+        elif core in SECOND_PERSON_PRONOUNS:
+            word = SECOND_PERSON_PRONOUNS[core] + word[len(core):]
+        converted.append(word)
+    if converted and converted[0] in PARTICIPLE_OPENERS:
+        converted.insert(0, 'are')
+    return ' '.join(converted)
+
+
+def short_label(name: str) -> str:
+    """Display label for a dimension or value key ("time_horizon" -> "Time Horizon")"""
+    return name.replace('_', ' ').title()
+
+
+# dimension -> value -> {"third", "second", "label"}
+TRAIT_PHRASES = {
+    dim: {
+        value: {"third": desc, "second": second_person(desc), "label": short_label(value)}
+        for value, desc in values.items()
+    }
+    for dim, values in TRAIT_DESCRIPTIONS.items()
+}
+DIMENSION_LABELS = {dim: short_label(dim) for dim in TRAIT_DESCRIPTIONS}
+
+
+def trait_phrase(dimension: str, value: str, form: str = "third", default: str = "") -> str:
+    """One form of a trait value's phrase, or default for unknown dimensions/values"""
+    return TRAIT_PHRASES.get(dimension, {}).get(value, {}).get(form, default)
+
+
+def dimension_label(dimension: str) -> str:
+    return DIMENSION_LABELS.get(dimension) or short_label(dimension)
+
+
+def archetype_style(archetype: str, field: str) -> str:
+    return ARCHETYPE_STYLES.get(archetype, DEFAULT_STYLE).format(field=field)
+
+
+def archetype_moment(archetype: str, field: str) -> str:
+    return ARCHETYPE_MOMENTS.get(archetype, DEFAULT_MOMENT).format(field=field)
+
+
+def check_phrase_table(dimensions: dict) -> list:
+    """Problems with the phrase table for the quiz's {dimension: [values]} (empty if none)"""
+    problems = []
+    for dim, values in dimensions.items():
+        if dim not in DIMENSION_LABELS:
+            problems.append(f"{dim}: no dimension label")
+        for value in values:
+            phrase = TRAIT_PHRASES.get(dim, {}).get(value)
+            if phrase is None:
+                problems.append(f"{dim}/{value}: no phrase")
+                continue
+            for form in ("third", "second", "label"):
+                if not phrase[form].strip():
+                    problems.append(f"{dim}/{value}: empty {form} form")
+            # A verb missing from SECOND_PERSON_VERBS stays in third person ("You designs ...")
+            words = phrase["second"].split(' ')
+            for i, word in enumerate(words):
+                core = word.rstrip(',.;')
+                if _is_verb_slot(words, i) and core.endswith('s') and core not in BASE_VERBS:
+                    problems.append(f"{dim}/{value}: third-person '{core}' in \"You {phrase['second']}\"")
+    return problems
+
+
+if __name__ == "__main__":
+    from questions_v3_simplified import TRAIT_DIMENSIONS
+
+    for dim, values in TRAIT_PHRASES.items():
+        for value, phrase in values.items():
+            print(f"{dim}/{value}: You {phrase['second']}")
+    problems = check_phrase_table(TRAIT_DIMENSIONS)
+    print("\n".join(problems) or "Phrase table OK")
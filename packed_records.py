@@ -0,0 +1,82 @@
+"""
+Packed Records - read-only rows kept as one bytes blob plus an offset array
+A list of dicts is thousands of objects whose refcounts change every time a
+request reads them, so a forked worker ends up copying every page they sit
+on. Packed, the whole table is two objects; reading a row decodes a fresh
+dict and leaves the shared pages untouched
+"""
+
+import json
+from array import array
+from collections.abc import Sequence
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+# How rows are serialized - a blob written with one encoding cannot be read with the other
+ENCODING = "msgpack" if MSGPACK_AVAILABLE else "json"
+
+
+def _pack(row) -> bytes:
+    if MSGPACK_AVAILABLE:
+        return msgpack.packb(row)
+    return json.dumps(row, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _unpack(data):
+    if MSGPACK_AVAILABLE:
+        return msgpack.unpackb(data)
+    return json.loads(bytes(data))
+
+
+class PackedRecords(Sequence):
+    """
+    Immutable sequence of JSON-compatible rows (dicts, lists, None ...)
+
+    records[i] decodes row i into a new object on every access - callers may
+    modify what they get back, the table itself never changes.
+    """
+
+    __slots__ = ("_blob", "_offsets")
+
+    def __init__(self, rows=()):
+        blob = bytearray()
+        offsets = array('Q', [0])
+        for row in rows:
+            blob += _pack(row)
+            offsets.append(len(blob))
+        self._blob = bytes(blob)
+        self._offsets = offsets
+
+    @classmethod
+    def from_buffers(cls, blob, offsets) -> "PackedRecords":
+        """Records over an existing blob (bytes, or a memoryview of a mapped file) and its row offsets"""
+        records = cls.__new__(cls)
+        records._blob = blob
+        records._offsets = array('Q', offsets)
+        return records
+
+    def buffers(self) -> tuple:
+        """(blob, offsets) - what from_buffers takes back"""
+        return bytes(self._blob), self._offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("record index out of range")
+        return _unpack(self._blob[self._offsets[index]:self._offsets[index + 1]])
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the blob and the offsets"""
+        return len(self._blob) + self._offsets.itemsize * len(self._offsets)
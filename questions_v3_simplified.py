@@ -190,6 +190,58 @@ TRAIT_DIMENSIONS = {
     "failure": ["analytical", "persistent", "serendipitous", "pragmatic"]
 }
 
+# Quiz domains - shared by the web app (domain picker) and the matching engine
+# ("fields" are the scientist fields each domain draws its candidates from)
+DOMAINS = {
+    "cosmos": {
+        "name": "The Cosmos",
+        "description": "Physics, Astrophysics, Space Science",
+        "icon": "stars",
+        "fields": ["Physics", "Space Science", "Astrophysics", "Astronomy", "Aerospace"]
+    },
+    "quantum": {
+        "name": "Quantum & Math",
+        "description": "Physics, Mathematics, Computer Science",
+        "icon": "atom",
+        "fields": ["Physics", "Mathematics", "Computer Science"]
+    },
+    "chemistry": {
+        "name": "Chemistry",
+        "description": "Chemical Science, Material Science, Organic & Inorganic Chemistry",
+        "icon": "flask",
+        "fields": ["Chemistry", "Material Science", "Biochemistry"]
+    },
+    "life": {
+        "name": "Life Sciences",
+        "description": "Biology, Medicine, Genetics",
+        "icon": "dna",
+        "fields": ["Biology", "Medicine", "Neuroscience", "Genetics"]
+    },
+    "earth": {
+        "name": "Earth & Environment",
+        "description": "Ecology, Agriculture, Environmental Science",
+        "icon": "leaf",
+        "fields": ["Environmental Science", "Agriculture", "Ecology", "Earth Science"]
+    },
+    "engineering": {
+        "name": "Engineering & Tech",
+        "description": "Engineering, Technology, Innovation",
+        "icon": "cog",
+        "fields": ["Engineering", "Technology", "Computer Science", "Aerospace"]
+    }
+}
+
+# Spelling variants of scientist fields, keyed by normalized name
+FIELD_ALIASES = {
+    "space sciences": "space science",
+    "aerospace engineering": "aerospace",
+    "astronomy and astrophysics": "astrophysics",
+    "materials science": "material science",
+    "computer sciences": "computer science",
+    "earth sciences": "earth science",
+    "environmental sciences": "environmental science"
+}
+
 def get_questions():
     """Return formatted questions for the quiz"""
     return [{
@@ -213,3 +265,28 @@ def build_user_profile(answers: list) -> dict:
         dimension, value = map_answer_to_trait(q_id, answer)
         profile[dimension] = value
     return profile
+
+def normalize_field(field: str) -> str:
+    """Normalize a scientist field name for domain lookup (case, spacing, variants)"""
+    key = " ".join((field or "").replace("&", "and").split()).lower()
+    return FIELD_ALIASES.get(key, key)
+
+# Answer codes for packing a complete profile into one int (2 bits per dimension)
+PROFILE_CODES = {dim: {value: i for i, value in enumerate(values)} for dim, values in TRAIT_DIMENSIONS.items()}
+DOMAIN_CODES = {domain: i for i, domain in enumerate(DOMAINS, 1)}  # 0 = no domain
+
+def pack_profile(profile: dict, domain: str = None):
+    """Pack a complete quiz profile (and domain) into one int, None if it isn't one
+
+    Bits 0-23 hold the 12 answers (2 bits each, TRAIT_DIMENSIONS order), the
+    domain code sits above them. Partial or off-quiz profiles can't be packed.
+    """
+    if len(profile) != len(PROFILE_CODES) or (domain is not None and domain not in DOMAIN_CODES):
+        return None
+    packed = DOMAIN_CODES.get(domain, 0)
+    for dim, codes in PROFILE_CODES.items():
+        code = codes.get(profile.get(dim))
+        if code is None:
+            return None
+        packed = (packed << 2) | code
+    return packed
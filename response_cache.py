@@ -0,0 +1,256 @@
+"""
+Response Cache - per-key TTL cache of rendered bodies with request coalescing
+Concurrent misses for a key share one render (single-flight), expired
+entries keep being served while one background refresh runs
+(stale-while-revalidate), and bodies are stored pre-serialized and
+pre-gzipped with an ETag, so hits cost a dict lookup. With a SharedState
+behind it, workers reuse each other's renders and take turns rendering
+"""
+
+import base64
+import gzip
+import hashlib
+import json
+import threading
+import time
+from typing import Callable
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+# Bodies smaller than this are not worth a gzip header (same floor as flask-compress)
+GZIP_MIN_SIZE = 500
+
+
+class CachedBody:
+    """
+    A rendered response body with its gzip variant, ETag and Last-Modified time
+    """
+
+    __slots__ = ("body", "gzipped", "content_type", "etag", "last_modified", "rendered_at")
+    # Fields JSON carries as base64 when msgpack is not installed
+    BINARY = ("body", "gzipped")
+
+    def __init__(self, body: bytes, content_type: str):
+        self.body = body
+        self.content_type = content_type
+        self.etag = hashlib.sha256(body).hexdigest()[:16]
+        self.last_modified = self.rendered_at = time.time()
+        # mtime=0 keeps the compressed bytes identical for identical bodies
+        gzipped = gzip.compress(body, compresslevel=6, mtime=0) if len(body) >= GZIP_MIN_SIZE else None
+        self.gzipped = gzipped if gzipped is not None and len(gzipped) < len(body) else None
+
+    def pack(self) -> bytes:
+        values = [getattr(self, name) for name in self.__slots__]
+        if MSGPACK_AVAILABLE:
+            return msgpack.packb(values)
+        return json.dumps([base64.b64encode(value).decode('ascii') if name in self.BINARY and value is not None
+                           else value for name, value in zip(self.__slots__, values)]).encode('utf-8')
+
+    @classmethod
+    def unpack(cls, packed: bytes) -> "CachedBody":
+        """Rebuild a body another worker rendered (no re-hashing or re-compressing)"""
+        values = msgpack.unpackb(packed) if MSGPACK_AVAILABLE else json.loads(packed)
+        entry = cls.__new__(cls)
+        for name, value in zip(cls.__slots__, values):
+            if name in cls.BINARY and isinstance(value, str):
+                value = base64.b64decode(value)
+            setattr(entry, name, value)
+        return entry
+
+
+class _Flight:
+    """One render in progress - requests for the same key wait on it instead of rendering again"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ResponseCache:
+    """
+    Fixed set of keys (one per endpoint), each fresh for ttl seconds and
+    then served stale for up to stale more seconds while it refreshes
+
+    render() returns a CachedBody to store, or anything else (an error
+    response) to hand to the waiting requests without storing it. A failed
+    refresh keeps the stale entry, so a Supabase outage shows slightly old
+    numbers instead of errors until the stale window runs out.
+
+    With shared (a SharedState), a worker first looks for a fresh body
+    another worker stored, and only the worker holding the key's lease
+    renders; the rest wait up to lease seconds for its body.
+    """
+
+    def __init__(self, enabled: bool = True, clock: Callable[[], float] = time.monotonic, shared=None,
+                 lease: float = 10.0):
+        self.enabled = enabled
+        self.clock = clock
+        self.shared = shared
+        self.lease = lease
+        self._entries = {}  # key -> (fresh until, stale until, CachedBody)
+        self._flights = {}  # key -> _Flight
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.renders = 0
+        self.failed_renders = 0
+        self.shared_hits = 0
+
+    def get(self, key: str, render: Callable, ttl: float, stale: float = 0.0):
+        """Cached body for key, rendering it at most once at a time however many requests ask"""
+        if not self.enabled:
+            return render()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            now = self.clock()
+            if entry is not None and now < entry[0]:
+                self.hits += 1
+                return entry[2]
+            if entry is not None and now < entry[1]:
+                self.stale_hits += 1
+                refresh = None
+                if key not in self._flights:
+                    refresh = self._flights[key] = _Flight()
+            else:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+                    self.misses += 1
+                else:
+                    self.coalesced += 1
+                entry = None
+
+        if entry is not None:
+            if refresh is not None:
+                threading.Thread(target=self._fill, args=(key, render, ttl, stale, refresh),
+                                 name=f"cache-refresh-{key}", daemon=True).start()
+            return entry[2]
+
+        if leader:
+            self._fill(key, render, ttl, stale, flight)
+        else:
+            flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def _fill(self, key: str, render: Callable, ttl: float, stale: float, flight: _Flight):
+        """Run render once for key and publish the outcome to everyone waiting on the flight"""
+        result, error = None, None
+        try:
+            result = self._render_shared(key, render, ttl, stale) if self.shared is not None else render()
+        except Exception as e:
+            error = e
+            print(f"[Cache] Rendering {key} failed: {e}")
+
+        with self._lock:
+            self.renders += 1
+            if isinstance(result, CachedBody):
+                previous = self._entries.get(key)
+                if previous is not None and previous[2].etag == result.etag:
+                    # Same bytes as before - Last-Modified stays put, rendered_at moves on
+                    result.last_modified = previous[2].last_modified
+                # A body from another worker is only fresh for what is left of its TTL
+                now = self.clock() - max(time.time() - result.rendered_at, 0.0)
+                self._entries[key] = (now + ttl, now + ttl + stale, result)
+            else:
+                self.failed_renders += 1
+            del self._flights[key]
+        flight.result, flight.error = result, error
+        flight.done.set()
+
+    def _render_shared(self, key: str, render: Callable, ttl: float, stale: float):
+        """A fresh body from shared state, else render under the key's cross-worker lease"""
+        def fresh():
+            try:
+                packed = self.shared.get(f"response:{key}")
+            except Exception as e:
+                print(f"[Cache] Shared state read failed: {e}")
+                return None
+            if packed is not None:
+                try:
+                    entry = CachedBody.unpack(packed)
+                except (ValueError, TypeError) as e:
+                    # Written by a worker with the other encoding - render over it
+                    print(f"[Cache] Unreadable shared body for {key}: {e}")
+                    return None
+                if time.time() - entry.rendered_at < ttl:
+                    self.shared_hits += 1
+                    return entry
+            return None
+
+        entry = fresh()
+        if entry is not None:
+            return entry
+
+        def claim():
+            try:
+                return self.shared.add(f"response-lease:{key}", b"1", self.lease)
+            except Exception as e:
+                print(f"[Cache] Shared state lease failed: {e}")
+                return True
+
+        leader = claim()
+        deadline = time.time() + self.lease
+        while not leader and time.time() < deadline:
+            # Another worker is rendering this key - use its body when it lands,
+            # or take over if it gives the lease back without one
+            time.sleep(0.05)
+            entry = fresh()
+            if entry is not None:
+                return entry
+            leader = claim()
+
+        try:
+            result = render()
+            if isinstance(result, CachedBody):
+                try:
+                    self.shared.set(f"response:{key}", result.pack(), ttl + stale)
+                except Exception as e:
+                    print(f"[Cache] Shared state write failed: {e}")
+        finally:
+            if leader:
+                try:
+                    self.shared.delete(f"response-lease:{key}")
+                except Exception as e:
+                    print(f"[Cache] Shared state write failed: {e}")
+        return result
+
+    def invalidate(self, key: str = None):
+        """Drop one key (or every key) so the next request renders it"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = self.clock()
+            lookups = self.hits + self.stale_hits + self.misses + self.coalesced
+            return {
+                "enabled": self.enabled,
+                "keys": {key: {"fresh_for": round(max(fresh - now, 0.0), 1),
+                               "etag": body.etag,
+                               "bytes": len(body.body),
+                               "gzip_bytes": len(body.gzipped) if body.gzipped is not None else None}
+                         for key, (fresh, _, body) in self._entries.items()},
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "renders": self.renders,
+                "failed_renders": self.failed_renders,
+                "shared_hits": self.shared_hits,
+                "hit_rate": round((self.hits + self.stale_hits + self.coalesced) / lookups, 4) if lookups else 0.0
+            }
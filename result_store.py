@@ -0,0 +1,152 @@
+"""
+Result Store - server-side storage for finished quiz results
+The session cookie only carries an opaque result id, the payload lives here.
+MemoryResultStore suits a single process, SQLiteResultStore shares results
+between workers on one host. A remote KV plugs in by subclassing ResultStore
+(put/get/delete with a TTL)
+"""
+
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Results back the "Back to results" page - a week matches the client-side history
+DEFAULT_TTL = 7 * 24 * 3600
+
+
+class ResultStore:
+    """
+    Interface for result storage: JSON-serializable dicts keyed by opaque ids
+
+    Implementations handle expiry themselves; get() returns None for unknown
+    or expired ids.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL):
+        self.ttl = ttl
+
+    def save(self, result: dict) -> str:
+        """Store a result under a new unguessable id and return the id"""
+        result_id = secrets.token_urlsafe(16)
+        self.put(result_id, result)
+        return result_id
+
+    def put(self, result_id: str, result: dict):
+        raise NotImplementedError
+
+    def get(self, result_id: str):
+        raise NotImplementedError
+
+    def delete(self, result_id: str):
+        raise NotImplementedError
+
+
+class MemoryResultStore(ResultStore):
+    """
+    In-process TTL + LRU store (results are lost on restart and not shared between workers)
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL, maxsize: int = 10000):
+        super().__init__(ttl)
+        self.maxsize = maxsize
+        self._data = OrderedDict()  # id -> (expires_at, result)
+        self._lock = threading.Lock()
+
+    def put(self, result_id: str, result: dict):
+        with self._lock:
+            self._data[result_id] = (time.time() + self.ttl, result)
+            self._data.move_to_end(result_id)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get(self, result_id: str):
+        with self._lock:
+            entry = self._data.get(result_id)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                del self._data[result_id]
+                return None
+            self._data.move_to_end(result_id)
+            return entry[1]
+
+    def delete(self, result_id: str):
+        with self._lock:
+            self._data.pop(result_id, None)
+
+
+class SQLiteResultStore(ResultStore):
+    """
+    SQLite-backed store shared by every worker process on the host
+    """
+
+    # Expired rows are swept every this many writes
+    PURGE_EVERY = 500
+
+    def __init__(self, path: str, ttl: float = DEFAULT_TTL):
+        super().__init__(ttl)
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        # A forked worker (gunicorn --preload) must open its own connections
+        os.register_at_fork(after_in_child=self._forget_connections)
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS quiz_results_cache ("
+                         "id TEXT PRIMARY KEY, payload TEXT NOT NULL, expires_at REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS quiz_results_cache_expires ON quiz_results_cache (expires_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        """One connection per thread (sqlite3 connections are not shareable across threads)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            # WAL lets readers in other workers proceed while one writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _forget_connections(self):
+        self._local = threading.local()
+
+    def put(self, result_id: str, result: dict):
+        conn = self._connect()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO quiz_results_cache (id, payload, expires_at) VALUES (?, ?, ?)",
+                         (result_id, json.dumps(result), time.time() + self.ttl))
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            self.purge_expired()
+
+    def get(self, result_id: str):
+        row = self._connect().execute("SELECT payload FROM quiz_results_cache WHERE id = ? AND expires_at >= ?",
+                                      (result_id, time.time())).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete(self, result_id: str):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM quiz_results_cache WHERE id = ?", (result_id,))
+
+    def purge_expired(self) -> int:
+        conn = self._connect()
+        with conn:
+            return conn.execute("DELETE FROM quiz_results_cache WHERE expires_at < ?", (time.time(),)).rowcount
+
+
+def create_result_store(url: str = None) -> ResultStore:
+    """Store from a URL: "memory" (default) or "sqlite:///path/to/results.db"
+
+    Defaults to the RESULT_STORE_URL environment variable.
+    """
+    url = url if url is not None else os.getenv("RESULT_STORE_URL", "memory")
+    ttl = float(os.getenv("RESULT_STORE_TTL", DEFAULT_TTL))
+    if url.startswith("sqlite:///"):
+        return SQLiteResultStore(url[len("sqlite:///"):], ttl)
+    if url in ("", "memory"):
+        return MemoryResultStore(ttl)
+    raise ValueError(f"Unsupported RESULT_STORE_URL: {url}")
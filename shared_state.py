@@ -0,0 +1,236 @@
+"""
+Shared State - small values and counters every worker and instance agrees on
+Rate counters and cached responses kept here are seen by all gunicorn
+workers (SQLiteSharedState, one host) or all instances (RestKVSharedState,
+Redis commands over HTTPS as Upstash / Vercel KV speak them). Per-process
+MemorySharedState is the single-worker default
+"""
+
+import base64
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+
+class SharedState:
+    """
+    Interface for shared state: bytes values with a TTL, plus window counters
+
+    add() is set-if-absent (a lease other workers respect until it expires),
+    incr() counts within a fixed window that starts at the first increment.
+    """
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: float):
+        raise NotImplementedError
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        """Store value only if key is absent or expired - True if this call stored it"""
+        raise NotImplementedError
+
+    def incr(self, key: str, ttl: float) -> int:
+        """Increment and return the counter, which resets ttl seconds after it started"""
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+
+class MemorySharedState(SharedState):
+    """
+    In-process state (only shared by the threads of one worker)
+    """
+
+    def __init__(self):
+        self._data = {}  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def _live(self, key: str, now: float):
+        entry = self._data.get(key)
+        if entry is not None and entry[0] < now:
+            del self._data[key]
+            return None
+        return entry
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._live(key, time.time())
+            return entry[1] if entry is not None else None
+
+    def set(self, key: str, value: bytes, ttl: float):
+        with self._lock:
+            self._data[key] = (time.time() + ttl, value)
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        with self._lock:
+            now = time.time()
+            if self._live(key, now) is not None:
+                return False
+            self._data[key] = (now + ttl, value)
+            return True
+
+    def incr(self, key: str, ttl: float) -> int:
+        with self._lock:
+            now = time.time()
+            entry = self._live(key, now)
+            count = (entry[1] if entry is not None else 0) + 1
+            self._data[key] = (entry[0] if entry is not None else now + ttl, count)
+            return count
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class SQLiteSharedState(SharedState):
+    """
+    SQLite file shared by every worker process on the host
+    """
+
+    # Expired rows are swept every this many writes
+    PURGE_EVERY = 500
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        # A forked worker (gunicorn --preload) must open its own connections
+        os.register_at_fork(after_in_child=self._forget_connections)
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS shared_state ("
+                         "key TEXT PRIMARY KEY, value BLOB, expires_at REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS shared_state_expires ON shared_state (expires_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        """One connection per thread (sqlite3 connections are not shareable across threads)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5)
+            # WAL lets readers in other workers proceed while one writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _forget_connections(self):
+        self._local = threading.local()
+
+    def _wrote(self):
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM shared_state WHERE expires_at < ?", (time.time(),))
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = self._connect().execute("SELECT value FROM shared_state WHERE key = ? AND expires_at >= ?",
+                                      (key, time.time())).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: bytes, ttl: float):
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO shared_state (key, value, expires_at) VALUES (?, ?, ?)",
+                         (key, value, time.time() + ttl))
+        self._wrote()
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        now = time.time()
+        with self._connect() as conn:
+            # Inserts, or takes over an expired row - a live row stays and nothing changes
+            changed = conn.execute("""
+                INSERT INTO shared_state (key, value, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at
+                WHERE shared_state.expires_at < ?""", (key, value, now + ttl, now)).rowcount
+        self._wrote()
+        return changed == 1
+
+    def incr(self, key: str, ttl: float) -> int:
+        now = time.time()
+        with self._connect() as conn:
+            count = conn.execute("""
+                INSERT INTO shared_state (key, value, expires_at) VALUES (?, 1, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    value = CASE WHEN shared_state.expires_at < ? THEN 1 ELSE shared_state.value + 1 END,
+                    expires_at = CASE WHEN shared_state.expires_at < ? THEN excluded.expires_at
+                                      ELSE shared_state.expires_at END
+                RETURNING value""", (key, now + ttl, now, now)).fetchone()[0]
+        self._wrote()
+        return count
+
+    def delete(self, key: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM shared_state WHERE key = ?", (key,))
+
+
+class RestKVSharedState(SharedState):
+    """
+    Redis commands over HTTPS (Upstash / Vercel KV REST API) - shared by every instance
+
+    Values travel base64-encoded, since the REST API returns strings.
+    """
+
+    def __init__(self, url: str, token: str, timeout: float = 2.0):
+        if not HTTPX_AVAILABLE:
+            raise RuntimeError("httpx is required for a REST KV shared state (pip install httpx)")
+        self.url = url.rstrip("/")
+        self._http = httpx.Client(headers={"Authorization": f"Bearer {token}"}, timeout=timeout)
+        # Pooled connections belong to the process that opened them
+        os.register_at_fork(after_in_child=self._reopen)
+
+    def _reopen(self):
+        self._http = httpx.Client(headers=self._http.headers, timeout=self._http.timeout)
+
+    def _command(self, *args):
+        response = self._http.post(self.url, json=[str(a) for a in args])
+        body = response.json()
+        if response.status_code != 200 or "error" in body:
+            raise RuntimeError(f"KV {args[0]} failed: {body.get('error', response.status_code)}")
+        return body["result"]
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self._command("GET", key)
+        return base64.b64decode(value) if value is not None else None
+
+    def set(self, key: str, value: bytes, ttl: float):
+        self._command("SET", key, base64.b64encode(value).decode(), "PX", int(ttl * 1000))
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        return self._command("SET", key, base64.b64encode(value).decode(), "PX", int(ttl * 1000), "NX") == "OK"
+
+    def incr(self, key: str, ttl: float) -> int:
+        count = int(self._command("INCR", key))
+        if count == 1:
+            # First hit opens the window
+            self._command("PEXPIRE", key, int(ttl * 1000))
+        return count
+
+    def delete(self, key: str):
+        self._command("DEL", key)
+
+
+def create_shared_state(url: str = None) -> SharedState:
+    """State from a URL: "memory" (default), "sqlite:///path/to/state.db" or https://<kv-rest-url>
+
+    Defaults to the SHARED_STATE_URL environment variable; the REST KV token
+    comes from SHARED_STATE_TOKEN.
+    """
+    url = url if url is not None else os.getenv("SHARED_STATE_URL", "memory")
+    if url.startswith("sqlite:///"):
+        return SQLiteSharedState(url[len("sqlite:///"):])
+    if url.startswith(("https://", "http://")):
+        token = os.getenv("SHARED_STATE_TOKEN")
+        if not token:
+            raise ValueError("SHARED_STATE_TOKEN is required for a REST KV SHARED_STATE_URL")
+        return RestKVSharedState(url, token)
+    if url in ("", "memory"):
+        return MemorySharedState()
+    raise ValueError(f"Unsupported SHARED_STATE_URL: {url}")
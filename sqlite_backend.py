@@ -0,0 +1,586 @@
+"""
+SQLite Backend - StorageBackend on a local SQLite file (WAL mode)
+Mirrors supabase_schema.sql (tables, indexes and analytics views) so load
+tests, benchmarks and offline event-day deployments need no network,
+including the triggers that keep analytics_counters current on every write.
+Select with STORAGE_BACKEND=sqlite:///path/to/scientist_twin.db
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from storage_backend import StorageBackend, DAY_NAMES, KEYSET_COLUMNS
+
+# Postgres NOW() as an ISO-8601 UTC string, the shape PostgREST returns timestamps in
+NOW = "(strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))"
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS scientists (
+    id TEXT PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL,
+    field TEXT NOT NULL,
+    subfield TEXT,
+    era TEXT,
+    archetype TEXT,
+    summary TEXT,
+    achievements TEXT,
+    working_style TEXT,
+    traits TEXT,            -- JSON
+    moments TEXT,           -- JSON
+    wiki_title TEXT,
+    image_url TEXT,
+    embedding TEXT,         -- JSON array (384 floats)
+    created_at TEXT DEFAULT {NOW}
+);
+
+CREATE TABLE IF NOT EXISTS quiz_sessions (
+    id TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    domain TEXT,
+    user_profile TEXT,      -- JSON
+    started_at TEXT DEFAULT {NOW},
+    completed_at TEXT,
+    ip_hash TEXT
+);
+
+CREATE TABLE IF NOT EXISTS quiz_results (
+    id TEXT PRIMARY KEY,
+    session_id TEXT REFERENCES quiz_sessions(id),
+    scientist_name TEXT NOT NULL,
+    scientist_id TEXT REFERENCES scientists(id),
+    scientist_field TEXT,
+    scientist_era TEXT,
+    scientist_image TEXT,
+    match_score REAL,
+    match_quality TEXT,
+    rank INTEGER,
+    created_at TEXT DEFAULT {NOW}
+);
+
+CREATE TABLE IF NOT EXISTS likes (
+    id TEXT PRIMARY KEY,
+    session_id TEXT REFERENCES quiz_sessions(id),
+    scientist_name TEXT NOT NULL,
+    created_at TEXT DEFAULT {NOW}
+);
+
+CREATE TABLE IF NOT EXISTS shares (
+    id TEXT PRIMARY KEY,
+    session_id TEXT REFERENCES quiz_sessions(id),
+    scientist_name TEXT NOT NULL,
+    platform TEXT,
+    created_at TEXT DEFAULT {NOW}
+);
+
+CREATE INDEX IF NOT EXISTS idx_quiz_sessions_completed ON quiz_sessions(completed_at) WHERE completed_at IS NOT NULL;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_quiz_sessions_session_id ON quiz_sessions(session_id);
+CREATE INDEX IF NOT EXISTS idx_quiz_results_scientist ON quiz_results(scientist_name);
+CREATE INDEX IF NOT EXISTS idx_quiz_results_created ON quiz_results(created_at);
+CREATE INDEX IF NOT EXISTS idx_quiz_results_session ON quiz_results(session_id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_quiz_results_session_rank ON quiz_results(session_id, rank);
+CREATE INDEX IF NOT EXISTS idx_quiz_results_rank_created ON quiz_results(rank, created_at);
+CREATE INDEX IF NOT EXISTS idx_likes_scientist ON likes(scientist_name);
+CREATE INDEX IF NOT EXISTS idx_quiz_sessions_keyset ON quiz_sessions(completed_at, id) WHERE completed_at IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_quiz_results_keyset ON quiz_results(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_likes_keyset ON likes(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_shares_keyset ON shares(created_at, id);
+
+CREATE VIEW IF NOT EXISTS hall_of_fame AS
+SELECT
+    scientist_name,
+    COUNT(*) AS match_count,
+    ROUND(AVG(match_score) * 100) AS avg_match_percent,
+    COUNT(*) FILTER (WHERE rank = 1) AS primary_matches
+FROM quiz_results
+GROUP BY scientist_name
+ORDER BY match_count DESC
+LIMIT 10;
+
+CREATE VIEW IF NOT EXISTS recent_activity AS
+SELECT
+    qr.scientist_name,
+    qs.session_id,
+    qr.match_quality,
+    qr.created_at
+FROM quiz_results qr
+JOIN quiz_sessions qs ON qr.session_id = qs.id
+WHERE qr.rank = 1
+ORDER BY qr.created_at DESC
+LIMIT 20;
+
+CREATE VIEW IF NOT EXISTS trait_distribution AS
+SELECT
+    traits.key AS trait_key,
+    traits.value AS trait_value,
+    COUNT(*) AS count,
+    ROUND(COUNT(*) * 100.0 / SUM(COUNT(*)) OVER (PARTITION BY traits.key), 1) AS percentage
+FROM quiz_sessions, json_each(quiz_sessions.user_profile) AS traits
+WHERE completed_at IS NOT NULL
+GROUP BY traits.key, traits.value
+ORDER BY traits.key, count DESC;
+
+CREATE VIEW IF NOT EXISTS popular_domains AS
+SELECT
+    domain,
+    COUNT(*) AS play_count
+FROM quiz_sessions
+WHERE completed_at IS NOT NULL
+GROUP BY domain
+ORDER BY play_count DESC;
+
+CREATE VIEW IF NOT EXISTS overall_stats AS
+SELECT
+    COUNT(*) FILTER (WHERE completed_at IS NOT NULL) AS total_plays,
+    COUNT(DISTINCT session_id) AS unique_sessions,
+    COUNT(*) FILTER (WHERE completed_at IS NOT NULL
+                     AND completed_at > strftime('%Y-%m-%dT%H:%M:%f', 'now', '-1 day')) AS plays_today,
+    (SELECT COUNT(*) FROM likes) AS total_likes,
+    (SELECT COUNT(*) FROM shares) AS total_shares
+FROM quiz_sessions;
+
+"""
+
+# Counter upserts run by the completion triggers (the body of count_quiz_session() in supabase_schema.sql)
+COUNT_COMPLETION = """
+    INSERT INTO analytics_counters (kind, key, count) VALUES ('plays', '', 1)
+        ON CONFLICT (kind, key) DO UPDATE SET count = count + 1;
+    INSERT INTO analytics_counters (kind, key, count) VALUES ('domain', COALESCE(NEW.domain, 'unknown'), 1)
+        ON CONFLICT (kind, key) DO UPDATE SET count = count + 1;
+    INSERT INTO analytics_counters (kind, key, count)
+        SELECT 'trait', t.key || ':' || t.value, 1 FROM json_each(COALESCE(NEW.user_profile, '{}')) AS t WHERE 1
+        ON CONFLICT (kind, key) DO UPDATE SET count = count + 1;
+    INSERT INTO analytics_counters (kind, key, count)
+        SELECT 'activity', CAST(strftime('%H', NEW.started_at) AS INTEGER) || ':' || strftime('%w', NEW.started_at), 1
+        WHERE NEW.started_at IS NOT NULL
+        ON CONFLICT (kind, key) DO UPDATE SET count = count + 1;
+    INSERT INTO analytics_counters (kind, key, count) SELECT 'retakes', 'sessions', 1 WHERE NEW.ip_hash IS NOT NULL
+        ON CONFLICT (kind, key) DO UPDATE SET count = count + 1;
+    INSERT OR IGNORE INTO analytics_seen_ips (ip_hash) SELECT NEW.ip_hash WHERE NEW.ip_hash IS NOT NULL;
+"""
+
+# Running totals kept on write, mirroring the analytics_counters section of supabase_schema.sql
+COUNTERS_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS analytics_counters (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL DEFAULT '',
+    count INTEGER NOT NULL DEFAULT 0,
+    meta TEXT,              -- JSON
+    PRIMARY KEY (kind, key)
+);
+
+CREATE TABLE IF NOT EXISTS analytics_seen_ips (
+    ip_hash TEXT PRIMARY KEY
+);
+
+CREATE TRIGGER IF NOT EXISTS count_started AFTER INSERT ON quiz_sessions
+BEGIN
+    INSERT INTO analytics_counters (kind, key, count) VALUES ('started', '', 1)
+        ON CONFLICT (kind, key) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS count_completed_insert AFTER INSERT ON quiz_sessions
+WHEN NEW.completed_at IS NOT NULL
+BEGIN {COUNT_COMPLETION}
+END;
+
+CREATE TRIGGER IF NOT EXISTS count_completed AFTER UPDATE OF completed_at ON quiz_sessions
+WHEN OLD.completed_at IS NULL AND NEW.completed_at IS NOT NULL
+BEGIN {COUNT_COMPLETION}
+END;
+
+CREATE TRIGGER IF NOT EXISTS count_unique_ip AFTER INSERT ON analytics_seen_ips
+BEGIN
+    INSERT INTO analytics_counters (kind, key, count) VALUES ('retakes', 'unique_ips', 1)
+        ON CONFLICT (kind, key) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS count_quiz_result AFTER INSERT ON quiz_results
+WHEN NEW.rank = 1
+BEGIN
+    INSERT INTO analytics_counters (kind, key, count, meta)
+        VALUES ('scientist', NEW.scientist_name, 1, json_object(
+            'field', NEW.scientist_field, 'era', NEW.scientist_era, 'image_url', NEW.scientist_image))
+        ON CONFLICT (kind, key) DO UPDATE SET count = count + 1, meta = excluded.meta;
+    INSERT INTO analytics_counters (kind, key, count)
+        SELECT 'field', NEW.scientist_field, 1 WHERE COALESCE(NEW.scientist_field, '') != ''
+        ON CONFLICT (kind, key) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS count_likes AFTER INSERT ON likes
+BEGIN
+    INSERT INTO analytics_counters (kind, key, count) VALUES ('likes', '', 1)
+        ON CONFLICT (kind, key) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS count_shares AFTER INSERT ON shares
+BEGIN
+    INSERT INTO analytics_counters (kind, key, count) VALUES ('shares', '', 1)
+        ON CONFLICT (kind, key) DO UPDATE SET count = count + 1;
+END;
+
+CREATE VIEW IF NOT EXISTS analytics_totals AS
+SELECT
+    COALESCE(SUM(count) FILTER (WHERE kind = 'started'), 0) AS started,
+    COALESCE(SUM(count) FILTER (WHERE kind = 'plays'), 0) AS plays,
+    COALESCE(SUM(count) FILTER (WHERE kind = 'likes'), 0) AS likes,
+    COALESCE(SUM(count) FILTER (WHERE kind = 'shares'), 0) AS shares
+FROM analytics_counters
+WHERE kind IN ('started', 'plays', 'likes', 'shares');
+
+CREATE VIEW IF NOT EXISTS analytics_top_matches AS
+SELECT key AS name, json_extract(meta, '$.field') AS field, json_extract(meta, '$.era') AS era,
+       json_extract(meta, '$.image_url') AS image_url,
+       count AS match_count
+FROM analytics_counters
+WHERE kind = 'scientist';
+
+CREATE VIEW IF NOT EXISTS analytics_trait_counts AS
+SELECT substr(key, 1, instr(key, ':') - 1) AS trait_key, substr(key, instr(key, ':') + 1) AS trait_value, count
+FROM analytics_counters
+WHERE kind = 'trait';
+
+CREATE VIEW IF NOT EXISTS analytics_domain_counts AS
+SELECT key AS domain, count FROM analytics_counters WHERE kind = 'domain';
+
+CREATE VIEW IF NOT EXISTS analytics_field_counts AS
+SELECT key AS name, count FROM analytics_counters WHERE kind = 'field';
+
+CREATE VIEW IF NOT EXISTS analytics_activity AS
+SELECT CAST(substr(key, 1, instr(key, ':') - 1) AS INTEGER) AS hour,
+       CAST(substr(key, instr(key, ':') + 1) AS INTEGER) AS weekday, count
+FROM analytics_counters
+WHERE kind = 'activity';
+
+CREATE VIEW IF NOT EXISTS analytics_retakes AS
+SELECT
+    COALESCE(SUM(count) FILTER (WHERE key = 'sessions'), 0) AS sessions,
+    COALESCE(SUM(count) FILTER (WHERE key = 'unique_ips'), 0) AS unique_ips
+FROM analytics_counters
+WHERE kind = 'retakes';
+"""
+
+# rebuild_analytics_counters(): every counter recomputed from the raw tables
+REBUILD_COUNTERS = """
+INSERT INTO analytics_counters (kind, key, count, meta)
+SELECT 'started', '', COUNT(*), NULL FROM quiz_sessions
+UNION ALL
+SELECT 'plays', '', COUNT(*), NULL FROM quiz_sessions WHERE completed_at IS NOT NULL
+UNION ALL
+SELECT 'likes', '', COUNT(*), NULL FROM likes
+UNION ALL
+SELECT 'shares', '', COUNT(*), NULL FROM shares
+UNION ALL
+SELECT 'domain', COALESCE(domain, 'unknown'), COUNT(*), NULL
+FROM quiz_sessions WHERE completed_at IS NOT NULL GROUP BY 2
+UNION ALL
+SELECT 'trait', t.key || ':' || t.value, COUNT(*), NULL
+FROM quiz_sessions, json_each(quiz_sessions.user_profile) AS t
+WHERE completed_at IS NOT NULL GROUP BY 2
+UNION ALL
+SELECT 'activity', CAST(strftime('%H', started_at) AS INTEGER) || ':' || strftime('%w', started_at), COUNT(*), NULL
+FROM quiz_sessions WHERE completed_at IS NOT NULL AND started_at IS NOT NULL GROUP BY 2
+UNION ALL
+SELECT 'retakes', 'sessions', COUNT(*), NULL
+FROM quiz_sessions WHERE completed_at IS NOT NULL AND ip_hash IS NOT NULL
+UNION ALL
+SELECT 'retakes', 'unique_ips', COUNT(*), NULL FROM analytics_seen_ips
+UNION ALL
+SELECT 'scientist', scientist_name, match_count, json_object('field', scientist_field, 'era', scientist_era,
+                                                            'image_url', scientist_image)
+FROM (
+    SELECT scientist_name, scientist_field, scientist_era, scientist_image,
+           COUNT(*) OVER (PARTITION BY scientist_name) AS match_count,
+           ROW_NUMBER() OVER (PARTITION BY scientist_name ORDER BY created_at DESC) AS newest
+    FROM quiz_results WHERE rank = 1
+)
+WHERE newest = 1
+UNION ALL
+SELECT 'field', scientist_field, COUNT(*), NULL
+FROM quiz_results WHERE rank = 1 AND COALESCE(scientist_field, '') != '' GROUP BY scientist_field
+"""
+
+# Columns a write may set per table (anything else in a row is ignored, like unknown JSON keys)
+COLUMNS = {
+    "quiz_sessions": ("id", "session_id", "domain", "user_profile", "started_at", "completed_at", "ip_hash"),
+    "quiz_results": ("id", "session_id", "scientist_name", "scientist_id", "scientist_field", "scientist_era",
+                     "scientist_image", "match_score", "match_quality", "rank"),
+    "likes": ("id", "session_id", "scientist_name"),
+    "shares": ("id", "session_id", "scientist_name", "platform"),
+    "scientists": ("id", "name", "field", "subfield", "era", "archetype", "summary", "achievements",
+                   "working_style", "traits", "moments", "wiki_title", "image_url", "embedding"),
+}
+JSON_COLUMNS = {"user_profile", "traits", "moments", "embedding"}
+
+
+def _new_id() -> str:
+    return str(uuid.uuid4())
+
+
+def _encode(column: str, value):
+    return json.dumps(value) if column in JSON_COLUMNS and value is not None else value
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    Whole Supabase schema in one SQLite file shared by every worker on the host
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        # A forked worker (gunicorn --preload) must open its own connections
+        os.register_at_fork(after_in_child=self._forget_connections)
+        conn = self._connect()
+        conn.executescript(SCHEMA + COUNTERS_SCHEMA)
+        # Backfill once for files written before the counter triggers existed
+        if not conn.execute("SELECT 1 FROM analytics_counters LIMIT 1").fetchone() \
+                and conn.execute("SELECT 1 FROM quiz_sessions LIMIT 1").fetchone():
+            self.rebuild_analytics_counters()
+
+    def _connect(self) -> sqlite3.Connection:
+        """One connection per thread (sqlite3 connections are not shareable across threads)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            # WAL lets the dashboard read while quiz writes land
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _forget_connections(self):
+        self._local = threading.local()
+
+    def _query(self, sql: str, params=()) -> List[Dict]:
+        return [dict(row) for row in self._connect().execute(sql, params)]
+
+    def _scalar(self, sql: str, params=()):
+        return self._connect().execute(sql, params).fetchone()[0]
+
+    def _insert(self, conn, table: str, rows: List[Dict], ignore_duplicates: bool = False):
+        allowed = COLUMNS[table]
+        for row in rows:
+            row = {k: v for k, v in row.items() if k in allowed}
+            row.setdefault("id", _new_id())
+            columns = list(row)
+            conn.execute(f"INSERT {'OR IGNORE ' if ignore_duplicates else ''}INTO {table} ({', '.join(columns)}) "
+                         f"VALUES ({', '.join('?' * len(columns))})",
+                         [_encode(c, row[c]) for c in columns])
+
+    def _update(self, conn, table: str, row_id: str, values: Dict):
+        values = {k: v for k, v in values.items() if k in COLUMNS[table] and k != "id"}
+        if values:
+            assignments = ", ".join(f"{c} = ?" for c in values)
+            conn.execute(f"UPDATE {table} SET {assignments} WHERE id = ?",
+                         [_encode(c, v) for c, v in values.items()] + [row_id])
+
+    def _transaction(self):
+        return _Transaction(self._connect())
+
+    def available(self) -> bool:
+        return True
+
+    # ---- writes ----
+
+    def start_quiz(self, session_id: str, domain: str, ip_hash: Optional[str]) -> Optional[str]:
+        with self._transaction() as conn:
+            conn.execute("INSERT INTO quiz_sessions (id, session_id, domain, ip_hash) VALUES (?, ?, ?, ?) "
+                         "ON CONFLICT (session_id) DO NOTHING", (_new_id(), session_id, domain, ip_hash))
+            return conn.execute("SELECT id FROM quiz_sessions WHERE session_id = ?", (session_id,)).fetchone()[0]
+
+    def write(self, op: str, table: str, rows: List[Dict]):
+        if table not in COLUMNS:
+            raise ValueError(f"Unknown table: {table}")
+        with self._transaction() as conn:
+            if op == "insert":
+                self._insert(conn, table, rows)
+            elif op == "update":
+                for row in rows:
+                    self._update(conn, table, row["id"], row["values"])
+            elif op == "finish_quiz":
+                for row in rows:
+                    self._update(conn, "quiz_sessions", row["session_uuid"],
+                                 {"user_profile": row["profile"], "completed_at": row["completed_at"]})
+                    # finish_quiz is safe to repeat, as in supabase_schema.sql
+                    self._insert(conn, "quiz_results",
+                                 [dict(result, session_id=row["session_uuid"]) for result in row["results"]],
+                                 ignore_duplicates=True)
+            else:
+                raise ValueError(f"Unknown write op: {op}")
+
+    # ---- analytics reads ----
+
+    def count_completed(self) -> int:
+        return self._scalar("SELECT plays FROM analytics_totals")
+
+    def count_started(self) -> int:
+        return self._scalar("SELECT started FROM analytics_totals")
+
+    def count_rows(self, table: str) -> int:
+        if table not in ("likes", "shares"):
+            raise ValueError(f"Unknown table: {table}")
+        return self._scalar(f"SELECT {table} FROM analytics_totals")
+
+    def top_scientists(self, limit: int) -> List[Dict]:
+        return self._query("SELECT name, field, era, image_url, match_count FROM analytics_top_matches "
+                           "ORDER BY match_count DESC, name LIMIT ?", (limit,))
+
+    def recent_top_matches(self, limit: int) -> List[Dict]:
+        return self._query("SELECT scientist_name, match_quality, created_at FROM quiz_results "
+                           "WHERE rank = 1 ORDER BY created_at DESC LIMIT ?", (limit,))
+
+    def trait_value_counts(self, sample: int) -> Dict[str, int]:
+        rows = self._query("""
+            SELECT traits.value AS value, COUNT(*) AS n
+            FROM (SELECT user_profile FROM quiz_sessions WHERE completed_at IS NOT NULL
+                  ORDER BY completed_at DESC LIMIT ?) AS s, json_each(s.user_profile) AS traits
+            GROUP BY traits.value""", (sample,))
+        return {row["value"]: row["n"] for row in rows}
+
+    def trait_pair_counts(self, limit: int) -> List[Dict]:
+        return self._query("SELECT trait_key || ':' || trait_value AS trait, count FROM analytics_trait_counts "
+                           "ORDER BY count DESC LIMIT ?", (limit,))
+
+    def domain_counts(self) -> List[Dict]:
+        return self._query("SELECT domain, count FROM analytics_domain_counts ORDER BY count DESC")
+
+    def field_counts(self, limit: int) -> List[Dict]:
+        return self._query("SELECT name, count FROM analytics_field_counts ORDER BY count DESC LIMIT ?", (limit,))
+
+    def retake_counts(self) -> tuple:
+        row = self._connect().execute("SELECT sessions, unique_ips FROM analytics_retakes").fetchone()
+        return (row[0], row[1]) if row else (0, 0)
+
+    def activity_by_time(self) -> tuple:
+        hours, days = {}, {}
+        for row in self._query("SELECT hour, weekday, count FROM analytics_activity"):
+            hours[row["hour"]] = hours.get(row["hour"], 0) + row["count"]
+            day = DAY_NAMES[row["weekday"]]
+            days[day] = days.get(day, 0) + row["count"]
+        return hours, days
+
+    # ---- counters ----
+
+    def totals(self) -> Dict[str, int]:
+        return self._query("SELECT started, plays, likes, shares FROM analytics_totals")[0]
+
+    def rebuild_analytics_counters(self):
+        """Recount every counter from the raw tables (backfill, or repair after manual edits)
+
+        Runs under the write lock, so no completion lands between the scan and the swap.
+        """
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM analytics_seen_ips")
+            conn.execute("INSERT INTO analytics_seen_ips (ip_hash) SELECT DISTINCT ip_hash FROM quiz_sessions "
+                         "WHERE completed_at IS NOT NULL AND ip_hash IS NOT NULL")
+            conn.execute("DELETE FROM analytics_counters")
+            conn.execute(REBUILD_COUNTERS)
+            conn.execute("DELETE FROM analytics_counters WHERE count = 0")  # as if nothing had been bumped
+
+    def recent_sessions(self, limit: int) -> List[Dict]:
+        rows = self._query("SELECT * FROM quiz_sessions WHERE completed_at IS NOT NULL "
+                           "ORDER BY completed_at DESC LIMIT ?", (limit,))
+        for row in rows:
+            row["user_profile"] = json.loads(row["user_profile"]) if row["user_profile"] else None
+        return rows
+
+    def recent_results(self, limit: int) -> List[Dict]:
+        return self._query("SELECT * FROM quiz_results ORDER BY created_at DESC LIMIT ?", (limit,))
+
+    def session_top_match(self, session_uuid: str) -> Optional[Dict]:
+        rows = self._query("SELECT scientist_name, scientist_field, scientist_image, match_score FROM quiz_results "
+                           "WHERE session_id = ? AND rank = 1 LIMIT 1", (session_uuid,))
+        return rows[0] if rows else None
+
+    # ---- keyset pagination ----
+
+    def page(self, table: str, columns: List[str], after: Optional[tuple], limit: int,
+             where: Optional[Dict[str, Any]] = None) -> List[Dict]:
+        key = KEYSET_COLUMNS[table]
+        where = where or {}
+        allowed = set(COLUMNS[table]) | {"created_at", "started_at", "completed_at"}
+        unknown = (set(columns) | set(where)) - allowed
+        if unknown:
+            raise ValueError(f"Unknown columns for {table}: {sorted(unknown)}")
+        conditions, params = [f"{key} IS NOT NULL"], []
+        for column, value in where.items():
+            conditions.append(f"{column} = ?")
+            params.append(value)
+        if after is not None:
+            # Row-value comparison walks the (key, id) index from the cursor
+            conditions.append(f"({key}, id) > (?, ?)")
+            params.extend(after)
+        rows = self._query(f"SELECT {', '.join(columns)} FROM {table} WHERE {' AND '.join(conditions)} "
+                           f"ORDER BY {key}, id LIMIT ?", params + [limit])
+        for column in JSON_COLUMNS & set(columns):
+            for row in rows:
+                if row[column] is not None:
+                    row[column] = json.loads(row[column])
+        return rows
+
+    # ---- scientists ----
+
+    def search_scientists_by_embedding(self, query_embedding: List[float], limit: int,
+                                       threshold: float) -> List[Dict]:
+        """Cosine similarity over every stored embedding (a few hundred rows - no index needed)"""
+        rows = self._query("SELECT id, name, field, embedding FROM scientists WHERE embedding IS NOT NULL")
+        if not rows:
+            return []
+        matrix = np.array([json.loads(row["embedding"]) for row in rows], dtype=np.float32)
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query)
+        similarity = matrix @ query / np.where(norms == 0, 1, norms)
+        order = [i for i in np.argsort(-similarity) if similarity[i] > threshold][:limit]
+        return [{"id": rows[i]["id"], "name": rows[i]["name"], "field": rows[i]["field"],
+                 "similarity": float(similarity[i])} for i in order]
+
+    def get_scientist(self, name: str) -> Optional[Dict]:
+        rows = self._query("SELECT * FROM scientists WHERE name = ?", (name,))
+        if not rows:
+            return None
+        row = rows[0]
+        for column in JSON_COLUMNS & set(row):
+            if row[column] is not None:
+                row[column] = json.loads(row[column])
+        return row
+
+    def upsert_scientist(self, scientist_data: Dict):
+        row = {k: v for k, v in scientist_data.items() if k in COLUMNS["scientists"]}
+        row.setdefault("id", _new_id())
+        columns = list(row)
+        updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c not in ("id", "name"))
+        with self._transaction() as conn:
+            conn.execute(f"INSERT INTO scientists ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+                         f"ON CONFLICT (name) DO " + (f"UPDATE SET {updates}" if updates else "NOTHING"),
+                         [_encode(c, row[c]) for c in columns])
+
+    def update_scientist_embedding(self, name: str, embedding: List[float]):
+        with self._transaction() as conn:
+            conn.execute("UPDATE scientists SET embedding = ? WHERE name = ?", (json.dumps(embedding), name))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "path": self.path}
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK around a block (the connection runs in autocommit mode)"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
@@ -0,0 +1,197 @@
+"""
+Storage Backend - where quiz sessions, results, likes, shares and scientists live
+supabase_client is the public API (breakers, write-behind queue, analytics
+formatting); it talks to one StorageBackend. SupabaseBackend is the hosted
+default, SQLiteBackend runs the same schema fully offline for load tests and
+event-day deployments without reliable internet
+"""
+
+import os
+from typing import Any, Dict, Iterator, List, Optional
+
+# Weekday numbers as Postgres EXTRACT(DOW) and SQLite strftime('%w') return them
+DAY_NAMES = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+
+# Keyset pagination order per table: (column, id). Sessions page by completion, so unfinished ones are skipped.
+KEYSET_COLUMNS = {
+    "quiz_sessions": "completed_at",
+    "quiz_results": "created_at",
+    "likes": "created_at",
+    "shares": "created_at",
+}
+
+# Columns of each exportable table, in export order
+EXPORT_COLUMNS = {
+    "quiz_sessions": ["id", "session_id", "domain", "user_profile", "started_at", "completed_at", "ip_hash"],
+    "quiz_results": ["id", "session_id", "scientist_name", "scientist_field", "scientist_era", "match_score",
+                     "match_quality", "rank", "created_at"],
+    "likes": ["id", "session_id", "scientist_name", "created_at"],
+    "shares": ["id", "session_id", "scientist_name", "platform", "created_at"],
+}
+
+
+class NotDeployedError(Exception):
+    """Raised for a read whose SQL function or view is missing and which has no cheap fallback"""
+
+
+class PartialWriteError(Exception):
+    """Raised by a write applied row by row: the first .written rows landed, then .error stopped it"""
+
+    def __init__(self, written: int, error: Exception):
+        super().__init__(str(error))
+        self.written = written
+        self.error = error
+
+
+class StorageBackend:
+    """
+    Interface for persistence: every method either returns a small result or raises
+
+    Failures are surfaced as exceptions - supabase_client's breakers, retries
+    and fallbacks decide what the caller sees.
+    """
+
+    name = "base"
+
+    def available(self) -> bool:
+        """Whether the backend is configured and can be used at all"""
+        raise NotImplementedError
+
+    # ---- writes ----
+
+    def start_quiz(self, session_id: str, domain: str, ip_hash: Optional[str]) -> Optional[str]:
+        """Create the quiz session for session_id, or return the id of the existing one"""
+        raise NotImplementedError
+
+    def write(self, op: str, table: str, rows: List[Dict]):
+        """One batched write for the write-behind queue
+
+        op is "insert" (rows are column dicts), "update" ({"id", "values"}) or
+        "finish_quiz" ({"session_uuid", "profile", "results", "completed_at"}).
+        A backend that cannot apply a batch atomically raises PartialWriteError,
+        so the rows that landed are not sent again; finish_quiz must be safe
+        to repeat either way.
+        """
+        raise NotImplementedError
+
+    # ---- analytics reads (small results only) ----
+    # Totals and distributions come from counters updated on every write
+    # (analytics_counters), so they cost the same at ten sessions or a million.
+
+    def count_completed(self) -> int:
+        raise NotImplementedError
+
+    def count_started(self) -> int:
+        raise NotImplementedError
+
+    def count_rows(self, table: str) -> int:
+        """Row count of likes or shares"""
+        raise NotImplementedError
+
+    def totals(self) -> Dict[str, int]:
+        """started, plays (completed), likes and shares - one read where the backend can"""
+        return {"started": self.count_started(), "plays": self.count_completed(),
+                "likes": self.count_rows("likes"), "shares": self.count_rows("shares")}
+
+    def top_scientists(self, limit: int) -> List[Dict]:
+        """Most frequent rank-1 matches: name, field, era, image_url, match_count"""
+        raise NotImplementedError
+
+    def recent_top_matches(self, limit: int) -> List[Dict]:
+        """Newest rank-1 results: scientist_name, match_quality, created_at"""
+        raise NotImplementedError
+
+    def trait_value_counts(self, sample: int) -> Dict[str, int]:
+        """Answer value -> count over the newest sample completed sessions"""
+        raise NotImplementedError
+
+    def trait_pair_counts(self, limit: int) -> List[Dict]:
+        """Most frequent "dimension:value" answers over all completed sessions: trait, count"""
+        raise NotImplementedError
+
+    def domain_counts(self) -> List[Dict]:
+        """Completed sessions per domain: domain, count (most played first)"""
+        raise NotImplementedError
+
+    def field_counts(self, limit: int) -> List[Dict]:
+        """Rank-1 matches per scientific field: name, count"""
+        raise NotImplementedError
+
+    def retake_counts(self) -> tuple:
+        """(completed sessions with an ip hash, distinct ip hashes among them)"""
+        raise NotImplementedError
+
+    def activity_by_time(self) -> tuple:
+        """(sessions per UTC hour started {0-23: n}, sessions per weekday name {"Monday": n})"""
+        raise NotImplementedError
+
+    def recent_sessions(self, limit: int) -> List[Dict]:
+        raise NotImplementedError
+
+    def recent_results(self, limit: int) -> List[Dict]:
+        raise NotImplementedError
+
+    def session_top_match(self, session_uuid: str) -> Optional[Dict]:
+        """Rank-1 result of one session (share pages): scientist_name, scientist_field, scientist_image, match_score"""
+        raise NotImplementedError
+
+    # ---- keyset pagination ----
+
+    def page(self, table: str, columns: List[str], after: Optional[tuple], limit: int,
+             where: Optional[Dict[str, Any]] = None) -> List[Dict]:
+        """Up to limit rows ordered by (KEYSET_COLUMNS[table], id), strictly after the cursor
+
+        after is (keyset value, id) of the last row already seen, or None for
+        the first page. where holds equality filters (e.g. {"rank": 1}).
+        """
+        raise NotImplementedError
+
+    def iter_rows(self, table: str, columns: List[str], chunk_size: int = 1000,
+                  where: Optional[Dict[str, Any]] = None) -> Iterator[Dict]:
+        """Every row of table in keyset order, one page in memory at a time
+
+        Stops on an empty page rather than a short one, so a server-side row
+        cap below chunk_size (PostgREST max-rows) cannot end the walk early.
+        """
+        key = KEYSET_COLUMNS[table]
+        fetch = list(dict.fromkeys(list(columns) + [key, "id"]))
+        after = None
+        while True:
+            rows = self.page(table, fetch, after, chunk_size, where)
+            if not rows:
+                return
+            yield from rows
+            after = (rows[-1][key], rows[-1]["id"])
+
+    # ---- scientists ----
+
+    def search_scientists_by_embedding(self, query_embedding: List[float], limit: int,
+                                       threshold: float) -> List[Dict]:
+        raise NotImplementedError
+
+    def get_scientist(self, name: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def upsert_scientist(self, scientist_data: Dict):
+        raise NotImplementedError
+
+    def update_scientist_embedding(self, name: str, embedding: List[float]):
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+
+def create_storage_backend(url: str = None) -> StorageBackend:
+    """Backend from a URL: "supabase" (default) or "sqlite:///path/to/scientist_twin.db"
+
+    Defaults to the STORAGE_BACKEND environment variable.
+    """
+    url = url if url is not None else os.getenv("STORAGE_BACKEND", "supabase")
+    if url.startswith("sqlite:///"):
+        from sqlite_backend import SQLiteBackend
+        return SQLiteBackend(url[len("sqlite:///"):])
+    if url in ("", "supabase"):
+        from supabase_backend import SupabaseBackend
+        return SupabaseBackend()
+    raise ValueError(f"Unsupported STORAGE_BACKEND: {url}")
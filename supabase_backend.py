@@ -0,0 +1,309 @@
+"""
+Supabase Backend - StorageBackend on the hosted Supabase (PostgREST) API
+Owns the pooled client (see supabase_transport) and the SQL-function and
+counter-view fast paths from supabase_schema.sql. Where those are not
+deployed, small reads fall back to plain table queries and whole-table
+aggregates fail fast (NotDeployedError) rather than scan on the request path
+"""
+
+import os
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from storage_backend import StorageBackend, NotDeployedError, PartialWriteError, DAY_NAMES, KEYSET_COLUMNS
+
+try:
+    from supabase import create_client, Client
+    from supabase.lib.client_options import SyncClientOptions
+    from supabase_transport import InstrumentedTransport, create_http_client
+    SUPABASE_SDK_AVAILABLE = True
+except ImportError:
+    SUPABASE_SDK_AVAILABLE = False
+    print("[Supabase] supabase package not available - install with: pip install supabase")
+
+
+class SupabaseBackend(StorageBackend):
+    """
+    Supabase tables and RPCs through one client per worker process
+    """
+
+    name = "supabase"
+
+    def __init__(self, url: str = None, key: str = None):
+        self.url = url if url is not None else os.getenv("SUPABASE_URL", "")
+        self.key = key if key is not None else os.getenv("SUPABASE_KEY", "")  # Use anon/public key
+        self._client = None
+        self.transport = None  # pooled keep-alive HTTP, shared by every thread in this worker
+        self._lock = threading.Lock()
+        self.missing = set()  # SQL functions/views not deployed - fallbacks (or NotDeployedError) from then on
+        # A forked worker (gunicorn --preload) must not share the master's pooled sockets
+        os.register_at_fork(after_in_child=self._forget_client)
+
+    def _forget_client(self):
+        self._client = None
+        self.transport = None
+        self._lock = threading.Lock()
+
+    def client(self) -> Optional["Client"]:
+        """Create the client on first use; raises if creation fails, None when not configured"""
+        if self._client is None and SUPABASE_SDK_AVAILABLE and self.url and self.key:
+            with self._lock:
+                if self._client is None:
+                    transport = self.transport or InstrumentedTransport()
+                    self._client = create_client(self.url, self.key,
+                                                 options=SyncClientOptions(httpx_client=create_http_client(transport)))
+                    self.transport = transport
+        return self._client
+
+    def available(self) -> bool:
+        if not (SUPABASE_SDK_AVAILABLE and self.url and self.key):
+            return False
+        try:
+            return self.client() is not None
+        except Exception as e:
+            print(f"[Supabase] Connection failed: {e}")
+            return False
+
+    def _table(self, name: str):
+        client = self.client()
+        if client is None:
+            raise ConnectionError("Supabase is not configured")
+        return client.table(name)
+
+    def _fast_path(self, name: str, run, fallback=None):
+        """run() a query on SQL object name, or fallback() when it is not deployed (see supabase_schema.sql)
+
+        Without a fallback a missing object raises NotDeployedError. Any other error propagates unchanged.
+        """
+        if name not in self.missing:
+            try:
+                return run()
+            except Exception as e:
+                # PostgREST: PGRST202 missing function, PGRST205 missing table/view (42P01 before v12)
+                if getattr(e, "code", None) not in ("PGRST202", "PGRST205", "42P01") \
+                        and "Could not find the" not in str(e):
+                    raise
+                self.missing.add(name)
+                print(f"[Supabase] {name} not deployed - "
+                      f"{'falling back to table queries' if fallback else 'run supabase_schema.sql'}")
+        if fallback is None:
+            raise NotDeployedError(f"{name} is not deployed - run supabase_schema.sql")
+        return fallback()
+
+    def _call_rpc(self, name: str, params: dict, fallback=None):
+        """Run SQL function name, or fallback() when it is not deployed"""
+        return self._fast_path(name, lambda: self.client().rpc(name, params).execute().data, fallback)
+
+    def _read_view(self, view: str, columns: str, fallback=None, order: str = None, limit: int = None):
+        """Rows of an analytics view (small by construction), or fallback() when it is not deployed"""
+        def _select():
+            query = self._table(view).select(columns)
+            if order:
+                query = query.order(order, desc=True)
+            if limit:
+                query = query.limit(limit)
+            return query.execute().data or []
+
+        return self._fast_path(view, _select, fallback)
+
+    # ---- writes ----
+
+    def start_quiz(self, session_id: str, domain: str, ip_hash: Optional[str]) -> Optional[str]:
+        def _select_then_insert():
+            # First, check if session already exists
+            existing = self._table("quiz_sessions")\
+                .select("id")\
+                .eq("session_id", session_id)\
+                .execute()
+
+            if existing.data and len(existing.data) > 0:
+                # Session exists - return existing ID (prevents duplicate counting!)
+                return existing.data[0]["id"]
+
+            # Session doesn't exist - create new one
+            result = self._table("quiz_sessions").insert({
+                "session_id": session_id,
+                "domain": domain,
+                "ip_hash": ip_hash
+            }).execute()
+
+            if result.data:
+                return result.data[0]["id"]
+            return None
+
+        return self._call_rpc("start_quiz", {"session_id": session_id, "domain": domain, "ip_hash": ip_hash},
+                              _select_then_insert) or None
+
+    def write(self, op: str, table: str, rows: List[Dict]):
+        if op == "insert":
+            self._table(table).insert(rows).execute()
+        elif op == "update":
+            # PostgREST updates take one filter, so rows are applied one by one
+            self._row_by_row(rows, lambda row: self._table(table).update(row["values"]).eq("id", row["id"]).execute())
+        elif op == "finish_quiz":
+            self._row_by_row(rows, self._finish_quiz)
+        else:
+            raise ValueError(f"Unknown write op: {op}")
+
+    @staticmethod
+    def _row_by_row(rows: List[Dict], apply):
+        """apply(row) for each row - a failure reports how many rows landed before it (PartialWriteError)"""
+        for written, row in enumerate(rows):
+            try:
+                apply(row)
+            except Exception as e:
+                raise PartialWriteError(written, e) from e
+
+    def _finish_quiz(self, params: Dict):
+        """One finished quiz: the finish_quiz() transaction, or an UPDATE plus an INSERT where it is missing"""
+        def _update_then_insert():
+            self._table("quiz_sessions").update({
+                "user_profile": params["profile"],
+                "completed_at": params["completed_at"]
+            }).eq("id", params["session_uuid"]).execute()
+            if params["results"]:
+                # Same guard as finish_quiz(): results already stored for the session are skipped
+                self._table("quiz_results").upsert(
+                    [dict(row, session_id=params["session_uuid"]) for row in params["results"]],
+                    on_conflict="session_id,rank", ignore_duplicates=True).execute()
+
+        self._call_rpc("finish_quiz", params, _update_then_insert)
+
+    # ---- analytics reads ----
+
+    def _total(self, column: str, count_rows) -> int:
+        """One total from the analytics_totals counters, or count_rows() where they are not deployed"""
+        rows = self._read_view("analytics_totals", column, lambda: [{column: count_rows()}])
+        return (rows[0][column] or 0) if rows else 0
+
+    def totals(self) -> Dict[str, int]:
+        rows = self._read_view("analytics_totals", "started, plays, likes, shares",
+                               lambda: [super(SupabaseBackend, self).totals()])
+        return {k: v or 0 for k, v in rows[0].items()} if rows else {"started": 0, "plays": 0, "likes": 0, "shares": 0}
+
+    # Fallback counts are HEAD requests: PostgREST returns the total in Content-Range and no rows
+
+    def count_completed(self) -> int:
+        return self._total("plays", lambda: self._table("quiz_sessions").select("id", count="exact", head=True)
+                           .not_.is_("completed_at", "null").execute().count or 0)
+
+    def count_started(self) -> int:
+        return self._total("started", lambda: self._table("quiz_sessions").select("id", count="exact", head=True)
+                           .execute().count or 0)
+
+    def count_rows(self, table: str) -> int:
+        if table not in ("likes", "shares"):
+            raise ValueError(f"Unknown table: {table}")
+        return self._total(table, lambda: self._table(table).select("id", count="exact", head=True)
+                           .execute().count or 0)
+
+    def top_scientists(self, limit: int) -> List[Dict]:
+        rows = self._call_rpc("get_hall_of_fame", {"match_limit": limit})
+        return (rows or [])[:limit]
+
+    def recent_top_matches(self, limit: int) -> List[Dict]:
+        return self._table("quiz_results")\
+            .select("scientist_name, match_quality, created_at")\
+            .eq("rank", 1)\
+            .order("created_at", desc=True)\
+            .limit(limit)\
+            .execute().data or []
+
+    def trait_value_counts(self, sample: int) -> Dict[str, int]:
+        def _count_profiles():
+            traits = self._table("quiz_sessions")\
+                .select("user_profile")\
+                .not_.is_("completed_at", "null")\
+                .order("completed_at", desc=True)\
+                .limit(sample)\
+                .execute()
+            counts = Counter()
+            for row in traits.data or []:
+                counts.update((row.get("user_profile") or {}).values())
+            return [{"trait_value": value, "count": count} for value, count in counts.items()]
+
+        rows = self._call_rpc("get_trait_value_counts", {"sample_size": sample}, _count_profiles)
+        return {row["trait_value"]: row["count"] for row in rows or []}
+
+    def trait_pair_counts(self, limit: int) -> List[Dict]:
+        rows = self._read_view("analytics_trait_counts", "trait_key, trait_value, count", order="count", limit=limit)
+        return [{"trait": f"{r['trait_key']}:{r['trait_value']}", "count": r["count"]} for r in rows]
+
+    def domain_counts(self) -> List[Dict]:
+        return self._read_view("analytics_domain_counts", "domain, count", order="count")
+
+    def field_counts(self, limit: int) -> List[Dict]:
+        return self._read_view("analytics_field_counts", "name, count", order="count", limit=limit)
+
+    def retake_counts(self) -> tuple:
+        rows = self._read_view("analytics_retakes", "sessions, unique_ips")
+        return (rows[0]["sessions"], rows[0]["unique_ips"]) if rows else (0, 0)
+
+    def activity_by_time(self) -> tuple:
+        hours, days = Counter(), Counter()
+        for row in self._read_view("analytics_activity", "hour, weekday, count"):
+            hours[row["hour"]] += row["count"]
+            days[DAY_NAMES[row["weekday"]]] += row["count"]
+        return dict(hours), dict(days)
+
+    def recent_sessions(self, limit: int) -> List[Dict]:
+        return self._table("quiz_sessions")\
+            .select("*")\
+            .not_.is_("completed_at", "null")\
+            .order("completed_at", desc=True)\
+            .limit(limit)\
+            .execute().data or []
+
+    def recent_results(self, limit: int) -> List[Dict]:
+        return self._table("quiz_results")\
+            .select("*")\
+            .order("created_at", desc=True)\
+            .limit(limit)\
+            .execute().data or []
+
+    def session_top_match(self, session_uuid: str) -> Optional[Dict]:
+        result = self._table("quiz_results")\
+            .select("scientist_name, scientist_field, scientist_image, match_score")\
+            .eq("session_id", session_uuid)\
+            .eq("rank", 1)\
+            .limit(1)\
+            .execute()
+        return result.data[0] if result.data else None
+
+    # ---- keyset pagination ----
+
+    def page(self, table: str, columns: List[str], after: Optional[tuple], limit: int,
+             where: Optional[Dict[str, Any]] = None) -> List[Dict]:
+        key = KEYSET_COLUMNS[table]
+        query = self._table(table).select(",".join(columns)).not_.is_(key, "null")
+        for column, value in (where or {}).items():
+            query = query.eq(column, value)
+        if after is not None:
+            # PostgREST has no row-value comparison: key > v OR (key = v AND id > last id).
+            # Timestamps hold ':' and '+', so the values are quoted.
+            value, last_id = after
+            query = query.or_(f'{key}.gt."{value}",and({key}.eq."{value}",id.gt.{last_id})')
+        return query.order(key).order("id").limit(limit).execute().data or []
+
+    # ---- scientists ----
+
+    def search_scientists_by_embedding(self, query_embedding: List[float], limit: int,
+                                       threshold: float) -> List[Dict]:
+        return self.client().rpc("match_scientists_by_embedding", {
+            "query_embedding": query_embedding,
+            "match_threshold": threshold,
+            "match_count": limit
+        }).execute().data or []
+
+    def get_scientist(self, name: str) -> Optional[Dict]:
+        return self._table("scientists").select("*").eq("name", name).single().execute().data
+
+    def upsert_scientist(self, scientist_data: Dict):
+        self._table("scientists").upsert(scientist_data, on_conflict="name").execute()
+
+    def update_scientist_embedding(self, name: str, embedding: List[float]):
+        self._table("scientists").update({"embedding": embedding}).eq("name", name).execute()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "missing_sql_objects": sorted(self.missing)}
@@ -1,380 +1,323 @@
 """
 Supabase Client for Scientist Twin
 Handles all database operations, analytics, and vector search
-With connection pooling, request queuing, and graceful fallbacks
+With circuit breakers, write-behind queuing, and graceful fallbacks in front
+of a pluggable storage backend (STORAGE_BACKEND=supabase or sqlite:///path)
 """
 
-import os
+import atexit
+import csv
+import io
 import json
+import os
 import hashlib
-import threading
+import tempfile
 import time
-from datetime import datetime, timedelta
+from collections import Counter
+from datetime import datetime
 from typing import Optional, List, Dict, Any
-from collections import deque
-from supabase import create_client, Client
+from storage_backend import create_storage_backend, NotDeployedError, EXPORT_COLUMNS
+from write_behind import WriteBehindQueue, is_permanent
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+
+# Writes that could not reach the database are journaled here and replayed on recovery
+# (serverless hosts only allow writes under the temp directory)
+WRITE_JOURNAL_PATH = os.getenv("WRITE_JOURNAL_PATH",
+                               os.path.join(tempfile.gettempdir(), "scientist_twin_writes.db"))
 
-# Initialize Supabase client
-SUPABASE_URL = os.getenv("SUPABASE_URL", "")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY", "")  # Use anon/public key
+# Rows per keyset page - at most PostgREST's max-rows (1000 by default)
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
 
-# Connection pool and queue management
-_supabase: Optional[Client] = None
-_connection_lock = threading.Lock()
-_request_queue = deque(maxlen=100)  # Queue for failed requests
+# Supabase by default; sqlite:///path runs the same schema locally with no network
+_backend = create_storage_backend()
 _connection_failures = 0
 _last_failure_time = None
 
-def get_client() -> Optional[Client]:
-    """Get or create Supabase client with connection pooling"""
-    global _supabase, _connection_failures, _last_failure_time
-
-    with _connection_lock:
-        if _supabase is None and SUPABASE_URL and SUPABASE_KEY:
-            try:
-                _supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-                # Reset failure counter on successful connection
-                _connection_failures = 0
-                _last_failure_time = None
-            except Exception as e:
-                _connection_failures += 1
-                _last_failure_time = time.time()
-                print(f"[Supabase] Connection failed ({_connection_failures}): {e}")
-                return None
-        return _supabase
+# One breaker per operation class, so slow analytics queries cannot take quiz writes down with them
+_breakers = {
+    "reads": CircuitBreaker("reads"),
+    "writes": CircuitBreaker("writes"),
+    "analytics": CircuitBreaker("analytics", open_seconds=60.0),
+}
+
+def get_client():
+    """Raw Supabase client for Supabase-only scripts (None for other backends or when not configured)"""
+    if _backend.name != "supabase" or not is_connected():
+        return None
+    return _backend.client()
 
 def is_connected() -> bool:
-    """Check if Supabase is connected"""
-    return get_client() is not None
+    """Check if the storage backend is configured and usable"""
+    return _backend.available()
+
+def backend_name() -> str:
+    return _backend.name
+
+def _record_success():
+    global _connection_failures, _last_failure_time
+    _connection_failures = 0
+    _last_failure_time = None
+
+def _record_failure():
+    global _connection_failures, _last_failure_time
+    _connection_failures += 1
+    _last_failure_time = time.time()
 
-def _execute_with_fallback(operation_name: str, db_operation, fallback_value=None):
+def _execute_with_fallback(operation_name: str, db_operation, fallback_value=None, kind: str = "reads"):
     """
     Execute database operation with graceful fallback
-    Queues failed requests for retry if connection issues
+    Returns fallback_value when there is no connection, the operation fails,
+    or the breaker for kind ("reads", "writes", "analytics") is open
     """
-    global _request_queue, _connection_failures
+    breaker = _breakers[kind]
+    if not is_connected():
+        return fallback_value
+    if not breaker.allow():
+        # Fail fast - no point waiting on an HTTP timeout against a dead backend
+        return fallback_value
 
     try:
-        client = get_client()
-        if not client:
-            # No connection available - queue for later if critical
-            if fallback_value is None:
-                _request_queue.append({
-                    'operation': operation_name,
-                    'timestamp': time.time(),
-                    'retries': 0
-                })
-            return fallback_value
-
-        # Execute the operation
-        result = db_operation(client)
-        return result
+        result = db_operation(_backend)
+    except NotDeployedError as e:
+        # The schema is incomplete, the backend is fine - other reads on this breaker keep working
+        print(f"[Storage] {operation_name} unavailable: {e}")
+        breaker.release()
+        return fallback_value
+    except Exception as e:
+        print(f"[Storage] {operation_name} failed: {e}")
+        breaker.record_failure()
+        _record_failure()
+        return fallback_value
 
+    breaker.record_success()
+    _record_success()
+    return result
+
+
+# ============ WRITE-BEHIND QUEUE ============
+
+_write_listeners = []
+
+def _write_batch(op: str, table: str, rows: List[Dict]):
+    """Sink for the write-behind queue - one round trip per insert batch or finished quiz, raises on failure"""
+    if not is_connected():
+        raise ConnectionError(f"{_backend.name} storage unavailable")
+    breaker = _breakers["writes"]
+    if not breaker.allow():
+        # The queue retries, then journals - nothing is lost while the breaker is open
+        raise CircuitOpenError("writes circuit is open")
+    try:
+        _backend.write(op, table, rows)
     except Exception as e:
-        print(f"[Supabase] {operation_name} failed: {e}")
-        _connection_failures += 1
+        if is_permanent(e):
+            # The backend answered - it rejected these rows, the queue sets them aside
+            breaker.record_success()
+            _record_success()
+        else:
+            breaker.record_failure()
+            _record_failure()
+        raise
+    breaker.record_success()
+    _record_success()
+    for listener in _write_listeners:
+        try:
+            listener(op, table)
+        except Exception as e:
+            # The batch is already written - a listener error must not make the queue retry it
+            print(f"[WriteBehind] Write listener failed: {e}")
 
-        # Queue for retry if important
-        if fallback_value is None and _connection_failures < 5:
-            _request_queue.append({
-                'operation': operation_name,
-                'timestamp': time.time(),
-                'retries': _connection_failures
-            })
 
-        return fallback_value
+def on_write(listener):
+    """Call listener(op, table) after each batch lands in storage (wakes the live feed)"""
+    _write_listeners.append(listener)
+
+
+_writes = WriteBehindQueue(_write_batch, journal_path=WRITE_JOURNAL_PATH)
+atexit.register(_writes.stop)  # anything still queued at shutdown goes to the journal
+
+
+def transport_stats() -> Dict[str, Any]:
+    """Connection pool settings, in-flight requests and per-table latency histograms"""
+    transport = getattr(_backend, "transport", None)
+    if transport is None:
+        return {"enabled": False}
+    return transport.stats()
+
+
+def write_queue_stats() -> Dict[str, Any]:
+    """Write-behind queue depth, lag and counters"""
+    return _writes.stats()
 
 
 # ============ QUIZ SESSION TRACKING ============
 
 def create_quiz_session(session_id: str, domain: str, ip_address: str = None) -> Optional[str]:
     """Create or reuse existing quiz session (prevents duplicate counts) - graceful fallback"""
-    def _create_session(client):
-        # Hash IP for privacy
-        ip_hash = hashlib.sha256(ip_address.encode()).hexdigest()[:16] if ip_address else None
-
-        # First, check if session already exists
-        existing = client.table("quiz_sessions")\
-            .select("id")\
-            .eq("session_id", session_id)\
-            .execute()
-
-        if existing.data and len(existing.data) > 0:
-            # Session exists - return existing ID (prevents duplicate counting!)
-            return existing.data[0]["id"]
-
-        # Session doesn't exist - create new one
-        result = client.table("quiz_sessions").insert({
-            "session_id": session_id,
-            "domain": domain,
-            "ip_hash": ip_hash
-        }).execute()
-
-        if result.data:
-            return result.data[0]["id"]
-        return None
+    # Hash IP for privacy
+    ip_hash = hashlib.sha256(ip_address.encode()).hexdigest()[:16] if ip_address else None
 
     # Execute with fallback (returns None if DB unavailable)
-    return _execute_with_fallback("create_quiz_session", _create_session, fallback_value=None)
+    return _execute_with_fallback("create_quiz_session",
+                                  lambda backend: backend.start_quiz(session_id, domain, ip_hash),
+                                  fallback_value=None, kind="writes")
 
 def complete_quiz_session(session_uuid: str, user_profile: dict) -> bool:
-    """Mark quiz session as complete - graceful fallback"""
-    def _complete_session(client):
-        client.table("quiz_sessions").update({
+    """Mark quiz session as complete - queued, written in the background"""
+    return _writes.submit("update", "quiz_sessions", [{
+        "id": session_uuid,
+        "values": {
             "user_profile": user_profile,
             "completed_at": datetime.utcnow().isoformat()
-        }).eq("id", session_uuid).execute()
-        return True
-
-    # Execute with fallback (returns False if DB unavailable)
-    return _execute_with_fallback("complete_quiz_session", _complete_session, fallback_value=False)
+        }
+    }])
 
 
 # ============ QUIZ RESULTS ============
 
+def _result_rows(matches: List[Dict]) -> List[Dict]:
+    """quiz_results columns for the top 3 matches"""
+    results = []
+    for i, match in enumerate(matches[:3]):  # Top 3 matches
+        results.append({
+            "scientist_name": match.get("name", ""),
+            "scientist_field": match.get("field", ""),
+            "scientist_era": match.get("era", ""),
+            "scientist_image": match.get("image_url", ""),
+            "match_score": match.get("score", 0),
+            "match_quality": match.get("match_quality", ""),
+            "rank": i + 1
+        })
+    return results
+
 def save_quiz_results(session_uuid: str, matches: List[Dict]) -> bool:
-    """Save quiz match results - graceful fallback"""
-    def _save_results(client):
-        results = []
-        for i, match in enumerate(matches[:3]):  # Top 3 matches
-            results.append({
-                "session_id": session_uuid,
-                "scientist_name": match.get("name", ""),
-                "scientist_field": match.get("field", ""),
-                "scientist_era": match.get("era", ""),
-                "scientist_image": match.get("image_url", ""),
-                "match_score": match.get("score", 0),
-                "match_quality": match.get("match_quality", ""),
-                "rank": i + 1
-            })
-
-        if results:
-            client.table("quiz_results").insert(results).execute()
-            return True
-        return False
-
-    # Execute with fallback (returns False if DB unavailable)
-    return _execute_with_fallback("save_quiz_results", _save_results, fallback_value=False)
+    """Save quiz match results - queued and batched with other sessions' results"""
+    results = [dict(row, session_id=session_uuid) for row in _result_rows(matches)]
+    if results:
+        return _writes.submit("insert", "quiz_results", results)
+    return False
+
+def finish_quiz(session_uuid: str, user_profile: dict, matches: List[Dict]) -> bool:
+    """Complete the session and save its results - queued, one finish_quiz() round trip when written"""
+    return _writes.submit("finish_quiz", "quiz_sessions", [{
+        "session_uuid": session_uuid,
+        "profile": user_profile,
+        "results": _result_rows(matches),
+        # Stamped now - the write itself may happen later
+        "completed_at": datetime.utcnow().isoformat()
+    }])
 
 
 # ============ LIKES & SHARES ============
 
 def record_like(session_uuid: str, scientist_name: str) -> bool:
-    """Record when user likes result - graceful fallback"""
-    def _record(client):
-        client.table("likes").insert({
-            "session_id": session_uuid,
-            "scientist_name": scientist_name
-        }).execute()
-        return True
-
-    # Execute with fallback (returns False if DB unavailable)
-    return _execute_with_fallback("record_like", _record, fallback_value=False)
+    """Record when user likes result - queued, written in the background"""
+    return _writes.submit("insert", "likes", [{
+        "session_id": session_uuid,
+        "scientist_name": scientist_name
+    }])
 
 def record_share(session_uuid: str, scientist_name: str, platform: str) -> bool:
-    """Record when user shares result - graceful fallback"""
-    def _record(client):
-        client.table("shares").insert({
-            "session_id": session_uuid,
-            "scientist_name": scientist_name,
-            "platform": platform
-        }).execute()
-        return True
-
-    # Execute with fallback (returns False if DB unavailable)
-    return _execute_with_fallback("record_share", _record, fallback_value=False)
+    """Record when user shares result - queued, written in the background"""
+    return _writes.submit("insert", "shares", [{
+        "session_id": session_uuid,
+        "scientist_name": scientist_name,
+        "platform": platform
+    }])
 
 
 # ============ ANALYTICS ============
 
+# Map to display names
+TRAIT_LABELS = {
+    "bold": ("Risk-Taker", "🎯"),
+    "curiosity": ("Curious", "🔍"),
+    "small_team": ("Collaborative", "🤝"),
+    "theoretical": ("Theoretical", "🧠"),
+    "persist": ("Persistent", "💪"),
+    "impact": ("Impactful", "🌟"),
+    "specialist": ("Focused", "🎯"),
+    "long_term": ("Visionary", "🔮")
+}
+
+def _activity_feed(recent: List[Dict], total_plays: int) -> List[Dict]:
+    """Recent rank-1 matches as the "player #n matched X, 5 min ago" feed"""
+    feed = []
+    for i, r in enumerate(recent):
+        created = datetime.fromisoformat(r["created_at"].replace("Z", "+00:00"))
+        feed.append({
+            "id": total_plays - i,  # Descending player number
+            "scientist": r["scientist_name"],
+            "time": get_time_ago(created)
+        })
+    return feed
+
 def get_real_analytics() -> Dict[str, Any]:
     """Get real analytics from database - graceful fallback"""
-    def _get_analytics(client):
+    def _get_analytics(backend):
         analytics = {}
+        totals = backend.totals()
 
         # Total plays
-        stats = client.table("quiz_sessions").select("id", count="exact").not_.is_("completed_at", "null").execute()
-        analytics["total_plays"] = stats.count or 0
+        analytics["total_plays"] = totals["plays"]
 
         # Hall of Fame - most matched scientists
-        try:
-            hall_of_fame = client.rpc("get_hall_of_fame").execute()
-            if hall_of_fame.data:
-                analytics["hall_of_fame"] = hall_of_fame.data[:5]
-            else:
-                raise Exception("RPC not available")
-        except:
-            # Fallback query - get most matched scientists
-            hof = client.table("quiz_results")\
-                .select("scientist_name, scientist_field, scientist_era, scientist_image, match_score")\
-                .eq("rank", 1)\
-                .execute()
-
-            if hof.data:
-                from collections import Counter, defaultdict
-
-                # Count matches and aggregate data for each scientist
-                scientist_data = defaultdict(lambda: {"count": 0, "scores": [], "field": None, "era": None, "image": None})
-                for r in hof.data:
-                    name = r["scientist_name"]
-                    scientist_data[name]["count"] += 1
-                    scientist_data[name]["scores"].append(r.get("match_score", 0))
-                    scientist_data[name]["field"] = r.get("scientist_field", "Science")
-                    scientist_data[name]["era"] = r.get("scientist_era", "Contemporary")
-                    scientist_data[name]["image"] = r.get("scientist_image", "")
-
-                # Sort by count and get top 5
-                top_scientists = sorted(scientist_data.items(), key=lambda x: -x[1]["count"])[:5]
-
-                analytics["hall_of_fame"] = []
-                for name, data in top_scientists:
-                    analytics["hall_of_fame"].append({
-                        "name": name,
-                        "field": data["field"],
-                        "era": data["era"],
-                        "image_url": data["image"],
-                        "match_count": data["count"]
-                    })
+        hall_of_fame = backend.top_scientists(5)
+        if hall_of_fame:
+            analytics["hall_of_fame"] = hall_of_fame
 
         # Recent activity
-        recent = client.table("quiz_results")\
-            .select("scientist_name, match_quality, created_at")\
-            .eq("rank", 1)\
-            .order("created_at", desc=True)\
-            .limit(6)\
-            .execute()
-
-        if recent.data:
-            analytics["recent_activity"] = []
-            for i, r in enumerate(recent.data):
-                created = datetime.fromisoformat(r["created_at"].replace("Z", "+00:00"))
-                time_ago = get_time_ago(created)
-                analytics["recent_activity"].append({
-                    "id": analytics["total_plays"] - i,  # Descending player number
-                    "scientist": r["scientist_name"],
-                    "time": time_ago
-                })
-
-        # Top traits from community
-        traits = client.table("quiz_sessions")\
-            .select("user_profile")\
-            .not_.is_("completed_at", "null")\
-            .limit(100)\
-            .execute()
-
-        if traits.data:
-            trait_counts = {}
-            for row in traits.data:
-                profile = row.get("user_profile", {})
-                if profile:
-                    for key, value in profile.items():
-                        trait_counts[value] = trait_counts.get(value, 0) + 1
-
-            # Map to display names
-            trait_labels = {
-                "bold": ("Risk-Taker", "🎯"),
-                "curiosity": ("Curious", "🔍"),
-                "small_team": ("Collaborative", "🤝"),
-                "theoretical": ("Theoretical", "🧠"),
-                "persist": ("Persistent", "💪"),
-                "impact": ("Impactful", "🌟"),
-                "specialist": ("Focused", "🎯"),
-                "long_term": ("Visionary", "🔮")
-            }
+        recent = backend.recent_top_matches(6)
+        if recent:
+            analytics["recent_activity"] = _activity_feed(recent, analytics["total_plays"])
 
+        # Top traits from community (newest 100 completed sessions)
+        trait_counts = backend.trait_value_counts(100)
+        if trait_counts:
             top_traits = sorted(trait_counts.items(), key=lambda x: -x[1])[:5]
             total = sum(c for _, c in top_traits)
             analytics["top_traits"] = [
                 {
-                    "name": trait_labels.get(t, (t.replace("_", " ").title(), "⭐"))[0],
-                    "icon": trait_labels.get(t, (t, "⭐"))[1],
+                    "name": TRAIT_LABELS.get(t, (t.replace("_", " ").title(), "⭐"))[0],
+                    "icon": TRAIT_LABELS.get(t, (t, "⭐"))[1],
                     "percent": round(c * 100 / total) if total > 0 else 0
                 }
                 for t, c in top_traits
             ]
 
-        # Popular fields - get from quiz_results with scientist field data
-        results = client.table("quiz_results").select("scientist_field").eq("rank", 1).execute()
-        if results.data:
-            from collections import Counter
-            field_counts = Counter(r.get("scientist_field", "Unknown") for r in results.data if r.get("scientist_field"))
-            analytics["popular_fields"] = [
-                {"name": field, "count": count}
-                for field, count in field_counts.most_common(5)
-            ]
-        else:
-            analytics["popular_fields"] = []
+        # Popular fields - from rank-1 quiz_results
+        analytics["popular_fields"] = backend.field_counts(5)
 
         # Engagement stats
-        likes_count = client.table("likes").select("id", count="exact").execute()
-        shares_count = client.table("shares").select("id", count="exact").execute()
-
-        analytics["favorites"] = likes_count.count or 0
-        analytics["share_count"] = shares_count.count or 0
+        analytics["favorites"] = totals["likes"]
+        analytics["share_count"] = totals["shares"]
 
         if analytics["total_plays"] > 0:
-            analytics["share_rate"] = round((shares_count.count or 0) * 100 / analytics["total_plays"])
+            analytics["share_rate"] = round(analytics["share_count"] * 100 / analytics["total_plays"])
         else:
             analytics["share_rate"] = 0
 
         # Retake rate - users who completed multiple times
         try:
-            # Get all completed sessions with IP hashes
-            all_sessions = client.table("quiz_sessions")\
-                .select("ip_hash")\
-                .not_.is_("completed_at", "null")\
-                .not_.is_("ip_hash", "null")\
-                .execute()
-
-            if all_sessions.data:
-                # Count unique IP hashes
-                unique_ips = len(set(s["ip_hash"] for s in all_sessions.data if s.get("ip_hash")))
-                total_sessions = len(all_sessions.data)
-
-                # If we have more sessions than unique IPs, some users retook
-                if unique_ips > 0 and total_sessions > unique_ips:
-                    analytics["retake_rate"] = round(((total_sessions - unique_ips) * 100) / total_sessions)
-                else:
-                    analytics["retake_rate"] = 0
+            total_sessions, unique_ips = backend.retake_counts()
+
+            # If we have more sessions than unique IPs, some users retook
+            if unique_ips > 0 and total_sessions > unique_ips:
+                analytics["retake_rate"] = round(((total_sessions - unique_ips) * 100) / total_sessions)
             else:
                 analytics["retake_rate"] = 0
         except Exception as e:
             print(f"[Analytics] Retake rate calculation error: {e}")
             analytics["retake_rate"] = 0
 
-        # Peak times - calculate from session timestamps
+        # Peak times - from session timestamps
         try:
-            sessions = client.table("quiz_sessions")\
-                .select("created_at")\
-                .not_.is_("completed_at", "null")\
-                .execute()
-
-            if sessions.data and len(sessions.data) > 5:
-                from collections import Counter
-                hours = []
-                days = []
-
-                for s in sessions.data:
-                    try:
-                        dt = datetime.fromisoformat(s["created_at"].replace("Z", "+00:00"))
-                        hours.append(dt.hour)
-                        days.append(dt.strftime("%A"))  # Day name
-                    except:
-                        pass
-
-                if hours:
-                    hour_counts = Counter(hours)
-                    peak_hour_num = hour_counts.most_common(1)[0][0]
-                    # Format as time range
-                    analytics["peak_hour"] = f"{peak_hour_num}:00-{peak_hour_num+1}:00"
-                else:
-                    analytics["peak_hour"] = "N/A"
-
-                if days:
-                    day_counts = Counter(days)
-                    analytics["peak_day"] = day_counts.most_common(1)[0][0]
-                else:
-                    analytics["peak_day"] = "N/A"
+            hour_counts, day_counts = backend.activity_by_time()
+
+            if sum(hour_counts.values()) > 5:
+                peak_hour_num = Counter(hour_counts).most_common(1)[0][0]
+                # Format as time range
+                analytics["peak_hour"] = f"{peak_hour_num}:00-{peak_hour_num+1}:00"
+                analytics["peak_day"] = Counter(day_counts).most_common(1)[0][0] if day_counts else "N/A"
             else:
                 analytics["peak_hour"] = "N/A"
                 analytics["peak_day"] = "N/A"
@@ -386,7 +329,70 @@ def get_real_analytics() -> Dict[str, Any]:
         return analytics
 
     # Execute with fallback (returns None if DB unavailable)
-    return _execute_with_fallback("get_real_analytics", _get_analytics, fallback_value=None)
+    return _execute_with_fallback("get_real_analytics", _get_analytics, fallback_value=None, kind="analytics")
+
+def get_live_activity(limit: int = 6) -> Optional[Dict[str, Any]]:
+    """Total plays and the newest matches for the analytics auto-refresh - None if unavailable"""
+    def _live(backend):
+        total_plays = backend.count_completed()
+        return {
+            "total_plays": total_plays,
+            "recent_activity": _activity_feed(backend.recent_top_matches(limit), total_plays)
+        }
+
+    return _execute_with_fallback("get_live_activity", _live, fallback_value=None, kind="analytics")
+
+def get_totals() -> Optional[Dict[str, int]]:
+    """started, plays, likes and shares counters (one small read) - None if unavailable"""
+    return _execute_with_fallback("get_totals", lambda backend: backend.totals(),
+                                  fallback_value=None, kind="analytics")
+
+def get_recent_plays(limit: int) -> Optional[List[Dict]]:
+    """Newest rank-1 matches (scientist_name, match_quality, created_at), newest first - None if unavailable"""
+    return _execute_with_fallback("get_recent_plays", lambda backend: backend.recent_top_matches(limit),
+                                  fallback_value=None, kind="analytics")
+
+def get_dashboard_stats() -> Optional[Dict[str, Any]]:
+    """Detailed event data for the admin dashboard - None if unavailable"""
+    def _dashboard(backend):
+        totals = backend.totals()
+        total_completed, likes, shares = totals["plays"], totals["likes"], totals["shares"]
+        return {
+            # Only what the page shows - full tables come from the streaming exports
+            "recent_sessions": backend.recent_sessions(20),
+            "domain_distribution": backend.domain_counts(),
+            "trait_distribution": backend.trait_pair_counts(20),
+            # Top 3 matches per session, newest first
+            "all_results": backend.recent_results(30),
+            # Who matched with whom
+            "scientist_matches": [{"name": s["name"], "count": s["match_count"]}
+                                  for s in backend.top_scientists(20)],
+            "summary": {
+                "total_plays": total_completed,
+                "favorites": likes,
+                "share_count": shares,
+                "share_rate": round(shares * 100 / total_completed) if total_completed > 0 else 0
+            }
+        }
+
+    return _execute_with_fallback("get_dashboard_stats", _dashboard, fallback_value=None, kind="analytics")
+
+def get_event_numbers(top: int = 15) -> Optional[Dict[str, Any]]:
+    """Headline counts for post-event reporting (get_actual_numbers.py) - None if unavailable"""
+    def _numbers(backend):
+        sessions_with_ip, unique_ips = backend.retake_counts()
+        return dict(backend.totals(),
+                    domains=backend.domain_counts(),
+                    top_scientists=backend.top_scientists(top),
+                    sessions_with_ip=sessions_with_ip,
+                    unique_ips=unique_ips)
+
+    return _execute_with_fallback("get_event_numbers", _numbers, fallback_value=None, kind="analytics")
+
+def get_session_top_match(session_uuid: str) -> Optional[Dict]:
+    """Rank-1 match of one session, for share-page Open Graph tags"""
+    return _execute_with_fallback("get_session_top_match", lambda backend: backend.session_top_match(session_uuid),
+                                  fallback_value=None)
 
 def get_time_ago(dt: datetime) -> str:
     """Convert datetime to human-readable 'time ago' string"""
@@ -409,127 +415,132 @@ def get_time_ago(dt: datetime) -> str:
         return f"{days} day{'s' if days > 1 else ''} ago"
 
 
+# ============ EXPORTS ============
+
+def iter_rows(table: str, columns: List[str] = None, chunk_size: int = EXPORT_CHUNK_SIZE):
+    """Every row of table, oldest first, fetched page by page on the (timestamp, id) keyset
+
+    Memory stays at one page however large the table is. Unlike the other
+    reads this raises instead of returning a fallback: a silently short
+    export is worse than a failed one.
+    """
+    if not is_connected():
+        raise ConnectionError(f"{_backend.name} storage unavailable")
+    breaker = _breakers["analytics"]
+    if not breaker.allow():
+        raise CircuitOpenError("analytics circuit is open")
+    try:
+        yield from _backend.iter_rows(table, columns or EXPORT_COLUMNS[table], chunk_size)
+    except Exception:
+        breaker.record_failure()
+        _record_failure()
+        raise
+    except BaseException:
+        # GeneratorExit when the client disconnects mid-export - says nothing about the backend,
+        # but a half-open probe claimed above must not stay claimed
+        breaker.release()
+        raise
+    breaker.record_success()
+    _record_success()
+
+def export_rows(table: str, fmt: str, chunk_size: int = EXPORT_CHUNK_SIZE):
+    """table as CSV (header first) or NDJSON text, one chunk per keyset page"""
+    columns = EXPORT_COLUMNS[table]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == "csv" else None
+    if writer:
+        writer.writerow(columns)
+    for i, row in enumerate(iter_rows(table, columns, chunk_size), 1):
+        if writer:
+            # JSON columns (user_profile) stay JSON inside their CSV cell
+            writer.writerow([json.dumps(row.get(c)) if isinstance(row.get(c), (dict, list)) else row.get(c)
+                             for c in columns])
+        else:
+            buffer.write(json.dumps({c: row.get(c) for c in columns}, default=str) + "\n")
+        if i % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
 # ============ CONNECTION HEALTH & QUEUE PROCESSING ============
 
 def get_connection_health() -> Dict[str, Any]:
     """
     Get connection health status
-    Returns info about failures, queue size, etc.
+    Returns info about failures, circuit breakers and the write-behind queue
     """
-    global _connection_failures, _request_queue, _last_failure_time
+    global _connection_failures, _last_failure_time
 
-    queue_size = len(_request_queue)
+    writes = _writes.stats()
+    breakers = {kind: breaker.stats() for kind, breaker in _breakers.items()}
     time_since_failure = None
     if _last_failure_time:
         time_since_failure = time.time() - _last_failure_time
 
     return {
+        "backend": _backend.stats(),
         "failures": _connection_failures,
-        "queue_size": queue_size,
+        "queue_size": writes["depth"] + writes["journal_depth"],
         "last_failure_seconds_ago": time_since_failure,
-        "is_healthy": _connection_failures < 3 and queue_size < 50
+        "writes": writes,
+        "breakers": breakers,
+        "transport": {k: v for k, v in transport_stats().items() if k != "tables"},
+        "is_healthy": all(b["state"] == "closed" for b in breakers.values())
+                      and writes["state"] == "ok" and writes["lag_seconds"] < 60
     }
 
 
-def process_queued_requests():
+def process_queued_requests(limit: int = 1000) -> int:
     """
-    Process queued requests (call this periodically or when connection recovers)
+    Replay journaled writes now (the write-behind worker also does this on its own)
     Only processes if connection is healthy
     """
-    global _request_queue, _connection_failures
-
-    if not is_connected() or _connection_failures > 0:
-        # Don't process queue if connection is unhealthy
+    if not is_connected():
         return 0
-
-    processed = 0
-    max_process = 10  # Process at most 10 at a time
-
-    while _request_queue and processed < max_process:
-        try:
-            request = _request_queue.popleft()
-            # Log that we're skipping the retry (operations already failed gracefully)
-            print(f"[Queue] Skipped queued operation: {request['operation']} (graceful degradation active)")
-            processed += 1
-        except IndexError:
-            break
-
-    if processed > 0:
-        print(f"[Queue] Processed {processed} queued operations")
-
-    return processed
+    return _writes.replay(limit)
 
 
 def reset_connection_health():
     """
-    Reset connection health counters
+    Reset connection health counters and close every breaker
     Call this when you know connection is working
     """
-    global _connection_failures, _last_failure_time
-    _connection_failures = 0
-    _last_failure_time = None
+    _record_success()
+    for breaker in _breakers.values():
+        breaker.reset()
 
 
 # ============ VECTOR SEARCH ============
 
 def search_scientists_by_embedding(query_embedding: List[float], limit: int = 5) -> List[Dict]:
     """Search scientists using vector similarity"""
-    client = get_client()
-    if not client:
-        return []
-
-    try:
-        result = client.rpc("match_scientists_by_embedding", {
-            "query_embedding": query_embedding,
-            "match_threshold": 0.5,
-            "match_count": limit
-        }).execute()
-
-        return result.data or []
-    except Exception as e:
-        print(f"[Supabase] Vector search error: {e}")
-        return []
+    return _execute_with_fallback("search_scientists_by_embedding",
+                                  lambda backend: backend.search_scientists_by_embedding(query_embedding, limit, 0.5),
+                                  fallback_value=[])
 
 
 # ============ SCIENTIST DATA ============
 
 def get_scientist_by_name(name: str) -> Optional[Dict]:
     """Get scientist data from database"""
-    client = get_client()
-    if not client:
-        return None
-
-    try:
-        result = client.table("scientists").select("*").eq("name", name).single().execute()
-        return result.data
-    except Exception as e:
-        print(f"[Supabase] Error getting scientist: {e}")
-        return None
+    return _execute_with_fallback("get_scientist_by_name", lambda backend: backend.get_scientist(name),
+                                  fallback_value=None)
 
 def upsert_scientist(scientist_data: Dict) -> bool:
     """Insert or update a scientist record"""
-    client = get_client()
-    if not client:
-        return False
-
-    try:
-        client.table("scientists").upsert(scientist_data, on_conflict="name").execute()
+    def _upsert(backend):
+        backend.upsert_scientist(scientist_data)
         return True
-    except Exception as e:
-        print(f"[Supabase] Error upserting scientist: {e}")
-        return False
+
+    return _execute_with_fallback("upsert_scientist", _upsert, fallback_value=False, kind="writes")
 
 def update_scientist_embedding(name: str, embedding: List[float]) -> bool:
     """Update scientist's vector embedding"""
-    client = get_client()
-    if not client:
-        return False
-
-    try:
-        client.table("scientists").update({
-            "embedding": embedding
-        }).eq("name", name).execute()
+    def _update(backend):
+        backend.update_scientist_embedding(name, embedding)
         return True
-    except Exception as e:
-        print(f"[Supabase] Error updating embedding: {e}")
-        return False
+
+    return _execute_with_fallback("update_scientist_embedding", _update, fallback_value=False, kind="writes")
@@ -69,6 +69,31 @@ CREATE INDEX IF NOT EXISTS idx_quiz_results_created ON quiz_results(created_at);
 CREATE INDEX IF NOT EXISTS idx_likes_scientist ON likes(scientist_name);
 CREATE INDEX IF NOT EXISTS idx_scientists_embedding ON scientists USING ivfflat (embedding vector_cosine_ops) WITH (lists = 20);
 
+-- Columns the app stores with each result (shown on the analytics pages)
+ALTER TABLE quiz_results ADD COLUMN IF NOT EXISTS scientist_field TEXT;
+ALTER TABLE quiz_results ADD COLUMN IF NOT EXISTS scientist_era TEXT;
+ALTER TABLE quiz_results ADD COLUMN IF NOT EXISTS scientist_image TEXT;
+
+-- One row per browser session: makes start_quiz an upsert and stops duplicate counts.
+-- If this fails on an existing project, older duplicates are present - keep the first of each:
+--   DELETE FROM quiz_sessions a USING quiz_sessions b
+--   WHERE a.session_id = b.session_id AND a.started_at > b.started_at
+--   AND NOT EXISTS (SELECT 1 FROM quiz_results r WHERE r.session_id = a.id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_quiz_sessions_session_id ON quiz_sessions(session_id);
+CREATE INDEX IF NOT EXISTS idx_quiz_results_session ON quiz_results(session_id);
+
+-- One result per session and rank: a retried finish_quiz cannot duplicate results (or their counts).
+-- If this fails on an existing project, duplicates are present - keep the first of each:
+--   DELETE FROM quiz_results a USING quiz_results b
+--   WHERE a.session_id = b.session_id AND a.rank = b.rank AND (a.created_at, a.id) > (b.created_at, b.id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_quiz_results_session_rank ON quiz_results(session_id, rank);
+
+-- Keyset pagination (exports, and the fallback counts): ORDER BY key, id from a cursor
+CREATE INDEX IF NOT EXISTS idx_quiz_sessions_keyset ON quiz_sessions(completed_at, id) WHERE completed_at IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_quiz_results_keyset ON quiz_results(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_likes_keyset ON likes(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_shares_keyset ON shares(created_at, id);
+
 -- Views for analytics
 
 -- Hall of Fame: Most matched scientists
@@ -129,6 +154,263 @@ SELECT
     (SELECT COUNT(*) FROM shares) as total_shares
 FROM quiz_sessions;
 
+-- Analytics counters: running totals kept by triggers on every completion, rank-1 result, like
+-- and share, so each /analytics and /dashboard metric reads a handful of counter rows however many
+-- sessions have been recorded. kind / key:
+--   started, plays, likes, shares ('')   domain / <domain>      trait / <dimension>:<value>
+--   scientist / <name> (meta: field, era, image_url)             field / <field>
+--   activity / <UTC hour>:<weekday, 0 = Sunday>                  retakes / sessions, unique_ips
+CREATE TABLE IF NOT EXISTS analytics_counters (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL DEFAULT '',
+    count BIGINT NOT NULL DEFAULT 0,
+    meta JSONB,
+    PRIMARY KEY (kind, key)
+);
+
+-- IP hashes with at least one completed quiz (the distinct count behind the retake rate)
+CREATE TABLE IF NOT EXISTS analytics_seen_ips (
+    ip_hash TEXT PRIMARY KEY
+);
+
+ALTER TABLE analytics_counters ENABLE ROW LEVEL SECURITY;
+ALTER TABLE analytics_seen_ips ENABLE ROW LEVEL SECURITY;
+
+CREATE OR REPLACE FUNCTION bump_counter(
+    counter_kind TEXT,
+    counter_key TEXT,
+    amount BIGINT DEFAULT 1,
+    counter_meta JSONB DEFAULT NULL
+)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    INSERT INTO analytics_counters (kind, key, count, meta)
+    VALUES (counter_kind, counter_key, amount, counter_meta)
+    ON CONFLICT (kind, key) DO UPDATE
+    SET count = analytics_counters.count + EXCLUDED.count,
+        meta = COALESCE(EXCLUDED.meta, analytics_counters.meta);
+$$;
+
+-- A play is counted once, when completed_at is first set (finish_quiz replays do not double count).
+-- Counters are bumped in a fixed order (traits in jsonb key order) so concurrent completions
+-- queue on the same rows in the same sequence instead of deadlocking.
+CREATE OR REPLACE FUNCTION count_quiz_session()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    new_ip INTEGER;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM bump_counter('started', '');
+    END IF;
+    IF NEW.completed_at IS NOT NULL AND (TG_OP = 'INSERT' OR OLD.completed_at IS NULL) THEN
+        PERFORM bump_counter('plays', '');
+        PERFORM bump_counter('domain', COALESCE(NEW.domain, 'unknown'));
+        PERFORM bump_counter('trait', t.key || ':' || t.value)
+        FROM jsonb_each_text(COALESCE(NEW.user_profile, '{}'::JSONB)) AS t;
+        IF NEW.started_at IS NOT NULL THEN
+            PERFORM bump_counter('activity', EXTRACT(HOUR FROM NEW.started_at AT TIME ZONE 'UTC')::INTEGER
+                                 || ':' || EXTRACT(DOW FROM NEW.started_at AT TIME ZONE 'UTC')::INTEGER);
+        END IF;
+        IF NEW.ip_hash IS NOT NULL THEN
+            PERFORM bump_counter('retakes', 'sessions');
+            INSERT INTO analytics_seen_ips (ip_hash) VALUES (NEW.ip_hash) ON CONFLICT DO NOTHING;
+            GET DIAGNOSTICS new_ip = ROW_COUNT;
+            IF new_ip > 0 THEN
+                PERFORM bump_counter('retakes', 'unique_ips');
+            END IF;
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION count_quiz_result()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF NEW.rank = 1 THEN
+        PERFORM bump_counter('scientist', NEW.scientist_name, 1, jsonb_build_object(
+            'field', NEW.scientist_field, 'era', NEW.scientist_era, 'image_url', NEW.scientist_image));
+        IF COALESCE(NEW.scientist_field, '') <> '' THEN
+            PERFORM bump_counter('field', NEW.scientist_field);
+        END IF;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+-- likes and shares: one total each
+CREATE OR REPLACE FUNCTION count_engagement()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    PERFORM bump_counter(TG_TABLE_NAME, '');
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS count_quiz_session ON quiz_sessions;
+CREATE TRIGGER count_quiz_session AFTER INSERT OR UPDATE OF completed_at ON quiz_sessions
+    FOR EACH ROW EXECUTE FUNCTION count_quiz_session();
+DROP TRIGGER IF EXISTS count_quiz_result ON quiz_results;
+CREATE TRIGGER count_quiz_result AFTER INSERT ON quiz_results
+    FOR EACH ROW EXECUTE FUNCTION count_quiz_result();
+DROP TRIGGER IF EXISTS count_likes ON likes;
+CREATE TRIGGER count_likes AFTER INSERT ON likes
+    FOR EACH ROW EXECUTE FUNCTION count_engagement();
+DROP TRIGGER IF EXISTS count_shares ON shares;
+CREATE TRIGGER count_shares AFTER INSERT ON shares
+    FOR EACH ROW EXECUTE FUNCTION count_engagement();
+
+-- Recount everything from the raw tables: the initial backfill, and the repair if counters ever drift
+CREATE OR REPLACE FUNCTION rebuild_analytics_counters()
+RETURNS VOID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    -- Writes wait for the recount instead of being lost between the scan and the swap
+    LOCK TABLE quiz_sessions, quiz_results, likes, shares IN SHARE MODE;
+    DELETE FROM analytics_counters;
+    DELETE FROM analytics_seen_ips;
+
+    INSERT INTO analytics_seen_ips (ip_hash)
+    SELECT DISTINCT ip_hash FROM quiz_sessions WHERE completed_at IS NOT NULL AND ip_hash IS NOT NULL;
+
+    INSERT INTO analytics_counters (kind, key, count, meta)
+    SELECT 'started', '', COUNT(*), NULL FROM quiz_sessions
+    UNION ALL
+    SELECT 'plays', '', COUNT(*), NULL FROM quiz_sessions WHERE completed_at IS NOT NULL
+    UNION ALL
+    SELECT 'likes', '', COUNT(*), NULL FROM likes
+    UNION ALL
+    SELECT 'shares', '', COUNT(*), NULL FROM shares
+    UNION ALL
+    SELECT 'domain', COALESCE(domain, 'unknown'), COUNT(*), NULL
+    FROM quiz_sessions WHERE completed_at IS NOT NULL GROUP BY 2
+    UNION ALL
+    SELECT 'trait', t.key || ':' || t.value, COUNT(*), NULL
+    FROM quiz_sessions, LATERAL jsonb_each_text(user_profile) AS t
+    WHERE completed_at IS NOT NULL GROUP BY 2
+    UNION ALL
+    SELECT 'activity', EXTRACT(HOUR FROM started_at AT TIME ZONE 'UTC')::INTEGER
+                       || ':' || EXTRACT(DOW FROM started_at AT TIME ZONE 'UTC')::INTEGER, COUNT(*), NULL
+    FROM quiz_sessions WHERE completed_at IS NOT NULL AND started_at IS NOT NULL GROUP BY 2
+    UNION ALL
+    SELECT 'retakes', 'sessions', COUNT(*), NULL
+    FROM quiz_sessions WHERE completed_at IS NOT NULL AND ip_hash IS NOT NULL
+    UNION ALL
+    SELECT 'retakes', 'unique_ips', COUNT(*), NULL FROM analytics_seen_ips
+    UNION ALL
+    SELECT 'scientist', scientist_name, COUNT(*), (ARRAY_AGG(jsonb_build_object(
+               'field', scientist_field, 'era', scientist_era, 'image_url', scientist_image)
+           ORDER BY created_at DESC))[1]
+    FROM quiz_results WHERE rank = 1 GROUP BY scientist_name
+    UNION ALL
+    SELECT 'field', scientist_field, COUNT(*), NULL
+    FROM quiz_results WHERE rank = 1 AND COALESCE(scientist_field, '') <> '' GROUP BY scientist_field;
+
+    DELETE FROM analytics_counters WHERE count = 0;
+END;
+$$;
+
+-- Counters are only written by the triggers above - the anon key must not be able to move them
+REVOKE EXECUTE ON FUNCTION bump_counter(TEXT, TEXT, BIGINT, JSONB) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION rebuild_analytics_counters() FROM PUBLIC, anon, authenticated;
+
+SELECT rebuild_analytics_counters();
+
+-- The counters in the shapes the app reads (all O(number of counters))
+CREATE OR REPLACE VIEW analytics_totals AS
+SELECT
+    COALESCE(SUM(count) FILTER (WHERE kind = 'started'), 0)::BIGINT AS started,
+    COALESCE(SUM(count) FILTER (WHERE kind = 'plays'), 0)::BIGINT AS plays,
+    COALESCE(SUM(count) FILTER (WHERE kind = 'likes'), 0)::BIGINT AS likes,
+    COALESCE(SUM(count) FILTER (WHERE kind = 'shares'), 0)::BIGINT AS shares
+FROM analytics_counters
+WHERE kind IN ('started', 'plays', 'likes', 'shares');
+
+CREATE OR REPLACE VIEW analytics_top_matches AS
+SELECT key AS name, meta->>'field' AS field, meta->>'era' AS era, meta->>'image_url' AS image_url,
+       count AS match_count
+FROM analytics_counters
+WHERE kind = 'scientist';
+
+CREATE OR REPLACE VIEW analytics_trait_counts AS
+SELECT split_part(key, ':', 1) AS trait_key, split_part(key, ':', 2) AS trait_value, count
+FROM analytics_counters
+WHERE kind = 'trait';
+
+CREATE OR REPLACE VIEW analytics_domain_counts AS
+SELECT key AS domain, count
+FROM analytics_counters
+WHERE kind = 'domain';
+
+CREATE OR REPLACE VIEW analytics_field_counts AS
+SELECT key AS name, count
+FROM analytics_counters
+WHERE kind = 'field';
+
+CREATE OR REPLACE VIEW analytics_activity AS
+SELECT split_part(key, ':', 1)::INTEGER AS hour, split_part(key, ':', 2)::INTEGER AS weekday, count
+FROM analytics_counters
+WHERE kind = 'activity';
+
+CREATE OR REPLACE VIEW analytics_retakes AS
+SELECT
+    COALESCE(SUM(count) FILTER (WHERE key = 'sessions'), 0)::BIGINT AS sessions,
+    COALESCE(SUM(count) FILTER (WHERE key = 'unique_ips'), 0)::BIGINT AS unique_ips
+FROM analytics_counters
+WHERE kind = 'retakes';
+
+-- Live paths: the activity feed and the newest-sessions trait sample
+CREATE INDEX IF NOT EXISTS idx_quiz_results_rank_created ON quiz_results(rank, created_at DESC);
+
+-- Hall of Fame for the analytics page: name, field, era, image_url, match_count
+CREATE OR REPLACE FUNCTION get_hall_of_fame(match_limit INTEGER DEFAULT 5)
+RETURNS TABLE (name TEXT, field TEXT, era TEXT, image_url TEXT, match_count BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT t.name, t.field, t.era, t.image_url, t.match_count
+    FROM analytics_top_matches t
+    ORDER BY t.match_count DESC, t.name
+    LIMIT match_limit;
+$$;
+
+-- Answer values over the newest sample_size completed sessions (live, uses idx_quiz_sessions_completed)
+CREATE OR REPLACE FUNCTION get_trait_value_counts(sample_size INTEGER DEFAULT 100)
+RETURNS TABLE (trait_value TEXT, count BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT traits.value, COUNT(*)
+    FROM (
+        SELECT user_profile FROM quiz_sessions
+        WHERE completed_at IS NOT NULL
+        ORDER BY completed_at DESC
+        LIMIT sample_size
+    ) s,
+    LATERAL jsonb_each_text(s.user_profile) AS traits
+    GROUP BY traits.value;
+$$;
+
+GRANT SELECT ON analytics_totals, analytics_top_matches, analytics_trait_counts, analytics_domain_counts,
+                analytics_activity, analytics_retakes, analytics_field_counts TO anon, authenticated;
+GRANT EXECUTE ON FUNCTION get_hall_of_fame(INTEGER), get_trait_value_counts(INTEGER) TO anon, authenticated;
+
 -- Function for vector similarity search
 CREATE OR REPLACE FUNCTION match_scientists_by_embedding(
     query_embedding vector(384),
@@ -158,6 +440,65 @@ BEGIN
 END;
 $$;
 
+-- Start a quiz in one round trip: create the session or return the existing one's id
+-- (SECURITY DEFINER so the anon key needs no UPDATE policy on quiz_sessions)
+CREATE OR REPLACE FUNCTION start_quiz(
+    session_id TEXT,
+    domain TEXT,
+    ip_hash TEXT DEFAULT NULL
+)
+RETURNS UUID
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    INSERT INTO quiz_sessions (session_id, domain, ip_hash)
+    VALUES (start_quiz.session_id, start_quiz.domain, start_quiz.ip_hash)
+    ON CONFLICT (session_id) DO UPDATE SET session_id = EXCLUDED.session_id
+    RETURNING id;
+$$;
+
+-- Finish a quiz in one round trip and one transaction: store the profile and every ranked result
+-- results: [{"scientist_name", "scientist_field", "scientist_era", "scientist_image",
+--            "match_score", "match_quality", "rank"}, ...]
+CREATE OR REPLACE FUNCTION finish_quiz(
+    session_uuid UUID,
+    profile JSONB,
+    results JSONB,
+    completed_at TIMESTAMPTZ DEFAULT NOW()
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    inserted INTEGER;
+BEGIN
+    UPDATE quiz_sessions
+    SET user_profile = finish_quiz.profile,
+        completed_at = finish_quiz.completed_at
+    WHERE id = finish_quiz.session_uuid;
+
+    INSERT INTO quiz_results (session_id, scientist_name, scientist_field, scientist_era,
+                              scientist_image, match_score, match_quality, rank)
+    SELECT finish_quiz.session_uuid, r.scientist_name, r.scientist_field, r.scientist_era,
+           r.scientist_image, r.match_score, r.match_quality, r.rank
+    FROM jsonb_to_recordset(finish_quiz.results) AS r(
+        scientist_name TEXT, scientist_field TEXT, scientist_era TEXT, scientist_image TEXT,
+        match_score FLOAT, match_quality TEXT, rank INTEGER
+    )
+    -- Safe to run twice: a retry after a lost response adds nothing
+    ON CONFLICT (session_id, rank) DO NOTHING;
+
+    GET DIAGNOSTICS inserted = ROW_COUNT;
+    RETURN inserted;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION start_quiz(TEXT, TEXT, TEXT) TO anon, authenticated;
+GRANT EXECUTE ON FUNCTION finish_quiz(UUID, JSONB, JSONB, TIMESTAMPTZ) TO anon, authenticated;
+
 -- Row Level Security (optional but recommended)
 ALTER TABLE quiz_sessions ENABLE ROW LEVEL SECURITY;
 ALTER TABLE quiz_results ENABLE ROW LEVEL SECURITY;
@@ -173,3 +514,6 @@ CREATE POLICY "Allow anonymous inserts" ON shares FOR INSERT WITH CHECK (true);
 -- Allow public reads for analytics
 CREATE POLICY "Allow public reads" ON quiz_sessions FOR SELECT USING (true);
 CREATE POLICY "Allow public reads" ON quiz_results FOR SELECT USING (true);
+-- Likes and shares too, for the dashboard exports (same columns as quiz_results: session uuid and a name)
+CREATE POLICY "Allow public reads" ON likes FOR SELECT USING (true);
+CREATE POLICY "Allow public reads" ON shares FOR SELECT USING (true);
@@ -0,0 +1,170 @@
+"""
+Supabase Transport - the HTTP layer under the Supabase client
+One pooled keep-alive httpx client per worker with separate timeouts for
+hot-path writes and dashboard reads, a cap on in-flight requests so a
+traffic spike cannot exhaust sockets, and per-table latency histograms
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Any
+
+import httpx
+
+try:
+    import h2  # noqa: F401 - httpx needs it for HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+POOL_SIZE = int(os.getenv("SUPABASE_POOL_SIZE", "20"))
+MAX_IN_FLIGHT = int(os.getenv("SUPABASE_MAX_IN_FLIGHT", "16"))
+KEEPALIVE_SECONDS = float(os.getenv("SUPABASE_KEEPALIVE_SECONDS", "60"))
+HTTP2 = os.getenv("SUPABASE_HTTP2", "1") not in ("0", "false", "no")
+
+# Writes sit on (or just behind) the request path - fail quickly. Dashboard reads scan more rows.
+CONNECT_TIMEOUT = float(os.getenv("SUPABASE_CONNECT_TIMEOUT", "2"))
+WRITE_TIMEOUT = httpx.Timeout(float(os.getenv("SUPABASE_WRITE_TIMEOUT", "5")), connect=CONNECT_TIMEOUT)
+READ_TIMEOUT = httpx.Timeout(float(os.getenv("SUPABASE_READ_TIMEOUT", "15")), connect=CONNECT_TIMEOUT)
+
+# SQL functions that write - every other rpc/ call is a read (e.g. get_hall_of_fame)
+WRITE_RPCS = {"start_quiz", "finish_quiz"}
+
+# Histogram bucket upper bounds in milliseconds (the last bucket is open-ended)
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram (cheap to update, percentiles approximated by bucket bound)
+    """
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+        self.errors = 0
+
+    def observe(self, ms: float, error: bool = False):
+        i = 0
+        while i < len(BUCKETS_MS) and ms > BUCKETS_MS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.total += 1
+        self.sum_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        if error:
+            self.errors += 1
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th percentile (max seen for the open bucket)"""
+        if not self.total:
+            return 0.0
+        rank = q / 100 * self.total
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return float(BUCKETS_MS[i]) if i < len(BUCKETS_MS) else round(self.max_ms, 1)
+        return round(self.max_ms, 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.total,
+            "errors": self.errors,
+            "mean_ms": round(self.sum_ms / self.total, 2) if self.total else 0.0,
+            "max_ms": round(self.max_ms, 2),
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "buckets": {f"le_{bound}ms": count for bound, count in zip(BUCKETS_MS, self.counts)}
+                       | {"le_inf": self.counts[-1]}
+        }
+
+
+def request_target(request: httpx.Request) -> tuple:
+    """(table or "rpc/<fn>", is_write) for a PostgREST request"""
+    parts = request.url.path.strip("/").split("/")
+    target = parts[-1] if parts else ""
+    if len(parts) >= 2 and parts[-2] == "rpc":
+        target = f"rpc/{target}"
+        return target, parts[-1] in WRITE_RPCS
+    return target, request.method not in ("GET", "HEAD")
+
+
+class InstrumentedTransport(httpx.BaseTransport):
+    """
+    Pooled httpx transport that bounds in-flight requests, picks the timeout
+    profile per request and records latency per table
+    """
+
+    def __init__(self, pool_size: int = POOL_SIZE, max_in_flight: int = MAX_IN_FLIGHT,
+                 http2: bool = HTTP2, keepalive: float = KEEPALIVE_SECONDS):
+        if http2 and not HTTP2_AVAILABLE:
+            print("[Supabase] HTTP/2 not available - install with: pip install 'httpx[http2]'")
+            http2 = False
+        self.http2 = http2
+        self.pool_size = pool_size
+        self.max_in_flight = max_in_flight
+        self._inner = httpx.HTTPTransport(
+            http2=http2,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size,
+                                keepalive_expiry=keepalive))
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.slot_timeouts = 0
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        target, is_write = request_target(request)
+        timeout = WRITE_TIMEOUT if is_write else READ_TIMEOUT
+        # httpcore reads the timeout from the request, so this overrides the client-wide default
+        request.extensions["timeout"] = timeout.as_dict()
+
+        # Waiting for a slot counts against the connect budget, like waiting for a pooled socket
+        if not self._slots.acquire(timeout=timeout.connect):
+            with self._lock:
+                self.slot_timeouts += 1
+            raise httpx.PoolTimeout(f"{self.max_in_flight} Supabase requests already in flight", request=request)
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+        start = time.perf_counter()
+        error = True
+        try:
+            response = self._inner.handle_request(request)
+            # The body is streamed after we return - read it here so the slot covers the whole exchange
+            response.read()
+            error = response.status_code >= 500
+            return response
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1e3
+            with self._lock:
+                self.in_flight -= 1
+                self._histograms.setdefault(target, LatencyHistogram()).observe(elapsed_ms, error)
+            self._slots.release()
+
+    def close(self):
+        self._inner.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pool_size": self.pool_size,
+                "max_in_flight": self.max_in_flight,
+                "http2": self.http2,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "slot_timeouts": self.slot_timeouts,
+                "tables": {table: h.snapshot() for table, h in sorted(self._histograms.items())}
+            }
+
+
+def create_http_client(transport: InstrumentedTransport) -> httpx.Client:
+    """httpx client for SyncClientOptions(httpx_client=...) - redirects followed like postgrest's own"""
+    return httpx.Client(transport=transport, timeout=READ_TIMEOUT, follow_redirects=True)
@@ -0,0 +1,11 @@
+"""Point modules that open storage at import time to a throwaway SQLite database"""
+
+import os
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix="scientist_twin_tests_")
+os.environ.setdefault("STORAGE_BACKEND", f"sqlite:///{os.path.join(_tmp, 'app.db')}")
+os.environ.setdefault("WRITE_JOURNAL_PATH", os.path.join(_tmp, "journal.db"))
+os.environ.setdefault("RESULT_STORE_URL", "memory")
+os.environ.setdefault("SHARED_STATE_URL", "memory")
+os.environ.setdefault("LIVE_FEED", "0")
@@ -0,0 +1,145 @@
+"""Circuit breaker - state transitions under injected faults, on a controlled clock"""
+
+import threading
+
+import pytest
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Backend:
+    """A call that succeeds or raises as .failing says"""
+
+    def __init__(self):
+        self.failing = False
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.failing:
+            raise ConnectionError("backend down")
+        return "ok"
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def breaker(clock, capsys):
+    yield CircuitBreaker("test", window=10.0, min_calls=5, error_threshold=0.5, open_seconds=2.0, clock=clock)
+    capsys.readouterr()  # transition prints
+
+
+def fail(breaker, backend, times):
+    backend.failing = True
+    for _ in range(times):
+        with pytest.raises(ConnectionError):
+            breaker.call(backend)
+
+
+def test_stays_closed_below_min_calls(breaker):
+    fail(breaker, Backend(), 4)
+    assert breaker.state == CLOSED
+
+
+def test_stays_closed_below_error_threshold(breaker):
+    backend = Backend()
+    for _ in range(6):
+        breaker.call(backend)
+    fail(breaker, backend, 5)
+    assert breaker.state == CLOSED
+
+
+def test_errors_outside_the_window_are_forgotten(breaker, clock):
+    backend = Backend()
+    fail(breaker, backend, 4)
+    clock.now = 11.0
+    fail(breaker, backend, 1)
+    assert breaker.state == CLOSED
+
+
+def test_closed_open_half_open_closed(breaker, clock):
+    backend = Backend()
+    fail(breaker, backend, 5)
+    assert breaker.state == OPEN
+
+    # Open: refused without touching the backend
+    calls = backend.calls
+    with pytest.raises(CircuitOpenError):
+        breaker.call(backend)
+    assert backend.calls == calls
+    assert breaker.stats()["rejected"] == 1
+
+    clock.now = 2.0
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert [(t["from"], t["to"]) for t in breaker.stats()["transitions"]] == [
+        (CLOSED, OPEN), (OPEN, HALF_OPEN), (HALF_OPEN, CLOSED)]
+
+
+def test_failed_probe_reopens(breaker, clock):
+    backend = Backend()
+    fail(breaker, backend, 5)
+    clock.now = 2.0
+    fail(breaker, backend, 1)
+    assert breaker.state == OPEN
+
+    # A fresh cool-down starts from the failed probe
+    clock.now = 3.0
+    assert not breaker.allow()
+    clock.now = 4.0
+    backend.failing = False
+    assert breaker.call(backend) == "ok"
+    assert breaker.state == CLOSED
+
+
+def test_half_open_admits_a_single_probe(breaker, clock):
+    fail(breaker, Backend(), 5)
+    clock.now = 2.0
+    threads = 32
+    barrier = threading.Barrier(threads)
+    admitted = []
+
+    def caller():
+        barrier.wait()
+        admitted.append(breaker.allow())
+
+    callers = [threading.Thread(target=caller) for _ in range(threads)]
+    for c in callers:
+        c.start()
+    for c in callers:
+        c.join()
+    assert sum(admitted) == 1
+    assert breaker.state == HALF_OPEN
+
+
+def test_reset_closes(breaker):
+    fail(breaker, Backend(), 5)
+    breaker.reset()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_probe_that_never_reports_back_is_replaced(breaker, clock):
+    fail(breaker, Backend(), 5)
+    clock.now = 2.0
+    assert breaker.allow()  # claimed, then the caller disappears
+    clock.now = 3.9
+    assert not breaker.allow()
+    clock.now = 4.0
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
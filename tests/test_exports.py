@@ -0,0 +1,66 @@
+"""Exports - the analytics breaker is settled however an export ends"""
+
+import pytest
+
+import supabase_client
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RowsBackend:
+    name = "rows"
+
+    def __init__(self, rows: int = 10, fail_at: int = None):
+        self.rows = rows
+        self.fail_at = fail_at
+
+    def available(self) -> bool:
+        return True
+
+    def iter_rows(self, table, columns, chunk_size):
+        for i in range(self.rows):
+            if i == self.fail_at:
+                raise ConnectionError("backend down")
+            yield {"id": i}
+
+
+@pytest.fixture
+def half_open(monkeypatch, capsys):
+    """The analytics breaker, tripped and cooled down so the next export is its probe"""
+    clock = Clock()
+    breaker = CircuitBreaker("analytics", min_calls=1, open_seconds=60.0, clock=clock)
+    breaker.record_failure()
+    clock.now = 60.0
+    monkeypatch.setitem(supabase_client._breakers, "analytics", breaker)
+    yield breaker
+    capsys.readouterr()
+
+
+def test_finished_export_closes_the_breaker(monkeypatch, half_open):
+    monkeypatch.setattr(supabase_client, "_backend", RowsBackend())
+    assert len(list(supabase_client.iter_rows("quiz_results", ["id"]))) == 10
+    assert half_open.state == CLOSED
+
+
+def test_failed_export_reopens_the_breaker(monkeypatch, half_open):
+    monkeypatch.setattr(supabase_client, "_backend", RowsBackend(fail_at=3))
+    with pytest.raises(ConnectionError):
+        list(supabase_client.iter_rows("quiz_results", ["id"]))
+    assert half_open.state == OPEN
+
+
+def test_abandoned_export_gives_the_probe_back(monkeypatch, half_open):
+    monkeypatch.setattr(supabase_client, "_backend", RowsBackend())
+    rows = supabase_client.iter_rows("quiz_results", ["id"])
+    next(rows)
+    rows.close()  # client disconnected mid-download
+
+    assert half_open.state == HALF_OPEN
+    assert half_open.allow()
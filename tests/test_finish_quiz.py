@@ -0,0 +1,92 @@
+"""finish_quiz - a retried write adds no results or counts, and row-by-row writes report their progress"""
+
+import pytest
+
+from sqlite_backend import SQLiteBackend
+from storage_backend import PartialWriteError
+from supabase_backend import SupabaseBackend
+from write_behind import WriteBehindQueue
+
+RESULTS = [{"scientist_name": name, "scientist_field": "Physics", "match_score": score,
+            "match_quality": "good", "rank": rank}
+           for rank, (name, score) in enumerate((("Marie Curie", 0.9), ("Niels Bohr", 0.8), ("Lise Meitner", 0.7)), 1)]
+
+
+def finish(session_uuid: str) -> dict:
+    return {"session_uuid": session_uuid, "profile": {"approach": "empirical"}, "results": RESULTS,
+            "completed_at": "2026-01-01T12:00:00"}
+
+
+def test_sqlite_finish_quiz_twice_stores_one_set_of_results(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "app.db"))
+    session_uuid = backend.start_quiz("client-1", "cosmos", None)
+    backend.write("finish_quiz", "quiz_sessions", [finish(session_uuid)])
+    before = (backend.top_scientists(10), backend.count_completed())
+    # The response to the first write was lost and the queue sends it again
+    backend.write("finish_quiz", "quiz_sessions", [finish(session_uuid)])
+
+    assert backend._scalar("SELECT COUNT(*) FROM quiz_results") == 3
+    assert (backend.top_scientists(10), backend.count_completed()) == before
+    assert [(row["name"], row["match_count"]) for row in before[0]] == [("Marie Curie", 1)]
+
+
+class Timeout(Exception):
+    pass
+
+
+def test_supabase_write_reports_the_rows_that_landed(monkeypatch):
+    backend = SupabaseBackend(url="", key="")
+    finished = []
+
+    def finish_quiz(row):
+        if row["session_uuid"] == "s2":
+            raise Timeout("read timed out")
+        finished.append(row["session_uuid"])
+
+    monkeypatch.setattr(backend, "_finish_quiz", finish_quiz)
+    with pytest.raises(PartialWriteError) as raised:
+        backend.write("finish_quiz", "quiz_sessions", [finish(f"s{i}") for i in range(4)])
+    assert (raised.value.written, finished) == (2, ["s0", "s1"])
+    assert isinstance(raised.value.error, Timeout)
+
+
+class RowByRow:
+    """A sink writing one row at a time, like SupabaseBackend.write("finish_quiz")"""
+
+    def __init__(self):
+        self.sent = []
+        self.fail = {}  # session_uuid -> error raised once
+
+    def __call__(self, op, table, rows):
+        for written, row in enumerate(rows):
+            error = self.fail.pop(row["session_uuid"], None)
+            if error is not None:
+                raise PartialWriteError(written, error)
+            self.sent.append(row["session_uuid"])
+
+
+@pytest.fixture
+def queue(tmp_path, capsys):
+    sink = RowByRow()
+    queue = WriteBehindQueue(sink, journal_path=str(tmp_path / "journal.db"), backoff=0.001, max_retries=3)
+    queue.sink_rows = sink
+    yield queue
+    queue.stop()
+    capsys.readouterr()
+
+
+def test_queue_retry_resends_only_the_unwritten_rows(queue):
+    queue.sink_rows.fail["s2"] = ConnectionError("connection reset")
+    queue.submit("finish_quiz", "quiz_sessions", [finish(f"s{i}") for i in range(5)])
+    assert queue.flush()
+    assert queue.sink_rows.sent == ["s0", "s1", "s2", "s3", "s4"]
+    assert queue.stats()["journal_depth"] == 0
+
+
+def test_queue_dead_letters_the_row_rejected_mid_batch(queue):
+    queue.sink_rows.fail["s1"] = ValueError("invalid input syntax for type uuid")
+    queue.submit("finish_quiz", "quiz_sessions", [finish(f"s{i}") for i in range(4)])
+    assert queue.flush()
+    assert queue.sink_rows.sent == ["s0", "s2", "s3"]
+    [letter] = queue.journal.dead_letters()
+    assert letter["row"]["session_uuid"] == "s1" and "uuid" in letter["error"]
@@ -0,0 +1,25 @@
+"""Live feed - streams beyond the cap are turned away, so they cannot take every server thread"""
+
+from live_feed import LiveFeed
+
+
+def test_subscribers_beyond_the_cap_fall_back_to_polling():
+    feed = LiveFeed(lambda: {"started": 1, "plays": 0, "likes": 0, "shares": 0}, lambda limit: [],
+                    max_subscribers=2)
+    first, second = feed.subscribe(), feed.subscribe()
+    assert first is not None and second is not None
+    assert feed.subscribe() is None
+
+    # A closed stream frees its slot
+    feed.unsubscribe(first)
+    third = feed.subscribe()
+    assert third is not None
+    stats = feed.stats()
+    assert (stats["subscribers"], stats["rejected"], stats["peak_subscribers"]) == (2, 1, 2)
+    feed.unsubscribe(second)
+    feed.unsubscribe(third)
+
+
+def test_default_cap_leaves_most_threads_for_requests():
+    feed = LiveFeed(lambda: None, lambda limit: [])
+    assert feed.max_subscribers <= 8 // 4  # gunicorn.conf.py's default GUNICORN_THREADS
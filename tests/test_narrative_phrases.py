@@ -0,0 +1,59 @@
+"""Phrase table - second-person trait wording and the narratives built from it"""
+
+import random
+
+import pytest
+
+from matching_engine_v3 import MatchingEngineV3
+from narrative_phrases import (SECOND_PERSON_VERBS, TRAIT_DESCRIPTIONS, TRAIT_PHRASES, check_phrase_table,
+                               second_person, short_label, trait_phrase)
+from questions_v3_simplified import DOMAINS, TRAIT_DIMENSIONS, build_user_profile
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return MatchingEngineV3('scientist_db_rich.json')
+
+
+def test_phrase_table_covers_the_quiz():
+    assert check_phrase_table(TRAIT_DIMENSIONS) == []
+
+
+@pytest.mark.parametrize("third, second", [
+    ("seeks acknowledgment and validation of excellence", "seek acknowledgment and validation of excellence"),
+    ("driven by responsibility to country and community", "are driven by responsibility to country and community"),
+    ("builds and strengthens institutions", "build and strengthen institutions"),
+    ("carefully weighs risks before committing", "carefully weigh risks before committing"),
+    ("starts deep then gradually expands scope", "start deep then gradually expand scope"),
+    ("wants discoveries that outlast them", "want discoveries that outlast you"),
+    # Only the description's own verbs change
+    ("creates entirely new frameworks", "create entirely new frameworks"),
+    ("seeks to change how society thinks", "seek to change how society thinks"),
+])
+def test_second_person(third, second):
+    assert second_person(third) == second
+
+
+def test_every_form_is_built_from_the_descriptions():
+    for dim, values in TRAIT_DESCRIPTIONS.items():
+        for value, description in values.items():
+            assert trait_phrase(dim, value) == description
+            assert trait_phrase(dim, value, "second") == second_person(description)
+            assert trait_phrase(dim, value, "label") == short_label(value)
+    assert trait_phrase("approach", "unknown", default="-") == "-"
+
+
+def test_contrasts_read_in_second_person(engine):
+    second_forms = {phrase["second"] for values in TRAIT_PHRASES.values() for phrase in values.values()}
+    rng = random.Random(8)
+    contrasts = 0
+    for i in range(300):
+        profile = build_user_profile([rng.randrange(4) for _ in range(12)])
+        for match in engine.get_full_matches(profile, rng.choice(list(DOMAINS) + [None]), rng=random.Random(i)):
+            for contrast in match["contrasts"]:
+                text = contrast["explanation"]
+                assert text.startswith("You "), text
+                assert text.split(" ")[1].rstrip(",") not in SECOND_PERSON_VERBS, text
+                assert any(text.startswith(f"You {form},") for form in second_forms), text
+                contrasts += 1
+    assert contrasts > 0
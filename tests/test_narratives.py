@@ -0,0 +1,71 @@
+"""Narrative artifact - precomputed fragments give exactly the live generator's output"""
+
+import random
+
+import pytest
+
+from build_narratives import build
+from matching_engine_v3 import MatchingEngineV3
+from narrative_artifact import load_artifact, save_artifact
+from questions_v3_simplified import DOMAINS, build_user_profile
+
+DB = 'scientist_db_rich.json'
+ARTIFACT = 'scientist_narratives.msgpack'
+SEEDS = range(300)
+
+
+@pytest.fixture(scope="module")
+def live():
+    return MatchingEngineV3(DB)
+
+
+@pytest.fixture(scope="module")
+def precomputed():
+    return MatchingEngineV3(DB, narratives_path=ARTIFACT)
+
+
+def random_profile(rng: random.Random) -> dict:
+    return build_user_profile([rng.randrange(4) for _ in range(12)])
+
+
+def test_shipped_artifact_is_current(precomputed):
+    # A stale entry falls back to live generation silently - rerun build_narratives.py
+    assert len(precomputed._narratives) == len(precomputed.scientists)
+
+
+def test_every_scientist_narrative_matches_live(live, precomputed):
+    rng = random.Random(7)
+    for row in range(len(live.scientists)):
+        profile = random_profile(rng)
+        expected = live.generate_rich_narrative(profile, live._build_matches(profile, [(row, 0.6, False)])[0])
+        actual = precomputed.generate_rich_narrative(
+            profile, precomputed._build_matches(profile, [(row, 0.6, False)])[0])
+        assert actual == expected, live.scientists[row]['name']
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_full_matches_match_live(live, precomputed, seed):
+    rng = random.Random(seed)
+    profile = random_profile(rng)
+    domain = rng.choice(list(DOMAINS) + [None])
+    expected = live.get_full_matches(profile, domain, rng=random.Random(seed))
+    assert precomputed.get_full_matches(profile, domain, rng=random.Random(seed)) == expected
+
+
+def test_rebuilt_json_artifact_matches_live(live, tmp_path):
+    path = str(tmp_path / "narratives.json")
+    build(DB, path)
+    rebuilt = MatchingEngineV3(DB, narratives_path=path)
+    assert len(rebuilt._narratives) == len(rebuilt.scientists)
+    for seed in SEEDS[:50]:
+        profile = random_profile(random.Random(seed))
+        assert (rebuilt.get_full_matches(profile, None, rng=random.Random(seed))
+                == live.get_full_matches(profile, None, rng=random.Random(seed)))
+
+
+def test_artifact_from_other_tables_is_ignored(tmp_path):
+    artifact = load_artifact(ARTIFACT)
+    artifact['tables'] = "edited-wording"
+    path = str(tmp_path / "stale.json")
+    save_artifact(path, artifact)
+    assert MatchingEngineV3(DB, narratives_path=path)._narratives == frozenset()
@@ -0,0 +1,60 @@
+"""Response cache - entries stay cached while the rendered bytes do not change"""
+
+import time
+
+import pytest
+
+import response_cache
+from response_cache import CachedBody, ResponseCache
+
+
+def test_unchanged_body_is_refreshed_not_re_rendered_on_every_request():
+    cache = ResponseCache()
+    renders = []
+
+    def render():
+        renders.append(time.time())
+        return CachedBody(b"same" * 200, "application/json")
+
+    first = cache.get("stats", render, ttl=0.2, stale=0.3)
+    for _ in range(40):
+        cache.get("stats", render, ttl=0.2, stale=0.3)
+        time.sleep(0.05)
+
+    # Past the first ttl + stale window every request used to miss and render again
+    assert cache.misses == 1
+    assert len(renders) <= 15
+    assert cache.get("stats", render, ttl=0.2, stale=0.3).last_modified == first.last_modified
+
+
+def test_changed_body_moves_last_modified():
+    cache = ResponseCache()
+    bodies = iter([b"a" * 600, b"b" * 600])
+    first = cache.get("stats", lambda: CachedBody(next(bodies), "application/json"), ttl=0.05)
+    time.sleep(0.1)
+    second = cache.get("stats", lambda: CachedBody(next(bodies), "application/json"), ttl=0.05)
+    assert second.etag != first.etag
+    assert second.last_modified > first.last_modified
+
+
+@pytest.mark.parametrize("use_msgpack", [True, False])
+def test_packed_body_round_trips(monkeypatch, use_msgpack):
+    monkeypatch.setattr(response_cache, "MSGPACK_AVAILABLE", use_msgpack and response_cache.msgpack is not None)
+    for body in (b'{"count": 1}', b'{"rows": [' + b'1, ' * 400 + b'1]}'):
+        entry = CachedBody(body, "application/json")
+        copy = CachedBody.unpack(entry.pack())
+        assert [getattr(copy, name) for name in CachedBody.__slots__] == \
+               [getattr(entry, name) for name in CachedBody.__slots__]
+
+
+def test_body_in_the_other_encoding_is_rendered_over(monkeypatch, capsys):
+    from shared_state import create_shared_state
+
+    # JSON for a msgpack worker, msgpack for a JSON one
+    other = b'["not", "a", "body"]' if response_cache.MSGPACK_AVAILABLE else b"\x96\xc4"
+    shared = create_shared_state("memory")
+    shared.set("response:stats", other, 60)
+    cache = ResponseCache(shared=shared)
+    entry = cache.get("stats", lambda: CachedBody(b"fresh", "application/json"), ttl=1)
+    assert entry.body == b"fresh"
+    assert "Unreadable shared body" in capsys.readouterr().out
@@ -0,0 +1,49 @@
+"""Single-shot quiz - only a quiz_sessions id the database returned receives the quiz's writes"""
+
+import pytest
+
+import web_app_v3
+
+ANSWERS = [1, 2, 0, 3, 1, 2, 0, 1, 3, 2, 1, 0]
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    """(create_quiz_session result to return, recorded writes)"""
+    recorded = {"created": "db-session-1", "finish": [], "like": []}
+    monkeypatch.setattr(web_app_v3, "SUPABASE_AVAILABLE", True)
+    monkeypatch.setattr(web_app_v3.db, "create_quiz_session", lambda **kwargs: recorded["created"])
+    monkeypatch.setattr(web_app_v3.db, "finish_quiz", lambda uuid, *args: recorded["finish"].append(uuid))
+    monkeypatch.setattr(web_app_v3.db, "record_like", lambda uuid, *args: recorded["like"].append(uuid))
+    return recorded
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setitem(web_app_v3.app.config, "SESSION_COOKIE_SECURE", False)
+    return web_app_v3.app.test_client()
+
+
+def submit(client, client_uuid: str):
+    response = client.post("/api/submit-quiz", json={"domain": "cosmos", "answers": ANSWERS,
+                                                      "client_uuid": client_uuid})
+    assert response.status_code == 200
+    return response
+
+
+def test_created_session_receives_results_and_likes(client, writes):
+    submit(client, "client-1")
+    client.post("/api/like", json={"scientist": "Marie Curie"})
+    assert writes["finish"] == ["db-session-1"]
+    assert writes["like"] == ["db-session-1"]
+
+
+def test_failed_session_skips_the_writes(client, writes):
+    submit(client, "client-1")
+    writes["created"] = None  # start_quiz failed or its breaker is open
+    submit(client, "client-2")
+    client.post("/api/like", json={"scientist": "Marie Curie"})
+
+    # Neither the client UUID nor the previous quiz's row stands in for the missing row
+    assert writes["finish"] == ["db-session-1"]
+    assert writes["like"] == []
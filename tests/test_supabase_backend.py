@@ -0,0 +1,99 @@
+"""Supabase backend - dashboard aggregates fail fast when their counter views are not deployed"""
+
+import pytest
+
+from storage_backend import NotDeployedError
+from supabase_backend import SupabaseBackend
+
+
+class MissingRelation(Exception):
+    """What PostgREST raises for a view that does not exist"""
+    code = "PGRST205"
+
+
+class Query:
+    """A PostgREST query builder whose every request hits a missing view"""
+
+    def __init__(self, requests: list):
+        self.requests = requests
+
+    def select(self, *args, **kwargs):
+        return self
+
+    order = limit = eq = select
+
+    def execute(self):
+        self.requests.append(1)
+        raise MissingRelation("Could not find the table 'public.analytics_domain_counts' in the schema cache")
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = SupabaseBackend(url="", key="")
+    requests = []
+    monkeypatch.setattr(backend, "_table", lambda name: Query(requests))
+    monkeypatch.setattr(backend, "iter_rows", lambda *args, **kwargs: pytest.fail("scanned a whole table"))
+    backend.requests = requests
+    return backend
+
+
+@pytest.mark.parametrize("read", [
+    lambda b: b.domain_counts(),
+    lambda b: b.trait_pair_counts(20),
+    lambda b: b.field_counts(5),
+    lambda b: b.retake_counts(),
+    lambda b: b.activity_by_time(),
+])
+def test_missing_view_fails_fast_without_scanning(backend, read, capsys):
+    with pytest.raises(NotDeployedError):
+        read(backend)
+    assert len(backend.requests) == 1
+
+    # Known missing from then on - no second round trip
+    with pytest.raises(NotDeployedError):
+        read(backend)
+    assert len(backend.requests) == 1
+    assert "not deployed" in capsys.readouterr().out
+
+
+def test_other_errors_propagate(backend):
+    def broken():
+        raise TimeoutError("read timed out")
+
+    with pytest.raises(TimeoutError):
+        backend._fast_path("analytics_domain_counts", broken)
+    assert "analytics_domain_counts" not in backend.missing
+
+
+def test_small_reads_keep_their_fallback(backend, capsys):
+    assert backend._read_view("analytics_totals", "plays", lambda: [{"plays": 3}]) == [{"plays": 3}]
+
+
+class CountersOnly:
+    """A connected backend whose totals work and whose aggregate views are missing"""
+    name = "counters-only"
+
+    def available(self) -> bool:
+        return True
+
+    def totals(self) -> dict:
+        return {"started": 2, "plays": 1, "likes": 0, "shares": 0}
+
+    def domain_counts(self):
+        raise NotDeployedError("analytics_domain_counts is not deployed - run supabase_schema.sql")
+
+
+def test_missing_view_does_not_trip_the_analytics_breaker(monkeypatch, capsys):
+    import supabase_client
+    from circuit_breaker import CLOSED, CircuitBreaker
+
+    breaker = CircuitBreaker("analytics", min_calls=1, open_seconds=60.0)
+    monkeypatch.setitem(supabase_client._breakers, "analytics", breaker)
+    monkeypatch.setattr(supabase_client, "_backend", CountersOnly())
+
+    for _ in range(20):
+        assert supabase_client._execute_with_fallback(
+            "domains", lambda backend: backend.domain_counts(), fallback_value=None, kind="analytics") is None
+    assert breaker.state == CLOSED
+    assert supabase_client.get_totals() == {"started": 2, "plays": 1, "likes": 0, "shares": 0}
+    assert "domains unavailable" in capsys.readouterr().out
@@ -0,0 +1,178 @@
+"""Supabase breakers - a SupabaseBackend against the PostgREST stand-in trips, fails fast and recovers
+
+The backend reaches the stand-in through the real supabase client when it is
+installed, and otherwise through its pooled transport (supabase_transport)
+with a PostgREST query built here - the fault path is the same HTTP either way.
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+import supabase_client
+import supabase_transport
+from benchmarks.circuit_breaker import StandIn, StandInServer
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from supabase_backend import SupabaseBackend
+
+TIMEOUT = 0.2
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class StandInProcess:
+    """The stand-in on a fixed port that can be stopped (connection refused) and started again"""
+
+    def __init__(self):
+        self.server = None
+        self.port = 0
+        self.requests = 0
+        self.start()
+
+    def start(self, mode: str = "ok"):
+        self.server = StandInServer(("127.0.0.1", self.port), StandIn)
+        self.server.mode, self.server.hang_seconds = mode, TIMEOUT * 5
+        self.port = self.server.server_port
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.requests += self.server.requests
+        self.server.shutdown()
+        self.server.server_close()
+        self.server = None
+
+    def served(self) -> int:
+        return self.requests + (self.server.requests if self.server else 0)
+
+
+class APIError(Exception):
+    """Raised like postgrest's APIError for an error response"""
+
+    def __init__(self, error: dict):
+        super().__init__(error.get("message"))
+        self.code = error.get("code")
+
+
+class Query:
+    """The part of the PostgREST query builder get_scientist() uses"""
+
+    def __init__(self, http: httpx.Client, url: str):
+        self.http, self.url = http, url
+        self.params, self.headers = {}, {}
+
+    def select(self, columns: str):
+        self.params["select"] = columns
+        return self
+
+    def eq(self, column: str, value):
+        self.params[column] = f"eq.{value}"
+        return self
+
+    def single(self):
+        self.headers["Accept"] = "application/vnd.pgrst.object+json"
+        return self
+
+    def execute(self):
+        response = self.http.get(self.url, params=self.params, headers=self.headers)
+        if response.status_code >= 400:
+            raise APIError(response.json())
+        return SimpleNamespace(data=response.json())
+
+
+@pytest.fixture
+def standin():
+    process = StandInProcess()
+    yield process
+    if process.server is not None:
+        process.stop()
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture(params=["supabase client", "pooled transport"])
+def breaker(request, standin, clock, monkeypatch, capsys):
+    """The reads breaker of supabase_client, on a controlled clock, in front of a backend on the stand-in"""
+    monkeypatch.setattr(supabase_transport, "READ_TIMEOUT", httpx.Timeout(TIMEOUT, connect=TIMEOUT))
+    backend = SupabaseBackend(url=f"http://127.0.0.1:{standin.port}", key="test-key")
+    if request.param == "supabase client":
+        pytest.importorskip("supabase")
+    else:
+        backend.transport = supabase_transport.InstrumentedTransport(http2=False)
+        http = supabase_transport.create_http_client(backend.transport)
+        monkeypatch.setattr(backend, "available", lambda: True)
+        monkeypatch.setattr(backend, "_table", lambda name: Query(http, f"{backend.url}/rest/v1/{name}"))
+    monkeypatch.setattr(supabase_client, "_backend", backend)
+
+    breaker = CircuitBreaker("reads", window=10.0, min_calls=5, error_threshold=0.5, open_seconds=2.0, clock=clock)
+    monkeypatch.setitem(supabase_client._breakers, "reads", breaker)
+    yield breaker
+    capsys.readouterr()
+
+
+def read():
+    return supabase_client.get_scientist_by_name("Marie Curie")
+
+
+def inject(standin, fault: str):
+    if fault == "connection refused":
+        standin.stop()
+    else:
+        standin.server.mode = fault
+
+
+def clear(standin, fault: str):
+    if fault == "connection refused":
+        standin.start()
+    else:
+        standin.server.mode = "ok"
+
+
+@pytest.mark.parametrize("fault", ["connection refused", "hang", "error"])
+def test_breaker_opens_fails_fast_and_recovers(breaker, standin, clock, fault):
+    assert read()["scientist_name"] == "Marie Curie"
+    assert breaker.state == CLOSED
+
+    # Trips once min_calls calls (the healthy one included) are mostly failures
+    inject(standin, fault)
+    calls = 0
+    while breaker.state != OPEN:
+        assert read() is None
+        calls += 1
+        assert calls < breaker.min_calls
+    assert calls == breaker.min_calls - 1
+
+    # Open: no request reaches the stand-in, and no call waits out a timeout
+    served = standin.served()
+    t = time.perf_counter()
+    for _ in range(50):
+        assert read() is None
+    assert time.perf_counter() - t < TIMEOUT
+    assert standin.served() == served
+
+    # After open_seconds one probe goes out - a failed probe opens the circuit again
+    clock.now += breaker.open_seconds
+    assert read() is None
+    assert breaker.state == OPEN
+
+    # A successful probe closes it
+    clear(standin, fault)
+    clock.now += breaker.open_seconds
+    served = standin.served()
+    assert read()["scientist_name"] == "Marie Curie"
+    assert breaker.state == CLOSED and standin.served() == served + 1
+    assert read() is not None
+
+    moves = [(t["from"], t["to"]) for t in breaker.stats()["transitions"]]
+    assert moves == [(CLOSED, OPEN), (OPEN, HALF_OPEN), (HALF_OPEN, OPEN), (OPEN, HALF_OPEN), (HALF_OPEN, CLOSED)]
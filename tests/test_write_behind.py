@@ -0,0 +1,180 @@
+"""Write-behind queue - rejected rows are dead-lettered, outages are journaled and replayed"""
+
+import sqlite3
+
+import pytest
+
+from write_behind import WriteBehindQueue, is_permanent
+
+
+class APIError(Exception):
+    """Shaped like postgrest's APIError: a SQLSTATE or PGRST code"""
+
+    def __init__(self, code: str):
+        super().__init__(code)
+        self.code = code
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int):
+        super().__init__(str(status))
+        self.status_code = status
+
+
+class Sink:
+    """Writes rows to .rows; rows with "bad" are rejected, .down raises a connection error"""
+
+    def __init__(self, rejection: Exception = None):
+        self.rows = []
+        self.calls = 0
+        self.down = False
+        self.rejection = rejection or sqlite3.IntegrityError("FOREIGN KEY constraint failed")
+
+    def __call__(self, op, table, rows):
+        self.calls += 1
+        if self.down:
+            raise ConnectionError("connection refused")
+        if any(row.get("bad") for row in rows):
+            raise self.rejection
+        self.rows.extend(row["n"] for row in rows)
+
+
+@pytest.fixture
+def queue_for(tmp_path, capsys):
+    queues = []
+
+    def make(sink, **kwargs):
+        queue = WriteBehindQueue(sink, journal_path=str(tmp_path / "journal.db"), backoff=0.001, **kwargs)
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.stop()
+    capsys.readouterr()
+
+
+@pytest.mark.parametrize("error, permanent", [
+    (sqlite3.IntegrityError("UNIQUE constraint failed"), True),
+    (APIError("23503"), True),  # foreign_key_violation
+    (APIError("22P02"), True),  # invalid_text_representation
+    (APIError("PGRST102"), True),  # invalid request body
+    (ValueError("Unknown write op"), True),
+    (HTTPError(400), True),
+    (HTTPError(409), True),
+    (ConnectionError("refused"), False),
+    (TimeoutError("read timed out"), False),
+    (sqlite3.OperationalError("database is locked"), False),
+    (APIError("PGRST000"), False),  # PostgREST cannot reach Postgres
+    (APIError("PGRST301"), False),  # JWT problem
+    (APIError("57014"), False),  # statement timeout
+    (APIError("40001"), False),  # serialization failure
+    (HTTPError(429), False),
+    (HTTPError(503), False),
+    (RuntimeError("something unexpected"), False),
+])
+def test_is_permanent(error, permanent):
+    assert is_permanent(error) is permanent
+
+
+def test_rejected_row_does_not_hold_up_its_batch(queue_for):
+    sink = Sink()
+    queue = queue_for(sink)
+    queue.submit("insert", "likes", [{"n": 1}, {"n": 2, "bad": True}, {"n": 3}])
+    assert queue.flush()
+    queue.submit("insert", "likes", [{"n": n} for n in range(4, 9)])
+    assert queue.flush()
+
+    assert sorted(sink.rows) == [1, 3, 4, 5, 6, 7, 8]
+    stats = queue.stats()
+    assert (stats["state"], stats["journal_depth"], stats["dead_letters"]) == ("ok", 0, 1)
+    assert stats["lag_seconds"] == 0.0
+    assert queue.replay() == 0
+    [letter] = queue.journal.dead_letters()
+    assert letter["row"] == {"n": 2, "bad": True} and "FOREIGN KEY" in letter["error"]
+
+
+def test_one_bad_row_is_isolated_in_a_few_round_trips(queue_for):
+    sink = Sink(rejection=APIError("23503"))
+    queue = queue_for(sink, batch_size=128)
+    queue.submit("insert", "quiz_results", [{"n": n, "bad": n == 77} for n in range(128)])
+    assert queue.flush()
+    assert len(sink.rows) == 127 and 77 not in sink.rows
+    # Halving: two writes per level down to the bad row, instead of 128 one-row writes
+    assert sink.calls <= 2 * 7 + 1
+    assert queue.retries == 0
+
+
+def test_outage_is_journaled_and_replayed_once_back(queue_for):
+    sink = Sink()
+    queue = queue_for(sink, max_retries=1)
+    sink.down = True
+    queue.submit("insert", "likes", [{"n": n} for n in range(5)])
+    assert queue.flush()
+    stats = queue.stats()
+    assert (stats["state"], stats["journal_depth"], stats["dead_letters"]) == ("down", 5, 0)
+
+    sink.down = False
+    assert queue.replay() == 5
+    assert sorted(sink.rows) == [0, 1, 2, 3, 4]
+    assert queue.stats()["journal_depth"] == 0
+
+
+def test_replay_dead_letters_rows_journaled_before_they_were_rejected(queue_for):
+    sink = Sink()
+    queue = queue_for(sink, max_retries=0)
+    sink.down = True
+    queue.submit("insert", "likes", [{"n": 1}, {"n": 2, "bad": True}, {"n": 3}])
+    assert queue.flush()
+
+    sink.down = False
+    assert queue.replay() == 2
+    assert sorted(sink.rows) == [1, 3]
+    assert queue.stats()["journal_depth"] == 0 and queue.stats()["dead_letters"] == 1
+
+
+def test_outage_while_splitting_journals_only_the_unwritten_rows(queue_for):
+    sink = Sink()
+    queue = queue_for(sink, max_retries=0, batch_size=8)
+
+    def flaky(op, table, rows):
+        if len(rows) == 2:  # the backend goes away halfway through the split
+            sink.down = True
+        return sink(op, table, rows)
+
+    queue.sink = flaky
+    queue.submit("insert", "likes", [{"n": n, "bad": n == 0} for n in range(8)])
+    assert queue.flush()
+    # [0..3] rejected, split; [0, 1] hits the outage. [4..7] is still unwritten too.
+    stats = queue.stats()
+    assert sink.rows == []
+    assert stats["journal_depth"] == 8 and stats["dead_letters"] == 0
+
+    sink.down = False
+    queue.sink = sink
+    queue.replay()
+    assert sorted(sink.rows) == list(range(1, 8))
+    assert queue.stats()["dead_letters"] == 1
+
+
+def test_rejected_rows_do_not_trip_the_writes_breaker(monkeypatch, capsys):
+    import supabase_client
+    from circuit_breaker import CLOSED, CircuitBreaker
+
+    class Rejecting:
+        name = "rejecting"
+
+        def available(self):
+            return True
+
+        def write(self, op, table, rows):
+            raise sqlite3.IntegrityError("FOREIGN KEY constraint failed")
+
+    breaker = CircuitBreaker("writes", min_calls=1)
+    monkeypatch.setitem(supabase_client._breakers, "writes", breaker)
+    monkeypatch.setattr(supabase_client, "_backend", Rejecting())
+    for _ in range(10):
+        with pytest.raises(sqlite3.IntegrityError):
+            supabase_client._write_batch("insert", "likes", [{"session_id": "missing"}])
+    assert breaker.state == CLOSED
+    capsys.readouterr()
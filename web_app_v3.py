@@ -3,21 +3,26 @@ Scientist Twin 3.0 - Rich Biographical Matching with Supabase
 Real analytics, persistent data, and vector similarity search
 """
 
-from flask import Flask, render_template, request, jsonify, session, redirect
+from flask import Flask, Response, render_template, request, jsonify, session, redirect, stream_with_context
+import os
 import secrets
 import json
 import random
 import hashlib
 from datetime import datetime, timedelta
-from questions_v3_simplified import QUESTIONS, map_answer_to_trait, build_user_profile
+from questions_v3_simplified import QUESTIONS, DOMAINS, map_answer_to_trait, build_user_profile
 from matching_engine_v3 import MatchingEngineV3
+from result_store import create_result_store
+from response_cache import ResponseCache, CachedBody
+from shared_state import create_shared_state, MemorySharedState
+from live_feed import LiveFeed
 
 # Try to import Supabase client
 try:
     import supabase_client as db
     SUPABASE_AVAILABLE = db.is_connected()
     if SUPABASE_AVAILABLE:
-        print("[Supabase] Connected - using real analytics")
+        print(f"[Supabase] Connected ({db.backend_name()} storage) - using real analytics")
     else:
         print("[Supabase] Not configured - using fallback analytics")
 except ImportError:
@@ -26,10 +31,20 @@ except ImportError:
     print("[Supabase] Client not available - using fallback analytics")
 
 app = Flask(__name__)
-app.secret_key = secrets.token_hex(16)
+
+# Session cookies must verify on every worker and instance, so the signing key is shared config.
+# To rotate: set the new SECRET_KEY and move the old one to SECRET_KEY_FALLBACKS (comma-separated) -
+# cookies signed with a fallback still load and are re-signed with the new key on their next write.
+app.secret_key = os.getenv("SECRET_KEY")
+if not app.secret_key:
+    app.secret_key = secrets.token_hex(32)
+    print("[Security] SECRET_KEY not set - sessions only verify in this process "
+          "(or in workers forked from it with gunicorn --preload) and are lost on restart")
+app.config['SECRET_KEY_FALLBACKS'] = [key for key in os.getenv("SECRET_KEY_FALLBACKS", "").split(",") if key]
 
 # Trust proxy headers (required for Vercel/production)
 from werkzeug.middleware.proxy_fix import ProxyFix
+from werkzeug.http import http_date
 app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
 
 # Session cookie configuration for iframe embedding
@@ -59,6 +74,93 @@ try:
 except ImportError:
     print("[Performance] flask-compress not available - install with: pip install flask-compress")
 
+# Finished results live server-side - the session cookie only carries their id
+# (RESULT_STORE_URL=memory for one process, sqlite:///path shared by workers on one host)
+result_store = create_result_store()
+print(f"[Performance] Result store: {type(result_store).__name__}")
+
+# Rate counters and cached responses every worker agrees on
+# (SHARED_STATE_URL=memory for one process, sqlite:///path for workers on one host, https://<kv> across instances)
+shared_state = create_shared_state()
+print(f"[Performance] Shared state: {type(shared_state).__name__}")
+
+# Analytics/stats responses are rendered once per TTL and shared by every viewer - and by every
+# worker when the shared state is (RESPONSE_CACHE=0 renders on every request)
+response_cache = ResponseCache(enabled=os.getenv("RESPONSE_CACHE", "1") != "0",
+                               shared=None if isinstance(shared_state, MemorySharedState) else shared_state)
+
+# Dashboard password attempts per IP and window, counted across workers
+LOGIN_ATTEMPTS = 10
+LOGIN_WINDOW = 15 * 60
+
+# Seconds each cached endpoint stays fresh, then how long it may be served stale while one refresh runs
+CACHE_TTLS = {
+    'analytics': (30, 300),
+    'analytics_live': (10, 120),
+    'stats': (30, 300),
+    'scientist_count': (3600, 86400),
+    'dashboard': (15, 120),
+}
+
+
+def cached_response(key: str, render, cache_control: str = 'public, no-cache'):
+    """Serve render()'s response from the response cache, with gzip, ETag/Last-Modified and 304s
+
+    render runs in an app context only (it may run on a background refresh thread),
+    so it must not touch request or session. Non-200 responses are passed through uncached.
+    """
+    def build():
+        with app.app_context():
+            response = app.make_response(render())
+            if response.status_code != 200:
+                return response.get_data(), response.status_code, response.content_type
+            return CachedBody(response.get_data(), response.content_type)
+
+    ttl, stale = CACHE_TTLS[key]
+    entry = response_cache.get(key, build, ttl, stale)
+    if not isinstance(entry, CachedBody):
+        body, status, content_type = entry
+        return Response(body, status=status, content_type=content_type)
+
+    use_gzip = entry.gzipped is not None and 'gzip' in request.accept_encodings
+    # Each encoding is a different representation, so it gets its own strong ETag
+    headers = {
+        'ETag': f'"{entry.etag}-gz"' if use_gzip else f'"{entry.etag}"',
+        'Last-Modified': http_date(entry.last_modified),
+        'Cache-Control': cache_control,
+        'Vary': 'Accept-Encoding',
+    }
+    if request.if_none_match:
+        not_modified = (request.if_none_match.contains(entry.etag)
+                        or request.if_none_match.contains(f"{entry.etag}-gz"))
+    else:
+        since = request.if_modified_since
+        not_modified = since is not None and since.timestamp() >= int(entry.last_modified)
+    if not_modified:
+        return Response(status=304, headers=headers)
+
+    response = Response(entry.gzipped if use_gzip else entry.body, content_type=entry.content_type,
+                        headers=headers)
+    if use_gzip:
+        # flask-compress leaves responses that already carry a Content-Encoding alone
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+
+# /api/live: one producer per process watches the counters and fans events out to every open stream
+# (LIVE_FEED=0 answers 204, which sends pages back to polling). Each open stream holds one of the
+# worker's GUNICORN_THREADS for as long as the page is open, so by default a quarter of them may
+# stream and the rest stay free for quiz requests
+live_feed = None
+if SUPABASE_AVAILABLE and os.getenv("LIVE_FEED", "1") != "0":
+    live_feed = LiveFeed(db.get_totals, db.get_recent_plays,
+                         interval=float(os.getenv("LIVE_POLL_SECONDS", "2")),
+                         max_subscribers=int(os.getenv("LIVE_MAX_SUBSCRIBERS",
+                                                       max(int(os.getenv("GUNICORN_THREADS", "8")) // 4, 1))))
+    # Completions written by this worker show up at once, other workers' on the next poll
+    db.on_write(lambda op, table: live_feed.notify())
+
+
 # Lazy load matching engine to avoid slow cold starts
 matching_engine = None
 
@@ -67,43 +169,13 @@ def get_matching_engine():
     global matching_engine
     if matching_engine is None:
         print("[Performance] Loading scientist database...")
-        matching_engine = MatchingEngineV3('scientist_db_rich.json')
+        # Narratives are assembled from the artifact built by build_narratives.py (live if missing/stale);
+        # the indexes are mapped from build_engine_snapshot.py's output (indexed from the JSON if missing/stale)
+        matching_engine = MatchingEngineV3('scientist_db_rich.json', narratives_path='scientist_narratives.msgpack',
+                                           snapshot_path=os.getenv("ENGINE_SNAPSHOT", "scientist_engine.snapshot"))
         print("[Performance] Database loaded successfully")
     return matching_engine
 
-DOMAINS = {
-    "cosmos": {
-        "name": "The Cosmos",
-        "description": "Physics, Astrophysics, Space Science",
-        "icon": "stars"
-    },
-    "quantum": {
-        "name": "Quantum & Math",
-        "description": "Physics, Mathematics, Computer Science",
-        "icon": "atom"
-    },
-    "chemistry": {
-        "name": "Chemistry",
-        "description": "Chemical Science, Material Science, Organic & Inorganic Chemistry",
-        "icon": "flask"
-    },
-    "life": {
-        "name": "Life Sciences",
-        "description": "Biology, Medicine, Genetics",
-        "icon": "dna"
-    },
-    "earth": {
-        "name": "Earth & Environment",
-        "description": "Ecology, Agriculture, Environmental Science",
-        "icon": "leaf"
-    },
-    "engineering": {
-        "name": "Engineering & Tech",
-        "description": "Engineering, Technology, Innovation",
-        "icon": "cog"
-    }
-}
-
 
 def get_client_ip():
     """Get client IP address (works behind proxies)"""
@@ -130,34 +202,23 @@ def share_result(session_id):
 
     # Try to fetch scientist data from Supabase if available
     if SUPABASE_AVAILABLE and db:
-        try:
-            client = db.get_client()
-            # Get the top matched scientist for this session
-            result = client.table("quiz_results")\
-                .select("scientist_name, scientist_field, scientist_image, match_score")\
-                .eq("session_id", session_id)\
-                .eq("rank", 1)\
-                .limit(1)\
-                .execute()
-
-            if result.data and len(result.data) > 0:
-                scientist = result.data[0]
-                match_score = round(scientist.get('match_score', 0) * 100)
-
-                # Update OG tags with scientist data
-                og_data['title'] = f"I matched with {scientist['scientist_name']} ({match_score}% match)! 🔬"
-                og_data['description'] = f"I just discovered my Indian Scientist Twin in {scientist.get('scientist_field', 'Science')}! Take the quiz to find yours!"
-
-                # Use scientist image if available
-                if scientist.get('scientist_image'):
-                    og_data['image'] = scientist['scientist_image']
-                else:
-                    # Fallback to Wikipedia image
-                    scientist_name = scientist['scientist_name'].replace(' ', '_')
-                    og_data['image'] = f"https://en.wikipedia.org/wiki/Special:FilePath/{scientist_name}.jpg"
+        # Get the top matched scientist for this session
+        scientist = db.get_session_top_match(session_id)
 
-        except Exception as e:
-            print(f"[Share] Error fetching scientist data: {e}")
+        if scientist:
+            match_score = round((scientist.get('match_score') or 0) * 100)
+
+            # Update OG tags with scientist data
+            og_data['title'] = f"I matched with {scientist['scientist_name']} ({match_score}% match)! 🔬"
+            og_data['description'] = f"I just discovered my Indian Scientist Twin in {scientist.get('scientist_field') or 'Science'}! Take the quiz to find yours!"
+
+            # Use scientist image if available
+            if scientist.get('scientist_image'):
+                og_data['image'] = scientist['scientist_image']
+            else:
+                # Fallback to Wikipedia image
+                scientist_name = scientist['scientist_name'].replace(' ', '_')
+                og_data['image'] = f"https://en.wikipedia.org/wiki/Special:FilePath/{scientist_name}.jpg"
 
     return render_template('index_v3.html', domains=DOMAINS, og_data=og_data, session_id=session_id)
 
@@ -385,9 +446,18 @@ def get_matches():
     answers = session.get('answers', [])
     domain = session.get('domain', 'cosmos')
 
+    # Use db_session_uuid from session if it exists, otherwise use client_uuid directly
+    result = complete_quiz(answers, domain, session.get('db_session_uuid') or client_uuid, start_time)
+    return jsonify(result)
+
+
+def complete_quiz(answers: list, domain: str, session_uuid: str, start_time: float) -> dict:
+    """Profile, match, persist and remember one finished quiz - returns the results payload"""
+    import time
+
     user_profile = build_user_profile(answers)
     print(f"[Performance] Profile built in {time.time() - start_time:.3f}s")
-    print(f"[Client UUID] Using UUID for save: {client_uuid}")
+    print(f"[Client UUID] Using UUID for save: {session_uuid}")
 
     # Anti-repetition: Get recently shown scientists from session
     # Keep track of last 9 scientists shown (3 attempts × 3 matches)
@@ -422,51 +492,151 @@ def get_matches():
 
     # Save to Supabase using client UUID (doesn't depend on server session!)
     if SUPABASE_AVAILABLE and db:
-        # Use db_session_uuid from session if it exists, otherwise use client_uuid directly
-        session_uuid = session.get('db_session_uuid') or client_uuid
-
         print(f"[Supabase] Attempting to save results")
         print(f"[Supabase] Using UUID: {session_uuid}")
 
         if session_uuid:
-            db_start = time.time()
-            try:
-                # Complete the session
-                db.complete_quiz_session(session_uuid, user_profile)
-                # Save match results
-                db.save_quiz_results(session_uuid, matches)
-                print(f"[Performance] Supabase save took {time.time() - db_start:.3f}s")
-                print(f"[Supabase] ✓ Successfully saved quiz results!")
-            except Exception as e:
-                print(f"[Supabase] ✗ Save failed: {e}")
-                import traceback
-                traceback.print_exc()
+            # Queued for the write-behind worker - Supabase latency stays off this request
+            db.finish_quiz(session_uuid, user_profile, matches)
+            print(f"[Supabase] ✓ Quiz results queued for saving")
         else:
             print(f"[Supabase] ✗ NO UUID available (neither db_session_uuid nor client_uuid)!")
             print(f"[Supabase] Results will NOT be saved")
 
-    # Store result in session for "Back to results" functionality
-    session['last_result'] = {
+    # Store result for "Back to results" functionality (only its id goes in the cookie)
+    session['last_result_id'] = result_store.save({
         "user_profile": user_profile,
         "trait_percentages": trait_percentages,
         "matches": matches
-    }
+    })
+    session.pop('last_result', None)  # full payload kept by older versions
     session.modified = True
 
     print(f"[Performance] Total request time: {time.time() - start_time:.3f}s")
 
-    return jsonify({
+    return {
         "user_profile": user_profile,
         "trait_percentages": trait_percentages,
         "matches": matches
+    }
+
+
+# Client-side quiz: every question in one cacheable response (versioned by content)
+QUESTIONS_PAYLOAD = [
+    {
+        "number": i + 1,
+        "text": q['text'],
+        "options": [opt['text'] for opt in q['options']],
+        "dimension": q['dimension']
+    }
+    for i, q in enumerate(QUESTIONS)
+]
+QUESTIONS_VERSION = hashlib.sha256(json.dumps(QUESTIONS_PAYLOAD, sort_keys=True).encode()).hexdigest()[:12]
+
+
+@app.route('/api/questions')
+def get_questions():
+    """All quiz questions for client-side delivery (answers are submitted once via /api/submit-quiz)"""
+    response = jsonify({
+        "version": QUESTIONS_VERSION,
+        "total_questions": len(QUESTIONS_PAYLOAD),
+        "questions": QUESTIONS_PAYLOAD
     })
+    response.set_etag(QUESTIONS_VERSION)
+    response.headers['Cache-Control'] = 'public, max-age=3600'
+    return response.make_conditional(request)
+
+
+@app.route('/api/submit-quiz', methods=['POST'])
+def submit_quiz():
+    """Single-shot quiz: validate all answers, match, persist and return results in one request
+
+    Replaces start-quiz + 12x answer-question + get-matches (which still work for old embeds).
+    """
+    import time
+    start_time = time.time()
+
+    data = request.get_json(silent=True) or {}
+    domain = data.get('domain', 'cosmos')
+    answers = data.get('answers')
+    client_uuid = data.get('client_uuid')
+
+    if domain not in DOMAINS:
+        return jsonify({"error": f"Unknown domain: {domain}"}), 400
+    version = data.get('questions_version')
+    if version and version != QUESTIONS_VERSION:
+        # Answers were given to a different question set - the client must reload the questions
+        return jsonify({"error": "Questions have changed", "questions_version": QUESTIONS_VERSION}), 409
+    if (not isinstance(answers, list) or len(answers) != len(QUESTIONS)
+            or not all(type(a) is int and 0 <= a < len(q['options']) for a, q in zip(answers, QUESTIONS))):
+        return jsonify({"error": f"Expected {len(QUESTIONS)} answers, each an option index"}), 400
+
+    session['domain'] = domain
+    session['answers'] = answers
+    if client_uuid:
+        session['client_uuid'] = client_uuid
+
+    # Track in Supabase using CLIENT UUID (not server session)
+    # Only an id the database returned is a quiz_sessions row - without one this quiz is not saved,
+    # and its likes/shares must not land on the previous quiz's row
+    session_uuid = None
+    session.pop('db_session_uuid', None)
+    if SUPABASE_AVAILABLE and db and client_uuid:
+        session_uuid = db.create_quiz_session(
+            session_id=client_uuid,
+            domain=domain,
+            ip_address=get_client_ip()
+        )
+        if session_uuid:
+            session['db_session_uuid'] = session_uuid
+        else:
+            print(f"[Supabase] ✗ Failed to create Supabase session - results will NOT be saved")
+
+    return jsonify(complete_quiz(answers, domain, session_uuid, start_time))
 
 
 @app.route('/api/scientists/count')
 def scientist_count():
-    return jsonify({
+    return cached_response('scientist_count', lambda: jsonify({
         "count": len(get_matching_engine().scientists)
-    })
+    }))
+
+
+@app.route('/api/engine-stats')
+def engine_stats():
+    """Matching engine cache counters (hits, misses, evictions) for monitoring"""
+    return jsonify(get_matching_engine().cache_stats())
+
+
+@app.route('/api/health')
+def health():
+    """Supabase circuit breaker states (time in state, recent transitions) and write queue health"""
+    if SUPABASE_AVAILABLE and db:
+        # Always 200 - the app keeps serving (with fallbacks) while Supabase is down
+        return jsonify(db.get_connection_health())
+    return jsonify({"supabase": False, "is_healthy": True})
+
+
+@app.route('/api/transport-stats')
+def transport_stats():
+    """Supabase HTTP pool usage and per-table latency histograms for monitoring"""
+    if SUPABASE_AVAILABLE and db:
+        return jsonify(db.transport_stats())
+    return jsonify({"enabled": False})
+
+
+@app.route('/api/write-queue')
+def write_queue():
+    """Write-behind queue depth, lag and counters for monitoring"""
+    if SUPABASE_AVAILABLE and db:
+        return jsonify(db.write_queue_stats())
+    return jsonify({"enabled": False})
+
+
+@app.route('/api/cache-stats')
+def cache_stats():
+    """Response cache hits, coalesced waits and renders per endpoint for monitoring"""
+    return jsonify(response_cache.stats())
 
 
 @app.route('/dashboard')
@@ -477,6 +647,15 @@ def dashboard():
     # Simple password protection
     if not flask_session.get('dashboard_auth'):
         password = request.args.get('password', '')
+        if password:
+            ip_hash = hashlib.sha256(get_client_ip().encode()).hexdigest()[:16]
+            try:
+                attempts = shared_state.incr(f"dashboard-login:{ip_hash}", LOGIN_WINDOW)
+            except Exception as e:
+                print(f"[Security] Login counter unavailable: {e}")
+                attempts = 0
+            if attempts > LOGIN_ATTEMPTS:
+                return "Too many attempts - try again later", 429
         if password == 'SciRio2025':
             flask_session['dashboard_auth'] = True
         else:
@@ -491,116 +670,72 @@ def dashboard():
             </body></html>
             '''
 
+    # Same page for every admin - private, so shared proxies never keep a copy
+    return cached_response('dashboard', render_dashboard, 'private, no-cache')
+
+
+def render_dashboard():
     # Get detailed analytics - FULL ISF EVENT DATA
     detailed_stats = {}
 
     if SUPABASE_AVAILABLE and db:
-        client = db.get_client()
-        if client:
-            try:
-                # GET TOTAL COUNT OF ALL COMPLETED SESSIONS (not just 50!)
-                total_count_result = client.table("quiz_sessions")\
-                    .select("id", count="exact")\
-                    .not_.is_("completed_at", "null")\
-                    .execute()
-
-                total_completed = total_count_result.count or 0
-
-                # Get ALL sessions for domain/trait distribution (no limit!)
-                all_sessions = client.table("quiz_sessions")\
-                    .select("domain, user_profile")\
-                    .not_.is_("completed_at", "null")\
-                    .execute()
-
-                # Get recent 100 sessions for display
-                recent_sessions = client.table("quiz_sessions")\
-                    .select("*")\
-                    .not_.is_("completed_at", "null")\
-                    .order("completed_at", desc=True)\
-                    .limit(100)\
-                    .execute()
-
-                detailed_stats['recent_sessions'] = recent_sessions.data if recent_sessions.data else []
-
-                # Domain distribution from ALL sessions
-                domain_counts = {}
-                trait_counts = {}
-
-                for session in (all_sessions.data or []):
-                    domain = session.get('domain', 'unknown')
-                    domain_counts[domain] = domain_counts.get(domain, 0) + 1
-
-                    # Collect trait data
-                    profile = session.get('user_profile', {})
-                    for dim, value in profile.items():
-                        key = f"{dim}:{value}"
-                        trait_counts[key] = trait_counts.get(key, 0) + 1
-
-                detailed_stats['domain_distribution'] = [
-                    {"domain": d, "count": c}
-                    for d, c in sorted(domain_counts.items(), key=lambda x: -x[1])
-                ]
-
-                detailed_stats['trait_distribution'] = [
-                    {"trait": t, "count": c}
-                    for t, c in sorted(trait_counts.items(), key=lambda x: -x[1])[:20]
-                ]
-
-                # ALL quiz results (top 3 matches per session)
-                results = client.table("quiz_results")\
-                    .select("*")\
-                    .order("created_at", desc=True)\
-                    .limit(500)\
-                    .execute()
-
-                detailed_stats['all_results'] = results.data if results.data else []
-
-                # Count likes and shares
-                likes = client.table("likes").select("id", count="exact").execute()
-                shares = client.table("shares").select("id", count="exact").execute()
-
-                # Get scientist match counts (who matched with whom)
-                scientist_matches = client.table("quiz_results")\
-                    .select("scientist_name, scientist_field")\
-                    .eq("rank", 1)\
-                    .execute()
-
-                match_counts = {}
-                for match in (scientist_matches.data or []):
-                    name = match.get('scientist_name', 'Unknown')
-                    match_counts[name] = match_counts.get(name, 0) + 1
-
-                detailed_stats['scientist_matches'] = [
-                    {"name": name, "count": count}
-                    for name, count in sorted(match_counts.items(), key=lambda x: -x[1])[:20]
-                ]
-
-                detailed_stats['summary'] = {
-                    'total_plays': total_completed,
-                    'favorites': likes.count or 0,
-                    'share_count': shares.count or 0,
-                    'share_rate': round((shares.count or 0) * 100 / total_completed) if total_completed > 0 else 0
-                }
-
-            except Exception as e:
-                print(f"Dashboard error: {e}")
-                detailed_stats['error'] = str(e)
+        # Counts and distributions over ALL completed sessions, plus the newest sessions/results
+        detailed_stats = db.get_dashboard_stats()
+        if detailed_stats is None:
+            detailed_stats = {
+                'error': "Database unavailable",
                 # Provide fallback summary
-                detailed_stats['summary'] = {
+                'summary': {
                     'total_plays': 0,
                     'favorites': 0,
                     'share_count': 0
                 }
+            }
 
     detailed_stats['total_scientists'] = len(get_matching_engine().scientists)
 
     return render_template('dashboard.html', stats=detailed_stats, is_admin=True)
 
 
+@app.route('/dashboard/export/<table>.<fmt>')
+def dashboard_export(table, fmt):
+    """Stream a whole table as CSV or NDJSON for the dashboard's export buttons (constant memory)"""
+    if not session.get('dashboard_auth'):
+        return jsonify({"error": "Dashboard login required"}), 401
+    if table not in ('quiz_sessions', 'quiz_results', 'likes', 'shares') or fmt not in ('csv', 'ndjson'):
+        return jsonify({"error": "Unknown export"}), 404
+    if not (SUPABASE_AVAILABLE and db):
+        return jsonify({"error": "Database unavailable"}), 503
+
+    chunks = db.export_rows(table, fmt)
+    try:
+        # Pull the first page before answering, so an unreachable database is a 503 and not an empty file
+        first = next(chunks, '')
+    except Exception as e:
+        print(f"[Export] {table}.{fmt} failed: {e}")
+        return jsonify({"error": "Database unavailable"}), 503
+
+    def generate():
+        yield first
+        try:
+            yield from chunks
+        except Exception as e:
+            # Headers are gone - all we can do is end the download early and say so in the log
+            print(f"[Export] {table}.{fmt} stopped early: {e}")
+
+    filename = f"scientist-twin-{table}-{datetime.now().strftime('%Y-%m-%d')}.{fmt}"
+    return Response(stream_with_context(generate()),
+                    mimetype='text/csv' if fmt == 'csv' else 'application/x-ndjson',
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
+
 @app.route('/analytics')
 def analytics():
     """Analytics dashboard with ONLY real data from Supabase"""
+    return cached_response('analytics', render_analytics)
 
+
+def render_analytics():
     # Try to get real analytics from Supabase
     if SUPABASE_AVAILABLE and db:
         real_stats = db.get_real_analytics()
@@ -638,25 +773,30 @@ def analytics():
 def view_results():
     """Display the last quiz result - bulletproof version"""
     try:
-        last_result = session.get('last_result')
+        result_id = session.get('last_result_id')
+        # Sessions from older versions still carry the whole result
+        last_result = result_store.get(result_id) if result_id else session.get('last_result')
 
         if not last_result:
-            # No result in session, redirect to home
+            # No result in session (or it expired from the store), redirect to home
+            session.pop('last_result_id', None)
             return redirect('/')
 
         # Validate result has required fields
         if not isinstance(last_result, dict) or 'matches' not in last_result:
             # Invalid result format, clear and redirect
             session.pop('last_result', None)
+            session.pop('last_result_id', None)
             return redirect('/')
 
         # Return stored result as JSON for client-side rendering
-        return render_template('index_v3.html', stored_result=json.dumps(last_result))
+        return render_template('index_v3.html', domains=DOMAINS, stored_result=json.dumps(last_result))
 
     except Exception as e:
         # Log error and redirect to home
         print(f"[ERROR] /results route failed: {e}")
         session.pop('last_result', None)
+        session.pop('last_result_id', None)
         return redirect('/')
 
 
@@ -694,50 +834,46 @@ def track_share():
 @app.route('/api/analytics-live')
 def analytics_live():
     """Live analytics data for auto-refresh"""
-    if SUPABASE_AVAILABLE and db:
-        try:
-            # Get just the live data that changes frequently
-            client = db.get_client()
-
-            # Total plays
-            stats = client.table("quiz_sessions").select("id", count="exact").not_.is_("completed_at", "null").execute()
-            total_plays = stats.count or 0
-
-            # Recent activity (last 6)
-            recent = client.table("quiz_results")\
-                .select("scientist_name, created_at")\
-                .eq("rank", 1)\
-                .order("created_at", desc=True)\
-                .limit(6)\
-                .execute()
-
-            recent_activity = []
-            if recent.data:
-                for i, r in enumerate(recent.data):
-                    from datetime import datetime
-                    created = datetime.fromisoformat(r["created_at"].replace("Z", "+00:00"))
-                    time_ago = db.get_time_ago(created)
-                    recent_activity.append({
-                        "id": total_plays - i,
-                        "scientist": r["scientist_name"],
-                        "time": time_ago
-                    })
-
-            return jsonify({
-                "total_plays": total_plays,
-                "recent_activity": recent_activity
-            })
+    return cached_response('analytics_live', render_analytics_live)
 
-        except Exception as e:
-            print(f"[Error] Analytics live refresh failed: {e}")
-            return jsonify({"error": str(e)}), 500
+
+def render_analytics_live():
+    if SUPABASE_AVAILABLE and db:
+        # Get just the live data that changes frequently
+        live = db.get_live_activity(6)
+        if live is None:
+            return jsonify({"error": "Analytics unavailable"}), 500
+        return jsonify(live)
 
     return jsonify({"total_plays": 0, "recent_activity": []})
 
 
+@app.route('/api/live')
+def live():
+    """Server-Sent Events: a snapshot on connect, then play and totals events as completions are written"""
+    subscriber = live_feed.subscribe(request.headers.get('Last-Event-ID')) if live_feed else None
+    if subscriber is None:
+        # No feed, or at the connection cap - 204 tells EventSource to stop, and the page polls instead
+        return Response(status=204)
+    return Response(live_feed.stream(subscriber), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/api/live-stats')
+def live_stats():
+    """Open /api/live connections, peak, drops and producer reads for monitoring"""
+    if live_feed:
+        return jsonify(live_feed.stats())
+    return jsonify({"enabled": False})
+
+
 @app.route('/api/stats')
 def get_stats():
     """API endpoint for real-time stats"""
+    return cached_response('stats', render_stats)
+
+
+def render_stats():
     if SUPABASE_AVAILABLE and db:
         stats = db.get_real_analytics()
         if stats:
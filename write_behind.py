@@ -0,0 +1,411 @@
+"""
+Write-Behind Queue - takes analytics writes off the request path
+Requests enqueue rows and return at once; a background worker drains the
+bounded queue in batches (one insert per table for many sessions), retries
+with backoff and spills to a SQLite journal while the database is
+unreachable, replaying it once writes succeed again. Rows the database
+rejects for good are split out of their batch and set aside as dead letters
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Optional
+
+# SQLSTATE classes worth retrying: connection exception, transaction rollback (serialization failure,
+# deadlock), insufficient resources, operator intervention (statement timeout), system error
+RETRYABLE_SQLSTATES = ("08", "40", "53", "57", "58")
+# HTTP 4xx that mean "try again later" rather than "never"
+RETRYABLE_STATUSES = (408, 425, 429)
+
+
+def is_permanent(error: Exception) -> bool:
+    """Whether writing the same rows again can never succeed
+
+    Constraint violations, bad values and 4xx rejections are permanent. Connection errors, timeouts,
+    5xx and anything unrecognised are retried - an unknown error must not cost a row.
+    """
+    if hasattr(error, "written"):
+        error = error.error  # PartialWriteError - the row that failed decides
+    if isinstance(error, (sqlite3.IntegrityError, ValueError, TypeError)):
+        return True
+    code = getattr(error, "code", None)
+    if isinstance(code, str):
+        if code.startswith("PGRST"):
+            # PostgREST: PGRST0xx cannot reach Postgres (503), PGRST3xx are JWT problems - both clear up
+            return code[5:6] not in ("0", "3")
+        if len(code) == 5:
+            return not code.startswith(RETRYABLE_SQLSTATES)
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return 400 <= status < 500 and status not in RETRYABLE_STATUSES
+    return False
+
+
+class WriteBehindQueue:
+    """
+    Bounded in-process write queue drained by one daemon thread
+
+    sink(op, table, rows) performs one batched write and raises on failure.
+    op is "insert" (rows are column dicts) or "update" (rows are
+    {"id": ..., "values": {...}}). Entries that cannot be written yet - queue
+    full, retries exhausted, or the sink marked down - go to the journal
+    when one is configured and are dropped (and counted) otherwise.
+
+    A batch rejected with a permanent error (is_permanent) is not retried:
+    it is split in halves until the rejected rows are isolated, the rest is
+    written, and the rejected rows go to the journal's dead letters. A sink
+    that writes row by row raises an error with .written (the rows that
+    landed) and .error (storage_backend.PartialWriteError): those rows are
+    never sent again and the row that failed is the next one.
+    """
+
+    def __init__(self, sink: Callable, journal_path: Optional[str] = None, maxsize: int = 10000,
+                 batch_size: int = 200, flush_interval: float = 0.5, max_retries: int = 4,
+                 backoff: float = 0.25, max_backoff: float = 30.0):
+        self.sink = sink
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.journal = WriteJournal(journal_path) if journal_path else None
+
+        self._queue = deque()  # (enqueued_at, op, table, row)
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopping = False
+        self._busy = False  # worker holds a batch taken off the queue
+        self._down_until = 0.0  # sink considered unreachable until then
+
+        self.written = 0
+        self.batches = 0
+        self.retries = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.dropped = 0
+        self.dead_lettered = 0
+        self.last_error = None
+        self.last_rejection = None
+
+    # ---- producer side (request threads) ----
+
+    def submit(self, op: str, table: str, rows: list) -> bool:
+        """Queue rows for writing; never blocks on the database
+
+        Returns False when the rows could only be dropped (queue full and no journal).
+        """
+        now = time.time()
+        entries = [(now, op, table, row) for row in rows]
+        with self._cond:
+            if len(self._queue) + len(entries) <= self.maxsize:
+                self._queue.extend(entries)
+                self._cond.notify()
+                overflow = None
+            else:
+                overflow = entries
+        self._ensure_worker()
+        if overflow is None:
+            return True
+        return self._spill(overflow)
+
+    def _ensure_worker(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._cond:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                self._thread.start()
+
+    # ---- worker side ----
+
+    def _take(self, timeout: float) -> list:
+        with self._cond:
+            if not self._queue and not self._stopping:
+                self._cond.wait(timeout)
+            count = min(self.batch_size, len(self._queue))
+            self._busy = count > 0
+            return [self._queue.popleft() for _ in range(count)]
+
+    def _run(self):
+        while True:
+            batch = self._take(self.flush_interval)
+            if batch:
+                if self._is_down():
+                    self._spill(batch)
+                else:
+                    self._write_with_retry(batch)
+                with self._cond:
+                    self._busy = False
+            elif self._stopping:
+                return
+            if self.journal and not batch and not self._is_down():
+                self.replay(self.batch_size)
+
+    def _is_down(self) -> bool:
+        return time.time() < self._down_until
+
+    def _mark_down(self, error: Exception):
+        self.last_error = f"{type(error).__name__}: {error}"
+        self._down_until = time.time() + self.max_backoff
+
+    def _write_with_retry(self, batch: list) -> bool:
+        remaining = batch
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._write_groups(remaining)
+                return True
+            except _PartialWrite as partial:
+                remaining = partial.remaining
+                error = partial.error
+            if attempt < self.max_retries:
+                self.retries += 1
+                delay = min(self.backoff * (2 ** attempt), self.max_backoff)
+                with self._cond:
+                    # Woken early on shutdown - leftovers are spilled below
+                    self._cond.wait_for(lambda: self._stopping, delay)
+                if self._stopping:
+                    break
+        print(f"[WriteBehind] {len(remaining)} rows not written ({error}) - "
+              f"{'journaled' if self.journal else 'dropped'}")
+        self._mark_down(error)
+        self._spill(remaining)
+        return False
+
+    def _write_groups(self, entries: list):
+        """Write entries grouped by (op, table) in first-seen order
+
+        Raises _PartialWrite carrying the unwritten entries of the failed group and every group after it.
+        """
+        groups = OrderedDict()
+        for entry in entries:
+            groups.setdefault((entry[1], entry[2]), []).append(entry)
+        groups = list(groups.items())
+        for done, ((op, table), group) in enumerate(groups):
+            try:
+                self._write_group(op, table, group)
+            except _PartialWrite as partial:
+                partial.remaining += [entry for _, g in groups[done + 1:] for entry in g]
+                raise
+
+    def _write_group(self, op: str, table: str, group: list):
+        """Write one (op, table) group, dead-lettering the rows the sink rejects for good
+
+        A permanent rejection splits the rejected piece in halves, so one bad row costs a few
+        extra round trips instead of its whole batch. A retryable error raises _PartialWrite
+        with every entry not written yet.
+        """
+        pending = [group]
+        while pending:
+            piece = pending.pop()
+            try:
+                self.sink(op, table, [entry[3] for entry in piece])
+            except Exception as e:
+                written = getattr(e, "written", None)
+                if written:
+                    self.written += written
+                    self.batches += 1
+                    piece = piece[written:]
+                if not is_permanent(e):
+                    raise _PartialWrite(piece + [entry for p in reversed(pending) for entry in p], e)
+                if written is not None:
+                    # Applied row by row - the first unwritten row is the one rejected
+                    self._dead_letter(piece[:1], e.error)
+                    if len(piece) > 1:
+                        pending.append(piece[1:])
+                elif len(piece) > 1:
+                    middle = len(piece) // 2
+                    pending += [piece[middle:], piece[:middle]]
+                else:
+                    self._dead_letter(piece, e)
+                continue
+            self.written += len(piece)
+            self.batches += 1
+
+    def _dead_letter(self, entries: list, error: Exception):
+        self.last_rejection = f"{type(error).__name__}: {error}"
+        self.dead_lettered += len(entries)
+        print(f"[WriteBehind] {entries[0][1]} {entries[0][2]} row rejected ({error}) - "
+              f"{'dead-lettered' if self.journal else 'dropped'}")
+        if self.journal:
+            try:
+                self.journal.dead_letter(entries, self.last_rejection)
+            except sqlite3.Error as e:
+                print(f"[WriteBehind] Dead letter write failed: {e}")
+
+    def _spill(self, entries: list) -> bool:
+        if self.journal:
+            try:
+                self.journal.append(entries)
+                self.spilled += len(entries)
+                return True
+            except sqlite3.Error as e:
+                print(f"[WriteBehind] Journal write failed: {e}")
+        self.dropped += len(entries)
+        return False
+
+    def replay(self, limit: int = 1000) -> int:
+        """Write up to limit journaled entries back to the sink; returns how many were written
+
+        Entries are claimed atomically, so several worker processes can share one journal.
+        """
+        if not self.journal:
+            return 0
+        entries = self.journal.claim(limit)
+        if not entries:
+            return 0
+        before = self.written
+        try:
+            self._write_groups(entries)
+        except _PartialWrite as partial:
+            self.journal.append(partial.remaining)
+            self._mark_down(partial.error)
+            self.replayed += self.written - before
+            return self.written - before
+        # Rows rejected on the way went to the dead letters, not back to the journal
+        self.replayed += self.written - before
+        print(f"[WriteBehind] Replayed {self.written - before} journaled rows")
+        return self.written - before
+
+    # ---- lifecycle and monitoring ----
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every queued row has been written or journaled"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            with self._cond:
+                if not self._queue and not self._busy:
+                    return True
+            time.sleep(0.01)
+        return False
+
+    def stop(self, timeout: float = 5.0):
+        """Drain what is queued (writing or journaling it) and stop the worker"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        with self._cond:
+            leftover = list(self._queue)
+            self._queue.clear()
+        if leftover:
+            self._spill(leftover)
+
+    def stats(self) -> dict:
+        now = time.time()
+        with self._cond:
+            depth = len(self._queue)
+            oldest = self._queue[0][0] if self._queue else None
+        journal_depth, journal_oldest = self.journal.stats() if self.journal else (0, None)
+        dead_letters = self.journal.dead_letter_count() if self.journal else 0
+        if journal_oldest is not None:
+            oldest = journal_oldest if oldest is None else min(oldest, journal_oldest)
+        return {
+            "depth": depth,
+            "maxsize": self.maxsize,
+            "journal_depth": journal_depth,
+            "lag_seconds": round(now - oldest, 3) if oldest is not None else 0.0,
+            "state": "down" if self._is_down() else "ok",
+            "written": self.written,
+            "batches": self.batches,
+            "retries": self.retries,
+            "spilled": self.spilled,
+            "replayed": self.replayed,
+            "dropped": self.dropped,
+            "dead_lettered": self.dead_lettered,
+            "dead_letters": dead_letters,
+            "last_error": self.last_error,
+            "last_rejection": self.last_rejection
+        }
+
+
+class _PartialWrite(Exception):
+    def __init__(self, remaining: list, error: Exception):
+        super().__init__(str(error))
+        self.remaining = remaining
+        self.error = error
+
+
+class WriteJournal:
+    """
+    SQLite spill file for writes that could not reach the database, and
+    dead letters: rows the database rejected, kept for inspection (never replayed)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        # A forked worker (gunicorn --preload) must open its own connections
+        os.register_at_fork(after_in_child=self._forget_connections)
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS write_journal ("
+                         "id INTEGER PRIMARY KEY AUTOINCREMENT, enqueued_at REAL NOT NULL, "
+                         "op TEXT NOT NULL, tbl TEXT NOT NULL, payload TEXT NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS dead_letters ("
+                         "id INTEGER PRIMARY KEY AUTOINCREMENT, enqueued_at REAL NOT NULL, failed_at REAL NOT NULL, "
+                         "op TEXT NOT NULL, tbl TEXT NOT NULL, payload TEXT NOT NULL, error TEXT NOT NULL)")
+
+    def _connect(self) -> sqlite3.Connection:
+        """One connection per thread (sqlite3 connections are not shareable across threads)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _forget_connections(self):
+        self._local = threading.local()
+
+    def append(self, entries: list):
+        conn = self._connect()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany("INSERT INTO write_journal (enqueued_at, op, tbl, payload) VALUES (?, ?, ?, ?)",
+                             [(t, op, table, json.dumps(row)) for t, op, table, row in entries])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def claim(self, limit: int) -> list:
+        """Remove and return the oldest entries (the caller re-appends whatever it fails to write)"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute("SELECT id, enqueued_at, op, tbl, payload FROM write_journal "
+                                "ORDER BY id LIMIT ?", (limit,)).fetchall()
+            if rows:
+                conn.execute("DELETE FROM write_journal WHERE id <= ?", (rows[-1][0],))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return [(t, op, table, json.loads(payload)) for _, t, op, table, payload in rows]
+
+    def dead_letter(self, entries: list, error: str):
+        now = time.time()
+        self._connect().executemany(
+            "INSERT INTO dead_letters (enqueued_at, failed_at, op, tbl, payload, error) VALUES (?, ?, ?, ?, ?, ?)",
+            [(t, now, op, table, json.dumps(row), error) for t, op, table, row in entries])
+
+    def dead_letters(self, limit: int = 100) -> list:
+        """Newest rejected rows: {"enqueued_at", "failed_at", "op", "table", "row", "error"}"""
+        rows = self._connect().execute("SELECT enqueued_at, failed_at, op, tbl, payload, error FROM dead_letters "
+                                       "ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [{"enqueued_at": t, "failed_at": failed, "op": op, "table": table, "row": json.loads(payload),
+                 "error": error} for t, failed, op, table, payload, error in rows]
+
+    def dead_letter_count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM dead_letters").fetchone()[0]
+
+    def stats(self) -> tuple:
+        """(entries, oldest enqueued_at or None)"""
+        return tuple(self._connect().execute("SELECT COUNT(*), MIN(enqueued_at) FROM write_journal").fetchone())